@@ -2,13 +2,17 @@
 CLI for evaluating the model on the test set.
 
 Usage:
-    uv run mina-evaluate --weights PATH [--test-dir PATH] [--imgsz N]
+    uv run mina-evaluate --weights PATH [--test-dir PATH] [--imgsz N] [--bootstrap N]
+    uv run mina-evaluate --weights PATH --sweep [--output-dir PATH]
+    uv run mina-evaluate --weights A.pt B.tflite C.tflite [--workers N]
 """
 
 import argparse
 from pathlib import Path
 
+from mina.compare import evaluate_models, print_comparison_results
 from mina.evaluate import evaluate, print_evaluation_results
+from mina.sweep import print_sweep_results, save_sweep_results, sweep_thresholds
 from mina.core.constants import DEFAULT_IMAGE_SIZE, DEFAULT_IOU_THRESHOLD, TEST_DATA_DIR
 
 
@@ -19,8 +23,10 @@ def main():
     parser.add_argument(
         "--weights",
         type=str,
+        nargs="+",
         required=True,
-        help="Path to trained model weights (.pt or .tflite)",
+        help="Path to trained model weights (.pt or .tflite). Pass several "
+        "to compare them side by side (the first is the baseline).",
     )
     parser.add_argument(
         "--test-dir",
@@ -46,12 +52,49 @@ def main():
         default=DEFAULT_IOU_THRESHOLD,
         help=f"IoU threshold for NMS (default: {DEFAULT_IOU_THRESHOLD})",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-run inference instead of reusing cached predictions "
+        "(comparing several --weights always re-runs inference)",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Sweep confidence and NMS IoU thresholds and recommend per-class values",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default=None,
+        help="Where --sweep writes pr_curves.csv and thresholds.yaml "
+        "(default: next to the weights)",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Report 95%% confidence intervals from N bootstrap resamples "
+        "of the test images (e.g. 1000; default: off)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes when comparing models; more than 1 is faster "
+        "but distorts the latencies (default: 1)",
+    )
 
     args = parser.parse_args()
+    if len(args.weights) > 1 and (args.sweep or args.output_dir):
+        parser.error("--sweep and --output-dir take a single --weights")
 
-    weights_path = Path(args.weights)
-    if not weights_path.exists():
-        raise FileNotFoundError(f"Weights file not found: {weights_path}")
+    weights_paths = [Path(w) for w in args.weights]
+    for weights_path in weights_paths:
+        if not weights_path.exists():
+            raise FileNotFoundError(f"Weights file not found: {weights_path}")
+    weights_path = weights_paths[0]
 
     test_dir = Path(args.test_dir)
     if not test_dir.exists():
@@ -60,12 +103,43 @@ def main():
             "Make sure you ran 'uv run mina-download' to download the dataset."
         )
 
+    if len(weights_paths) > 1:
+        results = evaluate_models(
+            weights_list=weights_paths,
+            test_dir=test_dir,
+            imgsz=args.imgsz,
+            confidence=args.confidence,
+            iou=args.iou,
+            workers=args.workers,
+            bootstrap=args.bootstrap,
+        )
+        print_comparison_results(results)
+        return 0
+
+    if args.sweep:
+        results = sweep_thresholds(
+            weights=weights_path,
+            test_dir=test_dir,
+            imgsz=args.imgsz,
+            use_cache=not args.no_cache,
+        )
+        print_sweep_results(results)
+
+        output_dir = Path(args.output_dir) if args.output_dir else weights_path.parent
+        curves_path, thresholds_path = save_sweep_results(results, output_dir)
+        print(f"\nPR curves saved to: {curves_path}")
+        print(f"Thresholds saved to: {thresholds_path}")
+        print(f"Use with: uv run mina-infer --thresholds {thresholds_path}")
+        return 0
+
     metrics = evaluate(
         weights=weights_path,
         test_dir=test_dir,
         imgsz=args.imgsz,
         confidence=args.confidence,
         iou=args.iou,
+        use_cache=not args.no_cache,
+        bootstrap=args.bootstrap,
     )
 
     print_evaluation_results(metrics)
@@ -2,13 +2,41 @@
 CLI for exporting the model to TFLite format.
 
 Usage:
-    uv run mina-export [--weights PATH] [--no-int8] [--imgsz N] [--output-dir PATH]
+    uv run mina-export [--weights PATH] [--no-int8] [--imgsz N] [--output-dir PATH] [--no-cache]
+                       [--calibration-size N] [--calibration-seed N]
+    uv run mina-export --formats onnx,tflite-fp16,tflite-int8 [--weights PATH]
+    uv run mina-export --mixed-precision [--max-map-drop X] [--max-latency-ms X]
+    uv run mina-export --ladder [320,416,512,640] [--no-int8]
+    uv run mina-export [...] --verify [--verify-dir PATH] [--verify-images N]
+    uv run mina-export [...] --run NAME|latest|best
 """
 
 import argparse
+from pathlib import Path
 
-from mina.export import export_tflite, get_weights_or_default
-from mina.core.constants import DEFAULT_IMAGE_SIZE
+import yaml
+
+from mina.calibration import DEFAULT_CALIBRATION_SIZE
+from mina.export import (
+    EXPORT_FORMATS,
+    export_formats,
+    export_tflite,
+    get_weights_or_default,
+    parse_formats,
+)
+from mina.core.constants import DEFAULT_IMAGE_SIZE, TEST_DATA_DIR
+from mina.ladder import (
+    RESOLUTION_LADDER,
+    export_ladder,
+    parse_resolutions,
+    print_ladder_results,
+)
+from mina.quantize import (
+    DEFAULT_MAX_MAP_DROP,
+    print_mixed_precision_results,
+    search_mixed_precision,
+)
+from mina.verify import VERIFY_IMAGES, print_verification_report, verify_export
 
 
 def main():
@@ -21,6 +49,13 @@ def main():
         default=None,
         help="Path to trained weights file (.pt). Auto-detects if not provided.",
     )
+    parser.add_argument(
+        "--run",
+        type=str,
+        default=None,
+        help="Training run to export without --weights: a run name, 'latest' or "
+        "'best' (highest val mAP50-95) (default: latest)",
+    )
     parser.add_argument(
         "--no-int8",
         action="store_true",
@@ -43,19 +78,175 @@ def main():
         action="store_true",
         help="Include NMS in the model (may fail due to onnx2tf TopK issues)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-run the conversion instead of reusing a cached export",
+    )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--calibration-size",
+        type=int,
+        default=DEFAULT_CALIBRATION_SIZE,
+        help="Number of class-balanced train images used for int8 calibration; "
+        f"0 uses the whole val split (default: {DEFAULT_CALIBRATION_SIZE})",
+    )
+    parser.add_argument(
+        "--calibration-seed",
+        type=int,
+        default=0,
+        help="Random seed for calibration image selection (default: 0)",
+    )
+    parser.add_argument(
+        "--formats",
+        type=str,
+        default=None,
+        help="Comma-separated formats to build from one shared conversion, "
+        f"with a manifest (choices: {','.join(EXPORT_FORMATS)})",
+    )
 
-    weights_path = get_weights_or_default(args.weights)
+    parser.add_argument(
+        "--mixed-precision",
+        action="store_true",
+        help="Search for an int8 model that keeps the most quantization-sensitive "
+        "layers in float, within the --max-map-drop / --max-latency-ms budget",
+    )
+    parser.add_argument(
+        "--max-map-drop",
+        type=float,
+        default=DEFAULT_MAX_MAP_DROP,
+        help="Largest mAP50-95 drop versus the .pt accepted by --mixed-precision "
+        f"(default: {DEFAULT_MAX_MAP_DROP})",
+    )
+    parser.add_argument(
+        "--max-latency-ms",
+        type=float,
+        default=None,
+        help="Latency ceiling for --mixed-precision candidates (default: none)",
+    )
+    parser.add_argument(
+        "--ladder",
+        type=str,
+        nargs="?",
+        const=",".join(map(str, RESOLUTION_LADDER)),
+        default=None,
+        help="Export at several comma-separated resolutions and print a latency "
+        f"vs. mAP table (default: {','.join(map(str, RESOLUTION_LADDER))})",
+    )
 
-    export_tflite(
-        weights_path=weights_path,
-        int8=not args.no_int8,
-        imgsz=args.imgsz,
-        output_dir=args.output_dir,
-        nms=args.nms,
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Compare each exported model against the .pt on held-out images "
+        "and fail if agreement is below the gate",
+    )
+    parser.add_argument(
+        "--verify-dir",
+        type=str,
+        default=str(TEST_DATA_DIR / "images"),
+        help=f"Images used by --verify (default: {TEST_DATA_DIR / 'images'})",
+    )
+    parser.add_argument(
+        "--verify-images",
+        type=int,
+        default=VERIFY_IMAGES,
+        help=f"Number of images used by --verify (default: {VERIFY_IMAGES})",
     )
 
+    args = parser.parse_args()
+
+    modes = [args.formats, args.mixed_precision, args.ladder]
+    if sum(bool(mode) for mode in modes) > 1:
+        parser.error("--formats, --mixed-precision and --ladder cannot be combined")
+
+    try:
+        if args.formats:
+            formats = parse_formats(args.formats)
+        if args.ladder:
+            resolutions = parse_resolutions(args.ladder)
+    except ValueError as e:
+        parser.error(str(e))
+
+    weights_path = get_weights_or_default(args.weights, args.run)
+
+    if args.formats:
+        manifest_path = export_formats(
+            weights_path=weights_path,
+            formats=formats,
+            imgsz=args.imgsz,
+            output_dir=args.output_dir,
+            nms=args.nms,
+            calibration_size=args.calibration_size or None,
+            calibration_seed=args.calibration_seed,
+            use_cache=not args.no_cache,
+        )
+        manifest = yaml.safe_load(manifest_path.read_text())
+        exports = [
+            (manifest_path.parent / artifact["file"], args.imgsz)
+            for artifact in manifest["artifacts"].values()
+        ]
+    elif args.mixed_precision:
+        results = search_mixed_precision(
+            weights_path=weights_path,
+            imgsz=args.imgsz,
+            output_dir=args.output_dir,
+            max_map_drop=args.max_map_drop,
+            max_latency_ms=args.max_latency_ms,
+            calibration_size=args.calibration_size or None,
+            calibration_seed=args.calibration_seed,
+        )
+        print_mixed_precision_results(results)
+        exports = [(results["model"], args.imgsz)]
+    elif args.ladder:
+        ladder = export_ladder(
+            weights_path=weights_path,
+            resolutions=resolutions,
+            int8=not args.no_int8,
+            output_dir=args.output_dir,
+            calibration_size=args.calibration_size or None,
+            calibration_seed=args.calibration_seed,
+            use_cache=not args.no_cache,
+        )
+        print_ladder_results(ladder)
+        exports = [(Path(r["weights"]), r["imgsz"]) for r in ladder["results"]]
+    else:
+        exports = [
+            (
+                export_tflite(
+                    weights_path=weights_path,
+                    int8=not args.no_int8,
+                    imgsz=args.imgsz,
+                    output_dir=args.output_dir,
+                    nms=args.nms,
+                    calibration_size=args.calibration_size or None,
+                    calibration_seed=args.calibration_seed,
+                    use_cache=not args.no_cache,
+                ),
+                args.imgsz,
+            )
+        ]
+
+    if not args.verify:
+        return 0
+
+    failed = False
+    for export_path, imgsz in exports:
+        report = verify_export(
+            export_path=export_path,
+            source_weights=weights_path,
+            images_dir=Path(args.verify_dir),
+            num_images=args.verify_images,
+            imgsz=imgsz,
+        )
+        print_verification_report(report)
+        failed = failed or bool(report["failures"])
+
+    if failed:
+        print("\nERROR: Exported model failed verification.")
+        return 1
+
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    exit(main())
@@ -2,19 +2,38 @@
 CLI for running inference on images.
 
 Usage:
-    uv run mina-infer [--weights PATH] [--image PATH] [--dir PATH] [--confidence N]
+    uv run mina-infer [--weights PATH | --run NAME|latest|best] [--image PATH] [--dir PATH] [--confidence N]
+    uv run mina-infer [...] --smoke-test [--no-cache]
+    uv run mina-infer --dir PATH --output results.{jsonl,parquet,db} [--limit N]
+    uv run mina-infer --dir PATH --output results.{jsonl,db} --resume
+    uv run mina-infer --dir PATH --recursive [--include GLOB] [--exclude GLOB] [--shard i/N]
+    find archive -name '*.jpg' | uv run mina-infer --files - --shard i/N --output ...
+    uv run mina-infer --dir PATH --tta {auto,on} [--tta-margin N]
+    uv run mina-infer --dir PATH --cascade [--screen-weights PATH] [--band LOW HIGH]
 """
 
 import argparse
-import tempfile
+from contextlib import nullcontext
 from pathlib import Path
 
-import numpy as np
-from PIL import Image
-
-from mina.inference import run_inference, run_inference_on_directory
-from mina.core.model import load_model, find_best_weights
+from mina.inference import (
+    run_inference,
+    run_inference_on_directory,
+    run_inference_on_images,
+    smoke_test,
+)
+from mina.inputs import STDIN_LIST, iter_images, parse_shard, read_image_list
+from mina.cascade import CASCADE_BAND, ESCALATION_BATCH_SIZE, run_cascade
+from mina.sinks import SINK_FORMATS, open_sink
+from mina.tta import TTA, TTA_MARGIN, TTA_MODES, TTA_VIEWS
+from mina.core.model import (
+    INT8_TFLITE_ARTIFACTS,
+    load_model,
+    find_run_weights,
+    find_tflite_weights,
+)
 from mina.core.constants import DEFAULT_CONFIDENCE_THRESHOLD
+from mina.core.thresholds import load_thresholds
 
 
 def main():
@@ -27,6 +46,13 @@ def main():
         default=None,
         help="Path to model weights (.pt or .tflite)",
     )
+    parser.add_argument(
+        "--run",
+        type=str,
+        default="latest",
+        help="Training run to use without --weights: a run name, 'latest' or "
+        "'best' (highest val mAP50-95) (default: latest)",
+    )
     parser.add_argument(
         "--image",
         type=str,
@@ -39,15 +65,147 @@ def main():
         default=None,
         help="Path to directory of images to test",
     )
+    parser.add_argument(
+        "--files",
+        type=str,
+        default=None,
+        help=f"Text file listing image paths, one per line ('{STDIN_LIST}' for stdin)",
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Include images in subdirectories of --dir",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        help="Only process images matching this glob, e.g. '*.png' or "
+        "'tank3/*' (relative to --dir; repeatable)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="Skip images and directories matching this glob (repeatable)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=str,
+        default=None,
+        help="Only process shard i of N (0-based), chosen by a hash of each "
+        "image's relative path, e.g. 0/4",
+    )
     parser.add_argument(
         "--confidence",
         type=float,
         default=DEFAULT_CONFIDENCE_THRESHOLD,
         help=f"Minimum confidence threshold (default: {DEFAULT_CONFIDENCE_THRESHOLD})",
     )
+    parser.add_argument(
+        "--thresholds",
+        type=str,
+        default=None,
+        help="Per-class thresholds YAML from 'mina-evaluate --sweep' "
+        "(overrides --confidence)",
+    )
+    parser.add_argument(
+        "--tta",
+        choices=TTA_MODES,
+        default=None,
+        help=f"Test-time augmentation: predict on {len(TTA_VIEWS)} flipped/scaled "
+        "views in one batch and fuse the boxes; 'auto' only augments images "
+        "with a box near its class threshold",
+    )
+    parser.add_argument(
+        "--tta-margin",
+        type=float,
+        default=TTA_MARGIN,
+        help="Confidence distance from a threshold that triggers --tta auto "
+        f"(default: {TTA_MARGIN})",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Screen --dir/--files images with the int8 TFLite export and re-run "
+        "only those with a top confidence inside --band through the full model",
+    )
+    parser.add_argument(
+        "--screen-weights",
+        type=str,
+        default=None,
+        help="Screening model for --cascade (default: the run's int8 TFLite export)",
+    )
+    parser.add_argument(
+        "--band",
+        type=float,
+        nargs=2,
+        metavar=("LOW", "HIGH"),
+        default=CASCADE_BAND,
+        help="Top confidences escalated by --cascade "
+        f"(default: {CASCADE_BAND[0]} {CASCADE_BAND[1]})",
+    )
+    parser.add_argument(
+        "--escalation-batch",
+        type=int,
+        default=ESCALATION_BATCH_SIZE,
+        help="Escalated images per full-model batch "
+        f"(default: {ESCALATION_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--smoke-test",
+        action="store_true",
+        help="Check the pipeline on a synthetic image first (always done when "
+        "neither --image nor --dir is given; passes are cached per weights)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-run the smoke test even if it passed for these weights before",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Stream per-image detections and timings to a file; the format "
+        f"follows the suffix ({', '.join(SINK_FORMATS)})",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Maximum number of --dir/--files images to process, 0 for all; "
+        "with --resume, images already done do not count (default: 10)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted --output run: append to the output and "
+        "skip the --dir/--files images recorded in its .progress file",
+    )
 
     args = parser.parse_args()
 
+    if args.output and Path(args.output).suffix.lower() not in SINK_FORMATS:
+        parser.error(f"--output must end in one of: {', '.join(SINK_FORMATS)}")
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+    if args.resume and Path(args.output).suffix.lower() == ".parquet":
+        parser.error("--resume needs .jsonl or .db output (Parquet cannot be appended)")
+    if args.dir and args.files:
+        parser.error("Use either --dir or --files")
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        parser.error(str(e))
+    if args.cascade and not (args.dir or args.files):
+        parser.error("--cascade needs --dir or --files")
+    if args.cascade and args.tta:
+        parser.error("--cascade and --tta cannot be combined")
+    if args.cascade and not 0.0 <= args.band[0] < args.band[1] <= 1.0:
+        parser.error("--band needs 0 <= LOW < HIGH <= 1")
+
     # Find weights
     if args.weights:
         weights_path = Path(args.weights)
@@ -55,43 +213,131 @@ def main():
             print(f"Error: Weights file not found: {weights_path}")
             return 1
     else:
-        weights_path = find_best_weights()
+        weights_path = find_run_weights(args.run)
         if weights_path is None:
+            if args.run not in ("latest", "best"):
+                print(f"Error: No training run named '{args.run}' with best.pt")
+                return 1
             print("Error: No weights file specified and no training runs found.")
             print("Please train a model first: uv run mina-train")
             return 1
         print(f"Using weights: {weights_path}")
 
+    thresholds = load_thresholds(args.thresholds) if args.thresholds else None
+    tta = TTA(args.tta, margin=args.tta_margin) if args.tta else None
+
+    # Find the cascade's screening model: an int8 export of the same run
+    screen_path = None
+    if args.cascade:
+        if args.screen_weights:
+            screen_path = Path(args.screen_weights)
+        elif args.weights:
+            run_dir = weights_path.parent.parent
+            screen_path = next(
+                (
+                    run_dir / artifact
+                    for artifact in INT8_TFLITE_ARTIFACTS
+                    if (run_dir / artifact).exists()
+                ),
+                None,
+            )
+        else:
+            screen_path = find_tflite_weights(
+                run=args.run, artifacts=INT8_TFLITE_ARTIFACTS
+            )[1]
+        if screen_path is None or not screen_path.exists():
+            print("Error: No int8 TFLite export found for the cascade.")
+            print("Export one first (uv run mina-export) or pass --screen-weights")
+            return 1
+        print(f"Screening with: {screen_path}")
+
     # Load model
     print(f"Loading model from: {weights_path}")
     model = load_model(weights_path)
+    screen_model = load_model(screen_path) if screen_path else None
 
-    # Test with synthetic image first
-    print("\n=== Testing with synthetic image ===")
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        img_array = np.random.randint(0, 256, (640, 640, 3), dtype=np.uint8)
-        img = Image.fromarray(img_array)
-        test_path = Path(tmp_dir) / "synthetic_test.jpg"
-        img.save(test_path)
-
-        detections = run_inference(model, test_path, args.confidence)
-        print(f"  Pipeline working: {len(detections)} detection(s)")
-
-    # Process specified image
-    if args.image:
-        image_path = Path(args.image)
-        if not image_path.exists():
-            print(f"Error: Image not found: {image_path}")
+    # Without images to process, checking the pipeline is all there is to do
+    if args.smoke_test or not (args.image or args.dir or args.files):
+        print("\n=== Testing with synthetic image ===")
+        if not smoke_test(model, weights_path, use_cache=not args.no_cache):
             return 1
-        run_inference(model, image_path, args.confidence)
 
-    # Process directory
-    if args.dir:
-        dir_path = Path(args.dir)
-        if not dir_path.exists():
-            print(f"Error: Directory not found: {dir_path}")
+    with (
+        open_sink(args.output, resume=args.resume) if args.output else nullcontext()
+    ) as sink:
+        # Process specified image
+        if args.image:
+            image_path = Path(args.image)
+            if not image_path.exists():
+                print(f"Error: Image not found: {image_path}")
+                return 1
+            run_inference(
+                model,
+                image_path,
+                args.confidence,
+                thresholds=thresholds,
+                sink=sink,
+                tta=tta,
+            )
+
+        if args.dir and not Path(args.dir).exists():
+            print(f"Error: Directory not found: {args.dir}")
             return 1
-        run_inference_on_directory(model, dir_path, args.confidence)
+        if args.files and args.files != STDIN_LIST and not Path(args.files).exists():
+            print(f"Error: File list not found: {args.files}")
+            return 1
+
+        # Screen everything, escalate uncertain images
+        if args.cascade:
+            if args.dir:
+                images = iter_images(
+                    Path(args.dir), args.recursive, args.include, args.exclude, shard
+                )
+            else:
+                images = read_image_list(args.files, args.include, args.exclude, shard)
+            run_cascade(
+                screen_model,
+                model,
+                images,
+                args.confidence,
+                band=tuple(args.band),
+                batch_size=args.escalation_batch,
+                limit=args.limit or None,
+                thresholds=thresholds,
+                sink=sink,
+            )
+
+        # Process directory
+        elif args.dir:
+            dir_path = Path(args.dir)
+            run_inference_on_directory(
+                model,
+                dir_path,
+                args.confidence,
+                limit=args.limit or None,
+                thresholds=thresholds,
+                sink=sink,
+                recursive=args.recursive,
+                include=args.include,
+                exclude=args.exclude,
+                shard=shard,
+                tta=tta,
+            )
+
+        # Process listed images
+        elif args.files:
+            run_inference_on_images(
+                model,
+                read_image_list(args.files, args.include, args.exclude, shard),
+                args.confidence,
+                limit=args.limit or None,
+                thresholds=thresholds,
+                sink=sink,
+                tta=tta,
+            )
+
+    if sink is not None:
+        print(f"\nResults for {sink.count} image(s) written to: {sink.path}")
 
     return 0
 
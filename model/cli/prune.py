@@ -0,0 +1,101 @@
+"""
+CLI for structured pruning and fine-tuning of a trained model.
+
+Usage:
+    uv run mina-prune [--weights PATH] [--target 0.7] [--metric flops|params] [--epochs N]
+                      [--batch N] [--imgsz N] [--name NAME] [--device DEVICE]
+"""
+
+import argparse
+
+from mina.core.constants import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_FINETUNE_EPOCHS,
+    DEFAULT_IMAGE_SIZE,
+    DEFAULT_PRUNE_RATIO,
+)
+from mina.export import get_weights_or_default
+from mina.prune import print_prune_results, prune_and_finetune
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prune channels of a trained YOLOv8 model and fine-tune it"
+    )
+    parser.add_argument(
+        "--weights",
+        type=str,
+        default=None,
+        help="Path to trained weights file (.pt). Auto-detects if not provided.",
+    )
+    parser.add_argument(
+        "--target",
+        type=float,
+        default=DEFAULT_PRUNE_RATIO,
+        help="Target pruned / original FLOPs or parameters "
+        f"(default: {DEFAULT_PRUNE_RATIO})",
+    )
+    parser.add_argument(
+        "--metric",
+        type=str,
+        choices=["flops", "params"],
+        default="flops",
+        help="What --target applies to (default: flops)",
+    )
+    parser.add_argument(
+        "--epochs",
+        type=int,
+        default=DEFAULT_FINETUNE_EPOCHS,
+        help=f"Fine-tuning epochs; 0 skips fine-tuning (default: {DEFAULT_FINETUNE_EPOCHS})",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Batch size (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--imgsz",
+        type=int,
+        default=DEFAULT_IMAGE_SIZE,
+        help=f"Input image size (default: {DEFAULT_IMAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--name",
+        type=str,
+        default="fish_disease_pruned",
+        help="Fine-tuning run name (default: fish_disease_pruned)",
+    )
+    parser.add_argument(
+        "--device",
+        type=str,
+        default=None,
+        help="Device to use: '0' for GPU, 'cpu' for CPU (default: auto-detect)",
+    )
+
+    args = parser.parse_args()
+
+    if not 0 < args.target <= 1:
+        parser.error("--target must be in (0, 1]")
+
+    try:
+        results = prune_and_finetune(
+            weights_path=get_weights_or_default(args.weights),
+            target_ratio=args.target,
+            metric=args.metric,
+            epochs=args.epochs,
+            batch=args.batch,
+            imgsz=args.imgsz,
+            name=args.name,
+            device=args.device,
+        )
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print_prune_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -3,12 +3,24 @@ CLI for training the fish disease detection model.
 
 Usage:
     uv run mina-train [--epochs N] [--batch N] [--imgsz N] [--name NAME] [--device DEVICE] [--hyp PATH]
+    uv run mina-train --teacher PATH [--distill-conf X] [...]
+    uv run mina-train --resume [--device DEVICE]
+    uv run mina-train --profile [--batch N] [--workers N] [--profile-steps N]
 """
 
 import argparse
 
-from mina.train import train
-from mina.core.constants import DEFAULT_EPOCHS, DEFAULT_BATCH_SIZE, DEFAULT_IMAGE_SIZE
+from mina.distill import DISTILL_MIN_CONFIDENCE
+from mina.profiling import PROFILE_STEPS, print_profile_results, profile_training
+from mina.train import get_data_yaml_path, get_device, train
+from mina.core.constants import (
+    CHECKPOINT_KEEP,
+    DEFAULT_EPOCHS,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_IMAGE_SIZE,
+    DEFAULT_SAVE_PERIOD,
+    DEFAULT_WORKERS,
+)
 
 
 def main():
@@ -39,6 +51,12 @@ def main():
         default="fish_disease",
         help="Training run name (default: fish_disease)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Data-loader worker processes (default: {DEFAULT_WORKERS})",
+    )
     parser.add_argument(
         "--device",
         type=str,
@@ -51,9 +69,65 @@ def main():
         default=None,
         help="Path to hyperparameters YAML file",
     )
+    parser.add_argument(
+        "--teacher",
+        type=str,
+        default=None,
+        help="Distill from a larger teacher model (.pt); its train-set "
+        "predictions are cached and used as soft targets",
+    )
+    parser.add_argument(
+        "--distill-conf",
+        type=float,
+        default=DISTILL_MIN_CONFIDENCE,
+        help="Minimum teacher confidence used as a soft target "
+        f"(default: {DISTILL_MIN_CONFIDENCE})",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the most recent interrupted run from its last.pt",
+    )
+    parser.add_argument(
+        "--save-period",
+        type=int,
+        default=DEFAULT_SAVE_PERIOD,
+        help="Write an epoch checkpoint every N epochs, -1 to disable "
+        f"(default: {DEFAULT_SAVE_PERIOD})",
+    )
+    parser.add_argument(
+        "--keep-checkpoints",
+        type=int,
+        default=CHECKPOINT_KEEP,
+        help=f"Number of epoch checkpoints kept (default: {CHECKPOINT_KEEP})",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile data loading vs compute with short probe runs and "
+        "recommend --workers and --batch instead of training",
+    )
+    parser.add_argument(
+        "--profile-steps",
+        type=int,
+        default=PROFILE_STEPS,
+        help=f"Timed training steps per probe (default: {PROFILE_STEPS})",
+    )
 
     args = parser.parse_args()
 
+    if args.profile:
+        results = profile_training(
+            get_data_yaml_path(),
+            imgsz=args.imgsz,
+            batch=args.batch,
+            workers=args.workers,
+            device=args.device or get_device(),
+            steps=args.profile_steps,
+        )
+        print_profile_results(results)
+        return
+
     train(
         epochs=args.epochs,
         batch=args.batch,
@@ -61,6 +135,12 @@ def main():
         name=args.name,
         device=args.device,
         hyp=args.hyp,
+        teacher=args.teacher,
+        distill_confidence=args.distill_conf,
+        resume=args.resume,
+        save_period=args.save_period,
+        keep_checkpoints=args.keep_checkpoints,
+        workers=args.workers,
     )
 
 
@@ -3,11 +3,28 @@ CLI for hyperparameter tuning using Ray Tune.
 
 Usage:
     uv run mina-tune [--data PATH] [--epochs N] [--iterations N] [--optimizer NAME] [--device DEVICE]
+    uv run mina-tune --asha [--parallel N] [--grace-epochs N] [--reduction-factor N] [...]
+    uv run mina-tune --asha --study NAME [--resume] [--warm-start STUDY ...]
+    uv run mina-tune --proxy [--proxy-fraction F] [--proxy-imgsz N] [--promote N] [...]
+    uv run mina-tune --studies | --best [STUDY]
 """
 
 import argparse
 
-from mina.tune import tune_hyperparameters
+from mina.tune import (
+    ASHA_GRACE_EPOCHS,
+    ASHA_REDUCTION_FACTOR,
+    DEFAULT_STUDY,
+    DEFAULT_TUNE_PARALLEL,
+    PROMOTE_TRIALS,
+    PROXY_FRACTION,
+    PROXY_IMAGE_SIZE,
+    print_best_trial,
+    print_studies,
+    tune_asha,
+    tune_hyperparameters,
+    tune_multifidelity,
+)
 from mina.core.constants import DEFAULT_TUNE_EPOCHS, DEFAULT_TUNE_ITERATIONS
 
 
@@ -43,18 +60,145 @@ def main():
     parser.add_argument(
         "--device",
         type=str,
-        default="0",
-        help="Device to use: '0' for GPU, 'cpu' for CPU (default: 0)",
+        default=None,
+        help="Device to use: '0' for GPU, 'cpu' for CPU, '0,1' to spread "
+        "--asha trials over GPUs (default: auto-detect)",
+    )
+    parser.add_argument(
+        "--asha",
+        action="store_true",
+        help="Run trials locally in parallel and stop poor ones early (ASHA)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=DEFAULT_TUNE_PARALLEL,
+        help=f"Trials running at once with --asha (default: {DEFAULT_TUNE_PARALLEL})",
+    )
+    parser.add_argument(
+        "--grace-epochs",
+        type=int,
+        default=ASHA_GRACE_EPOCHS,
+        help="Epochs before a trial can be stopped with --asha "
+        f"(default: {ASHA_GRACE_EPOCHS})",
+    )
+    parser.add_argument(
+        "--reduction-factor",
+        type=int,
+        default=ASHA_REDUCTION_FACTOR,
+        help="Keep the top 1/N of trials at each rung with --asha "
+        f"(default: {ASHA_REDUCTION_FACTOR})",
+    )
+    parser.add_argument(
+        "--study",
+        type=str,
+        default=DEFAULT_STUDY,
+        help="Study name in the trial database with --asha or --proxy "
+        f"(default: {DEFAULT_STUDY})",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the study (--asha, --proxy) or the latest ultralytics tuning run",
+    )
+    parser.add_argument(
+        "--warm-start",
+        type=str,
+        nargs="+",
+        default=None,
+        metavar="STUDY",
+        help="Try the best configurations of these studies first (--asha)",
+    )
+    parser.add_argument(
+        "--proxy",
+        action="store_true",
+        help="Run ASHA on a stratified train subset at reduced image size, then "
+        "retrain the best configurations at full fidelity",
+    )
+    parser.add_argument(
+        "--proxy-fraction",
+        type=float,
+        default=PROXY_FRACTION,
+        help=f"Share of train images used by --proxy trials (default: {PROXY_FRACTION})",
+    )
+    parser.add_argument(
+        "--proxy-imgsz",
+        type=int,
+        default=PROXY_IMAGE_SIZE,
+        help=f"Image size of --proxy trials (default: {PROXY_IMAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--promote",
+        type=int,
+        default=PROMOTE_TRIALS,
+        help="Configurations retrained at full fidelity with --proxy "
+        f"(default: {PROMOTE_TRIALS})",
+    )
+    parser.add_argument(
+        "--studies",
+        action="store_true",
+        help="List recorded tuning studies and exit",
+    )
+    parser.add_argument(
+        "--best",
+        type=str,
+        nargs="?",
+        const="",
+        default=None,
+        metavar="STUDY",
+        help="Print the best recorded hyperparameters (of STUDY, or overall) and exit",
     )
 
     args = parser.parse_args()
 
+    if args.studies:
+        print_studies()
+        return
+    if args.best is not None:
+        print_best_trial(args.best or None)
+        return
+
+    if args.proxy:
+        tune_multifidelity(
+            data=args.data,
+            epochs=args.epochs,
+            iterations=args.iterations,
+            parallel=args.parallel,
+            optimizer=args.optimizer,
+            device=args.device,
+            grace_epochs=args.grace_epochs,
+            reduction_factor=args.reduction_factor,
+            study=args.study,
+            resume=args.resume,
+            proxy_fraction=args.proxy_fraction,
+            proxy_imgsz=args.proxy_imgsz,
+            promote=args.promote,
+        )
+        return
+
+    if args.asha:
+        tune_asha(
+            data=args.data,
+            epochs=args.epochs,
+            iterations=args.iterations,
+            parallel=args.parallel,
+            optimizer=args.optimizer,
+            device=args.device,
+            grace_epochs=args.grace_epochs,
+            reduction_factor=args.reduction_factor,
+            study=args.study,
+            resume=args.resume,
+            warm_start=args.warm_start,
+        )
+        return
+
     tune_hyperparameters(
         data=args.data,
         epochs=args.epochs,
         iterations=args.iterations,
         optimizer=args.optimizer,
         device=args.device,
+        resume=args.resume,
     )
 
 
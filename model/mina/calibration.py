@@ -0,0 +1,283 @@
+"""
+Representative calibration subset selection for int8 export.
+
+Images are described by cheap label statistics (class histogram, box
+count, box size, aspect ratio and position). Each class gets an equal
+share of the budget, filled rarest class first, and within every share
+images are picked by greedy k-center sampling so the subset covers the
+spread of the split rather than its most common cases. Selections are
+cached and reproducible for a given split, size and seed.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from mina.core.cache import atomic_output, hash_key
+from mina.core.constants import CACHE_DIR, DISEASE_CLASSES
+from mina.core.dataset import label_path_for, resolve_split_images
+
+# Default number of calibration images (ultralytics recommends >= 300)
+DEFAULT_CALIBRATION_SIZE: int = 300
+
+# Bump to invalidate cached selections when the algorithm changes
+CALIBRATION_VERSION: int = 1
+
+
+def label_features(
+    image_paths: list[Path], num_classes: int = len(DISEASE_CLASSES)
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Describe each image by statistics of its labels.
+
+    Args:
+        image_paths: Images to describe
+        num_classes: Number of classes
+
+    Returns:
+        Tuple of (features (N, F) float, class presence (N, C) bool).
+        Features are the class histogram, log box count, and mean and
+        spread of box area, aspect ratio and center.
+    """
+    features = np.zeros((len(image_paths), num_classes + 7))
+    present = np.zeros((len(image_paths), num_classes), dtype=bool)
+
+    for i, image_path in enumerate(image_paths):
+        label_path = label_path_for(image_path)
+        if not label_path.exists():
+            continue
+
+        rows = [line.split() for line in label_path.read_text().splitlines()]
+        rows = [row for row in rows if len(row) >= 5]
+        if not rows:
+            continue
+
+        classes = np.array([int(row[0]) for row in rows])
+        coords = [np.array(row[1:], dtype=float) for row in rows]
+
+        # Polygons are reduced to their bounding box, like load_labels does
+        boxes = np.array(
+            [
+                c
+                if len(c) == 4
+                else [
+                    (c[0::2].min() + c[0::2].max()) / 2,
+                    (c[1::2].min() + c[1::2].max()) / 2,
+                    c[0::2].max() - c[0::2].min(),
+                    c[1::2].max() - c[1::2].min(),
+                ]
+                for c in coords
+            ]
+        )
+        valid = (classes >= 0) & (classes < num_classes)
+        classes, boxes = classes[valid], boxes[valid]
+        if len(classes) == 0:
+            continue
+
+        area = boxes[:, 2] * boxes[:, 3]
+        aspect = np.log(np.maximum(boxes[:, 2], 1e-6) / np.maximum(boxes[:, 3], 1e-6))
+
+        histogram = np.bincount(classes, minlength=num_classes)
+        present[i] = histogram > 0
+        features[i, :num_classes] = histogram / len(classes)
+        features[i, num_classes:] = [
+            np.log1p(len(classes)),
+            np.sqrt(area).mean(),
+            np.sqrt(area).std(),
+            aspect.mean(),
+            boxes[:, 0].mean(),
+            boxes[:, 1].mean(),
+            np.hypot(boxes[:, 0] - 0.5, boxes[:, 1] - 0.5).mean(),
+        ]
+
+    return features, present
+
+
+def k_center_greedy(
+    features: np.ndarray,
+    count: int,
+    selected: np.ndarray,
+    candidates: np.ndarray,
+    rng: np.random.Generator,
+) -> list[int]:
+    """
+    Pick candidates that are farthest from everything already selected.
+
+    Args:
+        features: (N, F) standardized features for all images
+        count: Number of images to pick
+        selected: Indices already selected (the picks extend these)
+        candidates: Indices to pick from
+        rng: Random generator for the first pick when nothing is selected
+
+    Returns:
+        List of picked indices, in pick order
+    """
+    candidates = np.asarray(candidates)
+    count = min(count, len(candidates))
+    if count <= 0:
+        return []
+
+    pool = features[candidates]
+
+    def distance_to(index: int) -> np.ndarray:
+        return np.sqrt(((pool - features[index]) ** 2).sum(axis=1))
+
+    # Distance from each candidate to its nearest selected image
+    distance = np.full(len(candidates), np.inf)
+    for index in selected:
+        distance = np.minimum(distance, distance_to(index))
+
+    picks = []
+    for _ in range(count):
+        if np.isinf(distance).all():
+            best = int(rng.integers(len(candidates)))
+        else:
+            best = int(distance.argmax())
+
+        picks.append(int(candidates[best]))
+        distance = np.minimum(distance, distance_to(candidates[best]))
+        distance[best] = -1.0
+
+    return picks
+
+
+def select_calibration_images(
+    image_paths: list[Path],
+    size: int = DEFAULT_CALIBRATION_SIZE,
+    seed: int = 0,
+    num_classes: int = len(DISEASE_CLASSES),
+) -> list[Path]:
+    """
+    Select a class-balanced, diverse calibration subset.
+
+    Every class present in the split gets an equal share of the budget,
+    filled rarest class first from images containing it; the remaining
+    budget (including images without labels) is filled by k-center
+    sampling over the whole split.
+
+    Args:
+        image_paths: Candidate images (usually the train split)
+        size: Number of images to select
+        seed: Random seed for tie-breaking
+        num_classes: Number of classes
+
+    Returns:
+        Selected image paths, sorted
+    """
+    if size >= len(image_paths):
+        return sorted(image_paths)
+
+    rng = np.random.default_rng(seed)
+    features, present = label_features(image_paths, num_classes)
+
+    scale = features.std(axis=0)
+    features = (features - features.mean(axis=0)) / np.where(scale > 0, scale, 1.0)
+
+    selected: list[int] = []
+    classes = np.flatnonzero(present.any(axis=0))
+    classes = classes[np.argsort(present[:, classes].sum(axis=0), kind="stable")]
+    quota = size // max(len(classes), 1)
+
+    for c in classes:
+        already = np.isin(np.arange(len(image_paths)), selected)
+        have = int(present[already, c].sum())
+        candidates = np.flatnonzero(present[:, c] & ~already)
+        selected += k_center_greedy(
+            features, quota - have, np.array(selected, dtype=int), candidates, rng
+        )
+
+    rest = np.setdiff1d(np.arange(len(image_paths)), selected)
+    selected += k_center_greedy(
+        features, size - len(selected), np.array(selected, dtype=int), rest, rng
+    )
+
+    return sorted(image_paths[i] for i in selected)
+
+
+def build_calibration_yaml(
+    data_yaml: Path,
+    size: int = DEFAULT_CALIBRATION_SIZE,
+    seed: int = 0,
+    split: str = "train",
+    cache_dir: Path | None = None,
+) -> Path:
+    """
+    Select (or reuse) a calibration subset and write a data.yaml for it.
+
+    The subset is cached under CACHE_DIR/calibration, keyed by the split's
+    image names and label contents, size and seed. The generated data.yaml
+    points both train and val at the image list, so it can be passed as
+    ``data=`` to an int8 export.
+
+    Args:
+        data_yaml: Dataset config to select from
+        size: Number of calibration images
+        seed: Random seed
+        split: Split to select from
+        cache_dir: Cache root. Defaults to CACHE_DIR.
+
+    Returns:
+        Path to the calibration data.yaml
+
+    Raises:
+        ValueError: If the split has no images
+    """
+    if cache_dir is None:
+        cache_dir = CACHE_DIR
+
+    image_paths = resolve_split_images(data_yaml, split)
+    if not image_paths:
+        raise ValueError(f"No {split} images found for {data_yaml}")
+
+    # Label contents, not image pixels, drive the selection
+    root = Path(os.path.commonpath([p.parent for p in image_paths]))
+    labels = {
+        path.relative_to(root).as_posix(): (
+            label_path_for(path).read_text() if label_path_for(path).exists() else ""
+        )
+        for path in image_paths
+    }
+
+    key = hash_key(
+        {
+            "version": CALIBRATION_VERSION,
+            # The list stores absolute paths, so a moved split is a new entry
+            "root": str(root.resolve()),
+            "labels": hash_key(labels),
+            "size": size,
+            "seed": seed,
+        }
+    )
+    entry = cache_dir / "calibration" / key
+    list_path = entry / "images.txt"
+    yaml_path = entry / "data.yaml"
+
+    if yaml_path.exists() and list_path.exists():
+        selected = list_path.read_text().split()
+        print(f"Using cached calibration set: {len(selected)} images ({list_path})")
+        return yaml_path
+
+    print(f"Selecting {min(size, len(image_paths))} calibration images...")
+    selected = select_calibration_images(image_paths, size, seed)
+
+    with atomic_output(list_path) as tmp_path:
+        tmp_path.write_text("".join(f"{p.resolve()}\n" for p in selected))
+
+    data = yaml.safe_load(Path(data_yaml).read_text()) or {}
+    content = {
+        "path": str(entry.resolve()),
+        "train": list_path.name,
+        "val": list_path.name,
+        "names": data.get("names", dict(enumerate(DISEASE_CLASSES))),
+        "nc": data.get("nc", len(DISEASE_CLASSES)),
+    }
+    with atomic_output(yaml_path) as tmp_path:
+        tmp_path.write_text(
+            f"# Calibration subset of {Path(data_yaml).resolve()}\n"
+            + yaml.safe_dump(content, sort_keys=False)
+        )
+
+    return yaml_path
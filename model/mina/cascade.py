@@ -0,0 +1,204 @@
+"""
+Confidence-gated cascade inference.
+
+A fast screening model (normally the int8 TFLite export, see
+INT8_TFLITE_ARTIFACTS) runs on every image. Most images are clear-cut:
+either nothing is found or the top box is confident. Only images whose
+top confidence falls inside the uncertainty band are escalated to the
+full model (best.pt), which runs on them in batches. Clear-cut images
+keep the screening detections, so the cascade costs about one int8 pass
+per image plus one full pass per escalated image.
+"""
+
+import time
+from collections.abc import Iterable
+from itertools import islice
+from pathlib import Path
+from typing import NamedTuple
+
+from ultralytics import YOLO
+
+from mina.core.constants import DEFAULT_CONFIDENCE_THRESHOLD
+from mina.core.thresholds import ClassThresholds
+from mina.inference import convert_to_detections
+from mina.progress import SkipCompleted
+from mina.sinks import ResultSink
+
+# Top confidences in [low, high) are escalated to the full model
+CASCADE_BAND: tuple[float, float] = (0.2, 0.6)
+
+# Escalated images run through the full model this many at a time
+ESCALATION_BATCH_SIZE: int = 16
+
+
+class CascadeStats(NamedTuple):
+    """Counts and wall times of a cascade run."""
+
+    images: int
+    escalated: int
+    screen_seconds: float
+    full_seconds: float
+    total_seconds: float
+
+    @property
+    def escalation_rate(self) -> float:
+        """Share of images re-run through the full model."""
+        return self.escalated / self.images if self.images else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """End-to-end images per second."""
+        return self.images / self.total_seconds if self.total_seconds else 0.0
+
+
+def top_confidence(results) -> float:
+    """
+    Get the highest box confidence of a prediction.
+
+    Args:
+        results: YOLO results for one image
+
+    Returns:
+        Top confidence, 0.0 if nothing was found
+    """
+    scores = [
+        float(result.boxes.conf.max())
+        for result in results
+        if result.boxes is not None and len(result.boxes)
+    ]
+    return max(scores, default=0.0)
+
+
+def run_cascade(
+    screen: YOLO,
+    full: YOLO,
+    images: Iterable[Path],
+    min_confidence: float = DEFAULT_CONFIDENCE_THRESHOLD,
+    band: tuple[float, float] = CASCADE_BAND,
+    batch_size: int = ESCALATION_BATCH_SIZE,
+    limit: int | None = None,
+    verbose: bool = True,
+    thresholds: ClassThresholds | None = None,
+    sink: ResultSink | None = None,
+) -> CascadeStats:
+    """
+    Run cascade inference over a stream of images.
+
+    Args:
+        screen: Fast model run on every image
+        full: Accurate model run on escalated images
+        images: Image paths, consumed lazily (e.g. from mina.inputs)
+        min_confidence: Minimum confidence threshold
+        band: (low, high) top confidences that are escalated
+        batch_size: Escalated images per full-model batch
+        limit: Maximum number of images to process, not counting skipped
+            ones (None for all)
+        verbose: Whether to print per-image results and the summary
+        thresholds: Optional per-class thresholds and NMS IoU from a sweep
+        sink: Optional result sink. Escalated images reach it when their
+            batch is done, so records are not in input order. Images in a
+            resumed sink's progress log are skipped.
+
+    Returns:
+        Counts and timings of the run
+
+    Raises:
+        ValueError: If the band is empty or outside [0, 1]
+    """
+    low, high = band
+    if not 0.0 <= low < high <= 1.0:
+        raise ValueError(f"Uncertainty band must satisfy 0 <= low < high <= 1: {band}")
+
+    kwargs = {"verbose": False}
+    if thresholds is not None:
+        kwargs["iou"] = thresholds.nms_iou
+    lowest = thresholds.min_confidence() if thresholds else min_confidence
+    # The screen must see boxes down to the band to judge an image
+    screen_kwargs = {**kwargs, "conf": min(low, lowest)}
+    if thresholds is not None:
+        kwargs["conf"] = lowest
+
+    images_done = escalated = 0
+    screen_seconds = full_seconds = 0.0
+    class_counts: dict[str, int] = {}
+    pending: list[Path] = []
+
+    def emit(image_path: Path, results, model: str) -> None:
+        detections = convert_to_detections(results, min_confidence, thresholds)
+        if sink is not None:
+            sink.write(image_path, detections, results[0].speed if results else None)
+        for det in detections:
+            class_counts[det.disease_class] = class_counts.get(det.disease_class, 0) + 1
+        if verbose:
+            print(f"  {image_path.name}: {len(detections)} detection(s) ({model})")
+
+    def escalate() -> None:
+        nonlocal full_seconds
+        start = time.perf_counter()
+        results = full([str(p) for p in pending], **kwargs)
+        full_seconds += time.perf_counter() - start
+        for image_path, result in zip(pending, results, strict=True):
+            emit(image_path, [result], "full")
+        pending.clear()
+
+    start = time.perf_counter()
+    remaining = SkipCompleted(images, sink.progress if sink and sink.resume else None)
+    for image_path in islice(remaining, limit):
+        images_done += 1
+
+        screen_start = time.perf_counter()
+        results = screen(str(image_path), **screen_kwargs)
+        screen_seconds += time.perf_counter() - screen_start
+
+        if low <= top_confidence(results) < high:
+            escalated += 1
+            pending.append(image_path)
+            if len(pending) >= batch_size:
+                escalate()
+        else:
+            emit(image_path, results, "screen")
+    if pending:
+        escalate()
+
+    stats = CascadeStats(
+        images=images_done,
+        escalated=escalated,
+        screen_seconds=screen_seconds,
+        full_seconds=full_seconds,
+        total_seconds=time.perf_counter() - start,
+    )
+    if verbose:
+        print_cascade_summary(stats, class_counts)
+    return stats
+
+
+def print_cascade_summary(stats: CascadeStats, class_counts: dict[str, int]) -> None:
+    """
+    Print escalation rate, throughput and detections per class.
+
+    Args:
+        stats: Cascade run statistics
+        class_counts: Detections per class
+    """
+    print("\n=== Cascade Summary ===")
+    print(f"Processed: {stats.images} images")
+    print(
+        f"Escalated to full model: {stats.escalated} "
+        f"({stats.escalation_rate * 100:.1f}%)"
+    )
+    if stats.images:
+        print(f"Screen: {stats.screen_seconds / stats.images * 1000:.1f} ms per image")
+    if stats.escalated:
+        print(
+            f"Full: {stats.full_seconds / stats.escalated * 1000:.1f} ms "
+            "per escalated image"
+        )
+    print(
+        f"Throughput: {stats.throughput:.1f} images/s "
+        f"({stats.total_seconds:.1f} s total)"
+    )
+    print(f"Total detections: {sum(class_counts.values())}")
+    if class_counts:
+        print("Detections by class:")
+        for cls, count in sorted(class_counts.items(), key=lambda x: -x[1]):
+            print(f"  {cls}: {count}")
@@ -0,0 +1,220 @@
+"""
+Asynchronous, atomic training checkpoints.
+
+ultralytics serializes each checkpoint to bytes in memory and then writes
+it with Path.write_bytes, which blocks the training loop on disk I/O and
+leaves a truncated last.pt if the machine is preempted mid-write. The
+trainer mixin here hands those writes to a background thread instead.
+Each file is written to a temporary sibling, fsynced and renamed over the
+destination, so last.pt is always either the previous or the new
+checkpoint. Periodic epoch checkpoints are rotated to keep the newest few.
+"""
+
+import os
+import queue
+import re
+import threading
+from pathlib import Path
+
+from mina.core.cache import atomic_output
+from mina.core.constants import CHECKPOINT_KEEP
+
+# Periodic checkpoints written by ultralytics, i.e. epoch3.pt
+EPOCH_CHECKPOINT = re.compile(r"^epoch(\d+)\.pt$")
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write bytes to a file via fsync and rename, so readers never see a partial file.
+
+    Args:
+        path: Destination file
+        data: File contents
+    """
+    with atomic_output(path) as tmp_path, open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def rotate_checkpoints(weights_dir: Path, keep: int = CHECKPOINT_KEEP) -> list[Path]:
+    """
+    Delete all but the newest periodic epoch checkpoints.
+
+    Args:
+        weights_dir: Run weights directory
+        keep: Number of epoch checkpoints to keep
+
+    Returns:
+        Deleted paths
+    """
+    epochs = sorted(
+        (int(match.group(1)), path)
+        for path in weights_dir.glob("epoch*.pt")
+        if (match := EPOCH_CHECKPOINT.match(path.name))
+    )
+    stale = [path for _, path in epochs[: max(len(epochs) - keep, 0)]]
+    for path in stale:
+        path.unlink(missing_ok=True)
+    return stale
+
+
+def is_resumable(checkpoint: Path) -> bool:
+    """
+    Check whether a checkpoint is from an unfinished run.
+
+    ultralytics strips the optimizer state (and resets the epoch) when a
+    run finishes, so only interrupted runs can be resumed.
+
+    Args:
+        checkpoint: last.pt of a run
+
+    Returns:
+        True if the checkpoint has optimizer state and an epoch
+    """
+    import torch
+
+    ckpt = torch.load(checkpoint, map_location="cpu", weights_only=False)
+    return ckpt.get("optimizer") is not None and ckpt.get("epoch", -1) >= 0
+
+
+class AsyncCheckpointer:
+    """
+    Write checkpoint files on a background thread.
+
+    Writes to the same path are coalesced: if a newer checkpoint for a path
+    arrives before the previous one was written, only the newer one is
+    written, so at most one pending copy per file is held in memory.
+    """
+
+    def __init__(self, keep: int = CHECKPOINT_KEEP):
+        self.keep = keep
+        self._pending: dict[Path, bytes] = {}
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[Path | None] = queue.Queue()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(
+            target=self._run, name="checkpoint-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, path: Path, data: bytes) -> None:
+        """
+        Queue a file write and return immediately.
+
+        Args:
+            path: Destination file
+            data: File contents
+
+        Raises:
+            RuntimeError: If a previous write failed
+        """
+        self._raise_error()
+        path = Path(path)
+        with self._lock:
+            queued = path in self._pending
+            self._pending[path] = data
+        if not queued:
+            self._queue.put(path)
+
+    def flush(self) -> None:
+        """
+        Block until every queued write has finished.
+
+        Raises:
+            RuntimeError: If a write failed
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Checkpoint write failed") from self._error
+
+    def _run(self) -> None:
+        while True:
+            path = self._queue.get()
+            try:
+                if path is None:
+                    return
+                with self._lock:
+                    data = self._pending.pop(path)
+                write_atomic(path, data)
+                if EPOCH_CHECKPOINT.match(path.name):
+                    rotate_checkpoints(path.parent, self.keep)
+            except Exception as e:  # surfaced to the training thread
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+
+class QueuedPath(Path):
+    """Path whose write_bytes is handed to an AsyncCheckpointer."""
+
+    def __init__(self, *pathsegments, checkpointer: AsyncCheckpointer):
+        super().__init__(*pathsegments)
+        self.checkpointer = checkpointer
+
+    def with_segments(self, *pathsegments):
+        """Keep derived paths (e.g. weights_dir / "epoch3.pt") queued too."""
+        return type(self)(*pathsegments, checkpointer=self.checkpointer)
+
+    def write_bytes(self, data) -> int:
+        """Queue the write instead of blocking on it."""
+        self.checkpointer.submit(Path(self), bytes(data))
+        return len(data)
+
+
+class AsyncCheckpointMixin:
+    """
+    Trainer mixin that writes checkpoints asynchronously and atomically.
+
+    Combine with an ultralytics trainer class, e.g. through
+    with_async_checkpoints(DetectionTrainer).
+    """
+
+    keep_checkpoints: int = CHECKPOINT_KEEP
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkpointer = AsyncCheckpointer(self.keep_checkpoints)
+
+    def save_model(self):
+        """Serialize as usual, but queue the file writes."""
+        paths = self.last, self.best, self.wdir
+        self.last, self.best, self.wdir = (
+            QueuedPath(p, checkpointer=self.checkpointer) for p in paths
+        )
+        try:
+            return super().save_model()
+        finally:
+            self.last, self.best, self.wdir = paths
+
+    def final_eval(self):
+        """Finish pending checkpoints and stop the writer before the final validation."""
+        self.checkpointer.close()
+        return super().final_eval()
+
+
+def with_async_checkpoints(trainer: type, keep: int = CHECKPOINT_KEEP) -> type:
+    """
+    Create a trainer class that writes checkpoints asynchronously.
+
+    Args:
+        trainer: ultralytics trainer class
+        keep: Number of periodic epoch checkpoints to keep
+
+    Returns:
+        Trainer subclass to pass to YOLO.train(trainer=...)
+    """
+    return type(
+        f"Async{trainer.__name__}",
+        (AsyncCheckpointMixin, trainer),
+        {"keep_checkpoints": keep},
+    )
@@ -0,0 +1,278 @@
+"""
+Multi-model evaluation and side-by-side comparison.
+
+Test images are decoded once into a flat memory-mapped buffer that every
+worker process maps read-only, so comparing several weights files (for
+example best.pt against its float16 and int8 TFLite exports) costs one
+decode pass plus one CPU inference pass per model. The passes run one
+model at a time by default, since concurrent models skew each other's
+latency; more workers trade latency accuracy for wall-clock time.
+"""
+
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from mina.core.constants import DEFAULT_IMAGE_SIZE, DEFAULT_IOU_THRESHOLD
+from mina.evaluate import load_test_set
+from mina.metrics import (
+    LabelArrays,
+    PredictionArrays,
+    bootstrap_ap,
+    bootstrap_interval,
+    compute_metrics,
+    mean_ap_samples,
+)
+from mina.predictions import (
+    apply_nms,
+    predict_timed,
+    prediction_cache_path,
+    save_predictions,
+)
+from mina.tta import load_bgr
+
+
+def decode_images(image_paths: list[Path], buffer_path: Path) -> list[tuple]:
+    """
+    Decode images once into a single flat uint8 file.
+
+    Args:
+        image_paths: Images to decode
+        buffer_path: Destination file for the raw pixel buffer
+
+    Returns:
+        List of (offset, shape) per image, in BGR channel order
+    """
+    layout = []
+    offset = 0
+
+    with open(buffer_path, "wb") as f:
+        for path in image_paths:
+            # Same pixels as ultralytics reading the path (EXIF-rotated BGR),
+            # since the predictions land in the shared prediction cache
+            pixels = load_bgr(path)
+            f.write(pixels.tobytes())
+            layout.append((offset, pixels.shape))
+            offset += pixels.size
+
+    return layout
+
+
+def _evaluate_worker(
+    weights: str,
+    buffer_path: str,
+    layout: list[tuple],
+    imgsz: int,
+    cache_path: str,
+    image_names: list[str],
+    metadata: dict,
+) -> tuple[tuple, list[dict]]:
+    """Run one model over the shared decoded images (runs in a worker process)."""
+    from ultralytics import YOLO
+
+    buffer = np.memmap(buffer_path, dtype=np.uint8, mode="r")
+    images = [
+        np.asarray(buffer[offset : offset + int(np.prod(shape))]).reshape(shape)
+        for offset, shape in layout
+    ]
+
+    predictions, timings = predict_timed(YOLO(weights), images, imgsz=imgsz)
+    save_predictions(Path(cache_path), predictions, image_names, metadata)
+
+    return tuple(predictions), timings
+
+
+def evaluate_models(
+    weights_list: list[Path],
+    test_dir: Path | None = None,
+    imgsz: int | list[int] = DEFAULT_IMAGE_SIZE,
+    confidence: float = 0.001,
+    iou: float = DEFAULT_IOU_THRESHOLD,
+    workers: int = 1,
+    cache_dir: Path | None = None,
+    bootstrap: int = 0,
+) -> list[dict]:
+    """
+    Evaluate several models on the test set.
+
+    Every model is run on CPU with batch size 1 so the measured latency
+    matches single-image use on device. Raw predictions are also written to the
+    prediction cache, so a later evaluate() of any of these models is free.
+
+    Args:
+        weights_list: Model weights files to compare (first is the baseline)
+        test_dir: Path to test data directory. Defaults to TEST_DATA_DIR.
+        imgsz: Input image size, or one size per model (for exports made
+            at different resolutions)
+        confidence: Confidence threshold for predictions (low for mAP)
+        iou: IoU threshold for NMS
+        workers: Number of worker processes. Models running concurrently
+            compete for the CPU, so latencies are only comparable with 1.
+        cache_dir: Prediction cache root. Defaults to CACHE_DIR.
+        bootstrap: Number of paired bootstrap resamples for 95% confidence
+            intervals of the mAP deltas (0 disables them)
+
+    Returns:
+        List of metrics dicts (one per model, in input order) with extra
+        "weights", "imgsz", "latency_ms" and "total_ms" (median per image) and
+        "latency_p95_ms" entries, plus "delta_ci" (low, high) intervals
+        for the mAP deltas when bootstrap is enabled
+
+    Raises:
+        ValueError: If imgsz is a list whose length does not match
+            weights_list
+    """
+    image_paths, labels = load_test_set(test_dir)
+    image_names = [p.name for p in image_paths]
+    sizes = list(imgsz) if isinstance(imgsz, list) else [imgsz] * len(weights_list)
+    if len(sizes) != len(weights_list):
+        raise ValueError(f"Got {len(sizes)} image sizes for {len(weights_list)} models")
+
+    workers = max(1, min(workers, len(weights_list)))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        buffer_path = Path(tmp_dir) / "images.bin"
+        print(f"Decoding {len(image_paths)} test images...")
+        layout = decode_images(image_paths, buffer_path)
+
+        print(f"Evaluating {len(weights_list)} models with {workers} worker(s)...")
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn")
+        ) as pool:
+            futures = []
+            for weights, size in zip(weights_list, sizes):
+                cache_path, metadata = prediction_cache_path(
+                    Path(weights), image_paths, size, cache_dir
+                )
+                futures.append(
+                    pool.submit(
+                        _evaluate_worker,
+                        str(weights),
+                        str(buffer_path),
+                        layout,
+                        size,
+                        str(cache_path),
+                        image_names,
+                        metadata,
+                    )
+                )
+            outputs = [future.result() for future in futures]
+
+    results = summarize_models(
+        [(PredictionArrays(*arrays), timings) for arrays, timings in outputs],
+        labels,
+        len(image_paths),
+        confidence=confidence,
+        iou=iou,
+        bootstrap=bootstrap,
+    )
+    for metrics, weights, size in zip(results, weights_list, sizes):
+        metrics["weights"] = str(weights)
+        metrics["imgsz"] = size
+    return results
+
+
+def summarize_models(
+    outputs: list[tuple[PredictionArrays, list[dict]]],
+    labels: LabelArrays,
+    num_images: int,
+    confidence: float = 0.001,
+    iou: float = DEFAULT_IOU_THRESHOLD,
+    bootstrap: int = 0,
+) -> list[dict]:
+    """
+    Compute metrics, latencies and mAP deltas from raw model outputs.
+
+    Args:
+        outputs: (raw predictions, per-image timings) per model, baseline
+            first
+        labels: Ground-truth labels of the test set
+        num_images: Number of test images
+        confidence: Confidence threshold for predictions
+        iou: IoU threshold for NMS
+        bootstrap: Number of paired bootstrap resamples for the mAP delta
+            intervals (0 disables them)
+
+    Returns:
+        List of metrics dicts as returned by evaluate_models, without the
+        "weights" and "imgsz" entries
+    """
+    results = []
+    baseline_samples = None
+    for raw, timings in outputs:
+        predictions = apply_nms(raw, confidence=confidence, iou=iou)
+        metrics = compute_metrics(predictions, labels)
+
+        if bootstrap > 0:
+            # Same seed and image count for every model gives paired resamples
+            samples = mean_ap_samples(
+                bootstrap_ap(predictions, labels, num_images, bootstrap)
+            )
+            if baseline_samples is None:
+                baseline_samples = samples
+            metrics["delta_ci"] = {
+                key: bootstrap_interval(model - baseline)
+                for key, model, baseline in zip(
+                    ("mAP50", "mAP50-95"), samples, baseline_samples
+                )
+            }
+
+        inference_ms = np.array([t["inference"] for t in timings])
+        total_ms = np.array([sum(t.values()) for t in timings])
+        metrics["latency_ms"] = float(np.median(inference_ms))
+        metrics["latency_p95_ms"] = float(np.percentile(inference_ms, 95))
+        metrics["total_ms"] = float(np.median(total_ms))
+        results.append(metrics)
+
+    return results
+
+
+def print_comparison_results(results: list[dict]) -> None:
+    """Print a side-by-side comparison against the first model."""
+    baseline = results[0]
+    names = [Path(r["weights"]).name for r in results]
+    width = max(12, *(len(n) for n in names)) + 2
+
+    print("\n" + "=" * 60)
+    print("MODEL COMPARISON (deltas vs. first model)")
+    print("=" * 60)
+
+    header = (
+        f"\n{'Model':<{width}} {'mAP50':>8} {'Δ':>8} {'mAP50-95':>9} {'Δ':>8} "
+        f"{'P':>7} {'R':>7} {'ms':>8} {'p95 ms':>8}"
+    )
+    print(header)
+    print("-" * (len(header) - 1))
+    for name, r in zip(names, results):
+        print(
+            f"{name:<{width}} {r['mAP50']:>8.4f} "
+            f"{r['mAP50'] - baseline['mAP50']:>+8.4f} "
+            f"{r['mAP50-95']:>9.4f} "
+            f"{r['mAP50-95'] - baseline['mAP50-95']:>+8.4f} "
+            f"{r['precision']:>7.3f} {r['recall']:>7.3f} "
+            f"{r['latency_ms']:>8.1f} {r['latency_p95_ms']:>8.1f}"
+        )
+
+    if "delta_ci" in baseline:
+        print("\n95% CI of Δ vs. first model (paired bootstrap over test images)")
+        print(f"{'Model':<{width}} {'mAP50':>19} {'mAP50-95':>19}")
+        for name, r in zip(names[1:], results[1:]):
+            ci50, ci5095 = r["delta_ci"]["mAP50"], r["delta_ci"]["mAP50-95"]
+            print(
+                f"{name:<{width}} [{ci50[0]:>+7.4f}, {ci50[1]:>+7.4f}] "
+                f"[{ci5095[0]:>+7.4f}, {ci5095[1]:>+7.4f}]"
+            )
+
+    # Baseline column shows AP@50, the others show the delta to it
+    print(f"\n{'Per-Class AP@50':<23}" + "".join(f" {n[:10]:>10}" for n in names))
+    print("-" * (23 + 11 * len(names)))
+    for cls, base_ap in baseline["per_class_ap50"].items():
+        row = f"  {cls:<21} {base_ap:>10.4f}"
+        for r in results[1:]:
+            row += f" {r['per_class_ap50'].get(cls, 0.0) - base_ap:>+10.4f}"
+        print(row)
+
+    print("=" * 60)
@@ -8,7 +8,13 @@ from mina.core.constants import (
     DEFAULT_IMAGE_SIZE,
 )
 from mina.core.types import BoundingBox, Detection
-from mina.core.model import load_model, find_best_weights
+from mina.core.model import (
+    load_model,
+    find_best_weights,
+    find_last_checkpoint,
+    find_run_weights,
+)
+from mina.core.registry import RunRegistry
 from mina.core.dataset import create_data_yaml
 
 __all__ = [
@@ -19,5 +25,8 @@ __all__ = [
     "Detection",
     "load_model",
     "find_best_weights",
+    "find_last_checkpoint",
+    "find_run_weights",
+    "RunRegistry",
     "create_data_yaml",
 ]
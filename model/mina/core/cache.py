@@ -0,0 +1,98 @@
+"""
+Content hashing and atomic file helpers for on-disk caches.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def hash_file(path: str | Path) -> str:
+    """
+    Compute the SHA-256 digest of a file's contents.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex digest string
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def hash_files(paths: Iterable[str | Path], root: Path | None = None) -> str:
+    """
+    Compute a combined SHA-256 digest over file names and contents.
+
+    Args:
+        paths: Files to hash (hashed in the given order)
+        root: If given, names are hashed relative to this directory so the
+              digest does not change when the whole tree is moved
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        name = path.relative_to(root) if root is not None else path
+        digest.update(name.as_posix().encode())
+        digest.update(bytes.fromhex(hash_file(path)))
+    return digest.hexdigest()
+
+
+def hash_key(values: dict) -> str:
+    """
+    Compute a short, stable cache key from a JSON-serializable dict.
+
+    Args:
+        values: Values identifying a cache entry
+
+    Returns:
+        16-character hex key
+    """
+    encoded = json.dumps(values, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+@contextmanager
+def atomic_output(path: Path) -> Iterator[Path]:
+    """
+    Write a file atomically via a temporary sibling and a rename.
+
+    Yields a temporary path in the same directory; when the block exits
+    without error the temporary file replaces ``path``. Readers never see
+    a partially written file.
+
+    Args:
+        path: Final destination path
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def atomic_copy(src: Path, dst: Path) -> Path:
+    """
+    Copy a file so that ``dst`` is replaced atomically.
+
+    Args:
+        src: Source file
+        dst: Destination file (overwritten if it exists)
+
+    Returns:
+        The destination path
+    """
+    with atomic_output(dst) as tmp_path:
+        shutil.copy2(src, tmp_path)
+    return dst
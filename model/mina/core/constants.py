@@ -25,16 +25,29 @@ DEFAULT_IOU_THRESHOLD: float = 0.6
 DEFAULT_EPOCHS: int = 100
 DEFAULT_BATCH_SIZE: int = 16
 DEFAULT_PATIENCE: int = 20
+DEFAULT_WORKERS: int = 4
+
+# Checkpointing: periodic epoch checkpoints every N epochs, newest K kept
+DEFAULT_SAVE_PERIOD: int = 5
+CHECKPOINT_KEEP: int = 3
 
 # Tuning parameters
 DEFAULT_TUNE_EPOCHS: int = 30
 DEFAULT_TUNE_ITERATIONS: int = 300
+TUNE_EPOCHS_RANGE: tuple[int, int] = (5, 100)
+TUNE_ITERATIONS_RANGE: tuple[int, int] = (50, 1000)
+
+# Pruning parameters
+DEFAULT_PRUNE_RATIO: float = 0.7  # pruned / original FLOPs (or parameters)
+DEFAULT_FINETUNE_EPOCHS: int = 20
 
 # Model paths
 MODEL_DIR: Path = Path(__file__).parent.parent.parent
 RUNS_DIR: Path = MODEL_DIR / "runs" / "detect"
+STUDIES_DIR: Path = RUNS_DIR / "studies"  # tuning trial database and trial runs
 DATA_DIR: Path = MODEL_DIR / "data"
 TEST_DATA_DIR: Path = MODEL_DIR / "test_data"
+CACHE_DIR: Path = MODEL_DIR / ".cache"
 
 # Supported image extensions
 IMAGE_EXTENSIONS: set[str] = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
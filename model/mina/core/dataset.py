@@ -4,7 +4,9 @@ Dataset configuration utilities.
 
 from pathlib import Path
 
-from mina.core.constants import DISEASE_CLASSES, NUM_CLASSES
+import yaml
+
+from mina.core.constants import DISEASE_CLASSES, IMAGE_EXTENSIONS, NUM_CLASSES
 
 
 def create_data_yaml(data_dir: Path) -> Path:
@@ -65,3 +67,63 @@ nc: {NUM_CLASSES}
     yaml_path = test_dir / "test_data.yaml"
     yaml_path.write_text(yaml_content)
     return yaml_path
+
+
+def resolve_split_images(data_yaml: Path, split: str = "val") -> list[Path]:
+    """
+    List the images of a dataset split, resolved like ultralytics does.
+
+    Each split entry may be a directory (searched recursively) or a .txt
+    file listing one image path per line.
+
+    Args:
+        data_yaml: Path to data.yaml
+        split: Split name ("train", "val" or "test")
+
+    Returns:
+        Sorted list of image paths (empty if the split is missing)
+    """
+    data = yaml.safe_load(Path(data_yaml).read_text()) or {}
+
+    root = Path(data.get("path") or ".")
+    if not root.is_absolute():
+        root = Path(data_yaml).parent / root
+
+    entries = data.get(split) or []
+    if isinstance(entries, str):
+        entries = [entries]
+
+    images = []
+    for entry in entries:
+        path = (root / entry).resolve()
+        if not path.exists() and entry.startswith("../"):
+            path = (root / entry[3:]).resolve()
+
+        if path.is_dir():
+            images.extend(
+                p for p in path.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS
+            )
+        elif path.suffix == ".txt" and path.exists():
+            for line in path.read_text().splitlines():
+                if line.strip():
+                    image = Path(line.strip())
+                    images.append(image if image.is_absolute() else path.parent / image)
+
+    return sorted(images)
+
+
+def label_path_for(image_path: Path) -> Path:
+    """
+    Get the YOLO label file for an image, following the ultralytics layout.
+
+    Args:
+        image_path: Path to an image under an images/ directory
+
+    Returns:
+        Path to the matching .txt file under labels/
+    """
+    parts = list(image_path.parts)
+    if "images" in parts:
+        index = len(parts) - 1 - parts[::-1].index("images")
+        parts[index] = "labels"
+    return Path(*parts).with_suffix(".txt")
@@ -7,6 +7,21 @@ from pathlib import Path
 from ultralytics import YOLO
 
 from mina.core.constants import RUNS_DIR
+from mina.core.registry import RunRegistry
+
+# TFLite exports of a run's best.pt, in order of preference
+TFLITE_ARTIFACTS: tuple[str, ...] = (
+    "weights/best.tflite",
+    "weights/best_saved_model/best_float32.tflite",
+    "weights/best_saved_model/best_int8.tflite",
+)
+
+# int8 TFLite exports of a run's best.pt (mina-export, then --formats tflite-int8)
+INT8_TFLITE_ARTIFACTS: tuple[str, ...] = (
+    "weights/best_saved_model/best_int8.tflite",
+    "weights/best_full_integer_quant.tflite",
+    "weights/best_saved_model/best_full_integer_quant.tflite",
+)
 
 
 def load_model(weights_path: str | Path) -> YOLO:
@@ -29,15 +44,22 @@ def load_model(weights_path: str | Path) -> YOLO:
     return YOLO(str(weights_path))
 
 
-def find_best_weights(runs_dir: Path | None = None) -> Path | None:
+def find_run_weights(
+    run: str = "latest",
+    weights: str = "best.pt",
+    runs_dir: Path | None = None,
+) -> Path | None:
     """
-    Find the best.pt file from the most recent training run.
+    Find a run's weights through the run registry (see mina.core.registry).
 
     Args:
+        run: Run name, "latest" (most recent run) or "best" (highest val
+            mAP50-95)
+        weights: Weights file name, e.g. "best.pt" or "last.pt"
         runs_dir: Directory containing training runs. Defaults to RUNS_DIR.
 
     Returns:
-        Path to best.pt if found, None otherwise
+        Path to the weights if found, None otherwise
     """
     if runs_dir is None:
         runs_dir = RUNS_DIR
@@ -45,59 +67,73 @@ def find_best_weights(runs_dir: Path | None = None) -> Path | None:
     if not runs_dir.exists():
         return None
 
-    # Find most recent training run
     try:
-        run_dirs = sorted(
-            runs_dir.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True
-        )
-    except (OSError, PermissionError):
+        with RunRegistry(runs_dir) as registry:
+            if run == "latest":
+                entry = registry.latest(weights)
+            elif run == "best":
+                entry = registry.best(weights)
+            else:
+                entry = registry.get(run)
+    except OSError:
         return None
 
-    for run_dir in run_dirs:
-        best_weights = run_dir / "weights" / "best.pt"
-        if best_weights.exists():
-            return best_weights
+    if entry is None or weights not in entry["weights"]:
+        return None
+    path = entry["path"] / "weights" / weights
+    return path if path.exists() else None
 
-    return None
+
+def find_best_weights(runs_dir: Path | None = None) -> Path | None:
+    """
+    Find the best.pt file from the most recent training run.
+
+    Args:
+        runs_dir: Directory containing training runs. Defaults to RUNS_DIR.
+
+    Returns:
+        Path to best.pt if found, None otherwise
+    """
+    return find_run_weights("latest", "best.pt", runs_dir)
+
+
+def find_last_checkpoint(runs_dir: Path | None = None) -> Path | None:
+    """
+    Find the last.pt checkpoint of the most recent training run.
+
+    Args:
+        runs_dir: Directory containing training runs. Defaults to RUNS_DIR.
+
+    Returns:
+        Path to last.pt if found, None otherwise
+    """
+    return find_run_weights("latest", "last.pt", runs_dir)
 
 
 def find_tflite_weights(
     runs_dir: Path | None = None,
+    run: str = "latest",
+    artifacts: tuple[str, ...] = TFLITE_ARTIFACTS,
 ) -> tuple[Path | None, Path | None]:
     """
-    Find both PyTorch and TFLite model paths from the most recent training run.
+    Find both PyTorch and TFLite model paths of a training run.
 
     Args:
         runs_dir: Directory containing training runs. Defaults to RUNS_DIR.
+        run: Run name, "latest" or "best" (see find_run_weights)
+        artifacts: TFLite paths relative to the run, in order of
+            preference (e.g. INT8_TFLITE_ARTIFACTS for int8 only)
 
     Returns:
         Tuple of (pt_path, tflite_path). Either may be None if not found.
     """
-    if runs_dir is None:
-        runs_dir = RUNS_DIR
-
-    if not runs_dir.exists():
+    pt_path = find_run_weights(run, "best.pt", runs_dir)
+    if pt_path is None:
         return None, None
 
-    try:
-        run_dirs = sorted(
-            runs_dir.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True
-        )
-    except (OSError, PermissionError):
-        return None, None
-
-    for run_dir in run_dirs:
-        pt_path = run_dir / "weights" / "best.pt"
-        tflite_path = pt_path.with_suffix(".tflite")
-
-        # Also check alternative TFLite locations
-        alt_tflite = run_dir / "weights" / "best_saved_model" / "best_float32.tflite"
-        alt_tflite_int8 = run_dir / "weights" / "best_saved_model" / "best_int8.tflite"
-
-        if pt_path.exists():
-            for tf_path in [tflite_path, alt_tflite, alt_tflite_int8]:
-                if tf_path.exists():
-                    return pt_path, tf_path
-            return pt_path, None
-
-    return None, None
+    # Only the chosen run is probed, in the order of artifacts
+    run_dir = pt_path.parent.parent
+    for candidate in artifacts:
+        if (run_dir / candidate).exists():
+            return pt_path, run_dir / candidate
+    return pt_path, None
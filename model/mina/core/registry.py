@@ -0,0 +1,357 @@
+"""
+Index of training runs, so weights can be found without scanning runs/.
+
+The registry is a SQLite database inside the runs directory. Each run
+directory with weights gets a row with its weights paths and hashes,
+exported artifacts and best validation metrics. Training and export
+update their run's row when they finish. Runs created or deleted by other
+means are picked up by comparing the runs directory's mtime with the one
+recorded at the last sync, which costs a single stat() when nothing
+changed. Directories without weights yet (a training run before its first
+checkpoint) are recorded with an empty weights map, and looking up a
+weights file re-checks the runs recorded without it, because weights
+written inside a run do not change the runs directory's mtime. A missing
+or deleted registry is rebuilt from disk.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Self
+
+from mina.core.cache import hash_file
+from mina.core.constants import RUNS_DIR
+
+# Kept in a subdirectory, so writing it does not change the runs
+# directory's mtime that detects new and deleted runs
+REGISTRY_PATH: str = ".registry/runs.db"
+
+# Seconds a writer waits for another process's write lock
+REGISTRY_TIMEOUT: float = 30.0
+
+# Weights files recorded for each run
+WEIGHTS_FILES: tuple[str, ...] = ("best.pt", "last.pt")
+
+# Exported artifacts recorded for each run, relative to its weights/
+ARTIFACT_PATTERNS: tuple[str, ...] = ("*.onnx", "*.tflite", "*_saved_model/*.tflite")
+
+# Validation metric runs are ranked by
+RANK_METRIC: str = "metrics/mAP50-95(B)"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    name TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    weights TEXT NOT NULL,
+    artifacts TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    fitness REAL
+);
+CREATE INDEX IF NOT EXISTS runs_mtime ON runs (mtime);
+CREATE INDEX IF NOT EXISTS runs_fitness ON runs (fitness);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def read_best_metrics(results_csv: Path) -> dict[str, float]:
+    """
+    Get the validation metrics of the best epoch from a run's results.csv.
+
+    Args:
+        results_csv: results.csv written by ultralytics
+
+    Returns:
+        Metrics of the epoch with the highest RANK_METRIC (empty if the
+        file is missing or has no epochs)
+    """
+    if not results_csv.exists():
+        return {}
+    with open(results_csv, newline="") as f:
+        rows = [
+            {key.strip(): float(value) for key, value in row.items() if value}
+            for row in csv.DictReader(f)
+        ]
+    rows = [row for row in rows if RANK_METRIC in row]
+    if not rows:
+        return {}
+    return max(rows, key=lambda row: row[RANK_METRIC])
+
+
+class RunRegistry:
+    """SQLite index of the training runs in a runs directory."""
+
+    def __init__(self, runs_dir: Path | None = None):
+        self.runs_dir = Path(runs_dir or RUNS_DIR)
+        self.path = self.runs_dir / REGISTRY_PATH
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=REGISTRY_TIMEOUT)
+            # The index can be rebuilt, so commits need not wait for fsync
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(SCHEMA)
+        except (OSError, sqlite3.OperationalError):
+            # Read-only runs directory: index in memory for this process
+            self.connection = sqlite3.connect(":memory:")
+            self.connection.executescript(SCHEMA)
+        self.connection.row_factory = sqlite3.Row
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def register(self, run_dir: Path) -> dict | None:
+        """
+        Record (or refresh) a run from its files on disk.
+
+        Weights hashes are reused while a file's size and mtime are
+        unchanged, so refreshing a run only hashes new weights.
+
+        Args:
+            run_dir: Run directory directly inside the runs directory
+
+        Returns:
+            The run's entry, or None if it has no weights (it is then
+            recorded without weights, to be re-checked on lookup)
+        """
+        run_dir = Path(run_dir)
+        previous = self.get(run_dir.name, refresh=False)
+        known = previous["weights"] if previous else {}
+
+        weights = {}
+        for name in WEIGHTS_FILES:
+            path = run_dir / "weights" / name
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entry = known.get(name)
+            if not (
+                entry
+                and entry["size"] == stat.st_size
+                and entry["mtime_ns"] == stat.st_mtime_ns
+            ):
+                entry = {
+                    "sha256": hash_file(path),
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                }
+            weights[name] = entry
+
+        with self.connection:
+            if not weights:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO runs "
+                    "(name, mtime, weights, artifacts, metrics, fitness) "
+                    "VALUES (?, ?, '{}', '[]', '{}', NULL)",
+                    (run_dir.name, run_dir.stat().st_mtime),
+                )
+                return None
+
+            artifacts = sorted(
+                path.relative_to(run_dir).as_posix()
+                for pattern in ARTIFACT_PATTERNS
+                for path in (run_dir / "weights").glob(pattern)
+            )
+            metrics = read_best_metrics(run_dir / "results.csv")
+            self.connection.execute(
+                "INSERT OR REPLACE INTO runs "
+                "(name, mtime, weights, artifacts, metrics, fitness) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    run_dir.name,
+                    run_dir.stat().st_mtime,
+                    json.dumps(weights),
+                    json.dumps(artifacts),
+                    json.dumps(metrics),
+                    metrics.get(RANK_METRIC),
+                ),
+            )
+        return self.get(run_dir.name, refresh=False)
+
+    def sync(self) -> None:
+        """
+        Register new run directories and drop deleted ones.
+
+        Does nothing (beyond one stat()) if the runs directory's mtime is
+        the one recorded at the last sync.
+        """
+        try:
+            mtime = str(self.runs_dir.stat().st_mtime_ns)
+        except OSError:
+            return
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'mtime'"
+        ).fetchone()
+        if row is not None and row["value"] == mtime:
+            return
+
+        # mtime is read before listing, so a run added meanwhile is seen next time
+        with os.scandir(self.runs_dir) as entries:
+            names = {
+                entry.name
+                for entry in entries
+                if entry.is_dir() and not entry.name.startswith(".")
+            }
+        known = {name for (name,) in self.connection.execute("SELECT name FROM runs")}
+        for name in sorted(names - known):
+            self.register(self.runs_dir / name)
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM runs WHERE name = ?", [(n,) for n in known - names]
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('mtime', ?)",
+                (mtime,),
+            )
+
+    def rebuild(self) -> int:
+        """
+        Re-index every run from disk.
+
+        Returns:
+            Number of runs registered
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM meta")
+        self.sync()
+        for (name,) in self.connection.execute("SELECT name FROM runs").fetchall():
+            self.register(self.runs_dir / name)
+        return len(self.runs(refresh=False))
+
+    def get(self, name: str, refresh: bool = True) -> dict | None:
+        """
+        Look up a run by name.
+
+        Args:
+            name: Run directory name
+            refresh: Sync with the runs directory first
+
+        Returns:
+            Run entry, or None if there is no such run with weights
+        """
+        if refresh:
+            self.sync()
+        row = self.connection.execute(
+            "SELECT * FROM runs WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = self._entry(row)
+        if not entry["weights"]:
+            # Recorded before its first checkpoint: look again
+            return self.register(entry["path"]) if refresh else None
+        return entry
+
+    def runs(self, refresh: bool = True) -> list[dict]:
+        """
+        List runs, newest first.
+
+        Args:
+            refresh: Sync with the runs directory first
+
+        Returns:
+            Run entries
+        """
+        if refresh:
+            self.sync()
+            self._recheck("best.pt")
+        rows = self.connection.execute(
+            "SELECT * FROM runs WHERE weights != '{}' ORDER BY mtime DESC"
+        )
+        return [self._entry(row) for row in rows.fetchall()]
+
+    def latest(self, weights: str = "best.pt") -> dict | None:
+        """
+        Get the newest run that has a weights file.
+
+        Args:
+            weights: Weights file name, e.g. "best.pt" or "last.pt"
+
+        Returns:
+            Run entry, or None if no run has the file
+        """
+        return self._first("ORDER BY mtime DESC", weights)
+
+    def best(self, weights: str = "best.pt") -> dict | None:
+        """
+        Get the run with the highest validation mAP50-95.
+
+        Args:
+            weights: Weights file the run must have
+
+        Returns:
+            Run entry, or None if no run with the file has metrics
+        """
+        return self._first("WHERE fitness IS NOT NULL ORDER BY fitness DESC", weights)
+
+    def _first(self, order: str, weights: str) -> dict | None:
+        """First run in the given order whose weights file still exists."""
+        self.sync()
+        self._recheck(weights)
+        for row in self.connection.execute(f"SELECT * FROM runs {order}").fetchall():
+            entry = self._entry(row)
+            if weights not in entry["weights"]:
+                continue
+            if (entry["path"] / "weights" / weights).exists():
+                return entry
+            # Weights deleted inside a run do not change the runs dir mtime
+            self.register(entry["path"])
+        return None
+
+    def _recheck(self, weights: str) -> None:
+        """Re-register runs recorded without a weights file that now exists."""
+        rows = self.connection.execute(
+            "SELECT name FROM runs WHERE weights NOT LIKE ?", (f'%"{weights}":%',)
+        ).fetchall()
+        for (name,) in rows:
+            if (self.runs_dir / name / "weights" / weights).exists():
+                self.register(self.runs_dir / name)
+
+    def _entry(self, row: sqlite3.Row) -> dict:
+        return {
+            "name": row["name"],
+            "path": self.runs_dir / row["name"],
+            "mtime": row["mtime"],
+            "weights": json.loads(row["weights"]),
+            "artifacts": json.loads(row["artifacts"]),
+            "metrics": json.loads(row["metrics"]),
+            "fitness": row["fitness"],
+        }
+
+
+def register_run(run_dir: Path, runs_dir: Path | None = None) -> dict | None:
+    """
+    Record a finished training or export in the registry of its runs directory.
+
+    Runs outside runs_dir are ignored, so exporting weights from elsewhere
+    does not create registries in arbitrary directories.
+
+    Args:
+        run_dir: Run directory
+        runs_dir: Registry's runs directory. Defaults to RUNS_DIR.
+
+    Returns:
+        The run's entry, or None if it was not registered
+    """
+    runs_dir = Path(runs_dir or RUNS_DIR)
+    run_dir = Path(run_dir).resolve()
+    if run_dir.parent != runs_dir.resolve() or not run_dir.is_dir():
+        return None
+    try:
+        with RunRegistry(runs_dir) as registry:
+            return registry.register(run_dir)
+    except sqlite3.Error as e:
+        print(f"Warning: could not update run registry: {e}")
+        return None
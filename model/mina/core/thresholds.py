@@ -0,0 +1,85 @@
+"""
+Per-class confidence threshold tables produced by the threshold sweep.
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+
+import yaml
+
+from mina.core.constants import (
+    DEFAULT_CONFIDENCE_THRESHOLD,
+    DEFAULT_IOU_THRESHOLD,
+    DISEASE_CLASSES,
+)
+
+
+class ClassThresholds(NamedTuple):
+    """Operating point for inference: NMS IoU plus a confidence per class."""
+
+    nms_iou: float
+    confidence: dict[str, float]
+
+    def for_class(self, disease_class: str) -> float:
+        """Get the confidence threshold for a class (default if not tuned)."""
+        return self.confidence.get(disease_class, DEFAULT_CONFIDENCE_THRESHOLD)
+
+    def min_confidence(self) -> float:
+        """Get the lowest threshold across all classes."""
+        return min(self.for_class(cls) for cls in DISEASE_CLASSES)
+
+
+def save_thresholds(thresholds: ClassThresholds, path: Path) -> Path:
+    """
+    Save a threshold table as YAML.
+
+    Args:
+        thresholds: Threshold table to save
+        path: Destination .yaml file
+
+    Returns:
+        Path to the saved file
+    """
+    content = {
+        "nms_iou": float(thresholds.nms_iou),
+        "confidence": {cls: float(v) for cls, v in thresholds.confidence.items()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        "# Per-class operating point - generated by mina-evaluate --sweep\n"
+        + yaml.safe_dump(content, sort_keys=False)
+    )
+    return path
+
+
+def load_thresholds(path: str | Path) -> ClassThresholds:
+    """
+    Load a threshold table saved by save_thresholds.
+
+    Args:
+        path: Path to thresholds .yaml file
+
+    Returns:
+        ClassThresholds
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file names an unknown class
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Thresholds file not found: {path}")
+
+    content = yaml.safe_load(path.read_text()) or {}
+    confidence = {
+        str(cls): float(v) for cls, v in (content.get("confidence") or {}).items()
+    }
+
+    unknown = set(confidence) - set(DISEASE_CLASSES)
+    if unknown:
+        raise ValueError(f"Unknown classes in {path}: {sorted(unknown)}")
+
+    return ClassThresholds(
+        nms_iou=float(content.get("nms_iou", DEFAULT_IOU_THRESHOLD)),
+        confidence=confidence,
+    )
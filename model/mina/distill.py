@@ -0,0 +1,293 @@
+"""
+Knowledge distillation from a larger teacher with cached soft targets.
+
+The teacher runs once over the training images through the prediction
+store (mina.predictions), so its detections are cached on disk and reused
+by every epoch and every later run with the same teacher and images.
+Teacher detections that do not duplicate a ground-truth box of the same
+class are added to the training labels as soft targets: objects the
+annotators missed and plausible alternative classes, each weighted by the
+teacher's confidence.
+
+The confidence travels through the augmentation pipeline in the fractional
+part of the class value (ground truth stays integer, i.e. weight 1). At
+loss time the task-aligned assigner sees the integer class and the
+assigned target scores are scaled by the weight, so the student's class
+and box losses for a teacher box are proportional to its confidence.
+
+The teacher settings are saved in the run directory, so an interrupted
+distillation run resumes as a distillation run.
+"""
+
+from pathlib import Path
+from typing import ClassVar
+
+import numpy as np
+import torch
+import yaml
+from torch import nn
+from ultralytics.models.yolo.detect import DetectionTrainer
+from ultralytics.utils import RANK
+
+from mina.core.constants import DEFAULT_IMAGE_SIZE, DEFAULT_IOU_THRESHOLD
+from mina.metrics import (
+    LabelArrays,
+    PredictionArrays,
+    box_iou_pairs,
+    candidate_pairs,
+    load_labels,
+)
+from mina.predictions import apply_nms, get_predictions
+
+# Teacher detections below this confidence are not used as targets
+DISTILL_MIN_CONFIDENCE: float = 0.25
+
+# Teacher boxes overlapping a same-class ground-truth box this much are dropped
+DISTILL_MATCH_IOU: float = 0.5
+
+# Teacher settings of a distillation run, saved in its run directory
+DISTILL_SETTINGS_FILE: str = "distill.yaml"
+
+
+def encode_soft_classes(classes: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Encode target weights in (0, 1] into the fractional part of class ids.
+
+    Args:
+        classes: (N,) integer classes
+        weights: (N,) target weights
+
+    Returns:
+        (N,) float32 classes; floor() recovers the class
+    """
+    return (classes + (1.0 - np.clip(weights, 1e-3, 1.0)) / 2).astype(np.float32)
+
+
+def decode_soft_classes(
+    classes: torch.Tensor,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Split encoded class values into integer classes and target weights.
+
+    Args:
+        classes: Encoded class values (any shape)
+
+    Returns:
+        Tuple of (integer classes as float, weights), same shape as classes
+    """
+    integer = classes.floor()
+    return integer, 1.0 - 2.0 * (classes - integer)
+
+
+def build_soft_targets(
+    teacher: PredictionArrays,
+    labels: LabelArrays,
+    image_paths: list[Path],
+    match_iou: float = DISTILL_MATCH_IOU,
+) -> dict[str, np.ndarray]:
+    """
+    Turn teacher detections into extra soft training targets.
+
+    Args:
+        teacher: Teacher detections after confidence filtering and NMS
+        labels: Ground-truth labels for the same images
+        image_paths: Training images (defines the image ids)
+        match_iou: Teacher boxes with at least this IoU to a ground-truth
+            box of the same class are dropped as redundant
+
+    Returns:
+        Mapping from resolved image path to a (K, 5) float32 array of
+        [encoded class, x_center, y_center, width, height] (normalized)
+    """
+    pred_idx, label_idx = candidate_pairs(teacher, labels)
+    iou = box_iou_pairs(teacher.boxes[pred_idx], labels.boxes[label_idx])
+    redundant = np.zeros(len(teacher.scores), dtype=bool)
+    redundant[pred_idx[iou >= match_iou]] = True
+    extra = teacher.select(~redundant)
+
+    boxes = extra.boxes
+    rows = np.column_stack(
+        [
+            encode_soft_classes(extra.classes, extra.scores),
+            (boxes[:, 0] + boxes[:, 2]) / 2,
+            (boxes[:, 1] + boxes[:, 3]) / 2,
+            boxes[:, 2] - boxes[:, 0],
+            boxes[:, 3] - boxes[:, 1],
+        ]
+    ).astype(np.float32)
+
+    return {
+        str(image_paths[i].resolve()): rows[extra.image_ids == i]
+        for i in np.unique(extra.image_ids)
+    }
+
+
+def add_soft_targets(dataset_labels: list[dict], targets: dict[str, np.ndarray]) -> int:
+    """
+    Append soft targets to an ultralytics dataset's label dicts in place.
+
+    Polygon segments are dropped from images that get extra boxes, since
+    detection training only needs boxes and the segment list must stay
+    aligned with them.
+
+    Args:
+        dataset_labels: YOLODataset.labels
+        targets: Output of build_soft_targets
+
+    Returns:
+        Number of soft targets added
+    """
+    added = 0
+    for label in dataset_labels:
+        rows = targets.get(str(Path(label["im_file"]).resolve()))
+        if rows is None or len(rows) == 0:
+            continue
+        label["cls"] = np.concatenate([label["cls"].reshape(-1, 1), rows[:, :1]])
+        label["bboxes"] = np.concatenate([label["bboxes"].reshape(-1, 4), rows[:, 1:]])
+        label["segments"] = []
+        added += len(rows)
+    return added
+
+
+class SoftTargetAssigner(nn.Module):
+    """Wrap a task-aligned assigner to scale target scores by soft weights."""
+
+    def __init__(self, assigner: nn.Module):
+        super().__init__()
+        self.assigner = assigner
+
+    def forward(self, pd_scores, pd_bboxes, anc_points, gt_labels, gt_bboxes, mask_gt):
+        """Assign with integer classes, then scale scores per assigned target."""
+        classes, weights = decode_soft_classes(gt_labels)
+        labels, bboxes, scores, fg_mask, gt_idx = self.assigner(
+            pd_scores, pd_bboxes, anc_points, classes, gt_bboxes, mask_gt
+        )
+        if gt_labels.shape[1] > 0:
+            anchor_weights = weights.squeeze(-1).gather(1, gt_idx.long())
+            scores = scores * anchor_weights.unsqueeze(-1).to(scores.dtype)
+        return labels, bboxes, scores, fg_mask, gt_idx
+
+
+class DistillationTrainer(DetectionTrainer):
+    """Detection trainer that adds cached teacher detections as soft targets."""
+
+    soft_targets: ClassVar[dict[str, np.ndarray]] = {}
+    settings: ClassVar[dict] = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.settings and RANK in {-1, 0}:
+            save_distill_settings(self.save_dir, self.settings)
+
+    def build_dataset(self, img_path, mode="train", batch=None):
+        """Build the dataset and add soft targets to the training split."""
+        dataset = super().build_dataset(img_path, mode, batch)
+        if mode == "train":
+            added = add_soft_targets(dataset.labels, self.soft_targets)
+            print(f"Added {added} teacher soft targets to the training labels")
+        return dataset
+
+    def set_model_attributes(self):
+        """Set up the loss so it honors the soft target weights."""
+        super().set_model_attributes()
+        criterion = self.model.init_criterion()
+        if hasattr(criterion, "assigner"):
+            criterion.assigner = SoftTargetAssigner(criterion.assigner)
+        self.model.criterion = criterion
+
+
+def distillation_trainer(
+    soft_targets: dict[str, np.ndarray], settings: dict | None = None
+) -> type:
+    """
+    Create a DistillationTrainer class bound to a set of soft targets.
+
+    ultralytics instantiates the trainer class itself, so the targets are
+    attached to a subclass rather than passed to the constructor.
+
+    Args:
+        soft_targets: Output of build_soft_targets
+        settings: Teacher settings saved in the run directory for resuming
+            (see save_distill_settings)
+
+    Returns:
+        Trainer class to pass to mina.train.train
+    """
+    return type(
+        "DistillationTrainer",
+        (DistillationTrainer,),
+        {"soft_targets": soft_targets, "settings": settings or {}},
+    )
+
+
+def save_distill_settings(run_dir: Path, settings: dict) -> Path:
+    """
+    Save the teacher settings of a distillation run.
+
+    Args:
+        run_dir: Training run directory
+        settings: Dictionary with teacher (weights path), min_confidence
+            and imgsz
+
+    Returns:
+        Path to the settings file
+    """
+    path = Path(run_dir) / DISTILL_SETTINGS_FILE
+    path.write_text(yaml.safe_dump(settings, sort_keys=False))
+    return path
+
+
+def load_distill_settings(run_dir: Path) -> dict | None:
+    """
+    Load the teacher settings of a training run.
+
+    Args:
+        run_dir: Training run directory
+
+    Returns:
+        The saved settings, or None if the run was not distilled
+    """
+    path = Path(run_dir) / DISTILL_SETTINGS_FILE
+    if not path.exists():
+        return None
+    return yaml.safe_load(path.read_text())
+
+
+def teacher_soft_targets(
+    teacher_weights: Path,
+    data_yaml: Path,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    min_confidence: float = DISTILL_MIN_CONFIDENCE,
+    use_cache: bool = True,
+) -> dict[str, np.ndarray]:
+    """
+    Get the teacher's soft targets for the training split.
+
+    Teacher inference goes through the prediction store, so it runs only
+    when the teacher weights, training images or imgsz change.
+
+    Args:
+        teacher_weights: Teacher model weights
+        data_yaml: Dataset config (its train split is used)
+        imgsz: Teacher inference size
+        min_confidence: Minimum teacher confidence kept
+        use_cache: Whether to reuse cached teacher predictions
+
+    Returns:
+        Output of build_soft_targets
+
+    Raises:
+        ValueError: If the train split has no images
+    """
+    from mina.core.dataset import resolve_split_images
+
+    image_paths = resolve_split_images(data_yaml, "train")
+    if not image_paths:
+        raise ValueError(f"No train images found for {data_yaml}")
+
+    raw = get_predictions(Path(teacher_weights), image_paths, imgsz, use_cache)
+    teacher = apply_nms(raw, confidence=min_confidence, iou=DEFAULT_IOU_THRESHOLD)
+    # The train split may list several image directories, each with its labels
+    labels = load_labels(None, image_paths)
+
+    return build_soft_targets(teacher, labels, image_paths)
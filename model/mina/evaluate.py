@@ -4,36 +4,29 @@ Model evaluation logic for fish disease detection.
 
 from pathlib import Path
 
-from ultralytics import YOLO
-
 from mina.core.constants import (
-    DISEASE_CLASSES,
     DEFAULT_IMAGE_SIZE,
     DEFAULT_IOU_THRESHOLD,
     TEST_DATA_DIR,
 )
-from mina.core.dataset import create_test_yaml
+from mina.metrics import (
+    LabelArrays,
+    bootstrap_metrics,
+    compute_metrics,
+    load_labels,
+)
+from mina.predictions import apply_nms, get_predictions, list_images
 
 
-def evaluate(
-    weights: Path,
-    test_dir: Path | None = None,
-    imgsz: int = DEFAULT_IMAGE_SIZE,
-    confidence: float = 0.001,
-    iou: float = DEFAULT_IOU_THRESHOLD,
-) -> dict:
+def load_test_set(test_dir: Path | None = None) -> tuple[list[Path], LabelArrays]:
     """
-    Evaluate model on test set.
+    Load the test image list and ground-truth labels.
 
     Args:
-        weights: Path to trained model weights (.pt or .tflite)
         test_dir: Path to test data directory. Defaults to TEST_DATA_DIR.
-        imgsz: Input image size
-        confidence: Confidence threshold for predictions (low for mAP)
-        iou: IoU threshold for NMS
 
     Returns:
-        Dictionary containing evaluation metrics
+        Tuple of (image paths in evaluation order, labels)
 
     Raises:
         FileNotFoundError: If test directory or subdirectories not found
@@ -51,64 +44,101 @@ def evaluate(
     if not labels_dir.exists():
         raise FileNotFoundError(f"Test labels directory not found: {labels_dir}")
 
-    image_count = len(list(images_dir.glob("*")))
-    if image_count == 0:
+    image_paths = list_images(images_dir)
+    if not image_paths:
         raise ValueError(f"No images found in {images_dir}")
 
-    print(f"Evaluating on {image_count} test images...")
+    print(f"Evaluating on {len(image_paths)} test images...")
 
-    # Create temporary yaml for evaluation
-    test_yaml = create_test_yaml(test_dir)
+    return image_paths, load_labels(labels_dir, image_paths)
 
-    try:
-        # Load model
-        model = YOLO(str(weights))
 
-        # Run validation on test set
-        results = model.val(
-            data=str(test_yaml),
-            imgsz=imgsz,
-            conf=confidence,
-            iou=iou,
-            split="val",  # We pointed 'val' to test images in yaml
-            verbose=True,
-        )
+def evaluate(
+    weights: Path,
+    test_dir: Path | None = None,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    confidence: float = 0.001,
+    iou: float = DEFAULT_IOU_THRESHOLD,
+    use_cache: bool = True,
+    cache_dir: Path | None = None,
+    bootstrap: int = 0,
+) -> dict:
+    """
+    Evaluate model on test set.
 
-        # Extract metrics
-        metrics = {
-            "mAP50": results.box.map50,
-            "mAP50-95": results.box.map,
-            "precision": results.box.mp,
-            "recall": results.box.mr,
-            "per_class_ap50": {
-                DISEASE_CLASSES[i]: results.box.ap50[i]
-                for i in range(len(DISEASE_CLASSES))
-                if i < len(results.box.ap50)
-            },
-        }
-    finally:
-        # Clean up temporary yaml
-        test_yaml.unlink(missing_ok=True)
+    Raw predictions are cached per (weights, test set, imgsz), so repeated
+    evaluations with different confidence or IoU thresholds only re-score
+    the cached predictions instead of re-running the model.
+
+    Args:
+        weights: Path to trained model weights (.pt or .tflite)
+        test_dir: Path to test data directory. Defaults to TEST_DATA_DIR.
+        imgsz: Input image size
+        confidence: Confidence threshold for predictions (low for mAP)
+        iou: IoU threshold for NMS
+        use_cache: Whether to reuse cached predictions when hashes match
+        cache_dir: Prediction cache root. Defaults to CACHE_DIR.
+        bootstrap: Number of bootstrap resamples for 95% confidence
+            intervals (0 disables them)
+
+    Returns:
+        Dictionary containing evaluation metrics, with a "ci" entry of
+        (low, high) intervals when bootstrap is enabled
+
+    Raises:
+        FileNotFoundError: If test directory or subdirectories not found
+        ValueError: If no images found in test directory
+    """
+    image_paths, labels = load_test_set(test_dir)
+
+    raw_predictions = get_predictions(
+        Path(weights),
+        image_paths,
+        imgsz=imgsz,
+        use_cache=use_cache,
+        cache_dir=cache_dir,
+    )
+    predictions = apply_nms(raw_predictions, confidence=confidence, iou=iou)
+
+    metrics = compute_metrics(predictions, labels)
+    if bootstrap > 0:
+        metrics["ci"] = bootstrap_metrics(
+            predictions, labels, len(image_paths), num_resamples=bootstrap
+        )
 
     return metrics
 
 
 def print_evaluation_results(metrics: dict) -> None:
     """Print evaluation results in a formatted table."""
+    ci = metrics.get("ci")
+
+    def interval(key: str, cls_name: str | None = None) -> str:
+        if ci is None:
+            return ""
+        low, high = ci[key][cls_name] if cls_name else ci[key]
+        return f"   [{low:.4f}, {high:.4f}]"
+
     print("\n" + "=" * 60)
     print("FINAL TEST SET EVALUATION RESULTS")
     print("=" * 60)
 
-    print(f"\n{'Metric':<25} {'Value':>15}")
+    header = f"\n{'Metric':<25} {'Value':>15}"
+    if ci is not None:
+        header += f"   {int(ci['confidence_level'] * 100)}% CI"
+    print(header)
     print("-" * 40)
-    print(f"{'mAP@50':<25} {metrics['mAP50']:>15.4f}")
-    print(f"{'mAP@50-95':<25} {metrics['mAP50-95']:>15.4f}")
+    print(f"{'mAP@50':<25} {metrics['mAP50']:>15.4f}{interval('mAP50')}")
+    print(f"{'mAP@50-95':<25} {metrics['mAP50-95']:>15.4f}{interval('mAP50-95')}")
     print(f"{'Precision':<25} {metrics['precision']:>15.4f}")
     print(f"{'Recall':<25} {metrics['recall']:>15.4f}")
 
     print(f"\n{'Per-Class AP@50':<25}")
     print("-" * 40)
     for cls_name, ap in metrics["per_class_ap50"].items():
-        print(f"  {cls_name:<23} {ap:>15.4f}")
+        print(f"  {cls_name:<23} {ap:>15.4f}{interval('per_class_ap50', cls_name)}")
+
+    if ci is not None:
+        print(f"\n({ci['num_resamples']} bootstrap resamples over test images)")
 
     print("=" * 60)
@@ -2,11 +2,158 @@
 TFLite export logic for fish disease detection model.
 """
 
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata as importlib_metadata
 from pathlib import Path
 
+import yaml
 from ultralytics import YOLO
 
-from mina.core.model import find_best_weights
+from mina.calibration import DEFAULT_CALIBRATION_SIZE, build_calibration_yaml
+from mina.core.cache import atomic_copy, atomic_output, hash_file, hash_files, hash_key
+from mina.core.constants import CACHE_DIR
+from mina.core.dataset import resolve_split_images
+from mina.core.model import find_run_weights
+from mina.core.registry import register_run
+
+# Packages whose versions change the exported artifact
+EXPORT_CONVERTERS: tuple[str, ...] = (
+    "ultralytics",
+    "torch",
+    "onnx",
+    "onnxslim",
+    "onnx2tf",
+    "tensorflow",
+)
+
+# Multi-format export artifacts, named like ultralytics names them
+EXPORT_FORMATS: dict[str, str] = {
+    "onnx": "{stem}.onnx",
+    "tflite-fp32": "{stem}_float32.tflite",
+    "tflite-fp16": "{stem}_float16.tflite",
+    "tflite-int8": "{stem}_full_integer_quant.tflite",
+}
+
+# Bump to invalidate every cached export
+EXPORT_CACHE_VERSION: int = 1
+
+
+def converter_versions() -> dict[str, str | None]:
+    """
+    Get installed versions of the export toolchain.
+
+    Returns:
+        Dictionary of package name to version (None if not installed)
+    """
+    versions = {}
+    for package in EXPORT_CONVERTERS:
+        try:
+            versions[package] = importlib_metadata.version(package)
+        except importlib_metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def calibration_set_hash(data_yaml: Path) -> str:
+    """
+    Hash the int8 calibration set (data.yaml plus val image contents).
+
+    Args:
+        data_yaml: Path to data.yaml used for calibration
+
+    Returns:
+        Hex digest string
+    """
+    images = resolve_split_images(data_yaml, "val")
+    # Hash names relative to the split root so moving the dataset is a hit
+    root = Path(os.path.commonpath(images)) if images else None
+    return hash_key(
+        {"data_yaml": hash_file(data_yaml), "images": hash_files(images, root=root)}
+    )
+
+
+def export_cache_entry(
+    weights_path: Path,
+    int8: bool,
+    imgsz: int,
+    nms: bool,
+    data_yaml: Path,
+    cache_dir: Path | None = None,
+    fmt: str = "tflite",
+) -> tuple[Path, dict]:
+    """
+    Get the cache directory and identifying metadata for an export.
+
+    Args:
+        weights_path: Path to the .pt weights
+        int8: Whether int8 quantization is enabled
+        imgsz: Export image size
+        nms: Whether NMS is included in the model
+        data_yaml: Dataset config used for int8 calibration
+        cache_dir: Cache root. Defaults to CACHE_DIR.
+        fmt: Artifact format ("tflite" for export_tflite, or a key of
+            EXPORT_FORMATS)
+
+    Returns:
+        Tuple of (cache entry directory, metadata dict)
+    """
+    if cache_dir is None:
+        cache_dir = CACHE_DIR
+
+    metadata = {
+        "version": EXPORT_CACHE_VERSION,
+        "format": fmt,
+        "weights": hash_file(weights_path),
+        "int8": int8,
+        "imgsz": imgsz,
+        "nms": nms,
+        # Calibration data only affects int8 exports
+        "calibration": calibration_set_hash(data_yaml) if int8 else None,
+        "converters": converter_versions(),
+    }
+    entry = cache_dir / "exports" / f"{weights_path.stem}-{hash_key(metadata)}"
+    return entry, metadata
+
+
+def load_cached_export(entry: Path) -> Path | None:
+    """
+    Get the artifact stored in an export cache entry.
+
+    Args:
+        entry: Cache entry directory from export_cache_entry
+
+    Returns:
+        Path to the cached artifact, or None if the entry is incomplete
+    """
+    metadata_path = entry / "metadata.json"
+    if not metadata_path.exists():
+        return None
+    return entry / json.loads(metadata_path.read_text())["artifact"]
+
+
+def store_cached_export(entry: Path, artifact: Path, metadata: dict) -> Path:
+    """
+    Store an exported artifact in the export cache.
+
+    The artifact is copied before metadata.json is written, so an entry
+    is only visible to load_cached_export once it is complete.
+
+    Args:
+        entry: Cache entry directory from export_cache_entry
+        artifact: Exported file to store
+        metadata: Identifying metadata from export_cache_entry
+
+    Returns:
+        Path to the cached artifact
+    """
+    cached = atomic_copy(artifact, entry / artifact.name)
+    with atomic_output(entry / "metadata.json") as tmp_path:
+        tmp_path.write_text(
+            json.dumps({**metadata, "artifact": artifact.name}, indent=2)
+        )
+    return cached
 
 
 def export_tflite(
@@ -15,10 +162,19 @@ def export_tflite(
     imgsz: int = 640,
     output_dir: str | Path | None = None,
     nms: bool = False,
+    data_yaml: Path | None = None,
+    calibration_size: int | None = DEFAULT_CALIBRATION_SIZE,
+    calibration_seed: int = 0,
+    use_cache: bool = True,
+    cache_dir: Path | None = None,
 ) -> Path:
     """
     Export YOLOv8 model to TFLite format.
 
+    Exports are cached by weights hash, export options, calibration set
+    hash and converter versions, so re-exporting unchanged weights copies
+    the cached artifact instead of re-running the conversion.
+
     Args:
         weights_path: Path to the trained .pt weights file
         int8: Whether to use int8 quantization (recommended for mobile)
@@ -27,6 +183,14 @@ def export_tflite(
         nms: Whether to include NMS in the model. Default False because
              onnx2tf has issues with TopK operations used in YOLO NMS.
              NMS should be handled in the app instead.
+        data_yaml: Dataset config for int8 calibration. Defaults to the
+            training data.yaml.
+        calibration_size: Number of int8 calibration images selected from
+            the train split (see mina.calibration); None calibrates on the
+            whole val split of data_yaml
+        calibration_seed: Random seed for the calibration selection
+        use_cache: Whether to reuse a cached export when the key matches
+        cache_dir: Export cache root. Defaults to CACHE_DIR.
 
     Returns:
         Path to the exported TFLite model
@@ -41,34 +205,50 @@ def export_tflite(
     if not weights_path.exists():
         raise FileNotFoundError(f"Weights file not found: {weights_path}")
 
-    data_yaml = get_data_yaml_path()
-
-    print(f"Loading model from: {weights_path}")
-    model = YOLO(str(weights_path))
+    if data_yaml is None:
+        data_yaml = get_data_yaml_path()
+    if int8 and calibration_size:
+        data_yaml = build_calibration_yaml(
+            data_yaml, calibration_size, calibration_seed, cache_dir=cache_dir
+        )
 
-    print(f"Exporting to TFLite (int8={int8}, imgsz={imgsz}, nms={nms})...")
-
-    # Export to TFLite
-    # Note: nms=False by default because onnx2tf has issues with TopK operations
-    # used in YOLO NMS. NMS should be handled in the mobile app instead.
-    export_path = model.export(
-        format="tflite",
-        data=str(data_yaml),
-        int8=int8,
-        imgsz=imgsz,
-        simplify=True,
-        nms=nms,
+    entry, metadata = export_cache_entry(
+        weights_path, int8, imgsz, nms, data_yaml, cache_dir
     )
+    cached = load_cached_export(entry) if use_cache else None
+
+    if cached is not None:
+        print(f"Using cached export: {cached}")
+        # Same place ultralytics writes to when no output_dir is given
+        default_dir = weights_path.parent / f"{weights_path.stem}_saved_model"
+        export_path = atomic_copy(cached, Path(output_dir or default_dir) / cached.name)
+    else:
+        print(f"Loading model from: {weights_path}")
+        model = YOLO(str(weights_path))
+
+        print(f"Exporting to TFLite (int8={int8}, imgsz={imgsz}, nms={nms})...")
 
-    export_path = Path(export_path)
+        # Export to TFLite
+        # Note: nms=False by default because onnx2tf has issues with TopK operations
+        # used in YOLO NMS. NMS should be handled in the mobile app instead.
+        export_path = Path(
+            model.export(
+                format="tflite",
+                data=str(data_yaml),
+                int8=int8,
+                imgsz=imgsz,
+                simplify=True,
+                nms=nms,
+            )
+        )
+
+        store_cached_export(entry, export_path, metadata)
 
-    # Move to output directory if specified
-    if output_dir:
-        output_dir = Path(output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        final_path = output_dir / export_path.name
-        export_path.rename(final_path)
-        export_path = final_path
+        # Copy (not rename) so the destination is replaced atomically
+        if output_dir:
+            export_path = atomic_copy(export_path, Path(output_dir) / export_path.name)
+
+    register_run(weights_path.parent.parent)
 
     # Print model size
     size_mb = export_path.stat().st_size / (1024 * 1024)
@@ -79,12 +259,260 @@ def export_tflite(
     return export_path
 
 
-def get_weights_or_default(weights_path: str | Path | None) -> Path:
+def parse_formats(formats: str) -> list[str]:
+    """
+    Parse a comma-separated list of export formats.
+
+    Args:
+        formats: For example "onnx,tflite-fp16,tflite-int8"
+
+    Returns:
+        List of format names, without duplicates, in the given order
+
+    Raises:
+        ValueError: If a format is unknown or the list is empty
+    """
+    names = list(dict.fromkeys(f.strip() for f in formats.split(",") if f.strip()))
+    if not names:
+        raise ValueError("No export formats given")
+
+    unknown = [f for f in names if f not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(
+            f"Unknown export formats: {unknown}. Choose from: {list(EXPORT_FORMATS)}"
+        )
+    return names
+
+
+def _run_shared_export(
+    weights_path: Path,
+    formats: list[str],
+    imgsz: int,
+    nms: bool,
+    data_yaml: Path,
+) -> dict[str, Path]:
+    """Run the torch -> ONNX (-> SavedModel -> TFLite) chain once for all formats."""
+    print(f"Loading model from: {weights_path}")
+    model = YOLO(str(weights_path))
+
+    int8 = "tflite-int8" in formats
+    if any(fmt.startswith("tflite") for fmt in formats):
+        # The SavedModel export writes the ONNX file it converts from, and
+        # onnx2tf emits every TFLite precision from the same conversion
+        print(f"Exporting ONNX + SavedModel + TFLite (int8={int8}, imgsz={imgsz})...")
+        model.export(
+            format="saved_model",
+            data=str(data_yaml),
+            int8=int8,
+            imgsz=imgsz,
+            nms=nms,
+        )
+    else:
+        print(f"Exporting ONNX (imgsz={imgsz})...")
+        model.export(format="onnx", imgsz=imgsz, simplify=True, nms=nms)
+
+    return {fmt: _default_export_path(weights_path, fmt) for fmt in formats}
+
+
+def _default_export_path(weights_path: Path, fmt: str) -> Path:
+    """Get where ultralytics writes an artifact for the given weights."""
+    name = EXPORT_FORMATS[fmt].format(stem=weights_path.stem)
+    if fmt == "onnx":
+        return weights_path.parent / name
+    return weights_path.parent / f"{weights_path.stem}_saved_model" / name
+
+
+def _finalize_artifact(
+    source: Path,
+    destination: Path,
+    entry: Path,
+    metadata: dict,
+    store: bool,
+) -> dict:
+    """Cache, place and hash one exported artifact (runs in a worker thread)."""
+    if store:
+        store_cached_export(entry, source, metadata)
+    if source.resolve() != destination.resolve():
+        atomic_copy(source, destination)
+
+    return {
+        "path": destination,
+        "size": destination.stat().st_size,
+        "sha256": hash_file(destination),
+    }
+
+
+def export_formats(
+    weights_path: str | Path,
+    formats: list[str],
+    imgsz: int = 640,
+    output_dir: str | Path | None = None,
+    nms: bool = False,
+    data_yaml: Path | None = None,
+    calibration_size: int | None = DEFAULT_CALIBRATION_SIZE,
+    calibration_seed: int = 0,
+    use_cache: bool = True,
+    cache_dir: Path | None = None,
+    workers: int | None = None,
+) -> Path:
+    """
+    Export several formats from one shared conversion and write a manifest.
+
+    Formats already in the export cache are reused. The rest come from a
+    single torch -> ONNX -> SavedModel -> TFLite run, after which every
+    artifact is stored in the cache, copied into place and hashed in
+    parallel. A manifest.yaml with the size and SHA-256 of each artifact
+    is written next to the artifacts.
+
+    Args:
+        weights_path: Path to the trained .pt weights file
+        formats: Format names (keys of EXPORT_FORMATS)
+        imgsz: Input image size for the exported models
+        output_dir: Directory for all artifacts. Defaults to the ultralytics
+            locations (best.onnx next to the weights, TFLite files in
+            best_saved_model/), which is what publish-release.sh expects.
+        nms: Whether to include NMS in the models
+        data_yaml: Dataset config for int8 calibration. Defaults to the
+            training data.yaml.
+        calibration_size: Number of int8 calibration images selected from
+            the train split (see mina.calibration); None calibrates on the
+            whole val split of data_yaml
+        calibration_seed: Random seed for the calibration selection
+        use_cache: Whether to reuse cached exports when the key matches
+        cache_dir: Export cache root. Defaults to CACHE_DIR.
+        workers: Threads for the per-artifact stage (default: one per format)
+
+    Returns:
+        Path to the manifest.yaml
+
+    Raises:
+        FileNotFoundError: If weights file not found
+        ValueError: If a format is unknown
+    """
+    from mina.train import get_data_yaml_path
+
+    weights_path = Path(weights_path)
+    if not weights_path.exists():
+        raise FileNotFoundError(f"Weights file not found: {weights_path}")
+
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown export formats: {unknown}")
+
+    if data_yaml is None:
+        data_yaml = get_data_yaml_path()
+    if "tflite-int8" in formats and calibration_size:
+        data_yaml = build_calibration_yaml(
+            data_yaml, calibration_size, calibration_seed, cache_dir=cache_dir
+        )
+
+    entries = {
+        fmt: export_cache_entry(
+            weights_path,
+            fmt == "tflite-int8",
+            imgsz,
+            nms,
+            data_yaml,
+            cache_dir,
+            fmt=fmt,
+        )
+        for fmt in formats
+    }
+
+    sources = {}
+    for fmt, (entry, _) in entries.items():
+        cached = load_cached_export(entry) if use_cache else None
+        if cached is not None:
+            print(f"Using cached {fmt} export: {cached}")
+            sources[fmt] = cached
+
+    missing = [fmt for fmt in formats if fmt not in sources]
+    if missing:
+        produced = _run_shared_export(weights_path, missing, imgsz, nms, data_yaml)
+        sources.update(produced)
+
+    def destination(fmt: str) -> Path:
+        if output_dir:
+            return Path(output_dir) / EXPORT_FORMATS[fmt].format(stem=weights_path.stem)
+        return _default_export_path(weights_path, fmt)
+
+    with ThreadPoolExecutor(max_workers=workers or len(formats)) as pool:
+        futures = {
+            fmt: pool.submit(
+                _finalize_artifact,
+                sources[fmt],
+                destination(fmt),
+                *entries[fmt],
+                fmt in missing,
+            )
+            for fmt in formats
+        }
+        artifacts = {fmt: future.result() for fmt, future in futures.items()}
+
+    manifest_dir = Path(output_dir) if output_dir else weights_path.parent
+    manifest_path = write_export_manifest(
+        manifest_dir / "manifest.yaml", weights_path, imgsz, nms, artifacts
+    )
+    register_run(weights_path.parent.parent)
+
+    print("\nExport complete!")
+    for fmt, artifact in artifacts.items():
+        size_mb = artifact["size"] / (1024 * 1024)
+        print(f"  {fmt:<12} {size_mb:>7.2f} MB  {artifact['path']}")
+    print(f"Manifest saved to: {manifest_path}")
+
+    return manifest_path
+
+
+def write_export_manifest(
+    path: Path,
+    weights_path: Path,
+    imgsz: int,
+    nms: bool,
+    artifacts: dict[str, dict],
+) -> Path:
+    """
+    Write a manifest listing each exported artifact with its size and hash.
+
+    Args:
+        path: Destination manifest.yaml
+        weights_path: Weights the artifacts were exported from
+        imgsz: Export image size
+        nms: Whether NMS is included in the models
+        artifacts: {format: {path, size, sha256}}
+
+    Returns:
+        Path to the manifest
+    """
+    content = {
+        "weights": weights_path.name,
+        "weights_sha256": hash_file(weights_path),
+        "imgsz": imgsz,
+        "nms": nms,
+        "artifacts": {
+            fmt: {
+                "file": os.path.relpath(artifact["path"], path.parent),
+                "size": artifact["size"],
+                "sha256": artifact["sha256"],
+            }
+            for fmt, artifact in artifacts.items()
+        },
+    }
+    with atomic_output(path) as tmp_path:
+        tmp_path.write_text(yaml.safe_dump(content, sort_keys=False))
+    return path
+
+
+def get_weights_or_default(
+    weights_path: str | Path | None, run: str | None = None
+) -> Path:
     """
-    Get weights path, falling back to most recent training run.
+    Get weights path, falling back to a registered training run.
 
     Args:
         weights_path: Explicit path to weights, or None to auto-detect
+        run: Run to take best.pt from when no path is given: a run name,
+            "latest" or "best" (highest val mAP50-95). Defaults to "latest".
 
     Returns:
         Path to weights file
@@ -98,8 +526,10 @@ def get_weights_or_default(weights_path: str | Path | None) -> Path:
             raise FileNotFoundError(f"Weights file not found: {path}")
         return path
 
-    path = find_best_weights()
+    path = find_run_weights(run or "latest")
     if path is None:
+        if run not in (None, "latest", "best"):
+            raise FileNotFoundError(f"No training run named '{run}' with best.pt")
         raise FileNotFoundError(
             "No weights file specified and no training runs found.\n"
             "Please either:\n"
@@ -107,5 +537,5 @@ def get_weights_or_default(weights_path: str | Path | None) -> Path:
             "  2. Specify weights: uv run mina-export --weights path/to/best.pt"
         )
 
-    print(f"Using weights from most recent training: {path}")
+    print(f"Using weights from training run '{path.parent.parent.name}': {path}")
     return path
@@ -2,21 +2,37 @@
 Inference logic for fish disease detection.
 """
 
+import json
+from collections.abc import Iterable
+from itertools import chain, islice
 from pathlib import Path
 
+import numpy as np
+import ultralytics
 from ultralytics import YOLO
 
+from mina.core.cache import atomic_output, hash_file, hash_key
 from mina.core.constants import (
+    CACHE_DIR,
     DISEASE_CLASSES,
     DEFAULT_CONFIDENCE_THRESHOLD,
-    IMAGE_EXTENSIONS,
+    DEFAULT_IMAGE_SIZE,
 )
+from mina.core.thresholds import ClassThresholds
 from mina.core.types import BoundingBox, Detection
+from mina.inputs import Shard, iter_images
+from mina.progress import SkipCompleted
+from mina.sinks import ResultSink
+from mina.tta import TTA
+
+# Bump to invalidate cached smoke test results when the check changes
+SMOKE_TEST_VERSION: int = 1
 
 
 def convert_to_detections(
     results,
     min_confidence: float = DEFAULT_CONFIDENCE_THRESHOLD,
+    thresholds: ClassThresholds | None = None,
 ) -> list[Detection]:
     """
     Convert YOLO results to Detection objects.
@@ -27,47 +43,74 @@ def convert_to_detections(
     Args:
         results: YOLO inference results
         min_confidence: Minimum confidence threshold (default 0.3 per requirements)
+        thresholds: Optional per-class thresholds; overrides min_confidence
 
     Returns:
         List of Detection objects sorted by confidence (descending)
     """
-    detections = []
-    detection_id = 0
-
+    boxes, scores, labels = [], [], []
     for result in results:
-        boxes = result.boxes
-        if boxes is None:
+        if result.boxes is None:
             continue
+        boxes.extend(result.boxes.xyxyn.tolist())
+        scores.extend(result.boxes.conf.tolist())
+        labels.extend(result.boxes.cls.tolist())
 
-        for i in range(len(boxes)):
-            confidence = float(boxes.conf[i].item())
+    return detections_from_arrays(boxes, scores, labels, min_confidence, thresholds)
 
-            # Filter by confidence threshold
-            if confidence < min_confidence:
-                continue
 
-            class_id = int(boxes.cls[i].item())
-            disease_class = DISEASE_CLASSES[class_id]
+def detections_from_arrays(
+    boxes,
+    scores,
+    labels,
+    min_confidence: float = DEFAULT_CONFIDENCE_THRESHOLD,
+    thresholds: ClassThresholds | None = None,
+) -> list[Detection]:
+    """
+    Convert box arrays to Detection objects.
 
-            # Get normalized bounding box (xyxy format -> convert to xywh)
-            xyxy = boxes.xyxyn[i].tolist()
-            x1, y1, x2, y2 = xyxy
+    Args:
+        boxes: (N, 4) normalized xyxy boxes
+        scores: (N,) confidences
+        labels: (N,) class indices
+        min_confidence: Minimum confidence threshold
+        thresholds: Optional per-class thresholds; overrides min_confidence
 
-            bounding_box = BoundingBox(
-                x=x1,
-                y=y1,
-                width=x2 - x1,
-                height=y2 - y1,
-            )
+    Returns:
+        List of Detection objects sorted by confidence (descending)
+    """
+    detections = []
+    detection_id = 0
 
-            detection = Detection(
-                id=f"det_{detection_id:03d}",
-                disease_class=disease_class,
-                confidence=confidence,
-                bounding_box=bounding_box,
-            )
-            detections.append(detection)
-            detection_id += 1
+    for xyxy, confidence, class_id in zip(boxes, scores, labels, strict=True):
+        confidence = float(confidence)
+        disease_class = DISEASE_CLASSES[int(class_id)]
+
+        # Filter by confidence threshold
+        if thresholds is not None:
+            if confidence < thresholds.for_class(disease_class):
+                continue
+        elif confidence < min_confidence:
+            continue
+
+        # Convert xyxy to top-left xywh
+        x1, y1, x2, y2 = (float(v) for v in xyxy)
+
+        bounding_box = BoundingBox(
+            x=x1,
+            y=y1,
+            width=x2 - x1,
+            height=y2 - y1,
+        )
+
+        detection = Detection(
+            id=f"det_{detection_id:03d}",
+            disease_class=disease_class,
+            confidence=confidence,
+            bounding_box=bounding_box,
+        )
+        detections.append(detection)
+        detection_id += 1
 
     # Sort by confidence descending
     detections.sort(key=lambda d: -d.confidence)
@@ -75,11 +118,82 @@ def convert_to_detections(
     return detections
 
 
+def smoke_image(imgsz: int = DEFAULT_IMAGE_SIZE) -> np.ndarray:
+    """
+    Create the synthetic smoke test image.
+
+    Args:
+        imgsz: Image size (square)
+
+    Returns:
+        (imgsz, imgsz, 3) uint8 noise image, identical on every call
+    """
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (imgsz, imgsz, 3), dtype=np.uint8)
+
+
+def smoke_test(
+    model: YOLO,
+    weights_path: Path,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    use_cache: bool = True,
+    cache_dir: Path | None = None,
+) -> bool:
+    """
+    Check that the inference pipeline runs end to end on a synthetic image.
+
+    The image is built in memory and is the same on every call, so the
+    outcome only depends on the weights. A pass is cached under
+    CACHE_DIR/smoke, keyed by the weights hash, image size and ultralytics
+    version, and later calls with the same weights skip inference.
+
+    Args:
+        model: Loaded model
+        weights_path: Weights the model was loaded from
+        imgsz: Image size
+        use_cache: Whether to reuse a cached pass
+        cache_dir: Cache root. Defaults to CACHE_DIR.
+
+    Returns:
+        True if every detection is well-formed
+    """
+    if cache_dir is None:
+        cache_dir = CACHE_DIR
+
+    key = hash_key(
+        {
+            "version": SMOKE_TEST_VERSION,
+            "weights": hash_file(weights_path),
+            "imgsz": imgsz,
+            "ultralytics": ultralytics.__version__,
+        }
+    )
+    marker = cache_dir / "smoke" / f"{key}.json"
+    if use_cache and marker.exists():
+        print("  Pipeline working (cached result for these weights)")
+        return True
+
+    results = model(smoke_image(imgsz), imgsz=imgsz, verbose=False)
+    detections = convert_to_detections(results, min_confidence=0.0)
+    invalid = [d for d in detections if not d.is_valid()]
+    if invalid:
+        print(f"  Pipeline broken: {len(invalid)} malformed detection(s)")
+        return False
+
+    with atomic_output(marker) as tmp_path:
+        tmp_path.write_text(json.dumps({"detections": len(detections)}))
+    print(f"  Pipeline working: {len(detections)} detection(s)")
+    return True
+
+
 def run_inference(
     model: YOLO,
     image_path: Path,
     min_confidence: float = DEFAULT_CONFIDENCE_THRESHOLD,
     verbose: bool = True,
+    thresholds: ClassThresholds | None = None,
+    sink: ResultSink | None = None,
+    tta: TTA | None = None,
 ) -> list[Detection]:
     """
     Run inference on a single image.
@@ -89,6 +203,13 @@ def run_inference(
         image_path: Path to input image
         min_confidence: Minimum confidence threshold
         verbose: Whether to print results
+        thresholds: Optional per-class thresholds and NMS IoU from a sweep
+        sink: Optional result sink that receives the image's detections
+            and timings (see mina.sinks)
+        tta: Optional test-time augmentation (see mina.tta). In "auto" mode
+            the augmented pass only runs if the plain pass is borderline;
+            its detections then replace the plain ones. Its cost is
+            recorded in tta and reported as the "tta" timing.
 
     Returns:
         List of Detection objects
@@ -96,13 +217,54 @@ def run_inference(
     if verbose:
         print(f"\nProcessing: {image_path.name}")
 
-    # Run inference
-    results = model(str(image_path), verbose=False)
+    timings: dict[str, float] = {}
+    plain_ms = tta_ms = None
+    augment = tta is not None and tta.mode == "on"
 
-    # Convert to Detection objects
-    detections = convert_to_detections(results, min_confidence)
+    # Run inference
+    if not augment:
+        kwargs = {"verbose": False}
+        if thresholds is not None:
+            kwargs.update(conf=thresholds.min_confidence(), iou=thresholds.nms_iou)
+        if tta is not None:
+            # Boxes just below their threshold can make the image borderline
+            lowest = thresholds.min_confidence() if thresholds else min_confidence
+            kwargs["conf"] = max(lowest - tta.margin, 0.0)
+        results = model(str(image_path), **kwargs)
+
+        # Convert to Detection objects
+        detections = convert_to_detections(results, min_confidence, thresholds)
+        if results:
+            timings = dict(results[0].speed)
+            plain_ms = sum(timings.values())
+
+        if tta is not None and results and results[0].boxes is not None:
+            limits = np.array(
+                [
+                    thresholds.for_class(c) if thresholds else min_confidence
+                    for c in DISEASE_CLASSES
+                ]
+            )
+            labels = results[0].boxes.cls.cpu().numpy().astype(int)
+            scores = results[0].boxes.conf.cpu().numpy()
+            augment = tta.is_borderline(scores, limits[labels])
+
+    if augment:
+        nms_iou = thresholds.nms_iou if thresholds else None
+        boxes, scores, labels, tta_ms = tta.predict(model, image_path, nms_iou)
+        detections = detections_from_arrays(
+            boxes, scores, labels, min_confidence, thresholds
+        )
+        timings["tta"] = tta_ms
+    if tta is not None:
+        tta.record(plain_ms, tta_ms)
+
+    if sink is not None:
+        sink.write(image_path, detections, timings or None)
 
     if verbose:
+        if tta_ms is not None:
+            print(f"  TTA over {len(tta.views)} views: {tta_ms:.1f} ms")
         if not detections:
             print("  No diseases detected (fish appears healthy)")
         else:
@@ -125,12 +287,82 @@ def run_inference(
     return detections
 
 
+def run_inference_on_images(
+    model: YOLO,
+    images: Iterable[Path],
+    min_confidence: float = DEFAULT_CONFIDENCE_THRESHOLD,
+    limit: int | None = None,
+    verbose: bool = True,
+    thresholds: ClassThresholds | None = None,
+    sink: ResultSink | None = None,
+    tta: TTA | None = None,
+) -> list[Detection]:
+    """
+    Run inference on a stream of images (e.g. from mina.inputs).
+
+    Args:
+        model: Loaded YOLO model
+        images: Image paths, consumed lazily
+        min_confidence: Minimum confidence threshold
+        limit: Maximum number of images to process, not counting skipped
+            ones (None for all)
+        verbose: Whether to print results
+        thresholds: Optional per-class thresholds and NMS IoU from a sweep
+        sink: Optional result sink that receives every image's detections.
+            Detections are then streamed to it instead of being collected,
+            and only the class counts are kept in memory. Images already
+            in a resumed sink's progress log are skipped.
+        tta: Optional test-time augmentation (see run_inference); its cost
+            is summarized at the end
+
+    Returns:
+        List of all Detection objects from all images (empty with a sink)
+    """
+    all_detections = []
+    class_counts: dict[str, int] = {}
+    processed = 0
+    # Completed images are skipped before the limit, so it counts new work
+    remaining = SkipCompleted(images, sink.progress if sink and sink.resume else None)
+    for image_path in islice(remaining, limit):
+        detections = run_inference(
+            model, image_path, min_confidence, verbose, thresholds, sink, tta
+        )
+        processed += 1
+        if sink is None:
+            all_detections.extend(detections)
+        for det in detections:
+            class_counts[det.disease_class] = class_counts.get(det.disease_class, 0) + 1
+
+    if verbose:
+        print("\n=== Summary ===")
+        print(f"Processed: {processed} images")
+        if remaining.skipped:
+            print(f"Skipped (already done): {remaining.skipped} images")
+        print(f"Total detections: {sum(class_counts.values())}")
+        if tta is not None:
+            print(tta.summary())
+
+        if class_counts:
+            print("Detections by class:")
+            for cls, count in sorted(class_counts.items(), key=lambda x: -x[1]):
+                print(f"  {cls}: {count}")
+
+    return all_detections
+
+
 def run_inference_on_directory(
     model: YOLO,
     dir_path: Path,
     min_confidence: float = DEFAULT_CONFIDENCE_THRESHOLD,
     limit: int | None = 10,
     verbose: bool = True,
+    thresholds: ClassThresholds | None = None,
+    sink: ResultSink | None = None,
+    recursive: bool = False,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    shard: Shard | None = None,
+    tta: TTA | None = None,
 ) -> list[Detection]:
     """
     Run inference on all images in a directory.
@@ -141,39 +373,33 @@ def run_inference_on_directory(
         min_confidence: Minimum confidence threshold
         limit: Maximum number of images to process (None for all)
         verbose: Whether to print results
+        thresholds: Optional per-class thresholds and NMS IoU from a sweep
+        sink: Optional result sink (see run_inference_on_images)
+        recursive: Include images in subdirectories
+        include: Glob patterns of which one must match (see mina.inputs)
+        exclude: Glob patterns of files and directories to skip
+        shard: Only process the images of this shard
+        tta: Optional test-time augmentation (see run_inference)
 
     Returns:
-        List of all Detection objects from all images
+        List of all Detection objects from all images (empty with a sink)
     """
-    images = [p for p in dir_path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS]
-
-    if not images:
+    images = iter_images(dir_path, recursive, include, exclude, shard)
+    first = next(images, None)
+    if first is None:
         print("No images found in directory")
         return []
 
     if verbose:
         print(f"\n=== Processing images from: {dir_path} ===")
 
-    images_to_process = sorted(images)[:limit] if limit else sorted(images)
-
-    all_detections = []
-    for image_path in images_to_process:
-        detections = run_inference(model, image_path, min_confidence, verbose)
-        all_detections.extend(detections)
-
-    if verbose:
-        print("\n=== Summary ===")
-        print(f"Processed: {len(images_to_process)} images")
-        print(f"Total detections: {len(all_detections)}")
-
-        # Count by class
-        class_counts: dict[str, int] = {}
-        for det in all_detections:
-            class_counts[det.disease_class] = class_counts.get(det.disease_class, 0) + 1
-
-        if class_counts:
-            print("Detections by class:")
-            for cls, count in sorted(class_counts.items(), key=lambda x: -x[1]):
-                print(f"  {cls}: {count}")
-
-    return all_detections
+    return run_inference_on_images(
+        model,
+        chain([first], images),
+        min_confidence,
+        limit,
+        verbose,
+        thresholds,
+        sink,
+        tta,
+    )
@@ -0,0 +1,189 @@
+"""
+Input enumeration for inference over large image archives.
+
+Images come from a directory walk (os.scandir, optionally recursive) or
+from a file list with one path per line ("-" reads stdin). Both are
+streamed, so inference starts before the whole archive has been listed.
+
+Paths are filtered by IMAGE_EXTENSIONS, then by glob patterns matched
+against the path relative to the walked directory (or as listed). Like
+pathlib's PurePath.match, patterns are anchored at the right: "*.png"
+matches in every directory and "thumbs/*" matches the files of any
+directory named thumbs. A directory matching an exclude pattern is not
+entered.
+
+Sharding (--shard i/N) keeps the paths whose hash falls into shard i of N.
+The hash is computed from the same relative path, so N machines that walk
+the same archive, wherever it is mounted, split it into disjoint shards
+that together cover it, without coordinating.
+"""
+
+import hashlib
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple
+
+from mina.core.constants import IMAGE_EXTENSIONS
+
+# Path list source that reads stdin
+STDIN_LIST: str = "-"
+
+
+class Shard(NamedTuple):
+    """Shard index (0-based) out of count shards."""
+
+    index: int
+    count: int
+
+
+def parse_shard(value: str) -> Shard:
+    """
+    Parse a shard specification.
+
+    Args:
+        value: "i/N" with 0 <= i < N
+
+    Returns:
+        The shard
+
+    Raises:
+        ValueError: If value is not of the form i/N or i is out of range
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must be i/N, e.g. 0/4, got '{value}'") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in 0..N-1, got '{value}'")
+    return Shard(index, count)
+
+
+def shard_of(key: str, count: int) -> int:
+    """
+    Get the shard of a path.
+
+    Uses a cryptographic hash rather than hash(), which is salted per
+    process, so every machine puts a path in the same shard.
+
+    Args:
+        key: Relative POSIX path
+        count: Number of shards
+
+    Returns:
+        Shard index in 0..count-1
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def _matches(key: str, patterns: Iterable[str]) -> bool:
+    path = PurePosixPath(key)
+    return any(path.match(pattern) for pattern in patterns)
+
+
+def is_selected(
+    key: str,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    shard: Shard | None = None,
+) -> bool:
+    """
+    Check whether an image path passes the filters.
+
+    Args:
+        key: Relative POSIX path of the image
+        include: Glob patterns of which one must match (all pass if empty)
+        exclude: Glob patterns of which none may match
+        shard: Shard the path must fall into
+
+    Returns:
+        True if the path is an image and passes every filter
+    """
+    if PurePosixPath(key).suffix.lower() not in IMAGE_EXTENSIONS:
+        return False
+    if include and not _matches(key, include):
+        return False
+    if exclude and _matches(key, exclude):
+        return False
+    return shard is None or shard_of(key, shard.count) == shard.index
+
+
+def iter_images(
+    root: Path,
+    recursive: bool = False,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    shard: Shard | None = None,
+) -> Iterator[Path]:
+    """
+    Walk a directory for images.
+
+    Entries are sorted within each directory, so the order is the same on
+    every run. Symlinked directories are not followed.
+
+    Args:
+        root: Directory to walk
+        recursive: Descend into subdirectories
+        include: Glob patterns of which one must match (all pass if empty)
+        exclude: Glob patterns of files and directories to skip
+        shard: Only yield the images of this shard
+
+    Yields:
+        Image paths under root
+    """
+    include, exclude = tuple(include), tuple(exclude)
+    # Directories still to walk, as (path, relative prefix), last popped first
+    pending = [(Path(root), "")]
+    while pending:
+        directory, prefix = pending.pop()
+        with os.scandir(directory) as listing:
+            entries = sorted(listing, key=lambda entry: entry.name)
+        subdirectories = []
+        for entry in entries:
+            key = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if recursive and not (exclude and _matches(key, exclude)):
+                    subdirectories.append((Path(entry.path), key + "/"))
+            elif is_selected(key, include, exclude, shard):
+                yield Path(entry.path)
+        pending.extend(reversed(subdirectories))
+
+
+def read_image_list(
+    source: str | Path,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    shard: Shard | None = None,
+) -> Iterator[Path]:
+    """
+    Read image paths from a file list.
+
+    Args:
+        source: Text file with one path per line, or STDIN_LIST for stdin
+        include: Glob patterns of which one must match (all pass if empty)
+        exclude: Glob patterns of which none may match
+        shard: Only yield the images of this shard (hashed by the path as
+            listed, so all machines need the same list)
+
+    Yields:
+        Listed image paths, in list order
+    """
+    if str(source) == STDIN_LIST:
+        yield from _select_lines(sys.stdin, tuple(include), tuple(exclude), shard)
+    else:
+        with open(source) as f:
+            yield from _select_lines(f, tuple(include), tuple(exclude), shard)
+
+
+def _select_lines(
+    lines: Iterable[str],
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    shard: Shard | None,
+) -> Iterator[Path]:
+    for line in lines:
+        key = line.strip()
+        if key and is_selected(Path(key).as_posix(), include, exclude, shard):
+            yield Path(key)
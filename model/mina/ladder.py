@@ -0,0 +1,178 @@
+"""
+Input-resolution ladder: export at several sizes and benchmark each.
+
+The same weights are exported once per resolution, then every export is
+evaluated on the test set (see mina.compare), which measures single-image
+CPU latency alongside mAP. The rungs are benchmarked one at a time by
+default: concurrent rungs would compete for the cores and skew the very
+latencies being compared. Resolutions that are both slower
+and less accurate than another rung are dominated; the remaining ones
+form the Pareto front to pick from per device tier.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from mina.calibration import DEFAULT_CALIBRATION_SIZE
+from mina.compare import evaluate_models
+from mina.core.cache import atomic_output
+from mina.export import export_tflite
+
+# Resolutions exported by default (multiples of the 32 px model stride)
+RESOLUTION_LADDER: tuple[int, ...] = (320, 416, 512, 640)
+
+
+def parse_resolutions(resolutions: str) -> list[int]:
+    """
+    Parse a comma-separated list of input resolutions.
+
+    Args:
+        resolutions: For example "320,416,512,640"
+
+    Returns:
+        Sorted list of unique resolutions
+
+    Raises:
+        ValueError: If the list is empty or a size is not a positive
+            multiple of 32
+    """
+    try:
+        sizes = sorted({int(s) for s in resolutions.split(",") if s.strip()})
+    except ValueError:
+        raise ValueError(f"Invalid resolution list: {resolutions!r}") from None
+
+    if not sizes:
+        raise ValueError("No resolutions given")
+    invalid = [s for s in sizes if s <= 0 or s % 32]
+    if invalid:
+        raise ValueError(f"Resolutions must be positive multiples of 32: {invalid}")
+    return sizes
+
+
+def pareto_front(latency: np.ndarray, accuracy: np.ndarray) -> np.ndarray:
+    """
+    Find the points not dominated in latency (lower) and accuracy (higher).
+
+    Args:
+        latency: (N,) latencies
+        accuracy: (N,) accuracies
+
+    Returns:
+        (N,) boolean mask of Pareto-optimal points
+    """
+    latency = np.asarray(latency, dtype=float)
+    accuracy = np.asarray(accuracy, dtype=float)
+
+    # dominates[i, j]: point i is at least as good as j on both and better on one
+    no_worse = (latency[:, None] <= latency[None, :]) & (
+        accuracy[:, None] >= accuracy[None, :]
+    )
+    better = (latency[:, None] < latency[None, :]) | (
+        accuracy[:, None] > accuracy[None, :]
+    )
+    return ~(no_worse & better).any(axis=0)
+
+
+def export_ladder(
+    weights_path: Path,
+    resolutions: list[int] | tuple[int, ...] = RESOLUTION_LADDER,
+    int8: bool = True,
+    output_dir: Path | None = None,
+    test_dir: Path | None = None,
+    calibration_size: int | None = DEFAULT_CALIBRATION_SIZE,
+    calibration_seed: int = 0,
+    use_cache: bool = True,
+    workers: int = 1,
+) -> dict:
+    """
+    Export a model at several resolutions and benchmark every export.
+
+    Args:
+        weights_path: Trained .pt weights
+        resolutions: Input sizes to export
+        int8: Whether to quantize the exports to int8
+        output_dir: Root for the exports, one imgsz<N>/ subdirectory per
+            resolution. Defaults to <stem>_ladder/ next to the weights.
+        test_dir: Test data for the benchmark. Defaults to TEST_DATA_DIR.
+        calibration_size: Number of int8 calibration images
+        calibration_seed: Random seed for calibration image selection
+        use_cache: Whether to reuse cached exports
+        workers: Number of benchmark worker processes (more than 1 is
+            faster but inflates and distorts the latencies)
+
+    Returns:
+        Dictionary with results (evaluate_models metrics per resolution,
+        each with a "pareto" flag) and report (path of ladder.yaml)
+    """
+    weights_path = Path(weights_path)
+    output_dir = Path(output_dir or weights_path.parent / f"{weights_path.stem}_ladder")
+
+    export_paths = [
+        export_tflite(
+            weights_path,
+            int8=int8,
+            imgsz=imgsz,
+            output_dir=output_dir / f"imgsz{imgsz}",
+            calibration_size=calibration_size,
+            calibration_seed=calibration_seed,
+            use_cache=use_cache,
+        )
+        for imgsz in resolutions
+    ]
+
+    results = evaluate_models(
+        export_paths, test_dir, imgsz=list(resolutions), workers=workers
+    )
+    front = pareto_front(
+        [r["latency_ms"] for r in results], [r["mAP50-95"] for r in results]
+    )
+    for metrics, optimal in zip(results, front):
+        metrics["pareto"] = bool(optimal)
+
+    report_path = output_dir / "ladder.yaml"
+    report = {
+        "weights": weights_path.name,
+        "int8": int8,
+        "resolutions": [
+            {
+                "imgsz": r["imgsz"],
+                "file": Path(r["weights"]).relative_to(output_dir).as_posix(),
+                "mAP50": round(r["mAP50"], 4),
+                "mAP50-95": round(r["mAP50-95"], 4),
+                "latency_ms": round(r["latency_ms"], 2),
+                "latency_p95_ms": round(r["latency_p95_ms"], 2),
+                "pareto": r["pareto"],
+            }
+            for r in results
+        ],
+    }
+    with atomic_output(report_path) as tmp_path:
+        tmp_path.write_text(yaml.safe_dump(report, sort_keys=False))
+
+    return {"results": results, "report": report_path}
+
+
+def print_ladder_results(ladder: dict) -> None:
+    """Print the latency vs. mAP table for each resolution."""
+    print("\n" + "=" * 60)
+    print("RESOLUTION LADDER (* = Pareto-optimal)")
+    print("=" * 60)
+
+    print(
+        f"\n{'imgsz':>6} {'mAP50':>8} {'mAP50-95':>9} {'ms':>8} {'p95 ms':>8} "
+        f"{'Size MB':>8}"
+    )
+    print("-" * 52)
+    for r in ladder["results"]:
+        size_mb = Path(r["weights"]).stat().st_size / (1024 * 1024)
+        marker = " *" if r["pareto"] else ""
+        print(
+            f"{r['imgsz']:>6} {r['mAP50']:>8.4f} {r['mAP50-95']:>9.4f} "
+            f"{r['latency_ms']:>8.1f} {r['latency_p95_ms']:>8.1f} "
+            f"{size_mb:>8.2f}{marker}"
+        )
+
+    print(f"\nReport saved to: {ladder['report']}")
+    print("=" * 60)
@@ -0,0 +1,609 @@
+"""
+Vectorized detection metrics (mAP, precision, recall) in pure NumPy.
+
+Predictions and ground-truth labels for a whole test set are held as flat
+arrays tagged with an image index, so IoU matching runs across every image
+at once instead of looping image by image.
+"""
+
+import warnings
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from mina.core.constants import DISEASE_CLASSES
+from mina.core.dataset import label_path_for
+
+# IoU thresholds used for mAP@50-95 (COCO convention)
+IOU_THRESHOLDS: np.ndarray = np.linspace(0.5, 0.95, 10)
+
+# Recall points used for interpolated AP (COCO 101-point interpolation)
+RECALL_POINTS: np.ndarray = np.linspace(0.0, 1.0, 101)
+
+# Confidence grid used to pick the max-F1 operating point
+CONFIDENCE_GRID: np.ndarray = np.linspace(0.0, 1.0, 1000)
+
+# Default number of bootstrap resamples for confidence intervals
+BOOTSTRAP_RESAMPLES: int = 1000
+
+# Max elements in one chunk of bootstrap PR curves (about 64 MB per array)
+BOOTSTRAP_CHUNK_ELEMENTS: int = 8_000_000
+
+
+class PredictionArrays(NamedTuple):
+    """Model predictions for a set of images, one row per box."""
+
+    image_ids: np.ndarray  # (N,) int, index into the image list
+    boxes: np.ndarray  # (N, 4) float, normalized xyxy
+    scores: np.ndarray  # (N,) float, confidence
+    classes: np.ndarray  # (N,) int, class index
+
+    @classmethod
+    def empty(cls) -> "PredictionArrays":
+        """Create an empty prediction set."""
+        return cls(
+            image_ids=np.zeros(0, dtype=np.int64),
+            boxes=np.zeros((0, 4), dtype=np.float32),
+            scores=np.zeros(0, dtype=np.float32),
+            classes=np.zeros(0, dtype=np.int64),
+        )
+
+    def select(self, mask: np.ndarray) -> "PredictionArrays":
+        """Return the subset of rows selected by a boolean mask or index array."""
+        return PredictionArrays(
+            image_ids=self.image_ids[mask],
+            boxes=self.boxes[mask],
+            scores=self.scores[mask],
+            classes=self.classes[mask],
+        )
+
+
+class LabelArrays(NamedTuple):
+    """Ground-truth boxes for a set of images, one row per box."""
+
+    image_ids: np.ndarray  # (M,) int, index into the image list
+    boxes: np.ndarray  # (M, 4) float, normalized xyxy
+    classes: np.ndarray  # (M,) int, class index
+
+
+def box_iou_pairs(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """
+    Compute the IoU of aligned box pairs.
+
+    Args:
+        boxes1: (K, 4) boxes in xyxy format
+        boxes2: (K, 4) boxes in xyxy format
+
+    Returns:
+        (K,) IoU of boxes1[i] with boxes2[i]
+    """
+    x1 = np.maximum(boxes1[:, 0], boxes2[:, 0])
+    y1 = np.maximum(boxes1[:, 1], boxes2[:, 1])
+    x2 = np.minimum(boxes1[:, 2], boxes2[:, 2])
+    y2 = np.minimum(boxes1[:, 3], boxes2[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+    area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+    union = area1 + area2 - inter
+
+    return inter / np.maximum(union, 1e-12)
+
+
+def candidate_pairs(
+    predictions: PredictionArrays,
+    labels: LabelArrays,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Enumerate every (prediction, label) pair sharing an image and a class.
+
+    Labels are grouped by an (image, class) key with one sort, and each
+    prediction is joined to its group with a binary search, so no dense
+    N x M matrix is ever built.
+
+    Args:
+        predictions: Predictions for the whole image set
+        labels: Ground-truth labels for the whole image set
+
+    Returns:
+        Tuple of (prediction indices, label indices), aligned
+    """
+    if len(predictions.scores) == 0 or len(labels.classes) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    span = int(max(predictions.classes.max(), labels.classes.max())) + 1
+    pred_keys = predictions.image_ids.astype(np.int64) * span + predictions.classes
+    label_keys = labels.image_ids.astype(np.int64) * span + labels.classes
+
+    order = np.argsort(label_keys, kind="stable")
+    sorted_keys = label_keys[order]
+    start = np.searchsorted(sorted_keys, pred_keys, side="left")
+    counts = np.searchsorted(sorted_keys, pred_keys, side="right") - start
+
+    pred_idx = np.repeat(np.arange(len(pred_keys)), counts)
+    # Position of each pair inside its label group
+    group_offset = np.arange(counts.sum()) - np.repeat(
+        np.cumsum(counts) - counts, counts
+    )
+    label_idx = order[np.repeat(start, counts) + group_offset]
+
+    return pred_idx, label_idx
+
+
+def match_predictions(
+    predictions: PredictionArrays,
+    labels: LabelArrays,
+    iou_thresholds: np.ndarray = IOU_THRESHOLDS,
+) -> np.ndarray:
+    """
+    Mark each prediction as a true positive at each IoU threshold.
+
+    Matching is greedy by IoU (like the ultralytics validator): every
+    prediction keeps its best-overlapping label, then every label keeps its
+    best-overlapping prediction.
+
+    Args:
+        predictions: Predictions for the whole image set
+        labels: Ground-truth labels for the whole image set
+        iou_thresholds: IoU thresholds to evaluate
+
+    Returns:
+        (N, T) boolean true-positive matrix
+    """
+    tp = np.zeros((len(predictions.scores), len(iou_thresholds)), dtype=bool)
+
+    pred_idx, label_idx = candidate_pairs(predictions, labels)
+    if len(pred_idx) == 0:
+        return tp
+
+    iou = box_iou_pairs(predictions.boxes[pred_idx], labels.boxes[label_idx])
+
+    # Sort once by IoU; each threshold then takes a prefix-preserving subset
+    order = np.argsort(-iou, kind="stable")
+    pred_idx, label_idx, iou = pred_idx[order], label_idx[order], iou[order]
+
+    for t, threshold in enumerate(iou_thresholds):
+        keep = iou >= threshold
+        p, g = pred_idx[keep], label_idx[keep]
+        if len(p) == 0:
+            continue
+        first = np.sort(np.unique(p, return_index=True)[1])
+        p, g = p[first], g[first]
+        first = np.sort(np.unique(g, return_index=True)[1])
+        tp[p[first], t] = True
+
+    return tp
+
+
+def interpolated_ap(recall: np.ndarray, precision: np.ndarray) -> np.ndarray:
+    """
+    Compute 101-point interpolated AP for a batch of PR curves.
+
+    Args:
+        recall: (..., N) recall along predictions ranked by confidence
+        precision: (..., N) precision along the same ranking
+
+    Returns:
+        (...,) average precision
+    """
+    lead_shape = recall.shape[:-1]
+    n = recall.shape[-1]
+    if n == 0:
+        return np.zeros(lead_shape)
+
+    # Precision envelope: max precision at any recall >= r
+    envelope = np.flip(np.maximum.accumulate(np.flip(precision, -1), axis=-1), -1)
+
+    rows = int(np.prod(lead_shape, dtype=np.int64))
+    recall = recall.reshape(rows, n)
+    envelope = envelope.reshape(rows, n)
+
+    # Number of recall points each prediction reaches; monotonic per row.
+    # Offsetting rows by an integer stride keeps the flattened array sorted,
+    # so one exact searchsorted finds the first prediction reaching each
+    # recall point in every row.
+    stride = len(RECALL_POINTS) + 1
+    offsets = stride * np.arange(rows, dtype=np.int64)[:, None]
+    reached = np.searchsorted(RECALL_POINTS, recall, side="right")
+    flat = (reached + offsets).ravel()
+    queries = (np.arange(len(RECALL_POINTS))[None, :] + offsets).ravel()
+    idx = np.searchsorted(flat, queries, side="right").reshape(rows, -1)
+
+    local = idx - (np.arange(rows) * n)[:, None]
+    values = np.where(local < n, envelope.ravel()[np.minimum(idx, flat.size - 1)], 0.0)
+
+    return values.mean(axis=-1).reshape(lead_shape)
+
+
+def ap_per_class(
+    tp: np.ndarray,
+    scores: np.ndarray,
+    pred_classes: np.ndarray,
+    label_classes: np.ndarray,
+    num_classes: int = len(DISEASE_CLASSES),
+) -> dict:
+    """
+    Compute per-class AP and PR curves from a true-positive matrix.
+
+    Args:
+        tp: (N, T) true-positive matrix from match_predictions
+        scores: (N,) prediction confidences
+        pred_classes: (N,) prediction class indices
+        label_classes: (M,) ground-truth class indices
+        num_classes: Number of classes
+
+    Returns:
+        Dictionary with:
+            ap: (C, T) AP per class and IoU threshold (NaN if class has no labels)
+            p_curve: (C, G) precision at each CONFIDENCE_GRID value (IoU 0.5)
+            r_curve: (C, G) recall at each CONFIDENCE_GRID value (IoU 0.5)
+            num_labels: (C,) ground-truth count per class
+    """
+    num_thresholds = tp.shape[1]
+    num_labels = np.bincount(label_classes.astype(np.int64), minlength=num_classes)
+
+    ap = np.full((num_classes, num_thresholds), np.nan)
+    p_curve = np.zeros((num_classes, len(CONFIDENCE_GRID)))
+    r_curve = np.zeros((num_classes, len(CONFIDENCE_GRID)))
+
+    order = np.argsort(-scores, kind="stable")
+    tp, scores, pred_classes = tp[order], scores[order], pred_classes[order]
+
+    for c in range(num_classes):
+        if num_labels[c] == 0:
+            continue
+
+        mask = pred_classes == c
+        if not mask.any():
+            ap[c] = 0.0
+            continue
+
+        tpc = np.cumsum(tp[mask], axis=0)
+        fpc = np.cumsum(~tp[mask], axis=0)
+        recall = tpc / num_labels[c]
+        precision = tpc / (tpc + fpc)
+
+        ap[c] = interpolated_ap(recall.T, precision.T)
+
+        # Curves at IoU 0.5, indexed by confidence (scores are descending)
+        class_scores = -scores[mask]
+        p_curve[c] = np.interp(-CONFIDENCE_GRID, class_scores, precision[:, 0], left=1)
+        r_curve[c] = np.interp(-CONFIDENCE_GRID, class_scores, recall[:, 0], left=0)
+
+    return {
+        "ap": ap,
+        "p_curve": p_curve,
+        "r_curve": r_curve,
+        "num_labels": num_labels,
+    }
+
+
+def pr_at_confidences(
+    tp: np.ndarray,
+    scores: np.ndarray,
+    pred_classes: np.ndarray,
+    label_classes: np.ndarray,
+    confidences: np.ndarray,
+    num_classes: int = len(DISEASE_CLASSES),
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute exact per-class precision and recall at each confidence threshold.
+
+    Each class is sorted once; the number of predictions kept at every
+    threshold is found with one binary search, so a whole grid of
+    thresholds costs a single cumulative sum.
+
+    Args:
+        tp: (N,) true-positive flags at a single IoU threshold
+        scores: (N,) prediction confidences
+        pred_classes: (N,) prediction class indices
+        label_classes: (M,) ground-truth class indices
+        confidences: (G,) confidence thresholds (keep score >= threshold)
+        num_classes: Number of classes
+
+    Returns:
+        Tuple of (precision, recall), each (C, G). Precision is 1 where no
+        prediction is kept.
+    """
+    num_labels = np.bincount(label_classes.astype(np.int64), minlength=num_classes)
+    precision = np.ones((num_classes, len(confidences)))
+    recall = np.zeros((num_classes, len(confidences)))
+
+    for c in range(num_classes):
+        mask = pred_classes == c
+        order = np.argsort(-scores[mask], kind="stable")
+        class_scores = scores[mask][order]
+        cum_tp = np.concatenate([[0], np.cumsum(tp[mask][order])])
+
+        kept = np.searchsorted(-class_scores, -np.asarray(confidences), side="right")
+        tp_kept = cum_tp[kept]
+
+        precision[c] = np.where(kept > 0, tp_kept / np.maximum(kept, 1), 1.0)
+        if num_labels[c] > 0:
+            recall[c] = tp_kept / num_labels[c]
+
+    return precision, recall
+
+
+def compute_metrics(
+    predictions: PredictionArrays,
+    labels: LabelArrays,
+    class_names: list[str] = DISEASE_CLASSES,
+) -> dict:
+    """
+    Compute mAP50, mAP50-95, precision, recall and per-class AP.
+
+    Precision and recall are reported at the confidence that maximizes the
+    mean F1 over classes, matching what the ultralytics validator prints.
+    Classes without ground-truth labels are excluded from the means.
+
+    Args:
+        predictions: Predictions for the whole image set
+        labels: Ground-truth labels for the whole image set
+        class_names: Class names, indexed by class id
+
+    Returns:
+        Dictionary containing evaluation metrics
+    """
+    tp = match_predictions(predictions, labels)
+    stats = ap_per_class(
+        tp, predictions.scores, predictions.classes, labels.classes, len(class_names)
+    )
+
+    present = stats["num_labels"] > 0
+    ap = stats["ap"]
+
+    if present.any():
+        f1 = (
+            2
+            * stats["p_curve"][present]
+            * stats["r_curve"][present]
+            / np.maximum(stats["p_curve"][present] + stats["r_curve"][present], 1e-16)
+        )
+        best = int(f1.mean(axis=0).argmax())
+        precision = float(stats["p_curve"][present, best].mean())
+        recall = float(stats["r_curve"][present, best].mean())
+        map50 = float(ap[present, 0].mean())
+        map50_95 = float(ap[present].mean())
+    else:
+        best = 0
+        precision = recall = map50 = map50_95 = 0.0
+
+    return {
+        "mAP50": map50,
+        "mAP50-95": map50_95,
+        "precision": precision,
+        "recall": recall,
+        "confidence": float(CONFIDENCE_GRID[best]),
+        "per_class_ap50": {
+            class_names[c]: float(ap[c, 0]) for c in np.flatnonzero(present)
+        },
+        "per_class_ap50-95": {
+            class_names[c]: float(ap[c].mean()) for c in np.flatnonzero(present)
+        },
+    }
+
+
+def bootstrap_ap(
+    predictions: PredictionArrays,
+    labels: LabelArrays,
+    num_images: int,
+    num_resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = 0,
+    num_classes: int = len(DISEASE_CLASSES),
+) -> np.ndarray:
+    """
+    Per-class AP for bootstrap resamples of the image set.
+
+    Images are resampled with replacement. Matching is done once; each
+    resample only reweights the matched predictions and labels by how many
+    times their image was drawn, so AP curves for a chunk of resamples are
+    built with a few weighted cumulative sums. The draws depend only on
+    num_images, num_resamples and seed, so two models scored on the same
+    image set with the same seed get paired resamples.
+
+    Args:
+        predictions: Predictions for the whole image set
+        labels: Ground-truth labels for the whole image set
+        num_images: Number of images in the set (including empty ones)
+        num_resamples: Number of bootstrap resamples
+        seed: Random seed, so resamples are reproducible
+        num_classes: Number of classes
+
+    Returns:
+        (num_resamples, C, T) AP per resample, class and IoU threshold;
+        NaN where the resample drew no labels of that class
+
+    Raises:
+        ValueError: If num_images is not positive
+    """
+    if num_images <= 0:
+        raise ValueError(f"num_images must be positive, got {num_images}")
+
+    tp = match_predictions(predictions, labels)
+    num_thresholds = tp.shape[1]
+
+    # How many times each image is drawn in each resample: (B, I)
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(
+        num_images, np.full(num_images, 1.0 / num_images), size=num_resamples
+    ).astype(np.float32)
+
+    # Labels per (image, class), then per (resample, class)
+    label_counts = np.zeros((num_images, num_classes), dtype=np.float32)
+    np.add.at(label_counts, (labels.image_ids, labels.classes), 1.0)
+    num_labels = draws @ label_counts
+
+    ap = np.full((num_resamples, num_classes, num_thresholds), np.nan)
+
+    for c in np.flatnonzero(label_counts.sum(axis=0) > 0):
+        drawn = num_labels[:, c] > 0
+        mask = predictions.classes == c
+        if not mask.any():
+            ap[drawn, c] = 0.0
+            continue
+
+        order = np.argsort(-predictions.scores[mask], kind="stable")
+        class_tp = tp[mask][order].astype(np.float32)
+        class_images = predictions.image_ids[mask][order]
+
+        # Bound the (chunk, N, T) working set
+        chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // (len(order) * num_thresholds))
+        for start in range(0, num_resamples, chunk):
+            stop = min(start + chunk, num_resamples)
+            weights = draws[start:stop][:, class_images]
+            tpc = np.cumsum(weights[:, :, None] * class_tp, axis=1)
+            seen = np.cumsum(weights, axis=1)[:, :, None]
+
+            # Counts are exact in float32; divide in float64 so recall hits
+            # the recall points exactly like the unweighted computation
+            totals = np.maximum(num_labels[start:stop, c], 1.0).astype(np.float64)
+            recall = tpc / totals[:, None, None]
+            precision = tpc / np.maximum(seen, 1.0).astype(np.float64)
+
+            class_ap = interpolated_ap(
+                np.moveaxis(recall, 1, 2), np.moveaxis(precision, 1, 2)
+            )
+            ap[start:stop, c] = np.where(drawn[start:stop, None], class_ap, np.nan)
+
+    return ap
+
+
+def bootstrap_interval(
+    samples: np.ndarray, confidence_level: float = 0.95
+) -> tuple[float, float]:
+    """
+    Percentile interval of bootstrap samples, ignoring NaN samples.
+
+    Args:
+        samples: (B,) bootstrap samples of a statistic
+        confidence_level: Coverage of the interval
+
+    Returns:
+        Tuple of (low, high); (nan, nan) if every sample is NaN
+    """
+    samples = samples[~np.isnan(samples)]
+    if len(samples) == 0:
+        return float("nan"), float("nan")
+
+    alpha = (1.0 - confidence_level) / 2.0
+    low, high = np.percentile(samples, [100 * alpha, 100 * (1.0 - alpha)])
+    return float(low), float(high)
+
+
+def mean_ap_samples(ap: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce bootstrap AP samples to mAP50 and mAP50-95 samples.
+
+    Args:
+        ap: (B, C, T) output of bootstrap_ap
+
+    Returns:
+        Tuple of (B,) mAP50 samples and (B,) mAP50-95 samples
+    """
+    with warnings.catch_warnings():
+        # A resample that drew only unlabeled images has no defined mAP
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmean(ap[:, :, 0], axis=1), np.nanmean(ap.mean(axis=2), axis=1)
+
+
+def bootstrap_metrics(
+    predictions: PredictionArrays,
+    labels: LabelArrays,
+    num_images: int,
+    num_resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence_level: float = 0.95,
+    seed: int = 0,
+    class_names: list[str] = DISEASE_CLASSES,
+) -> dict:
+    """
+    Percentile bootstrap confidence intervals for mAP and per-class AP.
+
+    Args:
+        predictions: Predictions for the whole image set
+        labels: Ground-truth labels for the whole image set
+        num_images: Number of images in the set (including empty ones)
+        num_resamples: Number of bootstrap resamples
+        confidence_level: Coverage of the intervals
+        seed: Random seed, so intervals are reproducible
+        class_names: Class names, indexed by class id
+
+    Returns:
+        Dictionary with (low, high) intervals for "mAP50", "mAP50-95",
+        "per_class_ap50" and "per_class_ap50-95" (classes with labels only),
+        plus "num_resamples" and "confidence_level"
+    """
+    ap = bootstrap_ap(
+        predictions, labels, num_images, num_resamples, seed, len(class_names)
+    )
+    map50, map50_95 = mean_ap_samples(ap)
+    present = np.unique(labels.classes)
+
+    return {
+        "mAP50": bootstrap_interval(map50, confidence_level),
+        "mAP50-95": bootstrap_interval(map50_95, confidence_level),
+        "per_class_ap50": {
+            class_names[c]: bootstrap_interval(ap[:, c, 0], confidence_level)
+            for c in present
+        },
+        "per_class_ap50-95": {
+            class_names[c]: bootstrap_interval(ap[:, c].mean(axis=1), confidence_level)
+            for c in present
+        },
+        "num_resamples": num_resamples,
+        "confidence_level": confidence_level,
+    }
+
+
+def load_labels(labels_dir: Path | None, image_paths: list[Path]) -> LabelArrays:
+    """
+    Load YOLO-format label files for a list of images.
+
+    Each label line is ``class x_center y_center width height`` (normalized).
+    Polygon labels are reduced to their bounding box.
+
+    Args:
+        labels_dir: Directory containing one .txt label file per image, or
+            None to find each image's label file next to it in the
+            ultralytics layout (images may then span several directories)
+        image_paths: Images in evaluation order (defines the image index)
+
+    Returns:
+        LabelArrays for all images (missing label files mean no objects)
+    """
+    image_ids: list[int] = []
+    boxes: list[list[float]] = []
+    classes: list[int] = []
+
+    for image_id, image_path in enumerate(image_paths):
+        if labels_dir is None:
+            label_path = label_path_for(Path(image_path))
+        else:
+            label_path = labels_dir / f"{Path(image_path).stem}.txt"
+        if not label_path.exists():
+            continue
+
+        for line in label_path.read_text().splitlines():
+            values = line.split()
+            if len(values) < 5:
+                continue
+
+            coords = [float(v) for v in values[1:]]
+            if len(coords) == 4:
+                cx, cy, w, h = coords
+                box = [cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2]
+            else:
+                xs, ys = coords[0::2], coords[1::2]
+                box = [min(xs), min(ys), max(xs), max(ys)]
+
+            image_ids.append(image_id)
+            boxes.append(box)
+            classes.append(int(values[0]))
+
+    return LabelArrays(
+        image_ids=np.asarray(image_ids, dtype=np.int64),
+        boxes=np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+        classes=np.asarray(classes, dtype=np.int64),
+    )
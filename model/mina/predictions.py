@@ -0,0 +1,345 @@
+"""
+Cached prediction store for decoupling evaluation from model execution.
+
+Raw predictions are dumped once per (weights, test set, imgsz) at a low
+confidence floor and without NMS suppression, then stored as compressed
+columnar arrays. Evaluation re-applies confidence filtering and NMS at any
+threshold on the cached arrays, so re-scoring never touches the model.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from ultralytics import YOLO
+
+from mina.core.cache import atomic_output, hash_file, hash_files, hash_key
+from mina.core.constants import (
+    CACHE_DIR,
+    DEFAULT_IMAGE_SIZE,
+    DEFAULT_IOU_THRESHOLD,
+    IMAGE_EXTENSIONS,
+)
+from mina.metrics import PredictionArrays
+
+# Dump settings: low confidence floor, NMS effectively disabled (IoU 1.0)
+DUMP_CONFIDENCE: float = 0.001
+DUMP_IOU: float = 1.0
+DUMP_MAX_DET: int = 3000
+
+# Final detections kept per image after NMS (same as the ultralytics validator)
+DEFAULT_MAX_DET: int = 300
+
+# Bump when the on-disk layout changes to invalidate old cache entries
+STORE_VERSION: int = 1
+
+
+def list_images(images_dir: Path) -> list[Path]:
+    """
+    List image files in a directory in a stable order.
+
+    Args:
+        images_dir: Directory containing images
+
+    Returns:
+        Sorted list of image paths
+    """
+    return sorted(
+        p for p in images_dir.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+def predict_images(
+    model: YOLO,
+    images: list,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    batch: int = 16,
+    confidence: float = DUMP_CONFIDENCE,
+    iou: float = DUMP_IOU,
+    max_det: int = DUMP_MAX_DET,
+    timings: list[dict] | None = None,
+    device: str | None = None,
+) -> PredictionArrays:
+    """
+    Run a model over a list of images and collect predictions as arrays.
+
+    Args:
+        model: Loaded YOLO model
+        images: Image paths or decoded BGR arrays; list position is the image id
+        imgsz: Inference image size
+        batch: Number of images per predict call
+        confidence: Minimum confidence kept
+        iou: NMS IoU threshold (1.0 keeps every candidate)
+        max_det: Maximum predictions kept per image
+        timings: If given, per-image speed dicts (preprocess, inference,
+                 postprocess in ms) are appended to it
+        device: Inference device, e.g. "cpu" (ultralytics picks if None)
+
+    Returns:
+        PredictionArrays with normalized xyxy boxes
+    """
+    image_ids, boxes, scores, classes = [], [], [], []
+
+    for start in range(0, len(images), batch):
+        chunk = [
+            str(s) if isinstance(s, Path) else s for s in images[start : start + batch]
+        ]
+        results = model.predict(
+            chunk,
+            imgsz=imgsz,
+            conf=confidence,
+            iou=iou,
+            max_det=max_det,
+            device=device,
+            verbose=False,
+        )
+
+        for offset, result in enumerate(results):
+            if timings is not None:
+                timings.append(dict(result.speed))
+            if result.boxes is None or len(result.boxes) == 0:
+                continue
+            n = len(result.boxes)
+            image_ids.append(np.full(n, start + offset, dtype=np.int64))
+            boxes.append(result.boxes.xyxyn.cpu().numpy().astype(np.float32))
+            scores.append(result.boxes.conf.cpu().numpy().astype(np.float32))
+            classes.append(result.boxes.cls.cpu().numpy().astype(np.int64))
+
+    if not image_ids:
+        return PredictionArrays.empty()
+
+    return PredictionArrays(
+        image_ids=np.concatenate(image_ids),
+        boxes=np.concatenate(boxes),
+        scores=np.concatenate(scores),
+        classes=np.concatenate(classes),
+    )
+
+
+def predict_timed(
+    model: YOLO,
+    images: list,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    confidence: float = DUMP_CONFIDENCE,
+    iou: float = DUMP_IOU,
+) -> tuple[PredictionArrays, list[dict]]:
+    """
+    Predict one image at a time on CPU, timing each image.
+
+    The model is warmed up first, and torch runs with the thread count
+    ultralytics gives TFLite/LiteRT interpreters, so .pt and exported
+    models are timed on the same thread budget. Call this with no other
+    model running, as concurrent instances inflate each other's latency.
+
+    Args:
+        model: Loaded YOLO model
+        images: Image paths or decoded BGR arrays; list position is the image id
+        imgsz: Inference image size
+        confidence: Minimum confidence kept
+        iou: NMS IoU threshold (1.0 keeps every candidate)
+
+    Returns:
+        Tuple of (predictions, per-image speed dicts in ms)
+    """
+    import torch
+    from ultralytics.utils import NUM_THREADS
+
+    num_threads = torch.get_num_threads()
+    torch.set_num_threads(NUM_THREADS)
+    try:
+        # Warm up so the first image's latency does not include lazy init
+        predict_images(model, images[:1], imgsz=imgsz, device="cpu")
+
+        timings: list[dict] = []
+        predictions = predict_images(
+            model,
+            images,
+            imgsz=imgsz,
+            batch=1,
+            confidence=confidence,
+            iou=iou,
+            timings=timings,
+            device="cpu",
+        )
+    finally:
+        torch.set_num_threads(num_threads)
+    return predictions, timings
+
+
+def save_predictions(
+    path: Path,
+    predictions: PredictionArrays,
+    image_names: list[str],
+    metadata: dict,
+) -> None:
+    """
+    Save predictions as a compressed columnar .npz file.
+
+    Args:
+        path: Destination .npz file
+        predictions: Predictions to store
+        image_names: Image file names, indexed by image id
+        metadata: JSON-serializable metadata (weights hash, imgsz, ...)
+    """
+    with atomic_output(path) as tmp_path, open(tmp_path, "wb") as f:
+        np.savez_compressed(
+            f,
+            image_ids=predictions.image_ids.astype(np.uint32),
+            boxes=predictions.boxes.astype(np.float32),
+            scores=predictions.scores.astype(np.float32),
+            classes=predictions.classes.astype(np.uint8),
+            image_names=np.asarray(image_names, dtype=str),
+            metadata=np.asarray(json.dumps(metadata)),
+        )
+
+
+def load_predictions(path: Path) -> tuple[PredictionArrays, list[str], dict]:
+    """
+    Load predictions saved by save_predictions.
+
+    Args:
+        path: .npz file to load
+
+    Returns:
+        Tuple of (predictions, image names, metadata)
+    """
+    with np.load(path) as data:
+        predictions = PredictionArrays(
+            image_ids=data["image_ids"].astype(np.int64),
+            boxes=data["boxes"],
+            scores=data["scores"],
+            classes=data["classes"].astype(np.int64),
+        )
+        image_names = data["image_names"].tolist()
+        metadata = json.loads(str(data["metadata"]))
+
+    return predictions, image_names, metadata
+
+
+def prediction_cache_path(
+    weights: Path,
+    image_paths: list[Path],
+    imgsz: int,
+    cache_dir: Path | None = None,
+) -> tuple[Path, dict]:
+    """
+    Compute the cache file location for a (weights, test set, imgsz) triple.
+
+    Args:
+        weights: Model weights file
+        image_paths: Test images, in evaluation order
+        imgsz: Inference image size
+        cache_dir: Cache root. Defaults to CACHE_DIR.
+
+    Returns:
+        Tuple of (cache file path, metadata describing the key)
+    """
+    if cache_dir is None:
+        cache_dir = CACHE_DIR
+
+    # Images may span several (nested) directories, e.g. a multi-folder split
+    root = Path(os.path.commonpath([p.parent for p in image_paths]))
+    metadata = {
+        "version": STORE_VERSION,
+        "weights": hash_file(weights),
+        "test_set": hash_files(image_paths, root=root),
+        "imgsz": imgsz,
+        "confidence": DUMP_CONFIDENCE,
+        "iou": DUMP_IOU,
+        "max_det": DUMP_MAX_DET,
+    }
+
+    return (
+        cache_dir / "predictions" / f"{weights.stem}-{hash_key(metadata)}.npz",
+        metadata,
+    )
+
+
+def get_predictions(
+    weights: Path,
+    image_paths: list[Path],
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    use_cache: bool = True,
+    cache_dir: Path | None = None,
+) -> PredictionArrays:
+    """
+    Get raw predictions for a test set, reusing the on-disk cache when valid.
+
+    The cache is reused only when the weights hash, test-set hash and imgsz
+    all match; otherwise the model is run once and the dump is stored.
+
+    Args:
+        weights: Model weights file (.pt or .tflite)
+        image_paths: Test images, in evaluation order
+        imgsz: Inference image size
+        use_cache: Whether to read an existing dump (a fresh dump is always stored)
+        cache_dir: Cache root. Defaults to CACHE_DIR.
+
+    Returns:
+        Raw PredictionArrays (confidence >= DUMP_CONFIDENCE, before NMS)
+    """
+    cache_path, metadata = prediction_cache_path(weights, image_paths, imgsz, cache_dir)
+    image_names = [p.name for p in image_paths]
+
+    if use_cache and cache_path.exists():
+        predictions, cached_names, cached_metadata = load_predictions(cache_path)
+        if cached_metadata == metadata and cached_names == image_names:
+            print(f"Using cached predictions: {cache_path}")
+            return predictions
+
+    print(f"Running inference on {len(image_paths)} images...")
+    model = YOLO(str(weights))
+    predictions = predict_images(model, image_paths, imgsz=imgsz)
+
+    save_predictions(cache_path, predictions, image_names, metadata)
+    print(f"Cached predictions to: {cache_path}")
+
+    return predictions
+
+
+def apply_nms(
+    predictions: PredictionArrays,
+    confidence: float = DUMP_CONFIDENCE,
+    iou: float = DEFAULT_IOU_THRESHOLD,
+    max_det: int = DEFAULT_MAX_DET,
+) -> PredictionArrays:
+    """
+    Filter raw predictions by confidence and apply class-aware NMS per image.
+
+    All images are processed in a single batched NMS call by offsetting
+    boxes per (image, class) group.
+
+    Args:
+        predictions: Raw predictions from get_predictions
+        confidence: Minimum confidence kept
+        iou: NMS IoU threshold
+        max_det: Maximum detections kept per image
+
+    Returns:
+        Filtered PredictionArrays, sorted by image then descending confidence
+    """
+    import torch
+    from torchvision.ops import batched_nms
+
+    predictions = predictions.select(predictions.scores >= confidence)
+    if len(predictions.scores) == 0:
+        return predictions
+
+    span = int(predictions.classes.max()) + 1
+    groups = predictions.image_ids * span + predictions.classes
+    keep = batched_nms(
+        torch.from_numpy(predictions.boxes.astype(np.float32)),
+        torch.from_numpy(predictions.scores.astype(np.float32)),
+        torch.from_numpy(groups),
+        iou,
+    ).numpy()
+
+    # Order kept boxes by image, then by descending confidence, and cap per image
+    kept = predictions.select(keep)
+    order = np.lexsort((-kept.scores, kept.image_ids))
+    kept = kept.select(order)
+    _, first, counts = np.unique(kept.image_ids, return_index=True, return_counts=True)
+    rank = np.arange(len(kept.image_ids)) - np.repeat(first, counts)
+
+    return kept.select(rank < max_det)
@@ -0,0 +1,404 @@
+"""
+Training throughput profiling and data-loader tuning.
+
+Each probe builds an ultralytics trainer with a given number of data-loader
+workers and batch size, runs a few instrumented optimizer steps and
+records, per step, how long the loop waited for the next batch and how
+long the forward/backward/optimizer step took. If the wait is a large
+share of the step, the GPU/CPU is starved by data loading and more workers
+help; if it is near zero, compute is the bottleneck.
+
+The per-image data pipeline cost is split separately into image loading
+(decode and resize) and augmentation (mosaic, mixup, affine, HSV, flips),
+measured on the main process.
+
+Probes write their throwaway run directories to a temporary project, so
+they never show up as training runs.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import torch
+from ultralytics.models.yolo.detect import DetectionTrainer
+from ultralytics.utils.torch_utils import autocast
+
+from mina.core.constants import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_IMAGE_SIZE,
+    DEFAULT_WORKERS,
+)
+from mina.train import AUGMENTATION
+
+# Settings tried by the auto-tuner
+WORKER_CANDIDATES: tuple[int, ...] = (0, 2, 4, 8)
+BATCH_CANDIDATES: tuple[int, ...] = (8, 16, 32, 64)
+
+# Timed optimizer steps per probe, after untimed warm-up steps (worker
+# start-up, cudnn autotuning)
+PROFILE_STEPS: int = 20
+PROFILE_WARMUP_STEPS: int = 3
+
+# Images timed for the load/augmentation split
+PIPELINE_SAMPLES: int = 32
+
+# A smaller setting is preferred if its throughput is within this fraction
+# of the fastest one
+THROUGHPUT_TOLERANCE: float = 0.05
+
+
+class ProbeResult(NamedTuple):
+    """Throughput of a short instrumented training run."""
+
+    workers: int
+    batch: int
+    steps: int
+    data_wait_s: float  # total time waiting for the next batch
+    compute_s: float  # total forward + backward + optimizer time
+    images_per_sec: float
+    peak_memory_mb: float  # accelerator memory on GPU, process RSS on CPU
+
+    @property
+    def data_wait_fraction(self) -> float:
+        """Share of step time spent waiting for data."""
+        total = self.data_wait_s + self.compute_s
+        return self.data_wait_s / total if total > 0 else 0.0
+
+
+def pick_setting(
+    probes: list[ProbeResult],
+    key: str,
+    tolerance: float = THROUGHPUT_TOLERANCE,
+) -> ProbeResult:
+    """
+    Pick the smallest setting whose throughput is close to the best.
+
+    Fewer workers leave CPU cores free and smaller batches use less memory,
+    so a larger value is only chosen if it is clearly faster.
+
+    Args:
+        probes: Probe results that differ in one setting
+        key: Setting to minimize ("workers" or "batch")
+        tolerance: Allowed throughput loss relative to the fastest probe
+
+    Returns:
+        Chosen probe
+
+    Raises:
+        ValueError: If probes is empty
+    """
+    if not probes:
+        raise ValueError("No probe results to choose from")
+    best = max(p.images_per_sec for p in probes)
+    close = [p for p in probes if p.images_per_sec >= (1 - tolerance) * best]
+    return min(close, key=lambda p: getattr(p, key))
+
+
+def _synchronize(device: torch.device) -> None:
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+
+
+def _memory_mb() -> float:
+    """Current host memory of this process and its loader workers."""
+    import psutil
+
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return rss / 2**20
+
+
+def _build_trainer(
+    pretrained: str,
+    data_yaml: Path,
+    imgsz: int,
+    batch: int,
+    workers: int,
+    device: str | None,
+    project: Path,
+) -> DetectionTrainer:
+    """Build and set up a trainer without starting the training loop."""
+    trainer = DetectionTrainer(
+        overrides={
+            "model": pretrained,
+            "data": str(data_yaml),
+            "imgsz": imgsz,
+            "batch": batch,
+            "workers": workers,
+            "device": device,
+            "epochs": 1,
+            "project": str(project),
+            "name": f"probe_w{workers}_b{batch}",
+            "plots": False,
+            "val": False,
+            "verbose": False,
+            **AUGMENTATION,
+        }
+    )
+    trainer._setup_train()
+    return trainer
+
+
+def _close_loaders(trainer: DetectionTrainer) -> None:
+    for loader in (trainer.train_loader, trainer.test_loader):
+        if hasattr(loader, "close"):
+            loader.close()
+
+
+def time_steps(
+    trainer: DetectionTrainer,
+    steps: int = PROFILE_STEPS,
+    warmup: int = PROFILE_WARMUP_STEPS,
+) -> ProbeResult:
+    """
+    Run instrumented optimizer steps on a set-up trainer.
+
+    Args:
+        trainer: Trainer after _setup_train()
+        steps: Timed steps
+        warmup: Untimed steps run first
+
+    Returns:
+        Probe result for the trainer's workers and batch size
+    """
+    device = trainer.device
+    model = trainer.model
+    model.train()
+    if device.type == "cuda":
+        torch.cuda.reset_peak_memory_stats(device)
+
+    batches = iter(trainer.train_loader)
+    data_wait = compute = 0.0
+    images = 0
+    peak_memory = 0.0
+
+    for step in range(warmup + steps):
+        start = time.perf_counter()
+        try:
+            batch = next(batches)
+        except StopIteration:
+            batches = iter(trainer.train_loader)
+            batch = next(batches)
+        loaded = time.perf_counter()
+
+        with autocast(trainer.amp, device=device.type):
+            batch = trainer.preprocess_batch(batch)
+            loss, _ = model(batch)
+        trainer.scaler.scale(loss.sum()).backward()
+        trainer.optimizer_step()
+        _synchronize(device)
+        done = time.perf_counter()
+
+        if step >= warmup:
+            data_wait += loaded - start
+            compute += done - loaded
+            images += batch["img"].shape[0]
+            if device.type != "cuda":
+                peak_memory = max(peak_memory, _memory_mb())
+
+    if device.type == "cuda":
+        peak_memory = torch.cuda.max_memory_allocated(device) / 2**20
+
+    elapsed = data_wait + compute
+    return ProbeResult(
+        workers=trainer.args.workers,
+        batch=trainer.batch_size,
+        steps=steps,
+        data_wait_s=data_wait,
+        compute_s=compute,
+        images_per_sec=images / elapsed if elapsed > 0 else 0.0,
+        peak_memory_mb=peak_memory,
+    )
+
+
+def measure_pipeline(dataset, samples: int = PIPELINE_SAMPLES) -> dict:
+    """
+    Split the per-image data pipeline cost into loading and augmentation.
+
+    Args:
+        dataset: ultralytics YOLODataset in training mode
+        samples: Images timed (spread evenly over the dataset)
+
+    Returns:
+        Dictionary with load_ms and augment_ms (mean per image). Mosaic
+        loads three extra images, which counts as augmentation.
+    """
+    indices = torch.linspace(0, len(dataset) - 1, min(samples, len(dataset))).long()
+    load = augment = 0.0
+    for index in indices.tolist():
+        start = time.perf_counter()
+        label = dataset.get_image_and_label(index)
+        loaded = time.perf_counter()
+        dataset.transforms(label)
+        augment += time.perf_counter() - loaded
+        load += loaded - start
+
+    n = max(len(indices), 1)
+    return {"load_ms": load / n * 1000, "augment_ms": augment / n * 1000}
+
+
+def _is_out_of_memory(error: RuntimeError) -> bool:
+    return "out of memory" in str(error).lower()
+
+
+def profile_training(
+    data_yaml: Path,
+    pretrained: str = "yolov8n.pt",
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    batch: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    device: str | None = None,
+    steps: int = PROFILE_STEPS,
+    worker_candidates: tuple[int, ...] = WORKER_CANDIDATES,
+    batch_candidates: tuple[int, ...] = BATCH_CANDIDATES,
+) -> dict:
+    """
+    Profile training throughput and recommend workers and batch size.
+
+    The current settings are profiled first. Worker counts are then probed
+    at the current batch size, and batch sizes with the chosen worker
+    count. Batch probing stops at the first out-of-memory error. On CPU and
+    MPS, ultralytics always loads data on the main process, so only batch
+    sizes are probed there.
+
+    Args:
+        data_yaml: Dataset config
+        pretrained: Model to train
+        imgsz: Training image size
+        batch: Current batch size
+        workers: Current data-loader workers
+        device: Training device (None for auto-detect)
+        steps: Timed steps per probe
+        worker_candidates: Worker counts to try (capped at the CPU count)
+        batch_candidates: Batch sizes to try
+
+    Returns:
+        Dictionary with the baseline probe, data pipeline split, all
+        worker and batch probes and the recommended workers and batch
+    """
+    cpu_count = os.cpu_count() or 1
+    worker_candidates = sorted(
+        {w for w in (*worker_candidates, workers) if w <= cpu_count}
+    )
+    batch_candidates = sorted(set(batch_candidates) | {batch})
+
+    with tempfile.TemporaryDirectory() as project:
+
+        def probe(probe_workers: int, probe_batch: int) -> ProbeResult:
+            trainer = _build_trainer(
+                pretrained,
+                data_yaml,
+                imgsz,
+                probe_batch,
+                probe_workers,
+                device,
+                Path(project),
+            )
+            try:
+                result = time_steps(trainer, steps)
+            finally:
+                _close_loaders(trainer)
+            print(
+                f"  workers={result.workers:<3d} batch={result.batch:<4d} "
+                f"{result.images_per_sec:7.1f} img/s, "
+                f"{result.data_wait_fraction:5.1%} waiting for data"
+            )
+            return result
+
+        print(f"Profiling current settings (workers={workers}, batch={batch})...")
+        trainer = _build_trainer(
+            pretrained, data_yaml, imgsz, batch, workers, device, Path(project)
+        )
+        try:
+            pipeline = measure_pipeline(trainer.train_loader.dataset)
+            baseline = time_steps(trainer, steps)
+        finally:
+            _close_loaders(trainer)
+
+        if baseline.workers != workers:
+            # ultralytics loads data on the main process when training on CPU/MPS
+            print(f"Data loading runs on the main process on {trainer.device.type}")
+            worker_probes = [baseline]
+        else:
+            print("Probing data-loader workers...")
+            worker_probes = [
+                baseline if w == workers else probe(w, batch) for w in worker_candidates
+            ]
+        best_workers = pick_setting(worker_probes, "workers").workers
+
+        print("Probing batch sizes...")
+        batch_probes = []
+        for b in batch_candidates:
+            try:
+                batch_probes.append(
+                    baseline
+                    if (best_workers, b) == (baseline.workers, batch)
+                    else probe(best_workers, b)
+                )
+            except RuntimeError as e:
+                if not _is_out_of_memory(e):
+                    raise
+                print(f"  batch={b} ran out of memory, stopping")
+                torch.cuda.empty_cache()
+                break
+        best_batch = pick_setting(batch_probes, "batch").batch
+
+    return {
+        "baseline": baseline,
+        "pipeline": pipeline,
+        "worker_probes": worker_probes,
+        "batch_probes": batch_probes,
+        "workers": best_workers,
+        "batch": best_batch,
+    }
+
+
+def print_profile_results(results: dict) -> None:
+    """Print the step time split, probe table and recommended settings."""
+    baseline = results["baseline"]
+    pipeline = results["pipeline"]
+
+    print("\n" + "=" * 60)
+    print("TRAINING THROUGHPUT PROFILE")
+    print("=" * 60)
+
+    print(f"\nCurrent settings: workers={baseline.workers}, batch={baseline.batch}")
+    per_step = (baseline.data_wait_s + baseline.compute_s) / baseline.steps
+    print(f"  Step time:        {per_step * 1000:8.1f} ms")
+    print(
+        f"  Dataloader wait:  {baseline.data_wait_s / baseline.steps * 1000:8.1f} ms "
+        f"({baseline.data_wait_fraction:.1%})"
+    )
+    print(
+        f"  Compute:          {baseline.compute_s / baseline.steps * 1000:8.1f} ms "
+        f"({1 - baseline.data_wait_fraction:.1%})"
+    )
+    print(f"  Throughput:       {baseline.images_per_sec:8.1f} img/s")
+    print(f"  Peak memory:      {baseline.peak_memory_mb:8.0f} MB")
+
+    print("\nData pipeline per image (single process):")
+    print(f"  Load (decode, resize):          {pipeline['load_ms']:6.1f} ms")
+    print(f"  Augment (mosaic, mixup, ...):   {pipeline['augment_ms']:6.1f} ms")
+
+    print(f"\n{'Workers':>7} {'Batch':>6} {'img/s':>8} {'Wait':>7} {'Peak MB':>9}")
+    print("-" * 60)
+    seen = set()
+    for probe in results["worker_probes"] + results["batch_probes"]:
+        if (probe.workers, probe.batch) in seen:
+            continue
+        seen.add((probe.workers, probe.batch))
+        print(
+            f"{probe.workers:>7d} {probe.batch:>6d} {probe.images_per_sec:>8.1f} "
+            f"{probe.data_wait_fraction:>7.1%} {probe.peak_memory_mb:>9.0f}"
+        )
+
+    print(f"\nRecommended: --workers {results['workers']} --batch {results['batch']}")
+    print("=" * 60)
@@ -0,0 +1,155 @@
+"""
+Checkpointed progress for long inference runs.
+
+A progress log is a text file next to a result sink's output with one
+completed image path per line. The sink appends a batch's paths right
+after writing the batch's records and fsyncs the log together with its
+output, so every path in the log has its results on disk. A resumed run
+loads the log into a set and skips those images.
+
+If the process dies between writing a batch and logging its paths, the
+batch is processed again on resume, so the results may hold up to one
+batch of images twice; the image path identifies them.
+"""
+
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+# Suffix appended to the output file name for its progress log
+PROGRESS_SUFFIX: str = ".progress"
+
+# Bytes read at a time when looking for the end of the last complete line
+TAIL_CHUNK_SIZE: int = 64 * 1024
+
+
+def fsync_path(path: Path) -> None:
+    """
+    fsync a file by path (any descriptor flushes the file's pages).
+
+    Args:
+        path: File to fsync
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def drop_partial_line(path: Path) -> int:
+    """
+    Truncate a line-oriented file after its last newline.
+
+    A write cut short by a crash can leave a partial last line, which
+    would otherwise be joined with the first line appended on resume.
+
+    Args:
+        path: Text file to repair
+
+    Returns:
+        Number of bytes removed
+    """
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(position - TAIL_CHUNK_SIZE, 0)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                size = start + newline + 1
+                break
+            position = start
+        else:
+            size = 0
+        if size < end:
+            f.truncate(size)
+    return end - size
+
+
+def progress_path(output: Path) -> Path:
+    """
+    Get the progress log path of a sink output file.
+
+    Args:
+        output: Result sink output file
+
+    Returns:
+        The output path with PROGRESS_SUFFIX appended
+    """
+    output = Path(output)
+    return output.with_name(output.name + PROGRESS_SUFFIX)
+
+
+class ProgressLog:
+    """Append-only record of completed images, held in memory as a set."""
+
+    def __init__(self, path: Path, resume: bool = False):
+        """
+        Open a progress log.
+
+        Args:
+            path: Log file
+            resume: Load the paths already in the log instead of starting
+                an empty one
+        """
+        self.path = Path(path)
+        self.completed: set[str] = set()
+        if resume and self.path.exists():
+            drop_partial_line(self.path)
+            with open(self.path) as f:
+                self.completed = {line.rstrip("\n") for line in f}
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("")
+
+    def __contains__(self, image: str | Path) -> bool:
+        return str(image) in self.completed
+
+    def __len__(self) -> int:
+        return len(self.completed)
+
+    def add(self, images: Iterable[str | Path]) -> None:
+        """
+        Record images as completed.
+
+        Args:
+            images: Image paths whose results have been written
+        """
+        images = [str(image) for image in images]
+        if not images:
+            return
+        with open(self.path, "a") as f:
+            f.write("".join(image + "\n" for image in images))
+        self.completed.update(images)
+
+    def sync(self) -> None:
+        """fsync the log."""
+        fsync_path(self.path)
+
+
+class SkipCompleted:
+    """
+    Iterate over the images not in a progress log, counting skipped ones.
+
+    Limits applied to this iterator (e.g. with islice) count only the
+    images that still need processing.
+    """
+
+    def __init__(self, images: Iterable[Path], progress: ProgressLog | None):
+        """
+        Args:
+            images: Image paths
+            progress: Log of completed images (None skips nothing)
+        """
+        self.images = images
+        self.progress = progress
+        self.skipped = 0
+
+    def __iter__(self) -> Iterator[Path]:
+        for image in self.images:
+            if self.progress is not None and image in self.progress:
+                self.skipped += 1
+                continue
+            yield image
@@ -0,0 +1,406 @@
+"""
+Channel-level structured pruning and fine-tuning for YOLOv8 detection models.
+
+Only channels that are internal to a block are pruned, so tensor shapes
+seen by residual adds, concatenations and the stride outputs never change:
+
+- the hidden channels of every Bottleneck (cv1 output, cv2 input)
+- the hidden channels of SPPF (cv1 output, all four cv2 input blocks)
+- the intermediate channels of each Detect box/class branch
+
+Channels are ranked by the magnitude of their BatchNorm scale (network
+slimming), and the same fraction is removed from every group. The fraction
+is found by bisection so the pruned model meets a target FLOP or parameter
+ratio. The pruned model is then fine-tuned with a trainer that keeps the
+pruned architecture instead of rebuilding it from the model YAML.
+"""
+
+import copy
+import math
+import time
+from itertools import pairwise
+from pathlib import Path
+from typing import NamedTuple
+
+import torch
+from torch import nn
+from ultralytics import YOLO
+from ultralytics.models.yolo.detect import DetectionTrainer
+from ultralytics.nn.modules import SPPF, Bottleneck, Conv, Detect
+from ultralytics.utils.torch_utils import get_flops
+
+from mina.core.constants import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_FINETUNE_EPOCHS,
+    DEFAULT_IMAGE_SIZE,
+    DEFAULT_PRUNE_RATIO,
+)
+
+# Pruned channel counts are rounded up to a multiple of this (mobile kernels
+# are vectorized over channel blocks) and never go below it
+CHANNEL_MULTIPLE: int = 8
+
+# Largest fraction of a group's channels that may be removed
+MAX_PRUNE_FRACTION: float = 0.9
+
+# Forward passes timed for the CPU latency measurement
+LATENCY_RUNS: int = 20
+
+
+class PruneGroup(NamedTuple):
+    """Channels produced by one conv and consumed only by another."""
+
+    producer: Conv  # output channels (conv + BatchNorm) are pruned
+    consumer: nn.Conv2d  # input channels are pruned
+    repeats: int = 1  # times the channels appear in the consumer's input
+
+
+class PrunedDetectionTrainer(DetectionTrainer):
+    """Detection trainer that fine-tunes a given (pruned) model as is."""
+
+    def get_model(self, cfg=None, weights=None, verbose=True):
+        """Return the loaded model itself instead of rebuilding it from cfg."""
+        if isinstance(weights, nn.Module):
+            return self.set_model_names_for_load(weights)
+        return super().get_model(cfg, weights, verbose)
+
+
+def _is_plain_conv(module: nn.Module) -> bool:
+    """Check for an ungrouped ultralytics Conv (Conv2d + BatchNorm2d)."""
+    return (
+        isinstance(module, Conv)
+        and isinstance(module.bn, nn.BatchNorm2d)
+        and module.conv.groups == 1
+    )
+
+
+def find_prune_groups(model: nn.Module) -> list[PruneGroup]:
+    """
+    Find the prunable channel groups of a detection model.
+
+    Args:
+        model: ultralytics DetectionModel
+
+    Returns:
+        List of PruneGroups
+    """
+    groups = []
+    for module in model.modules():
+        if isinstance(module, Bottleneck):
+            if _is_plain_conv(module.cv1) and module.cv2.conv.groups == 1:
+                groups.append(PruneGroup(module.cv1, module.cv2.conv))
+        elif isinstance(module, SPPF):
+            # cv2 sees cv1's output and three max-pooled copies of it
+            if _is_plain_conv(module.cv1):
+                groups.append(PruneGroup(module.cv1, module.cv2.conv, repeats=4))
+        elif isinstance(module, Detect):
+            for branch in [*module.cv2, *module.cv3]:
+                for producer, consumer in pairwise(branch):
+                    if isinstance(consumer, Conv):
+                        consumer = consumer.conv
+                    if (
+                        _is_plain_conv(producer)
+                        and isinstance(consumer, nn.Conv2d)
+                        and consumer.groups == 1
+                    ):
+                        groups.append(PruneGroup(producer, consumer))
+    return groups
+
+
+def keep_count(channels: int, fraction: float) -> int:
+    """
+    Number of channels kept when pruning a fraction of a group.
+
+    Args:
+        channels: Channels in the group
+        fraction: Fraction to remove
+
+    Returns:
+        Channels kept: rounded up to CHANNEL_MULTIPLE, at least
+        CHANNEL_MULTIPLE, at most channels
+    """
+    keep = math.ceil(channels * (1 - fraction) / CHANNEL_MULTIPLE) * CHANNEL_MULTIPLE
+    return min(channels, max(CHANNEL_MULTIPLE, keep))
+
+
+def prune_group(group: PruneGroup, keep: int) -> None:
+    """
+    Keep the channels of a group with the largest BatchNorm scales.
+
+    Args:
+        group: Group to prune in place
+        keep: Number of channels to keep
+    """
+    conv, bn = group.producer.conv, group.producer.bn
+    if keep >= conv.out_channels:
+        return
+
+    index = bn.weight.detach().abs().argsort(descending=True)[:keep].sort().values
+
+    conv.weight = nn.Parameter(conv.weight.detach()[index].clone())
+    if conv.bias is not None:
+        conv.bias = nn.Parameter(conv.bias.detach()[index].clone())
+    conv.out_channels = keep
+
+    bn.weight = nn.Parameter(bn.weight.detach()[index].clone())
+    bn.bias = nn.Parameter(bn.bias.detach()[index].clone())
+    bn.running_mean = bn.running_mean[index].clone()
+    bn.running_var = bn.running_var[index].clone()
+    bn.num_features = keep
+
+    channels = group.consumer.in_channels // group.repeats
+    consumer_index = torch.cat([index + r * channels for r in range(group.repeats)])
+    group.consumer.weight = nn.Parameter(
+        group.consumer.weight.detach()[:, consumer_index].clone()
+    )
+    group.consumer.in_channels = len(consumer_index)
+
+
+def prune_model(model: nn.Module, fraction: float) -> nn.Module:
+    """
+    Prune the same fraction of channels from every prunable group.
+
+    Args:
+        model: Detection model (left unchanged)
+        fraction: Fraction of each group's channels to remove
+
+    Returns:
+        Pruned copy of the model
+    """
+    pruned = copy.deepcopy(model)
+    for group in find_prune_groups(pruned):
+        prune_group(group, keep_count(group.producer.conv.out_channels, fraction))
+    return pruned
+
+
+def count_parameters(model: nn.Module) -> int:
+    """Count model parameters."""
+    return sum(p.numel() for p in model.parameters())
+
+
+def model_cost(model: nn.Module, metric: str, imgsz: int) -> float:
+    """
+    Cost of a model in the metric used for the pruning target.
+
+    Args:
+        model: Detection model
+        metric: "flops" or "params"
+        imgsz: Image size for FLOPs
+
+    Returns:
+        GFLOPs or parameter count
+
+    Raises:
+        ValueError: If the metric is unknown
+    """
+    if metric == "flops":
+        return get_flops(model, imgsz)
+    if metric == "params":
+        return float(count_parameters(model))
+    raise ValueError(f"Unknown pruning metric: {metric!r} (use 'flops' or 'params')")
+
+
+def prune_to_target(
+    model: nn.Module,
+    target_ratio: float = DEFAULT_PRUNE_RATIO,
+    metric: str = "flops",
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    steps: int = 12,
+) -> tuple[nn.Module, float]:
+    """
+    Prune a model until its FLOPs (or parameters) are at most a target ratio.
+
+    The pruned fraction is found by bisection on [0, MAX_PRUNE_FRACTION].
+    If the target cannot be reached, the maximally pruned model is returned.
+
+    Args:
+        model: Detection model (left unchanged)
+        target_ratio: Target pruned / original cost, in (0, 1]
+        metric: "flops" or "params"
+        imgsz: Image size for FLOPs
+        steps: Bisection steps
+
+    Returns:
+        Tuple of (pruned model, achieved cost ratio)
+
+    Raises:
+        ValueError: If target_ratio is not in (0, 1]
+    """
+    if not 0 < target_ratio <= 1:
+        raise ValueError(f"Target ratio must be in (0, 1], got {target_ratio}")
+
+    original = model_cost(model, metric, imgsz)
+    low, high = 0.0, MAX_PRUNE_FRACTION
+
+    pruned = prune_model(model, high)
+    ratio = model_cost(pruned, metric, imgsz) / original
+    if ratio > target_ratio:
+        print(
+            f"WARNING: target {metric} ratio {target_ratio} is out of reach; "
+            f"pruning to {ratio:.3f}"
+        )
+        return pruned, ratio
+
+    best = (pruned, ratio)
+    for _ in range(steps):
+        fraction = (low + high) / 2
+        pruned = prune_model(model, fraction)
+        ratio = model_cost(pruned, metric, imgsz) / original
+        if ratio <= target_ratio:
+            best, high = (pruned, ratio), fraction
+        else:
+            low = fraction
+
+    return best
+
+
+def measure_cpu_latency(
+    model: nn.Module, imgsz: int = DEFAULT_IMAGE_SIZE, runs: int = LATENCY_RUNS
+) -> float:
+    """
+    Measure median batch-1 CPU forward time of a fused copy of a model.
+
+    Args:
+        model: Detection model
+        imgsz: Input size
+        runs: Timed forward passes
+
+    Returns:
+        Median latency in ms
+    """
+    fused = copy.deepcopy(model).float().cpu().eval().fuse(verbose=False)
+    image = torch.zeros(1, 3, imgsz, imgsz)
+
+    times = []
+    with torch.inference_mode():
+        fused(image)  # warm-up
+        for _ in range(runs):
+            start = time.perf_counter()
+            fused(image)
+            times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def model_stats(
+    weights_path: Path, imgsz: int = DEFAULT_IMAGE_SIZE, test_dir: Path | None = None
+) -> dict:
+    """
+    Measure size, cost, CPU latency and test-set accuracy of a weights file.
+
+    Args:
+        weights_path: .pt weights
+        imgsz: Image size
+        test_dir: Test data. Defaults to TEST_DATA_DIR.
+
+    Returns:
+        Dictionary with weights, params, gflops, latency_ms, mAP50 and mAP50-95
+    """
+    from mina.evaluate import evaluate
+
+    model = YOLO(str(weights_path)).model
+    metrics = evaluate(weights_path, test_dir, imgsz=imgsz)
+    return {
+        "weights": str(weights_path),
+        "params": count_parameters(model),
+        "gflops": get_flops(model, imgsz),
+        "latency_ms": measure_cpu_latency(model, imgsz),
+        "mAP50": metrics["mAP50"],
+        "mAP50-95": metrics["mAP50-95"],
+    }
+
+
+def prune_and_finetune(
+    weights_path: Path,
+    target_ratio: float = DEFAULT_PRUNE_RATIO,
+    metric: str = "flops",
+    epochs: int = DEFAULT_FINETUNE_EPOCHS,
+    batch: int = DEFAULT_BATCH_SIZE,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    name: str = "fish_disease_pruned",
+    device: str | None = None,
+    data_dir: Path | None = None,
+    test_dir: Path | None = None,
+) -> dict:
+    """
+    Prune trained weights to a target cost, fine-tune and compare.
+
+    Args:
+        weights_path: Trained .pt weights
+        target_ratio: Target pruned / original FLOPs (or parameters)
+        metric: "flops" or "params"
+        epochs: Fine-tuning epochs (0 skips fine-tuning)
+        batch: Fine-tuning batch size
+        imgsz: Image size for training, FLOPs and evaluation
+        name: Name for the fine-tuning run
+        device: Training device ('0', 'cpu', or None to auto-detect)
+        data_dir: Optional data directory
+        test_dir: Test data. Defaults to TEST_DATA_DIR.
+
+    Returns:
+        Dictionary with before, pruned and after model_stats, ratio (the
+        achieved cost ratio) and weights (the final .pt)
+
+    Raises:
+        FileNotFoundError: If the weights file is not found
+    """
+    from mina.train import train
+
+    weights_path = Path(weights_path)
+    if not weights_path.exists():
+        raise FileNotFoundError(f"Weights file not found: {weights_path}")
+
+    yolo = YOLO(str(weights_path))
+    print(f"Pruning {weights_path} to {target_ratio:.0%} of its {metric}...")
+    pruned, ratio = prune_to_target(yolo.model, target_ratio, metric, imgsz)
+
+    pruned_path = weights_path.with_name(f"{weights_path.stem}_pruned.pt")
+    yolo.model = pruned
+    yolo.save(pruned_path)
+    print(f"Pruned model saved to: {pruned_path} ({metric} ratio {ratio:.3f})")
+
+    final_path = pruned_path
+    if epochs > 0:
+        final_path = train(
+            epochs=epochs,
+            batch=batch,
+            imgsz=imgsz,
+            name=name,
+            pretrained=str(pruned_path),
+            data_dir=data_dir,
+            device=device,
+            trainer=PrunedDetectionTrainer,
+        )
+
+    return {
+        "before": model_stats(weights_path, imgsz, test_dir),
+        "pruned": model_stats(pruned_path, imgsz, test_dir),
+        "after": model_stats(final_path, imgsz, test_dir),
+        "ratio": ratio,
+        "weights": final_path,
+    }
+
+
+def print_prune_results(results: dict) -> None:
+    """Print size, cost, latency and accuracy before and after pruning."""
+    print("\n" + "=" * 60)
+    print("PRUNING RESULTS")
+    print("=" * 60)
+
+    rows = [("Original", "before"), ("Pruned", "pruned"), ("Fine-tuned", "after")]
+    if results["after"]["weights"] == results["pruned"]["weights"]:
+        rows = rows[:2]
+
+    print(
+        f"\n{'Model':<12} {'Params':>10} {'GFLOPs':>8} {'CPU ms':>8} "
+        f"{'mAP50':>8} {'mAP50-95':>9}"
+    )
+    print("-" * 60)
+    for label, key in rows:
+        s = results[key]
+        print(
+            f"{label:<12} {s['params']:>10,d} {s['gflops']:>8.2f} "
+            f"{s['latency_ms']:>8.1f} {s['mAP50']:>8.4f} {s['mAP50-95']:>9.4f}"
+        )
+
+    print(f"\nFinal weights: {results['weights']}")
+    print("=" * 60)
@@ -0,0 +1,599 @@
+"""
+Mixed-precision (selective int8) quantization search for TFLite export.
+
+Per-layer sensitivity is measured with the TFLite quantization debugger on
+the calibration set: each quantized tensor is compared against its float
+counterpart and scored by RMSE relative to its quantization scale. The
+search then keeps the most sensitive layers in float and quantizes the
+rest to int8, trying progressively more float layers until the mAP loss
+fits the budget, and returns the fastest candidate that does.
+
+Candidates are scored by ultralytics' LiteRT backend, which expects box
+coordinates normalized by the input size and reads the model metadata from
+a metadata.json entry in the .tflite. ultralytics' SavedModel export has
+neither, so the SavedModel is wrapped to normalize its outputs and each
+candidate gets the export's metadata embedded, as ultralytics' own LiteRT
+export does.
+
+TensorFlow is only needed here, so it is imported lazily.
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from mina.calibration import DEFAULT_CALIBRATION_SIZE, build_calibration_yaml
+from mina.core.cache import atomic_output, hash_file, hash_key
+from mina.core.constants import CACHE_DIR, DEFAULT_IMAGE_SIZE
+from mina.core.dataset import resolve_split_images
+
+# Numbers of most-sensitive layers kept in float that the search tries
+FLOAT_LAYER_STEPS: tuple[int, ...] = (0, 1, 2, 4, 8, 16, 32)
+
+# Default budget: largest acceptable mAP50-95 drop versus the .pt model
+DEFAULT_MAX_MAP_DROP: float = 0.01
+
+# Images timed per candidate for the latency measurement
+LATENCY_RUNS: int = 20
+
+# Bump to invalidate cached SavedModels when their export settings change
+SAVED_MODEL_CACHE_VERSION: int = 2
+
+
+class QuantCandidate(NamedTuple):
+    """One point of the mixed-precision search."""
+
+    float_layers: list[str]  # tensor names kept in float
+    path: Path  # .tflite file
+    latency_ms: float  # median CPU invoke time
+    map50: float
+    map50_95: float
+
+
+def letterbox(image: Image.Image, imgsz: int) -> np.ndarray:
+    """
+    Resize keeping aspect ratio and pad to a square, like ultralytics.
+
+    Args:
+        image: RGB image
+        imgsz: Output size
+
+    Returns:
+        (imgsz, imgsz, 3) float32 array scaled to 0-1
+    """
+    scale = imgsz / max(image.size)
+    width = max(1, round(image.width * scale))
+    height = max(1, round(image.height * scale))
+    resized = image.resize((width, height), Image.Resampling.BILINEAR)
+
+    canvas = Image.new("RGB", (imgsz, imgsz), (114, 114, 114))
+    canvas.paste(resized, ((imgsz - width) // 2, (imgsz - height) // 2))
+    return np.asarray(canvas, dtype=np.float32) / 255.0
+
+
+def calibration_image_paths(
+    data_yaml: Path,
+    size: int | None = DEFAULT_CALIBRATION_SIZE,
+    seed: int = 0,
+) -> list[Path]:
+    """
+    Get the calibration image paths.
+
+    Args:
+        data_yaml: Dataset config to select from
+        size: Number of calibration images selected from the train split;
+            None or 0 uses the whole val split, as export_tflite does
+        seed: Random seed for the selection
+
+    Returns:
+        Calibration image paths
+    """
+    calibration_yaml = (
+        build_calibration_yaml(data_yaml, size, seed) if size else data_yaml
+    )
+    return resolve_split_images(calibration_yaml, "val")
+
+
+def iter_calibration_images(
+    image_paths: list[Path], imgsz: int = DEFAULT_IMAGE_SIZE
+) -> Iterator[np.ndarray]:
+    """
+    Load calibration images one at a time, letterboxed to the model input.
+
+    A full calibration set of float32 640x640 images takes over a gigabyte,
+    so the images are decoded lazily every time the set is iterated.
+
+    Args:
+        image_paths: Calibration image paths
+        imgsz: Model input size
+
+    Yields:
+        (imgsz, imgsz, 3) float32 images
+    """
+    for path in image_paths:
+        with Image.open(path) as img:
+            yield letterbox(img.convert("RGB"), imgsz)
+
+
+def rank_sensitive_layers(layer_rows: list[dict]) -> list[str]:
+    """
+    Rank quantized tensors by quantization sensitivity.
+
+    Sensitivity is RMSE between float and dequantized outputs divided by
+    the quantization scale, i.e. the error measured in quantization steps.
+    A well-quantized tensor scores about 0.3 (uniform rounding noise).
+
+    Args:
+        layer_rows: Rows of the quantization debugger's layer statistics
+            (needs tensor_name, mean_squared_error and scale)
+
+    Returns:
+        Tensor names, most sensitive first
+    """
+    scores = {}
+    for row in layer_rows:
+        scale = float(row["scale"])
+        if scale <= 0:
+            continue
+        score = np.sqrt(float(row["mean_squared_error"])) / scale
+        name = row["tensor_name"]
+        scores[name] = max(score, scores.get(name, 0.0))
+
+    return sorted(scores, key=lambda name: -scores[name])
+
+
+def select_candidate(
+    candidates: list[QuantCandidate],
+    reference_map: float,
+    max_map_drop: float = DEFAULT_MAX_MAP_DROP,
+    max_latency_ms: float | None = None,
+) -> QuantCandidate:
+    """
+    Pick the fastest candidate within the mAP and latency budget.
+
+    If no candidate meets the mAP budget, the most accurate candidate
+    within the latency budget (or overall) is returned instead.
+
+    Args:
+        candidates: Evaluated candidates
+        reference_map: mAP50-95 of the unquantized model
+        max_map_drop: Largest acceptable mAP50-95 drop
+        max_latency_ms: Optional latency ceiling
+
+    Returns:
+        The selected candidate
+    """
+    within_latency = [
+        c
+        for c in candidates
+        if max_latency_ms is None or c.latency_ms <= max_latency_ms
+    ] or candidates
+
+    within_budget = [
+        c for c in within_latency if reference_map - c.map50_95 <= max_map_drop
+    ]
+    if within_budget:
+        return min(within_budget, key=lambda c: (c.latency_ms, len(c.float_layers)))
+
+    return max(within_latency, key=lambda c: c.map50_95)
+
+
+def _make_converter(saved_model_dir: Path, calibration: list[Path], imgsz: int):
+    """Create an int8 TFLite converter with float fallback for denylisted ops."""
+    import tensorflow as tf
+
+    def representative_dataset():
+        for image in iter_calibration_images(calibration, imgsz):
+            yield [image[None]]
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(str(saved_model_dir))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    # Builtin float kernels stay available for layers kept out of int8
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+        tf.lite.OpsSet.TFLITE_BUILTINS,
+    ]
+    return converter, representative_dataset
+
+
+def measure_layer_sensitivity(
+    saved_model_dir: Path, calibration: list[Path], imgsz: int = DEFAULT_IMAGE_SIZE
+) -> list[str]:
+    """
+    Measure per-layer int8 sensitivity with the TFLite quantization debugger.
+
+    Args:
+        saved_model_dir: SavedModel from export_saved_model
+        calibration: Calibration image paths
+        imgsz: Model input size
+
+    Returns:
+        Tensor names, most sensitive first
+    """
+    import tensorflow as tf
+
+    converter, dataset = _make_converter(saved_model_dir, calibration, imgsz)
+    debugger = tf.lite.experimental.QuantizationDebugger(
+        converter=converter, debug_dataset=dataset
+    )
+    debugger.run()
+
+    buffer = io.StringIO()
+    debugger.layer_statistics_dump(buffer)
+    buffer.seek(0)
+    return rank_sensitive_layers(list(csv.DictReader(buffer)))
+
+
+def quantize_with_float_layers(
+    saved_model_dir: Path,
+    calibration: list[Path],
+    float_layers: list[str],
+    output_path: Path,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+) -> Path:
+    """
+    Build an int8 model with the given layers kept in float.
+
+    Args:
+        saved_model_dir: SavedModel from export_saved_model
+        calibration: Calibration image paths
+        float_layers: Tensor names excluded from quantization
+        output_path: Destination .tflite file
+        imgsz: Model input size
+
+    Returns:
+        Path to the written model
+    """
+    import tensorflow as tf
+
+    converter, dataset = _make_converter(saved_model_dir, calibration, imgsz)
+    if float_layers:
+        debugger = tf.lite.experimental.QuantizationDebugger(
+            converter=converter,
+            debug_dataset=dataset,
+            debug_options=tf.lite.experimental.QuantizationDebugOptions(
+                denylisted_nodes=list(float_layers)
+            ),
+        )
+        model = debugger.get_nondebug_quantized_model()
+    else:
+        model = converter.convert()
+
+    return write_tflite(model, saved_model_dir, output_path)
+
+
+def write_tflite(model: bytes, saved_model_dir: Path, output_path: Path) -> Path:
+    """
+    Write a converted model with the export's metadata embedded.
+
+    The metadata goes into a metadata.json entry appended to the flatbuffer,
+    where ultralytics' LiteRT backend reads the class names, task and
+    input size from.
+
+    Args:
+        model: Converted .tflite flatbuffer
+        saved_model_dir: SavedModel from export_saved_model
+        output_path: Destination .tflite file
+
+    Returns:
+        Path to the written model
+    """
+    metadata = yaml.safe_load((saved_model_dir / "metadata.yaml").read_text())
+    with atomic_output(output_path) as tmp_path:
+        tmp_path.write_bytes(model)
+        with zipfile.ZipFile(tmp_path, "a", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("metadata.json", json.dumps(metadata, indent=2))
+    return output_path
+
+
+def measure_latency(
+    model_path: Path, images: list[np.ndarray], runs: int = LATENCY_RUNS
+) -> float:
+    """
+    Measure median single-image CPU latency of a TFLite model.
+
+    Args:
+        model_path: .tflite file
+        images: (H, W, 3) float input images (cycled through)
+        runs: Number of timed invocations
+
+    Returns:
+        Median invoke time in ms
+    """
+    import time
+
+    import tensorflow as tf
+
+    interpreter = tf.lite.Interpreter(model_path=str(model_path))
+    interpreter.allocate_tensors()
+    detail = interpreter.get_input_details()[0]
+
+    def prepare(image: np.ndarray) -> np.ndarray:
+        if detail["dtype"] == np.float32:
+            return image[None]
+        scale, zero_point = detail["quantization"]
+        return (image[None] / scale + zero_point).round().astype(detail["dtype"])
+
+    interpreter.set_tensor(detail["index"], prepare(images[0]))
+    interpreter.invoke()  # warm-up
+
+    times = []
+    for i in range(runs):
+        interpreter.set_tensor(detail["index"], prepare(images[i % len(images)]))
+        start = time.perf_counter()
+        interpreter.invoke()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def saved_model_entry(
+    weights_path: Path,
+    imgsz: int,
+    cache_dir: Path | None = None,
+) -> Path:
+    """
+    Get the cache directory of the float SavedModel for some weights.
+
+    Keyed by the weights hash and image size, so retrained weights or a
+    different --imgsz never reuse a stale SavedModel.
+
+    Args:
+        weights_path: Trained .pt weights
+        imgsz: Export image size
+        cache_dir: Cache root. Defaults to CACHE_DIR.
+
+    Returns:
+        Cache entry directory (it may not exist yet)
+    """
+    key = hash_key(
+        {
+            "version": SAVED_MODEL_CACHE_VERSION,
+            "weights": hash_file(weights_path),
+            "imgsz": imgsz,
+        }
+    )
+    return (cache_dir or CACHE_DIR) / "saved_models" / f"{weights_path.stem}-{key}"
+
+
+def normalize_saved_model(saved_model_dir: Path, imgsz: int, output_dir: Path) -> None:
+    """
+    Save a copy of a SavedModel whose box coordinates are normalized.
+
+    ultralytics' SavedModel outputs (batch, 4 + classes, anchors) with
+    pixel xywh, while its LiteRT backend multiplies the xywh of a .tflite
+    by the input size. Dividing here also keeps the int8 output scale from
+    being dominated by pixel coordinates, which would crush the class
+    scores.
+
+    Args:
+        saved_model_dir: SavedModel exported by ultralytics
+        imgsz: Export image size (square input)
+        output_dir: Where the normalized SavedModel is written
+    """
+    import tensorflow as tf
+
+    model = tf.saved_model.load(str(saved_model_dir))
+    serving = model.signatures["serving_default"]
+    ((input_name, spec),) = serving.structured_input_signature[1].items()
+
+    class Normalized(tf.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        @tf.function(input_signature=[tf.TensorSpec(spec.shape, spec.dtype)])
+        def serve(self, images):
+            outputs = serving(**{input_name: images})
+            return {
+                name: tf.concat([y[:, :4] / imgsz, y[:, 4:]], axis=1)
+                for name, y in outputs.items()
+            }
+
+    module = Normalized()
+    tf.saved_model.save(module, str(output_dir), signatures=module.serve)
+    shutil.copy(saved_model_dir / "metadata.yaml", output_dir / "metadata.yaml")
+
+
+def export_saved_model(
+    weights_path: Path,
+    imgsz: int,
+    cache_dir: Path | None = None,
+) -> Path:
+    """
+    Export weights to a normalized float SavedModel, reusing a cached export.
+
+    ultralytics always writes <stem>_saved_model next to the weights, so
+    the normalized model is written into its cache entry under a temporary
+    name and renamed into place once complete.
+
+    Args:
+        weights_path: Trained .pt weights
+        imgsz: Export image size
+        cache_dir: Cache root. Defaults to CACHE_DIR.
+
+    Returns:
+        SavedModel directory, with the export's metadata.yaml
+    """
+    from ultralytics import YOLO
+
+    entry = saved_model_entry(weights_path, imgsz, cache_dir)
+    if (entry / "saved_model.pb").exists():
+        return entry
+
+    print(f"Exporting SavedModel (imgsz={imgsz}) for the sensitivity analysis...")
+    exported = Path(YOLO(str(weights_path)).export(format="saved_model", imgsz=imgsz))
+    tmp_dir = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    normalize_saved_model(exported, imgsz, tmp_dir)
+    try:
+        os.rename(tmp_dir, entry)
+    except OSError:
+        # A concurrent search stored the same entry first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (entry / "saved_model.pb").exists():
+            raise
+    return entry
+
+
+def search_mixed_precision(
+    weights_path: Path,
+    data_yaml: Path | None = None,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    test_dir: Path | None = None,
+    output_dir: Path | None = None,
+    max_map_drop: float = DEFAULT_MAX_MAP_DROP,
+    max_latency_ms: float | None = None,
+    calibration_size: int | None = DEFAULT_CALIBRATION_SIZE,
+    calibration_seed: int = 0,
+    float_layer_steps: tuple[int, ...] = FLOAT_LAYER_STEPS,
+    cache_dir: Path | None = None,
+) -> dict:
+    """
+    Search for a mixed int8/float TFLite model within a mAP/latency budget.
+
+    Candidates keep the k most sensitive layers in float for each k in
+    float_layer_steps; the search stops at the first k whose mAP50-95 drop
+    fits the budget, since more float layers only add latency.
+
+    Args:
+        weights_path: Trained .pt weights
+        data_yaml: Dataset config used for calibration. Defaults to the
+            training dataset.
+        imgsz: Export image size
+        test_dir: Test data for mAP. Defaults to TEST_DATA_DIR.
+        output_dir: Where the selected model and report go. Defaults to the
+            SavedModel directory next to the weights.
+        max_map_drop: Largest acceptable mAP50-95 drop versus the .pt
+        max_latency_ms: Optional latency ceiling
+        calibration_size: Number of calibration images; None or 0 uses the
+            whole val split
+        calibration_seed: Random seed for calibration image selection
+        float_layer_steps: Numbers of float layers to try
+        cache_dir: Cache root for the SavedModel. Defaults to CACHE_DIR.
+
+    Returns:
+        Dictionary with reference (pt metrics), candidates (list of
+        QuantCandidate), selected (QuantCandidate), model (path of the
+        selected model) and report (path of the YAML report)
+    """
+    from mina.evaluate import evaluate
+    from mina.train import get_data_yaml_path
+
+    weights_path = Path(weights_path)
+    if data_yaml is None:
+        data_yaml = get_data_yaml_path()
+
+    saved_model_dir = export_saved_model(weights_path, imgsz, cache_dir)
+
+    if output_dir is None:
+        output_dir = weights_path.parent / f"{weights_path.stem}_saved_model"
+    output_dir = Path(output_dir)
+    work_dir = output_dir / "mixed_precision"
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    reference = evaluate(weights_path, test_dir, imgsz=imgsz)
+    print(f"Reference (.pt) mAP50-95: {reference['mAP50-95']:.4f}")
+
+    calibration = calibration_image_paths(data_yaml, calibration_size, calibration_seed)
+    latency_images = list(iter_calibration_images(calibration[:LATENCY_RUNS], imgsz))
+    print(f"Measuring layer sensitivity on {len(calibration)} images...")
+    ranked = measure_layer_sensitivity(saved_model_dir, calibration, imgsz)
+
+    candidates = []
+    for k in float_layer_steps:
+        if k > len(ranked):
+            break
+        float_layers = ranked[:k]
+        path = quantize_with_float_layers(
+            saved_model_dir,
+            calibration,
+            float_layers,
+            work_dir / f"float{k}.tflite",
+            imgsz,
+        )
+        metrics = evaluate(path, test_dir, imgsz=imgsz)
+        candidate = QuantCandidate(
+            float_layers=float_layers,
+            path=path,
+            latency_ms=measure_latency(path, latency_images),
+            map50=metrics["mAP50"],
+            map50_95=metrics["mAP50-95"],
+        )
+        candidates.append(candidate)
+        print(
+            f"  {k:>3} float layers: mAP50-95 {candidate.map50_95:.4f}, "
+            f"{candidate.latency_ms:.1f} ms"
+        )
+
+        if reference["mAP50-95"] - candidate.map50_95 <= max_map_drop:
+            break
+
+    selected = select_candidate(
+        candidates, reference["mAP50-95"], max_map_drop, max_latency_ms
+    )
+    model_path = output_dir / f"{weights_path.stem}_mixed_int8.tflite"
+    with atomic_output(model_path) as tmp_path:
+        tmp_path.write_bytes(selected.path.read_bytes())
+
+    report_path = output_dir / "mixed_precision.yaml"
+    report = {
+        "weights": weights_path.name,
+        "imgsz": imgsz,
+        "reference_map50_95": float(reference["mAP50-95"]),
+        "max_map_drop": max_map_drop,
+        "max_latency_ms": max_latency_ms,
+        "selected_float_layers": selected.float_layers,
+        "candidates": [
+            {
+                "float_layers": len(c.float_layers),
+                "latency_ms": round(c.latency_ms, 2),
+                "map50": round(c.map50, 4),
+                "map50_95": round(c.map50_95, 4),
+            }
+            for c in candidates
+        ],
+    }
+    with atomic_output(report_path) as tmp_path:
+        tmp_path.write_text(yaml.safe_dump(report, sort_keys=False))
+
+    return {
+        "reference": reference,
+        "candidates": candidates,
+        "selected": selected,
+        "model": model_path,
+        "report": report_path,
+    }
+
+
+def print_mixed_precision_results(results: dict) -> None:
+    """Print the mixed-precision search table and the selected model."""
+    reference = results["reference"]["mAP50-95"]
+    selected = results["selected"]
+
+    print("\n" + "=" * 60)
+    print("MIXED-PRECISION SEARCH")
+    print("=" * 60)
+
+    print(f"\n{'Float layers':<15} {'mAP50-95':>10} {'Drop':>9} {'ms':>9}")
+    print("-" * 46)
+    for c in results["candidates"]:
+        marker = "  <- selected" if c is selected else ""
+        print(
+            f"{len(c.float_layers):<15} {c.map50_95:>10.4f} "
+            f"{reference - c.map50_95:>+9.4f} {c.latency_ms:>9.1f}{marker}"
+        )
+
+    print(f"\nMixed model saved to: {results['model']}")
+    print(f"Report saved to: {results['report']}")
+    print("=" * 60)
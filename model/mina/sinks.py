@@ -0,0 +1,317 @@
+"""
+Streaming sinks for inference results.
+
+A sink receives one record per image (image path, detections and the
+timings in TIMING_KEYS) and writes them incrementally. Records are
+buffered and written in batches, and the file is fsynced at most every
+SINK_FSYNC_SECONDS, so long runs over large image archives keep memory
+flat and lose at most the last few seconds of results on a crash.
+
+The format is picked from the output suffix (see SINK_FORMATS):
+
+- .jsonl: one JSON object per image
+- .parquet: one row group per batch (needs pyarrow; the footer is written
+  on close, so the file is only readable once the run finishes)
+- .db / .sqlite: images and detections tables, queryable with SQL
+
+Each sink keeps a progress log of the images it has written next to its
+output (see mina.progress). Opened with resume=True, JSONL and SQLite sinks
+append to the output of an interrupted run and load its log, so those
+images can be skipped. Parquet files cannot be appended to.
+"""
+
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Self
+
+from mina.core.types import Detection
+from mina.progress import ProgressLog, drop_partial_line, fsync_path, progress_path
+
+# Records buffered before a batch is written
+SINK_BATCH_SIZE: int = 256
+
+# Minimum seconds between fsyncs of the output file
+SINK_FSYNC_SECONDS: float = 10.0
+
+# Timing keys in milliseconds: ultralytics' Results.speed, plus the
+# augmented pass of test-time augmentation (see mina.tta)
+TIMING_KEYS: tuple[str, ...] = ("preprocess", "inference", "postprocess", "tta")
+
+
+def detection_record(detection: Detection) -> dict:
+    """
+    Flatten a detection for serialization.
+
+    Args:
+        detection: Detection to flatten
+
+    Returns:
+        Dict with id, disease_class, confidence, x, y, width and height
+    """
+    return {
+        "id": detection.id,
+        "disease_class": detection.disease_class,
+        "confidence": detection.confidence,
+        **detection.bounding_box._asdict(),
+    }
+
+
+class ResultSink(ABC):
+    """
+    Base class for buffered result writers.
+
+    Subclasses implement _write_batch, and _close if the output needs
+    finishing; the file at self.path is fsynced periodically. The images
+    of each written batch are recorded in self.progress.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        batch_size: int = SINK_BATCH_SIZE,
+        fsync_seconds: float = SINK_FSYNC_SECONDS,
+        resume: bool = False,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.fsync_seconds = fsync_seconds
+        self.resume = resume
+        self.progress = ProgressLog(progress_path(self.path), resume=resume)
+        self.count = 0
+        self._buffer: list[dict] = []
+        self._last_sync = time.monotonic()
+
+    def write(
+        self,
+        image_path: Path,
+        detections: list[Detection],
+        timings: dict[str, float] | None = None,
+    ) -> None:
+        """
+        Queue one image's results, writing a batch when the buffer is full.
+
+        Args:
+            image_path: Image the detections came from
+            detections: Detections of the image
+            timings: Milliseconds per stage (see TIMING_KEYS)
+        """
+        timings = timings or {}
+        self._buffer.append(
+            {
+                "image": str(image_path),
+                "detections": [detection_record(d) for d in detections],
+                **{f"{key}_ms": timings.get(key) for key in TIMING_KEYS},
+            }
+        )
+        self.count += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self, sync: bool = False) -> None:
+        """
+        Write buffered records, fsyncing if the interval has passed.
+
+        Args:
+            sync: fsync regardless of the interval
+        """
+        if self._buffer:
+            self._write_batch(self._buffer)
+            # Logged only once written, so a logged image has its results
+            self.progress.add(record["image"] for record in self._buffer)
+            self._buffer = []
+        if sync or time.monotonic() - self._last_sync >= self.fsync_seconds:
+            self._sync()
+            self.progress.sync()
+            self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Write remaining records, fsync and close the output."""
+        self.flush()
+        self._close()
+        self._sync()
+        self.progress.sync()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @abstractmethod
+    def _write_batch(self, records: list[dict]) -> None:
+        """Write a batch of records to the output."""
+
+    def _sync(self) -> None:
+        """fsync the output file."""
+        fsync_path(self.path)
+
+    def _close(self) -> None:
+        """Finish and close the output."""
+
+
+class JSONLSink(ResultSink):
+    """One JSON object per line and image."""
+
+    def __init__(self, path: Path, **kwargs):
+        super().__init__(path, **kwargs)
+        if self.resume and self.path.exists():
+            drop_partial_line(self.path)
+        else:
+            self.path.write_text("")
+
+    def _write_batch(self, records: list[dict]) -> None:
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(r) + "\n" for r in records))
+
+
+class ParquetSink(ResultSink):
+    """Parquet file with one row group per batch."""
+
+    def __init__(self, path: Path, **kwargs):
+        if kwargs.get("resume"):
+            raise ValueError(
+                "Parquet output cannot be resumed; use .jsonl or .db output"
+            )
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Parquet output needs pyarrow: uv pip install pyarrow"
+            ) from e
+
+        super().__init__(path, **kwargs)
+        detection = pa.struct(
+            [
+                ("id", pa.string()),
+                ("disease_class", pa.string()),
+                ("confidence", pa.float64()),
+                ("x", pa.float64()),
+                ("y", pa.float64()),
+                ("width", pa.float64()),
+                ("height", pa.float64()),
+            ]
+        )
+        self._schema = pa.schema(
+            [("image", pa.string()), ("detections", pa.list_(detection))]
+            + [(f"{key}_ms", pa.float64()) for key in TIMING_KEYS]
+        )
+        self._pa = pa
+        self._writer = pq.ParquetWriter(str(self.path), self._schema)
+
+    def _write_batch(self, records: list[dict]) -> None:
+        table = self._pa.Table.from_pylist(records, schema=self._schema)
+        self._writer.write_table(table)
+
+    def _close(self) -> None:
+        # Writes the footer, without which the file is unreadable
+        self._writer.close()
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    preprocess_ms REAL,
+    inference_ms REAL,
+    postprocess_ms REAL,
+    tta_ms REAL
+);
+CREATE TABLE IF NOT EXISTS detections (
+    image_id INTEGER NOT NULL REFERENCES images(id),
+    id TEXT NOT NULL,
+    disease_class TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    width REAL NOT NULL,
+    height REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_path ON images (path);
+CREATE INDEX IF NOT EXISTS detections_class ON detections (disease_class);
+"""
+
+
+class SQLiteSink(ResultSink):
+    """images and detections tables, one transaction per batch."""
+
+    def __init__(self, path: Path, **kwargs):
+        super().__init__(path, **kwargs)
+        if not self.resume:
+            # Start fresh, including the journal of a run that crashed
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{self.path}{suffix}").unlink(missing_ok=True)
+        # A resumed database replays its WAL when opened
+        self._connection = sqlite3.connect(self.path)
+        # Commits skip fsync; checkpoints (see _sync) write the WAL durably
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SQLITE_SCHEMA)
+        self._open = True
+
+    def _write_batch(self, records: list[dict]) -> None:
+        with self._connection:
+            for record in records:
+                cursor = self._connection.execute(
+                    "INSERT INTO images "
+                    "(path, preprocess_ms, inference_ms, postprocess_ms, tta_ms) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (record["image"], *(record[f"{k}_ms"] for k in TIMING_KEYS)),
+                )
+                self._connection.executemany(
+                    "INSERT INTO detections (image_id, id, disease_class, "
+                    "confidence, x, y, width, height) VALUES (:image_id, :id, "
+                    ":disease_class, :confidence, :x, :y, :width, :height)",
+                    [
+                        {**detection, "image_id": cursor.lastrowid}
+                        for detection in record["detections"]
+                    ],
+                )
+
+    def _sync(self) -> None:
+        if self._open:
+            self._connection.execute("PRAGMA wal_checkpoint(FULL)")
+        else:
+            super()._sync()
+
+    def _close(self) -> None:
+        # Closing the last connection checkpoints the WAL into the database
+        self._connection.close()
+        self._open = False
+
+
+# Output suffix -> sink class
+SINK_FORMATS: dict[str, type[ResultSink]] = {
+    ".jsonl": JSONLSink,
+    ".parquet": ParquetSink,
+    ".db": SQLiteSink,
+    ".sqlite": SQLiteSink,
+    ".sqlite3": SQLiteSink,
+}
+
+
+def open_sink(path: str | Path, **kwargs) -> ResultSink:
+    """
+    Open a result sink for an output file, chosen by its suffix.
+
+    Args:
+        path: Output file (.jsonl, .parquet, .db, .sqlite or .sqlite3)
+        **kwargs: batch_size, fsync_seconds and resume
+
+    Returns:
+        Sink writing to path
+
+    Raises:
+        ValueError: If the suffix has no sink, or resuming Parquet output
+    """
+    path = Path(path)
+    sink = SINK_FORMATS.get(path.suffix.lower())
+    if sink is None:
+        raise ValueError(
+            f"Unknown output format '{path.suffix}'. Choose from: {list(SINK_FORMATS)}"
+        )
+    return sink(path, **kwargs)
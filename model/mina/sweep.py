@@ -0,0 +1,183 @@
+"""
+Confidence / NMS IoU threshold sweep and per-class operating-point selection.
+
+Inference runs once (through the cached prediction store); every NMS IoU
+candidate is then re-applied to the cached raw predictions, and every
+confidence candidate is scored in one vectorized pass per class.
+"""
+
+import csv
+from pathlib import Path
+
+import numpy as np
+
+from mina.core.constants import DEFAULT_IMAGE_SIZE, DISEASE_CLASSES
+from mina.core.thresholds import ClassThresholds, save_thresholds
+from mina.evaluate import load_test_set
+from mina.metrics import match_predictions, pr_at_confidences
+from mina.predictions import apply_nms, get_predictions
+
+# Candidate NMS IoU thresholds
+SWEEP_IOU_THRESHOLDS: tuple[float, ...] = (0.45, 0.5, 0.55, 0.6, 0.65, 0.7, 0.75)
+
+# Candidate confidence thresholds (0.05 to 0.95 in steps of 0.01)
+SWEEP_CONFIDENCES: np.ndarray = np.round(np.linspace(0.05, 0.95, 91), 2)
+
+# IoU used to decide whether a detection is correct at the operating point
+SWEEP_MATCH_IOU: float = 0.5
+
+
+def sweep_thresholds(
+    weights: Path,
+    test_dir: Path | None = None,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    nms_ious: tuple[float, ...] = SWEEP_IOU_THRESHOLDS,
+    confidences: np.ndarray = SWEEP_CONFIDENCES,
+    use_cache: bool = True,
+    cache_dir: Path | None = None,
+) -> dict:
+    """
+    Score a grid of NMS IoU and per-class confidence thresholds.
+
+    For each NMS IoU, each class gets the confidence that maximizes its F1
+    at IoU 0.5. The recommended NMS IoU is the one with the best mean F1
+    over classes at their per-class thresholds.
+
+    Args:
+        weights: Path to trained model weights (.pt or .tflite)
+        test_dir: Path to test data directory. Defaults to TEST_DATA_DIR.
+        imgsz: Input image size
+        nms_ious: NMS IoU thresholds to try
+        confidences: Confidence thresholds to try
+        use_cache: Whether to reuse cached predictions when hashes match
+        cache_dir: Prediction cache root. Defaults to CACHE_DIR.
+
+    Returns:
+        Dictionary with:
+            curves: list of rows (nms_iou, class, confidence, precision, recall, f1)
+            per_iou: {nms_iou: mean F1 at per-class thresholds}
+            per_class: {class: {confidence, precision, recall, f1}} at the
+                recommended NMS IoU
+            thresholds: recommended ClassThresholds
+    """
+    image_paths, labels = load_test_set(test_dir)
+    raw_predictions = get_predictions(
+        Path(weights),
+        image_paths,
+        imgsz=imgsz,
+        use_cache=use_cache,
+        cache_dir=cache_dir,
+    )
+
+    present = np.bincount(labels.classes, minlength=len(DISEASE_CLASSES)) > 0
+    confidences = np.asarray(confidences)
+
+    curves = []
+    per_iou = {}
+    best = None
+
+    for nms_iou in nms_ious:
+        # Keep everything above the lowest candidate; the grid filters the rest
+        predictions = apply_nms(
+            raw_predictions, confidence=float(confidences.min()), iou=nms_iou
+        )
+        tp = match_predictions(predictions, labels, np.array([SWEEP_MATCH_IOU]))[:, 0]
+        precision, recall = pr_at_confidences(
+            tp, predictions.scores, predictions.classes, labels.classes, confidences
+        )
+        f1 = 2 * precision * recall / np.maximum(precision + recall, 1e-16)
+
+        for c, cls in enumerate(DISEASE_CLASSES):
+            for g, conf in enumerate(confidences):
+                curves.append(
+                    {
+                        "nms_iou": nms_iou,
+                        "class": cls,
+                        "confidence": float(conf),
+                        "precision": float(precision[c, g]),
+                        "recall": float(recall[c, g]),
+                        "f1": float(f1[c, g]),
+                    }
+                )
+
+        best_idx = f1.argmax(axis=1)
+        best_f1 = f1[np.arange(len(DISEASE_CLASSES)), best_idx]
+        per_iou[nms_iou] = float(best_f1[present].mean()) if present.any() else 0.0
+
+        if best is None or per_iou[nms_iou] > per_iou[best[0]]:
+            best = (nms_iou, best_idx, precision, recall, f1)
+
+    nms_iou, best_idx, precision, recall, f1 = best
+    per_class = {
+        cls: {
+            "confidence": float(confidences[best_idx[c]]),
+            "precision": float(precision[c, best_idx[c]]),
+            "recall": float(recall[c, best_idx[c]]),
+            "f1": float(f1[c, best_idx[c]]),
+        }
+        for c, cls in enumerate(DISEASE_CLASSES)
+        if present[c]
+    }
+
+    thresholds = ClassThresholds(
+        nms_iou=float(nms_iou),
+        confidence={cls: row["confidence"] for cls, row in per_class.items()},
+    )
+
+    return {
+        "curves": curves,
+        "per_iou": per_iou,
+        "per_class": per_class,
+        "thresholds": thresholds,
+    }
+
+
+def save_sweep_results(results: dict, output_dir: Path) -> tuple[Path, Path]:
+    """
+    Save PR curves as CSV and the recommended thresholds as YAML.
+
+    Args:
+        results: Output of sweep_thresholds
+        output_dir: Directory to write into
+
+    Returns:
+        Tuple of (curves CSV path, thresholds YAML path)
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    curves_path = output_dir / "pr_curves.csv"
+    with open(curves_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results["curves"][0]))
+        writer.writeheader()
+        writer.writerows(results["curves"])
+
+    thresholds_path = save_thresholds(
+        results["thresholds"], output_dir / "thresholds.yaml"
+    )
+
+    return curves_path, thresholds_path
+
+
+def print_sweep_results(results: dict) -> None:
+    """Print the sweep summary and recommended thresholds."""
+    print("\n" + "=" * 60)
+    print("THRESHOLD SWEEP RESULTS")
+    print("=" * 60)
+
+    print(f"\n{'NMS IoU':<25} {'Mean F1':>15}")
+    print("-" * 40)
+    for nms_iou, mean_f1 in results["per_iou"].items():
+        print(f"{nms_iou:<25.2f} {mean_f1:>15.4f}")
+
+    thresholds = results["thresholds"]
+    print(f"\nRecommended NMS IoU: {thresholds.nms_iou:.2f}")
+
+    print(f"\n{'Class':<23} {'Conf':>7} {'P':>7} {'R':>7} {'F1':>7}")
+    print("-" * 55)
+    for cls, row in results["per_class"].items():
+        print(
+            f"  {cls:<21} {row['confidence']:>7.2f} {row['precision']:>7.3f} "
+            f"{row['recall']:>7.3f} {row['f1']:>7.3f}"
+        )
+
+    print("=" * 60)
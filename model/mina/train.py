@@ -5,14 +5,35 @@ Training logic for fish disease detection model.
 from pathlib import Path
 
 from ultralytics import YOLO
+from ultralytics.models.yolo.detect import DetectionTrainer
 
+from mina.checkpoint import is_resumable, with_async_checkpoints
 from mina.core.constants import (
+    CHECKPOINT_KEEP,
     DATA_DIR,
     DEFAULT_BATCH_SIZE,
     DEFAULT_EPOCHS,
     DEFAULT_IMAGE_SIZE,
     DEFAULT_PATIENCE,
+    DEFAULT_SAVE_PERIOD,
+    DEFAULT_WORKERS,
 )
+from mina.core.model import find_last_checkpoint
+from mina.core.registry import register_run
+
+# Augmentation used when no tuned hyperparameters file is given
+AUGMENTATION: dict = {
+    "hsv_h": 0.015,
+    "hsv_s": 0.7,
+    "hsv_v": 0.4,
+    "degrees": 10.0,
+    "translate": 0.1,
+    "scale": 0.5,
+    "flipud": 0.5,
+    "fliplr": 0.5,
+    "mosaic": 1.0,
+    "mixup": 0.1,
+}
 
 
 def get_data_yaml_path(data_dir: Path | None = None) -> Path:
@@ -71,6 +92,13 @@ def train(
     patience: int = DEFAULT_PATIENCE,
     device: str | None = None,
     hyp: str | None = None,
+    trainer: type | None = None,
+    teacher: str | Path | None = None,
+    distill_confidence: float | None = None,
+    resume: bool = False,
+    save_period: int = DEFAULT_SAVE_PERIOD,
+    keep_checkpoints: int = CHECKPOINT_KEEP,
+    workers: int = DEFAULT_WORKERS,
 ) -> Path:
     """
     Train YOLOv8n model on fish disease dataset.
@@ -85,17 +113,98 @@ def train(
         patience: Early stopping patience
         device: Device to train on ('0' for GPU, 'cpu' for CPU, None for auto-detect)
         hyp: Path to hyperparameters YAML file
+        trainer: Optional ultralytics trainer class (e.g. one that keeps a
+            pruned architecture instead of rebuilding it from the YAML)
+        teacher: Optional teacher weights for knowledge distillation. Its
+            detections on the train split are cached and added as
+            confidence-weighted soft targets (see mina.distill).
+        distill_confidence: Minimum teacher confidence used as a target
+            (default: mina.distill.DISTILL_MIN_CONFIDENCE)
+        resume: Resume the most recent interrupted run from its last.pt
+            (training arguments come from the checkpoint, and a distilled
+            run keeps its saved teacher settings)
+        save_period: Write an epoch checkpoint every N epochs (-1 disables)
+        keep_checkpoints: Number of epoch checkpoints kept
+        workers: Data-loader worker processes (see mina-train --profile)
 
     Returns:
         Path to the best model weights
+
+    Raises:
+        FileNotFoundError: If resume is set and no run is found, or if the
+            teacher of a resumed distillation run is missing
+        ValueError: If both teacher and trainer are given, if the latest
+            run already finished, or if teacher differs from the teacher
+            of the resumed run
     """
+    from mina.distill import (
+        DISTILL_MIN_CONFIDENCE,
+        distillation_trainer,
+        load_distill_settings,
+        teacher_soft_targets,
+    )
+
     data_yaml = get_data_yaml_path(data_dir)
     print(f"Using dataset config: {data_yaml}")
 
+    checkpoint = None
+    if resume:
+        checkpoint = find_last_checkpoint()
+        if checkpoint is None:
+            raise FileNotFoundError("No training run found to resume")
+        if not is_resumable(checkpoint):
+            raise ValueError(f"Run already finished, nothing to resume: {checkpoint}")
+
+        # Dropping or swapping the teacher would silently change the run
+        saved = load_distill_settings(checkpoint.parent.parent)
+        if saved is None and teacher is not None:
+            raise ValueError(f"Cannot add a teacher when resuming: {checkpoint}")
+        if saved is not None:
+            if teacher is not None and Path(teacher).resolve() != Path(
+                saved["teacher"]
+            ):
+                raise ValueError(
+                    f"Run was distilled from {saved['teacher']}, not {teacher}"
+                )
+            teacher = Path(saved["teacher"])
+            if not teacher.exists():
+                raise FileNotFoundError(
+                    f"Teacher of the resumed run not found: {teacher}"
+                )
+            distill_confidence = saved["min_confidence"]
+            imgsz = saved["imgsz"]
+
+    if teacher is not None:
+        if trainer is not None:
+            raise ValueError("Distillation cannot be combined with a custom trainer")
+        print(f"Distilling from teacher: {teacher}")
+        settings = {
+            "teacher": str(Path(teacher).resolve()),
+            "min_confidence": distill_confidence or DISTILL_MIN_CONFIDENCE,
+            "imgsz": imgsz,
+        }
+        soft_targets = teacher_soft_targets(
+            Path(teacher),
+            data_yaml,
+            imgsz=imgsz,
+            min_confidence=settings["min_confidence"],
+        )
+        trainer = distillation_trainer(soft_targets, settings)
+
+    # Checkpoints are written on a background thread via write-then-rename
+    trainer = with_async_checkpoints(trainer or DetectionTrainer, keep_checkpoints)
+
     if device is None:
         device = get_device()
     print(f"Using device: {device}")
 
+    if checkpoint is not None:
+        print(f"Resuming training from: {checkpoint}")
+        results = YOLO(str(checkpoint)).train(
+            resume=True, device=device, trainer=trainer
+        )
+        return _report_training(results)
+
     model = YOLO(pretrained)
 
     train_args = {
@@ -105,9 +214,9 @@ def train(
         "batch": batch,
         "name": name,
         "save": True,
-        "save_period": -1,
+        "save_period": save_period,
         "patience": patience,
-        "workers": 4,
+        "workers": workers,
         "device": device,
     }
 
@@ -119,22 +228,16 @@ def train(
                 "Run tuning first: uv run mina-tune"
             )
         print(f"Using tuned hyperparameters from: {hyp_path}")
-        results = model.train(cfg=str(hyp_path), **train_args)
+        results = model.train(cfg=str(hyp_path), trainer=trainer, **train_args)
     else:
-        results = model.train(
-            **train_args,
-            hsv_h=0.015,
-            hsv_s=0.7,
-            hsv_v=0.4,
-            degrees=10.0,
-            translate=0.1,
-            scale=0.5,
-            flipud=0.5,
-            fliplr=0.5,
-            mosaic=1.0,
-            mixup=0.1,
-        )
+        results = model.train(**train_args, trainer=trainer, **AUGMENTATION)
+
+    return _report_training(results)
+
 
+def _report_training(results) -> Path:
+    """Record the run in the registry, print a summary and return the best weights."""
+    register_run(Path(results.save_dir))
     best_weights = Path(results.save_dir) / "weights" / "best.pt"
     print("\nTraining complete!")
     print(f"Best weights saved to: {best_weights}")
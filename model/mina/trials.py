@@ -0,0 +1,330 @@
+"""
+Persistent SQLite store for hyperparameter tuning trials.
+
+Every trial of every tuning study is recorded with its hyperparameters,
+per-epoch validation scores and final status, so a crashed or interrupted
+study can be resumed, a new study can be warm-started from the best
+configurations of earlier ones, and the best hyperparameters can be
+queried at any time.
+
+Trials are written by the worker processes that train them. SQLite's WAL
+journal lets those writers and readers share the database file safely.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Self
+
+from mina.core.constants import STUDIES_DIR
+
+TRIALS_DB: Path = STUDIES_DIR / "trials.db"
+
+# Seconds a writer waits for another process's write lock
+DB_TIMEOUT: float = 60.0
+
+# Trial statuses; running trials are unfinished (interrupted if not active)
+RUNNING = "running"
+FINISHED_STATUSES = ("completed", "stopped", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS studies (
+    name TEXT PRIMARY KEY,
+    config TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    study TEXT NOT NULL REFERENCES studies(name),
+    number INTEGER NOT NULL,
+    hyperparameters TEXT NOT NULL,
+    status TEXT NOT NULL,
+    fitness REAL,
+    started REAL NOT NULL,
+    finished REAL,
+    UNIQUE (study, number)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    trial_id INTEGER NOT NULL REFERENCES trials(id) ON DELETE CASCADE,
+    epoch INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (trial_id, epoch)
+);
+"""
+
+
+class TrialStore:
+    """SQLite-backed record of tuning studies, trials and their metrics."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path or TRIALS_DB)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=DB_TIMEOUT)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def create_study(self, name: str, config: dict, resume: bool = False) -> None:
+        """
+        Create a study, or reopen it to resume.
+
+        Args:
+            name: Study name
+            config: Settings that define the study (must match on resume)
+            resume: Reopen an existing study instead of creating it
+
+        Raises:
+            ValueError: If the study exists and resume is False, if it does
+                not exist and resume is True, or if the config differs
+        """
+        row = self.connection.execute(
+            "SELECT config FROM studies WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            if resume:
+                raise ValueError(f"No study named '{name}' to resume in {self.path}")
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO studies (name, config, created) VALUES (?, ?, ?)",
+                    (name, json.dumps(config, sort_keys=True), time.time()),
+                )
+            return
+        if not resume:
+            raise ValueError(
+                f"Study '{name}' already exists in {self.path}; "
+                "resume it or choose another name"
+            )
+        stored = json.loads(row["config"])
+        if stored != config:
+            changed = sorted(
+                k
+                for k in stored.keys() | config.keys()
+                if stored.get(k) != config.get(k)
+            )
+            raise ValueError(f"Cannot resume study '{name}' with different {changed}")
+
+    def has_study(self, name: str) -> bool:
+        """Check whether a study exists."""
+        row = self.connection.execute(
+            "SELECT 1 FROM studies WHERE name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def studies(self) -> list[dict]:
+        """
+        List studies with their trial counts and best fitness.
+
+        Returns:
+            List of dicts with name, config, created, trials and fitness
+        """
+        rows = self.connection.execute(
+            "SELECT s.name, s.config, s.created, COUNT(t.id) AS trials, "
+            "MAX(t.fitness) AS fitness FROM studies s "
+            "LEFT JOIN trials t ON t.study = s.name "
+            "GROUP BY s.name ORDER BY s.created"
+        ).fetchall()
+        return [{**dict(row), "config": json.loads(row["config"])} for row in rows]
+
+    def start_trial(self, study: str, number: int, hyperparameters: dict) -> int:
+        """
+        Record that a trial started.
+
+        Args:
+            study: Study name
+            number: Trial number within the study
+            hyperparameters: Trial configuration
+
+        Returns:
+            Trial id
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO trials (study, number, hyperparameters, status, started) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (study, number, json.dumps(hyperparameters), RUNNING, time.time()),
+            )
+        return cursor.lastrowid
+
+    def report(self, trial_id: int, epoch: int, score: float) -> None:
+        """
+        Record an intermediate validation score.
+
+        Args:
+            trial_id: Trial id from start_trial
+            epoch: Epochs completed
+            score: Validation score
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO metrics (trial_id, epoch, score) VALUES (?, ?, ?)",
+                (trial_id, epoch, score),
+            )
+
+    def finish_trial(self, trial_id: int, status: str, fitness: float | None) -> None:
+        """
+        Record a trial's outcome.
+
+        Args:
+            trial_id: Trial id from start_trial
+            status: One of FINISHED_STATUSES
+            fitness: Best validation score (None if the trial failed early)
+
+        Raises:
+            ValueError: If status is not a finished status
+        """
+        if status not in FINISHED_STATUSES:
+            raise ValueError(f"Unknown trial status: {status}")
+        with self.connection:
+            self.connection.execute(
+                "UPDATE trials SET status = ?, fitness = ?, finished = ? WHERE id = ?",
+                (status, fitness, time.time(), trial_id),
+            )
+
+    def add_trial(
+        self,
+        study: str,
+        number: int,
+        hyperparameters: dict,
+        status: str,
+        fitness: float | None,
+        history: list[tuple[int, float]] = (),
+    ) -> int:
+        """
+        Record an already finished trial (e.g. imported from another tuner).
+
+        Args:
+            study: Study name
+            number: Trial number within the study
+            hyperparameters: Trial configuration
+            status: One of FINISHED_STATUSES
+            fitness: Final validation score
+            history: (epoch, score) pairs
+
+        Returns:
+            Trial id
+        """
+        trial_id = self.start_trial(study, number, hyperparameters)
+        for epoch, score in history:
+            self.report(trial_id, epoch, score)
+        self.finish_trial(trial_id, status, fitness)
+        return trial_id
+
+    def trials(self, study: str | None = None) -> list[dict]:
+        """
+        List trials with their score histories.
+
+        Args:
+            study: Only this study's trials (all studies if None)
+
+        Returns:
+            List of dicts with id, study, number, hyperparameters, status,
+            fitness, started, finished and history ([epoch, score] pairs)
+        """
+        query = "SELECT * FROM trials"
+        params = ()
+        if study is not None:
+            query += " WHERE study = ?"
+            params = (study,)
+        rows = self.connection.execute(query + " ORDER BY study, number", params)
+        trials = [
+            {**dict(row), "hyperparameters": json.loads(row["hyperparameters"])}
+            for row in rows.fetchall()
+        ]
+        for trial in trials:
+            trial["history"] = [
+                [epoch, score]
+                for epoch, score in self.connection.execute(
+                    "SELECT epoch, score FROM metrics WHERE trial_id = ? ORDER BY epoch",
+                    (trial["id"],),
+                )
+            ]
+        return trials
+
+    def best_trials(self, studies: list[str] | None = None, n: int = 1) -> list[dict]:
+        """
+        Get the highest-fitness finished trials.
+
+        Args:
+            studies: Only these studies (all studies if None)
+            n: Number of trials
+
+        Returns:
+            Up to n trials, best first (same fields as trials(), without
+            history)
+        """
+        query = "SELECT * FROM trials WHERE fitness IS NOT NULL AND status != ?"
+        params = [RUNNING]
+        if studies is not None:
+            query += f" AND study IN ({', '.join('?' * len(studies))})"
+            params += list(studies)
+        rows = self.connection.execute(
+            query + " ORDER BY fitness DESC LIMIT ?", (*params, n)
+        ).fetchall()
+        return [
+            {**dict(row), "hyperparameters": json.loads(row["hyperparameters"])}
+            for row in rows
+        ]
+
+    def best_trial(self, study: str | None = None) -> dict | None:
+        """
+        Get the highest-fitness finished trial.
+
+        Args:
+            study: Only this study (all studies if None)
+
+        Returns:
+            Best trial, or None if no trial has finished
+        """
+        best = self.best_trials(None if study is None else [study], n=1)
+        return best[0] if best else None
+
+    def reset_unfinished(self, study: str) -> list[dict]:
+        """
+        Delete trials of a study that never finished (e.g. after a crash).
+
+        Args:
+            study: Study name
+
+        Returns:
+            The deleted trials, so they can be re-run
+        """
+        unfinished = [t for t in self.trials(study) if t["status"] == RUNNING]
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM trials WHERE id = ?", [(t["id"],) for t in unfinished]
+            )
+        return unfinished
+
+    def rung_scores(self, study: str, milestones: list[int]) -> dict[int, list[float]]:
+        """
+        Collect recorded scores at ASHA rung epochs, to restore a scheduler.
+
+        Args:
+            study: Study name
+            milestones: Rung epochs
+
+        Returns:
+            Mapping from rung epoch to scores recorded there
+        """
+        rungs = {epoch: [] for epoch in milestones}
+        rows = self.connection.execute(
+            "SELECT m.epoch, m.score FROM metrics m JOIN trials t ON t.id = m.trial_id "
+            "WHERE t.study = ? ORDER BY t.started",
+            (study,),
+        )
+        for epoch, score in rows:
+            if epoch in rungs:
+                rungs[epoch].append(score)
+        return {epoch: scores for epoch, scores in rungs.items() if scores}
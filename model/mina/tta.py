@@ -0,0 +1,313 @@
+"""
+Test-time augmentation (TTA) with weighted box fusion.
+
+Each image is turned into a set of views (TTA_VIEWS: horizontal flips and
+zoomed-out copies, in which small lesions cover fewer pixels and large
+ones fit the receptive field better). All views go through the model as
+one batch, their boxes are mapped back to the original image and merged
+with weighted box fusion (WBF): boxes of the same class that overlap are
+averaged, weighted by confidence, instead of all but one being dropped as
+in NMS.
+
+TTA costs roughly one batched forward pass of len(TTA_VIEWS) images per
+image. In "auto" mode it only runs when the plain pass has a box within
+TTA_MARGIN of its class threshold, i.e. when the decision is borderline.
+TTA keeps the timings of both passes, so the cost can be judged.
+"""
+
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image, ImageOps
+from ultralytics import YOLO
+
+from mina.metrics import box_iou_pairs
+
+# When TTA runs: every image, or only borderline ones
+TTA_MODES: tuple[str, ...] = ("on", "auto")
+
+# Confidence distance from a class threshold that makes a box borderline
+TTA_MARGIN: float = 0.1
+
+# Confidence floor of the augmented pass (fusion needs weak boxes too)
+TTA_MIN_CONFIDENCE: float = 0.05
+
+# Boxes of one class overlapping more than this are fused
+WBF_IOU_THRESHOLD: float = 0.55
+
+# Gray used by ultralytics' letterbox, for the padding of zoomed-out views
+PAD_VALUE: int = 114
+
+
+class View(NamedTuple):
+    """One augmented view: the image scaled by scale, then maybe mirrored."""
+
+    scale: float
+    flip: bool
+
+
+# Same scales as ultralytics' own augment=True, plus a mirrored original
+TTA_VIEWS: tuple[View, ...] = (
+    View(1.0, False),
+    View(1.0, True),
+    View(0.83, False),
+    View(0.67, True),
+)
+
+
+def make_view(image: np.ndarray, view: View) -> np.ndarray:
+    """
+    Build an augmented view of an image.
+
+    Zoomed-out views keep the original size: the shrunk image sits in the
+    top-left corner of a gray canvas, so normalized coordinates map back
+    by dividing by the scale.
+
+    Args:
+        image: (H, W, 3) uint8 image
+        view: View to build
+
+    Returns:
+        (H, W, 3) uint8 view
+    """
+    if view.scale != 1.0:
+        height, width = image.shape[:2]
+        size = (max(round(width * view.scale), 1), max(round(height * view.scale), 1))
+        shrunk = np.asarray(Image.fromarray(image).resize(size, Image.BILINEAR))
+        canvas = np.full_like(image, PAD_VALUE)
+        canvas[: size[1], : size[0]] = shrunk
+        image = canvas
+    if view.flip:
+        image = image[:, ::-1]
+    return np.ascontiguousarray(image)
+
+
+def unmap_boxes(boxes: np.ndarray, view: View) -> np.ndarray:
+    """
+    Map boxes predicted on a view back to the original image.
+
+    Args:
+        boxes: (N, 4) normalized xyxy boxes on the view
+        view: View the boxes were predicted on
+
+    Returns:
+        (N, 4) normalized xyxy boxes on the original image
+    """
+    boxes = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+    if view.flip:
+        boxes[:, [0, 2]] = 1.0 - boxes[:, [2, 0]]
+    return np.clip(boxes / view.scale, 0.0, 1.0)
+
+
+def weighted_box_fusion(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    labels: np.ndarray,
+    num_views: int = 1,
+    iou_threshold: float = WBF_IOU_THRESHOLD,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fuse overlapping boxes of the same class (weighted box fusion).
+
+    Boxes are clustered greedily in descending confidence: each box not
+    yet clustered starts a cluster with every unclustered box of its class
+    whose IoU with it exceeds iou_threshold. A cluster becomes one box,
+    the confidence-weighted mean of its members. Its score is the mean
+    member confidence scaled by min(members, num_views) / num_views, so a
+    box found in only some of the views is down-weighted.
+
+    The IoUs of all same-class pairs are computed in one vectorized call;
+    only the greedy assignment walks the cluster seeds.
+
+    Args:
+        boxes: (N, 4) xyxy boxes
+        scores: (N,) confidences
+        labels: (N,) class indices
+        num_views: Number of views the boxes were pooled from
+        iou_threshold: IoU above which boxes are fused
+
+    Returns:
+        Tuple of fused (boxes, scores, labels), by descending score
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.int64)
+    count = len(scores)
+    if count == 0:
+        return boxes, scores, labels
+
+    order = np.argsort(-scores, kind="stable")
+    boxes, scores, labels = boxes[order], scores[order], labels[order]
+
+    # IoU of every same-class pair, as a dense boolean "fusable" matrix
+    first, second = np.nonzero(labels[:, None] == labels[None, :])
+    fusable = np.zeros((count, count), dtype=bool)
+    fusable[first, second] = box_iou_pairs(boxes[first], boxes[second]) > iou_threshold
+    np.fill_diagonal(fusable, True)
+
+    cluster = np.full(count, -1)
+    for seed in range(count):
+        if cluster[seed] < 0:
+            cluster[fusable[seed] & (cluster < 0)] = seed
+
+    seeds, cluster = np.unique(cluster, return_inverse=True)
+    weight = np.bincount(cluster, weights=scores)
+    members = np.bincount(cluster)
+    fused_boxes = (
+        np.stack(
+            [np.bincount(cluster, weights=scores * boxes[:, k]) for k in range(4)],
+            axis=1,
+        )
+        / weight[:, None]
+    )
+    fused_scores = weight / members * np.minimum(members, num_views) / num_views
+    fused_labels = labels[seeds]
+
+    order = np.argsort(-fused_scores, kind="stable")
+    return fused_boxes[order], fused_scores[order], fused_labels[order]
+
+
+def load_bgr(image_path: Path) -> np.ndarray:
+    """
+    Load an image as ultralytics expects numpy inputs.
+
+    The EXIF orientation is applied, as cv2.imread does when ultralytics
+    loads a path, so the views line up with the plain pass.
+
+    Args:
+        image_path: Image file
+
+    Returns:
+        (H, W, 3) uint8 array in BGR channel order, like cv2.imread
+    """
+    with Image.open(image_path) as img:
+        image = ImageOps.exif_transpose(img).convert("RGB")
+    return np.ascontiguousarray(np.asarray(image)[..., ::-1])
+
+
+class TTA:
+    """TTA settings plus the running cost of TTA and plain inference."""
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        views: tuple[View, ...] = TTA_VIEWS,
+        margin: float = TTA_MARGIN,
+        iou_threshold: float = WBF_IOU_THRESHOLD,
+    ):
+        """
+        Args:
+            mode: "on" to augment every image, "auto" for borderline ones
+            views: Views to predict on
+            margin: Confidence distance from a threshold that is borderline
+            iou_threshold: WBF IoU threshold
+
+        Raises:
+            ValueError: If mode is not one of TTA_MODES
+        """
+        if mode not in TTA_MODES:
+            raise ValueError(f"Unknown TTA mode '{mode}'. Choose from: {TTA_MODES}")
+        self.mode = mode
+        self.views = tuple(views)
+        self.margin = margin
+        self.iou_threshold = iou_threshold
+        self.images = 0
+        self.plain = 0
+        self.augmented = 0
+        self.plain_ms = 0.0
+        self.tta_ms = 0.0
+
+    def is_borderline(self, scores: np.ndarray, thresholds: np.ndarray) -> bool:
+        """
+        Check whether a plain pass is close to a decision.
+
+        Args:
+            scores: (N,) confidences of the plain pass
+            thresholds: (N,) confidence threshold of each box's class
+
+        Returns:
+            True if any box is within margin of its threshold
+        """
+        return bool(np.any(np.abs(np.asarray(scores) - thresholds) <= self.margin))
+
+    def record(self, plain_ms: float | None, tta_ms: float | None) -> None:
+        """
+        Count one image's passes.
+
+        Args:
+            plain_ms: Time of the plain pass (None if it was skipped)
+            tta_ms: Time of the augmented pass (None if it was skipped)
+        """
+        self.images += 1
+        if plain_ms is not None:
+            self.plain += 1
+            self.plain_ms += plain_ms
+        if tta_ms is not None:
+            self.augmented += 1
+            self.tta_ms += tta_ms
+
+    def predict(
+        self,
+        model: YOLO,
+        image_path: Path,
+        nms_iou: float | None = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """
+        Predict on all views of an image in one batch and fuse the boxes.
+
+        Args:
+            model: Loaded YOLO model
+            image_path: Image file
+            nms_iou: NMS IoU for each view (ultralytics default if None)
+
+        Returns:
+            Tuple of fused (boxes as normalized xyxy, scores, class indices)
+            and the wall time in milliseconds
+        """
+        start = time.perf_counter()
+        image = load_bgr(image_path)
+        kwargs = {"conf": TTA_MIN_CONFIDENCE, "verbose": False}
+        if nms_iou is not None:
+            kwargs["iou"] = nms_iou
+        results = model([make_view(image, view) for view in self.views], **kwargs)
+
+        boxes, scores, labels = [], [], []
+        for result, view in zip(results, self.views, strict=True):
+            if result.boxes is None or len(result.boxes) == 0:
+                continue
+            boxes.append(unmap_boxes(result.boxes.xyxyn.cpu().numpy(), view))
+            scores.append(result.boxes.conf.cpu().numpy())
+            labels.append(result.boxes.cls.cpu().numpy())
+        if boxes:
+            fused = weighted_box_fusion(
+                np.concatenate(boxes),
+                np.concatenate(scores),
+                np.concatenate(labels),
+                num_views=len(self.views),
+                iou_threshold=self.iou_threshold,
+            )
+        else:
+            fused = (np.zeros((0, 4)), np.zeros(0), np.zeros(0, dtype=np.int64))
+
+        return *fused, (time.perf_counter() - start) * 1000
+
+    def summary(self) -> str:
+        """
+        Describe how often TTA ran and what it cost.
+
+        Returns:
+            One line with the augmented share and mean times per image
+        """
+        line = (
+            f"TTA ({self.mode}, {len(self.views)} views): "
+            f"{self.augmented}/{self.images} images"
+        )
+        if self.augmented:
+            line += f", {self.tta_ms / self.augmented:.1f} ms per augmented image"
+        if self.plain:
+            line += f" vs {self.plain_ms / self.plain:.1f} ms plain"
+        if self.images:
+            line += f", +{self.tta_ms / self.images:.1f} ms per image overall"
+        return line
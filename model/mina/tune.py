@@ -1,16 +1,807 @@
 """
-Hyperparameter tuning using YOLOv8's built-in tune() method.
+Hyperparameter tuning.
+
+Two tuners are available:
+
+- tune_hyperparameters: YOLOv8's built-in tune(), an evolutionary search
+  that trains every iteration for the full epoch budget, one at a time.
+- tune_asha: a local scheduler that runs several random-search trials at
+  once in a process pool and stops poor trials early with asynchronous
+  successive halving (ASHA). At each rung (e.g. epochs 3, 9 and 27) a trial
+  continues only if its val mAP50-95 is in the top 1/reduction_factor of
+  the trials that reached that rung before it, so most of the epoch
+  budget goes to promising configurations.
+- tune_multifidelity: ASHA on a cheap proxy (a class-stratified subset of
+  the train split at a reduced image size), after which only the best
+  proxy configurations are retrained at full fidelity. The rank
+  correlation between proxy and full-fidelity results is reported, so the
+  proxy can be trusted (or not) for the next study.
+
+All three record every trial in the SQLite trial store (mina.trials), which
+supports resuming studies, warm-starting new ones from earlier results and
+querying the best hyperparameters.
 """
 
+import json
+import math
+import multiprocessing
+import os
+import time
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
+from typing import ClassVar
 
+import numpy as np
+import yaml
+from scipy.stats import spearmanr
 from ultralytics import YOLO
+from ultralytics.models.yolo.detect import DetectionTrainer
+from ultralytics.utils.files import increment_path
 
+from mina.calibration import select_calibration_images
 from mina.core.constants import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_IMAGE_SIZE,
     DEFAULT_TUNE_EPOCHS,
     DEFAULT_TUNE_ITERATIONS,
+    DEFAULT_WORKERS,
+    RUNS_DIR,
+    STUDIES_DIR,
+    TUNE_EPOCHS_RANGE,
+    TUNE_ITERATIONS_RANGE,
 )
-from mina.train import get_data_yaml_path
+from mina.core.dataset import resolve_split_images
+from mina.train import get_data_yaml_path, get_device
+from mina.trials import TRIALS_DB, TrialStore
+
+# Validation metric trials are ranked by
+TUNE_METRIC: str = "metrics/mAP50-95(B)"
+
+# ASHA: first rung after this many epochs, each next rung reduction_factor
+# times later; only the top 1/reduction_factor of trials pass a rung
+ASHA_GRACE_EPOCHS: int = 3
+ASHA_REDUCTION_FACTOR: int = 3
+
+# Trials running at once
+DEFAULT_TUNE_PARALLEL: int = 2
+
+# Study name used when none is given
+DEFAULT_STUDY: str = "asha"
+
+# Best earlier configurations tried first when warm-starting a study
+WARM_START_TRIALS: int = 5
+
+# Multi-fidelity: proxy trials train on this share of the train split at
+# this image size, then the best proxy configurations are promoted
+PROXY_FRACTION: float = 0.25
+PROXY_IMAGE_SIZE: int = 320
+PROMOTE_TRIALS: int = 5
+
+# Search space: name -> (min, max, log scale). Ranges follow ultralytics'
+# tuner defaults, restricted to settings relevant to box detection.
+SEARCH_SPACE: dict[str, tuple[float, float, bool]] = {
+    "lr0": (1e-5, 1e-2, True),
+    "lrf": (0.01, 1.0, False),
+    "momentum": (0.7, 0.98, False),
+    "weight_decay": (0.0, 0.001, False),
+    "warmup_epochs": (0.0, 5.0, False),
+    "box": (1.0, 20.0, False),
+    "cls": (0.1, 4.0, False),
+    "dfl": (0.4, 12.0, False),
+    "hsv_h": (0.0, 0.1, False),
+    "hsv_s": (0.0, 0.9, False),
+    "hsv_v": (0.0, 0.9, False),
+    "degrees": (0.0, 45.0, False),
+    "translate": (0.0, 0.9, False),
+    "scale": (0.0, 0.95, False),
+    "flipud": (0.0, 1.0, False),
+    "fliplr": (0.0, 1.0, False),
+    "mosaic": (0.0, 1.0, False),
+    "mixup": (0.0, 1.0, False),
+}
+
+
+def validate_tune_budget(epochs: int, iterations: int) -> None:
+    """
+    Check tuning epochs and iterations against their allowed ranges.
+
+    Args:
+        epochs: Training epochs per iteration
+        iterations: Total tuning iterations
+
+    Raises:
+        ValueError: If either is out of range
+    """
+    low, high = TUNE_EPOCHS_RANGE
+    if not low <= epochs <= high:
+        raise ValueError(f"epochs must be in [{low}, {high}], got {epochs}")
+    low, high = TUNE_ITERATIONS_RANGE
+    if not low <= iterations <= high:
+        raise ValueError(f"iterations must be in [{low}, {high}], got {iterations}")
+
+
+def sample_hyperparameters(
+    rng: np.random.Generator,
+    space: dict[str, tuple[float, float, bool]] = SEARCH_SPACE,
+) -> dict[str, float]:
+    """
+    Draw one configuration uniformly (or log-uniformly) from a search space.
+
+    Args:
+        rng: Random generator
+        space: Search space, see SEARCH_SPACE
+
+    Returns:
+        Hyperparameter values
+    """
+    values = {}
+    for name, (low, high, log) in space.items():
+        if log:
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        values[name] = round(float(value), 6)
+    return values
+
+
+def asha_milestones(
+    max_epochs: int,
+    grace_epochs: int = ASHA_GRACE_EPOCHS,
+    reduction_factor: int = ASHA_REDUCTION_FACTOR,
+) -> list[int]:
+    """
+    Epochs at which ASHA decides whether a trial continues.
+
+    Args:
+        max_epochs: Full epoch budget of a trial
+        grace_epochs: Epochs before the first decision
+        reduction_factor: Growth factor between rungs
+
+    Returns:
+        Increasing rung epochs, all below max_epochs
+    """
+    milestones = []
+    epoch = grace_epochs
+    while epoch < max_epochs:
+        milestones.append(epoch)
+        epoch *= reduction_factor
+    return milestones
+
+
+class ASHAScheduler:
+    """
+    Asynchronous successive halving over intermediate validation scores.
+
+    Rung scores are kept in a mapping that can be shared between processes
+    (e.g. a multiprocessing.Manager dict with a Manager lock), so trials in
+    different workers are compared against each other as they report.
+    """
+
+    def __init__(
+        self,
+        max_epochs: int,
+        grace_epochs: int = ASHA_GRACE_EPOCHS,
+        reduction_factor: int = ASHA_REDUCTION_FACTOR,
+        rungs: MutableMapping | None = None,
+        lock=None,
+    ):
+        if reduction_factor < 2:
+            raise ValueError(f"reduction_factor must be >= 2, got {reduction_factor}")
+        self.milestones = asha_milestones(max_epochs, grace_epochs, reduction_factor)
+        self.reduction_factor = reduction_factor
+        self.rungs = {} if rungs is None else rungs
+        self.lock = nullcontext() if lock is None else lock
+
+    def report(self, epoch: int, score: float) -> bool:
+        """
+        Record a trial's score after an epoch and decide whether it continues.
+
+        Args:
+            epoch: Epochs completed (1-based)
+            score: Validation score, higher is better
+
+        Returns:
+            False if the trial should stop
+        """
+        if epoch not in self.milestones:
+            return True
+        with self.lock:
+            recorded = list(self.rungs.get(epoch, []))
+            self.rungs[epoch] = [*recorded, score]
+        if not recorded:
+            return True
+        cutoff = np.percentile(recorded, (1 - 1 / self.reduction_factor) * 100)
+        return score >= cutoff
+
+
+class ASHATrainer(DetectionTrainer):
+    """Detection trainer that reports each epoch's val mAP to an ASHA scheduler."""
+
+    asha: ClassVar[ASHAScheduler | None] = None
+    history: ClassVar[list[list]] = []
+    store: ClassVar[TrialStore | None] = None
+    trial_id: ClassVar[int | None] = None
+
+    def validate(self):
+        """Validate, record the score and stop if the scheduler says so."""
+        metrics, fitness = super().validate()
+        if metrics is not None:
+            epoch = self.epoch + 1
+            score = float(metrics.get(TUNE_METRIC, 0.0))
+            self.history.append([epoch, score])
+            if self.store is not None:
+                self.store.report(self.trial_id, epoch, score)
+            if not self.asha.report(epoch, score):
+                self.stop = True
+        return metrics, fitness
+
+
+def _init_trial_worker(threads: int) -> None:
+    """Split CPU threads between concurrently running trials."""
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def run_trial(
+    trial: int,
+    hyperparameters: dict[str, float],
+    scheduler: ASHAScheduler,
+    store_path: Path,
+    study: str,
+    data_yaml: Path,
+    project: Path,
+    epochs: int,
+    imgsz: int,
+    batch: int,
+    device: str,
+    workers: int,
+    optimizer: str = "AdamW",
+    pretrained: str = "yolov8n.pt",
+) -> dict:
+    """
+    Train one tuning trial, reporting val mAP to the scheduler every epoch.
+
+    The trial, its per-epoch scores and its outcome are written to the
+    trial store as they happen.
+
+    Args:
+        trial: Trial number (names the run directory)
+        hyperparameters: Hyperparameter values for this trial
+        scheduler: Shared ASHA scheduler
+        store_path: Trial database
+        study: Study the trial belongs to
+        data_yaml: Dataset config
+        project: Directory for trial runs
+        epochs: Full epoch budget
+        imgsz: Training image size
+        batch: Batch size
+        device: Training device
+        workers: Data-loader workers
+        optimizer: Optimizer type (an explicit one, so lr0 is honored)
+        pretrained: Model to start from
+
+    Returns:
+        Dictionary with trial, hyperparameters, history ([epoch, score]
+        pairs), status ("completed", "stopped" or "failed") and fitness
+        (best score)
+    """
+    history = []
+    with TrialStore(store_path) as store:
+        trial_id = store.start_trial(study, trial, hyperparameters)
+        trainer = type(
+            "ASHATrainer",
+            (ASHATrainer,),
+            {
+                "asha": scheduler,
+                "history": history,
+                "store": store,
+                "trial_id": trial_id,
+            },
+        )
+        model = YOLO(pretrained)
+
+        status = "completed"
+        try:
+            model.train(
+                data=str(data_yaml),
+                epochs=epochs,
+                imgsz=imgsz,
+                batch=batch,
+                device=device,
+                workers=workers,
+                optimizer=optimizer,
+                project=str(project),
+                name=f"trial{trial}",
+                exist_ok=True,
+                val=True,
+                plots=False,
+                verbose=False,
+                trainer=trainer,
+                **hyperparameters,
+            )
+        except (RuntimeError, ValueError, OSError) as e:  # e.g. out of memory, NaN loss
+            print(f"Trial {trial} failed: {e}")
+            status = "failed"
+
+        if status == "completed" and history and history[-1][0] < epochs:
+            status = "stopped"
+        fitness = max((score for _, score in history), default=None)
+        store.finish_trial(trial_id, status, fitness)
+
+    return {
+        "trial": trial,
+        "hyperparameters": hyperparameters,
+        "history": history,
+        "status": status,
+        "fitness": fitness or 0.0,
+    }
+
+
+def tune_asha(
+    data: str | None = None,
+    epochs: int = DEFAULT_TUNE_EPOCHS,
+    iterations: int = DEFAULT_TUNE_ITERATIONS,
+    parallel: int = DEFAULT_TUNE_PARALLEL,
+    optimizer: str = "AdamW",
+    device: str | None = None,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    batch: int = DEFAULT_BATCH_SIZE,
+    grace_epochs: int = ASHA_GRACE_EPOCHS,
+    reduction_factor: int = ASHA_REDUCTION_FACTOR,
+    seed: int = 0,
+    study: str = DEFAULT_STUDY,
+    resume: bool = False,
+    warm_start: list[str] | None = None,
+    store_path: Path | None = None,
+    output_dir: Path | None = None,
+    pretrained: str = "yolov8n.pt",
+    hyperparameters: list[dict[str, float]] | None = None,
+) -> Path:
+    """
+    Tune hyperparameters with parallel random-search trials and ASHA.
+
+    Every trial is persisted to the trial store (mina.trials). Resuming a
+    study skips its finished trials, re-runs the ones that were interrupted
+    and restores the ASHA rung scores, so no finished training is repeated.
+
+    Args:
+        data: Path to data.yaml (auto-detected if None)
+        epochs: Full epoch budget of a trial
+        iterations: Number of trials
+        parallel: Trials running at once
+        optimizer: Optimizer type
+        device: Device(s), e.g. "cpu", "0" or "0,1" (trials are spread
+            round-robin over several GPUs; None for auto-detect)
+        imgsz: Training image size
+        batch: Batch size per trial
+        grace_epochs: Epochs before the first early-stopping decision
+        reduction_factor: Only the top 1/reduction_factor of trials pass
+            each rung
+        seed: Random seed for sampling configurations
+        study: Study name in the trial store
+        resume: Continue an existing study
+        warm_start: Studies whose best configurations are tried first
+            (up to WARM_START_TRIALS)
+        store_path: Trial database (default: mina.trials.TRIALS_DB)
+        output_dir: Where trial runs and results go (default:
+            STUDIES_DIR/<study>)
+        pretrained: Model every trial starts from
+        hyperparameters: Configurations to train instead of random samples
+            (iterations is then ignored)
+
+    Returns:
+        Path to best hyperparameters file (usable with mina-train --hyp)
+
+    Raises:
+        ValueError: If epochs or iterations are out of range, if the study
+            exists and resume is False, or if a resumed study's settings
+            differ
+        FileNotFoundError: If data.yaml is not found
+    """
+    if hyperparameters is None:
+        validate_tune_budget(epochs, iterations)
+    else:
+        iterations = len(hyperparameters)
+
+    if data is None:
+        data_yaml = get_data_yaml_path()
+    else:
+        data_yaml = Path(data)
+        if not data_yaml.exists():
+            raise FileNotFoundError(f"data.yaml not found at: {data_yaml}")
+
+    if device is None:
+        device = get_device()
+    devices = device.split(",")
+    store_path = Path(store_path or TRIALS_DB)
+    output_dir = output_dir or STUDIES_DIR / study
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    cpu_count = os.cpu_count() or 1
+    threads = max(cpu_count // parallel, 1)
+    workers = min(DEFAULT_WORKERS, threads)
+    milestones = asha_milestones(epochs, grace_epochs, reduction_factor)
+
+    config = {
+        "data": str(data_yaml.resolve()),
+        "epochs": epochs,
+        "iterations": iterations,
+        "imgsz": imgsz,
+        "batch": batch,
+        "optimizer": optimizer,
+        "grace_epochs": grace_epochs,
+        "reduction_factor": reduction_factor,
+        "seed": seed,
+        "pretrained": pretrained,
+    }
+
+    if hyperparameters is not None:
+        config["hyperparameters"] = hyperparameters
+        configs = list(hyperparameters)
+    else:
+        # Drawn up front, so a resumed study samples the same configurations
+        rng = np.random.default_rng(seed)
+        configs = [sample_hyperparameters(rng) for _ in range(iterations)]
+
+    with TrialStore(store_path) as store:
+        store.create_study(study, config, resume=resume)
+        if warm_start:
+            best = store.best_trials(warm_start, n=WARM_START_TRIALS)
+            configs[: len(best)] = [t["hyperparameters"] for t in best]
+            print(f"Warm-starting from {len(best)} trials of {warm_start}")
+        for trial in store.reset_unfinished(study):
+            configs[trial["number"]] = trial["hyperparameters"]
+        done = {t["number"] for t in store.trials(study)}
+        rungs = store.rung_scores(study, milestones)
+
+    pending = [n for n in range(iterations) if n not in done]
+
+    print(f"Using dataset config: {data_yaml}")
+    print(f"Starting ASHA hyperparameter tuning (study '{study}')...")
+    print(f"  Trials: {iterations} ({parallel} at a time on {device})")
+    if done:
+        print(f"  Resuming: {len(done)} trials already finished")
+    print(f"  Epochs per trial: up to {epochs}")
+    print(f"  Rungs: {milestones}")
+
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        scheduler = ASHAScheduler(
+            epochs,
+            grace_epochs,
+            reduction_factor,
+            rungs=manager.dict(rungs),
+            lock=manager.Lock(),
+        )
+        with ProcessPoolExecutor(
+            max_workers=parallel,
+            mp_context=context,
+            initializer=_init_trial_worker,
+            initargs=(threads,),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    run_trial,
+                    trial,
+                    configs[trial],
+                    scheduler,
+                    store_path,
+                    study,
+                    data_yaml,
+                    output_dir / "trials",
+                    epochs,
+                    imgsz,
+                    batch,
+                    devices[trial % len(devices)],
+                    workers,
+                    optimizer,
+                    pretrained,
+                )
+                for trial in pending
+            ]
+            for finished, future in enumerate(as_completed(futures), len(done) + 1):
+                result = future.result()
+                epochs_run = result["history"][-1][0] if result["history"] else 0
+                print(
+                    f"[{finished}/{iterations}] trial {result['trial']}: "
+                    f"{result['status']} after {epochs_run} epochs, "
+                    f"mAP50-95 {result['fitness']:.4f}"
+                )
+
+    with TrialStore(store_path) as store:
+        trials = store.trials(study)
+        best = store.best_trial(study)
+    if best is None:
+        raise RuntimeError(f"All trials of study '{study}' failed")
+
+    best_hyp_path = output_dir / "best_hyperparameters.yaml"
+    with open(best_hyp_path, "w") as f:
+        yaml.safe_dump(best["hyperparameters"], f, sort_keys=False)
+
+    epochs_spent = sum(t["history"][-1][0] for t in trials if t["history"])
+    print("\nTuning complete!")
+    print(f"Best trial: {best['number']} (mAP50-95 {best['fitness']:.4f})")
+    print(
+        f"Epochs trained: {epochs_spent} of {epochs * iterations} "
+        "without early stopping"
+    )
+    print(f"Trial database: {store_path}")
+    print(f"Best hyperparameters: {best_hyp_path}")
+
+    return best_hyp_path
+
+
+def build_proxy_yaml(
+    data_yaml: Path,
+    output_dir: Path,
+    fraction: float = PROXY_FRACTION,
+    seed: int = 0,
+) -> Path:
+    """
+    Write a data.yaml for a class-stratified subset of the train split.
+
+    The subset is picked like an int8 calibration set (see
+    mina.calibration), so rare classes and unusual box layouts stay
+    represented. Validation uses the full val split, so proxy scores are
+    measured on the same images as full-fidelity ones.
+
+    Args:
+        data_yaml: Dataset config
+        output_dir: Where the image lists and data.yaml are written
+        fraction: Share of train images to keep
+        seed: Random seed for the selection
+
+    Returns:
+        Path to the proxy data.yaml
+
+    Raises:
+        ValueError: If fraction is not in (0, 1] or a split has no images
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError(f"fraction must be in (0, 1], got {fraction}")
+
+    train_images = resolve_split_images(data_yaml, "train")
+    val_images = resolve_split_images(data_yaml, "val")
+    if not train_images or not val_images:
+        raise ValueError(f"No train or val images found for {data_yaml}")
+
+    size = max(round(len(train_images) * fraction), 1)
+    selected = select_calibration_images(train_images, size, seed)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, images in (("train.txt", selected), ("val.txt", val_images)):
+        (output_dir / name).write_text("".join(f"{p.resolve()}\n" for p in images))
+
+    data = yaml.safe_load(Path(data_yaml).read_text()) or {}
+    content = {
+        "path": str(output_dir.resolve()),
+        "train": "train.txt",
+        "val": "val.txt",
+        "names": data.get("names"),
+        "nc": data.get("nc"),
+    }
+    proxy_yaml = output_dir / "data.yaml"
+    proxy_yaml.write_text(
+        f"# {len(selected)}/{len(train_images)} train images of "
+        f"{Path(data_yaml).resolve()}\n" + yaml.safe_dump(content, sort_keys=False)
+    )
+    return proxy_yaml
+
+
+def rank_correlation(proxy: list[float], full: list[float]) -> float:
+    """
+    Spearman rank correlation between proxy and full-fidelity scores.
+
+    Args:
+        proxy: Proxy score of each configuration
+        full: Full-fidelity score of the same configurations
+
+    Returns:
+        Correlation in [-1, 1], or NaN if there are fewer than two
+        configurations or either side has no spread
+    """
+    if len(proxy) < 2 or len(set(proxy)) < 2 or len(set(full)) < 2:
+        return float("nan")
+    return float(spearmanr(proxy, full).statistic)
+
+
+def tune_multifidelity(
+    data: str | None = None,
+    epochs: int = DEFAULT_TUNE_EPOCHS,
+    iterations: int = DEFAULT_TUNE_ITERATIONS,
+    parallel: int = DEFAULT_TUNE_PARALLEL,
+    optimizer: str = "AdamW",
+    device: str | None = None,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    batch: int = DEFAULT_BATCH_SIZE,
+    grace_epochs: int = ASHA_GRACE_EPOCHS,
+    reduction_factor: int = ASHA_REDUCTION_FACTOR,
+    seed: int = 0,
+    study: str = DEFAULT_STUDY,
+    resume: bool = False,
+    store_path: Path | None = None,
+    pretrained: str = "yolov8n.pt",
+    proxy_fraction: float = PROXY_FRACTION,
+    proxy_imgsz: int = PROXY_IMAGE_SIZE,
+    promote: int = PROMOTE_TRIALS,
+) -> Path:
+    """
+    Tune with ASHA on a low-fidelity proxy, then promote the best configurations.
+
+    All iterations run as an ASHA study "<study>-proxy" on a stratified
+    proxy_fraction of the train split at proxy_imgsz, so an epoch costs
+    roughly proxy_fraction * (proxy_imgsz / imgsz)^2 of a full one. The
+    best `promote` configurations are then trained to the full epoch budget
+    on the full data at imgsz, without early stopping, as study
+    "<study>-full". The Spearman rank correlation between their proxy and
+    full-fidelity scores is printed and saved to fidelity.yaml.
+
+    Args:
+        data: Path to data.yaml (auto-detected if None)
+        epochs: Full epoch budget of a trial (both stages)
+        iterations: Number of proxy trials
+        parallel: Trials running at once
+        optimizer: Optimizer type
+        device: Device(s), see tune_asha
+        imgsz: Full-fidelity image size
+        batch: Batch size per trial
+        grace_epochs: Epochs before the first early-stopping decision
+        reduction_factor: Only the top 1/reduction_factor of proxy trials
+            pass each rung
+        seed: Random seed for sampling configurations and the subset
+        study: Study name prefix in the trial store
+        resume: Continue an interrupted multi-fidelity study
+        store_path: Trial database (default: mina.trials.TRIALS_DB)
+        pretrained: Model every trial starts from
+        proxy_fraction: Share of train images used by proxy trials
+        proxy_imgsz: Image size of proxy trials
+        promote: Number of configurations retrained at full fidelity
+
+    Returns:
+        Path to the best full-fidelity hyperparameters file
+
+    Raises:
+        ValueError: If promote is below 1, if proxy_fraction is not in
+            (0, 1], or for the reasons tune_asha raises
+        FileNotFoundError: If data.yaml is not found
+    """
+    if promote < 1:
+        raise ValueError(f"promote must be >= 1, got {promote}")
+    validate_tune_budget(epochs, iterations)
+
+    if data is None:
+        data_yaml = get_data_yaml_path()
+    else:
+        data_yaml = Path(data)
+        if not data_yaml.exists():
+            raise FileNotFoundError(f"data.yaml not found at: {data_yaml}")
+
+    store_path = Path(store_path or TRIALS_DB)
+    study_dir = STUDIES_DIR / study
+    proxy_study, full_study = f"{study}-proxy", f"{study}-full"
+    proxy_yaml = build_proxy_yaml(
+        data_yaml, study_dir / "proxy_data", proxy_fraction, seed
+    )
+    common = {
+        "epochs": epochs,
+        "optimizer": optimizer,
+        "device": device,
+        "batch": batch,
+        "seed": seed,
+        "store_path": store_path,
+        "pretrained": pretrained,
+    }
+
+    print(
+        f"Proxy fidelity: {proxy_fraction:.0%} of train images at imgsz {proxy_imgsz}"
+    )
+    start = time.perf_counter()
+    tune_asha(
+        data=str(proxy_yaml),
+        iterations=iterations,
+        parallel=parallel,
+        imgsz=proxy_imgsz,
+        grace_epochs=grace_epochs,
+        reduction_factor=reduction_factor,
+        study=proxy_study,
+        resume=resume,
+        output_dir=study_dir / "proxy",
+        **common,
+    )
+    proxy_seconds = time.perf_counter() - start
+
+    with TrialStore(store_path) as store:
+        promoted = store.best_trials([proxy_study], n=promote)
+        resume_full = resume and store.has_study(full_study)
+
+    print(f"\nPromoting {len(promoted)} configurations to imgsz {imgsz}")
+    start = time.perf_counter()
+    best_hyp_path = tune_asha(
+        data=str(data_yaml),
+        parallel=min(parallel, len(promoted)),
+        imgsz=imgsz,
+        # No rung below the full budget: promoted trials always finish
+        grace_epochs=epochs,
+        study=full_study,
+        resume=resume_full,
+        output_dir=study_dir / "full",
+        hyperparameters=[t["hyperparameters"] for t in promoted],
+        **common,
+    )
+    full_seconds = time.perf_counter() - start
+
+    with TrialStore(store_path) as store:
+        full_fitness = {t["number"]: t["fitness"] for t in store.trials(full_study)}
+    pairs = [
+        (t["number"], t["fitness"], full_fitness[i])
+        for i, t in enumerate(promoted)
+        if full_fitness.get(i) is not None
+    ]
+    correlation = rank_correlation([p for _, p, _ in pairs], [f for _, _, f in pairs])
+
+    print(f"\n{'Proxy trial':>11} {'Proxy mAP':>10} {'Full mAP':>10}")
+    print("-" * 33)
+    for number, proxy, full in pairs:
+        print(f"{number:>11d} {proxy:>10.4f} {full:>10.4f}")
+    print(f"Spearman rank correlation: {correlation:.3f}")
+    print(
+        f"Proxy stage: {proxy_seconds / 60:.1f} min, full stage: {full_seconds / 60:.1f} min"
+    )
+
+    report = {
+        "proxy_fraction": proxy_fraction,
+        "proxy_imgsz": proxy_imgsz,
+        "imgsz": imgsz,
+        "spearman": None if math.isnan(correlation) else round(correlation, 4),
+        "trials": [
+            {"proxy_trial": number, "proxy": proxy, "full": full}
+            for number, proxy, full in pairs
+        ],
+    }
+    with open(study_dir / "fidelity.yaml", "w") as f:
+        yaml.safe_dump(report, f, sort_keys=False)
+
+    return best_hyp_path
+
+
+def record_ultralytics_results(tune_dir: Path, store_path: Path | None = None) -> str:
+    """
+    Copy the ultralytics tuner's results into the trial store.
+
+    Iterations already in the store are skipped, so this can run after
+    every (possibly resumed) tuning run.
+
+    Args:
+        tune_dir: ultralytics tune directory (with tune_results.ndjson)
+        store_path: Trial database (default: mina.trials.TRIALS_DB)
+
+    Returns:
+        Study name the iterations are stored under
+    """
+    study = f"ultralytics-{tune_dir.name}"
+    results_file = tune_dir / "tune_results.ndjson"
+    records = []
+    if results_file.exists():
+        with open(results_file) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    with TrialStore(store_path) as store:
+        config = {"tuner": "ultralytics", "tune_dir": str(tune_dir.resolve())}
+        store.create_study(study, config, resume=store.has_study(study))
+        recorded = {t["number"] for t in store.trials(study)}
+        for record in records:
+            if record["iteration"] not in recorded:
+                store.add_trial(
+                    study,
+                    record["iteration"],
+                    record["hyperparameters"],
+                    "completed",
+                    record["fitness"],
+                )
+    return study
 
 
 def tune_hyperparameters(
@@ -18,21 +809,36 @@ def tune_hyperparameters(
     epochs: int = DEFAULT_TUNE_EPOCHS,
     iterations: int = DEFAULT_TUNE_ITERATIONS,
     optimizer: str = "AdamW",
-    device: str = "0",
+    device: str | None = None,
+    resume: bool = False,
+    store_path: Path | None = None,
 ) -> Path:
     """
     Tune YOLOv8 hyperparameters using Ray Tune.
 
+    Results go to RUNS_DIR/tune (tune2, tune3, ... for later runs). Every
+    iteration is also copied into the trial store, even if tuning crashes.
+
     Args:
         data: Path to data.yaml (auto-detected if None)
         epochs: Training epochs per iteration
         iterations: Total tuning iterations
         optimizer: Optimizer type
-        device: Device to use
+        device: Device to use (None for auto-detect)
+        resume: Continue the latest run in RUNS_DIR/tune from its
+            last finished iteration
+        store_path: Trial database (default: mina.trials.TRIALS_DB)
 
     Returns:
         Path to best hyperparameters file
+
+    Raises:
+        ValueError: If epochs or iterations are out of range
+        FileNotFoundError: If data.yaml is not found, or if resume is set
+            and there is no run to resume
     """
+    validate_tune_budget(epochs, iterations)
+
     if data is None:
         data_yaml = get_data_yaml_path()
     else:
@@ -40,31 +846,87 @@ def tune_hyperparameters(
         if not data_yaml.exists():
             raise FileNotFoundError(f"data.yaml not found at: {data_yaml}")
 
+    if device is None:
+        device = get_device()
+
+    if resume:
+        runs = sorted(RUNS_DIR.glob("tune*/tune_results.ndjson"), key=os.path.getmtime)
+        if not runs:
+            raise FileNotFoundError(f"No tuning run to resume in {RUNS_DIR}")
+        tune_dir = runs[-1].parent
+    else:
+        tune_dir = increment_path(RUNS_DIR / "tune")
+
     print(f"Using dataset config: {data_yaml}")
     print("Starting hyperparameter tuning...")
     print(f"  Epochs per iteration: {epochs}")
     print(f"  Total iterations: {iterations}")
     print(f"  Optimizer: {optimizer}")
+    if resume:
+        print(f"  Resuming: {tune_dir}")
 
     model = YOLO("yolov8n.pt")
 
-    model.tune(
-        data=str(data_yaml),
-        epochs=epochs,
-        iterations=iterations,
-        optimizer=optimizer,
-        device=device,
-        plots=True,
-        save=True,
-        val=True,
-    )
+    try:
+        model.tune(
+            data=str(data_yaml),
+            epochs=epochs,
+            iterations=iterations,
+            optimizer=optimizer,
+            device=device,
+            project=str(RUNS_DIR),
+            name=tune_dir.name,
+            resume=resume,
+            plots=True,
+            save=True,
+            val=True,
+        )
+    finally:
+        study = record_ultralytics_results(tune_dir, store_path)
 
-    # Ultralytics saves tuning results under runs/detect/tune/ by default
-    tune_dir = Path("runs/detect/tune")
     best_hyp_path = tune_dir / "best_hyperparameters.yaml"
 
     print("\nTuning complete!")
     print(f"Results saved to: {tune_dir}")
+    print(f"Trial database: {store_path or TRIALS_DB} (study '{study}')")
     print(f"Best hyperparameters: {best_hyp_path}")
 
     return best_hyp_path
+
+
+def print_studies(store_path: Path | None = None) -> None:
+    """Print every study in the trial store with its trial count and best mAP."""
+    with TrialStore(store_path) as store:
+        studies = store.studies()
+    if not studies:
+        print("No tuning studies recorded yet")
+        return
+    print(f"\n{'Study':<30} {'Trials':>7} {'Best mAP50-95':>14}")
+    print("-" * 53)
+    for study in studies:
+        fitness = "-" if study["fitness"] is None else f"{study['fitness']:.4f}"
+        print(f"{study['name']:<30} {study['trials']:>7d} {fitness:>14}")
+
+
+def print_best_trial(study: str | None = None, store_path: Path | None = None) -> None:
+    """
+    Print the best trial's hyperparameters as YAML (usable with --hyp).
+
+    Args:
+        study: Only this study (all studies if None)
+        store_path: Trial database (default: mina.trials.TRIALS_DB)
+
+    Raises:
+        ValueError: If no trial has finished
+    """
+    with TrialStore(store_path) as store:
+        best = store.best_trial(study)
+    if best is None:
+        raise ValueError(
+            "No finished trials" + (f" in study '{study}'" if study else "")
+        )
+    print(
+        f"# study '{best['study']}', trial {best['number']}, "
+        f"mAP50-95 {best['fitness']:.4f}"
+    )
+    print(yaml.safe_dump(best["hyperparameters"], sort_keys=False), end="")
@@ -0,0 +1,374 @@
+"""
+Post-export verification: compare an exported model against its .pt source.
+
+Both models run on the same fixed subset of held-out images. Detections
+from the export are matched to the source detections by IoU (ignoring
+class), and the gate checks how many source detections are recovered,
+how well matched boxes overlap, how much their confidences drift and how
+often their classes agree. Detections come from a small pool of CPU
+model instances, each working through its share of the images; latency is
+timed separately, one model and one image at a time, so the instances do
+not compete for the cores being measured.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from mina.core.constants import (
+    DEFAULT_CONFIDENCE_THRESHOLD,
+    DEFAULT_IMAGE_SIZE,
+    DEFAULT_IOU_THRESHOLD,
+    TEST_DATA_DIR,
+)
+from mina.metrics import LabelArrays, PredictionArrays, box_iou_pairs, candidate_pairs
+from mina.predictions import list_images, predict_images, predict_timed
+
+# Number of held-out images used for verification
+VERIFY_IMAGES: int = 64
+
+# IoU needed for an exported detection to count as the same box
+VERIFY_MATCH_IOU: float = 0.5
+
+
+class VerifyThresholds(NamedTuple):
+    """Limits an export must stay within to pass verification."""
+
+    min_match_rate: float = 0.9  # source detections recovered by the export
+    min_mean_iou: float = 0.85  # mean IoU of matched boxes
+    max_confidence_delta: float = 0.05  # mean |confidence difference|
+    min_class_agreement: float = 0.95  # matched boxes with the same class
+    max_latency_ratio: float | None = None  # export / source median latency
+
+
+def select_verify_images(
+    images_dir: Path | None = None, count: int = VERIFY_IMAGES
+) -> list[Path]:
+    """
+    Pick a fixed, evenly spaced subset of held-out images.
+
+    Args:
+        images_dir: Directory of images. Defaults to TEST_DATA_DIR/images.
+        count: Number of images to pick
+
+    Returns:
+        List of image paths (the same on every run for the same directory)
+
+    Raises:
+        ValueError: If the directory has no images
+    """
+    if images_dir is None:
+        images_dir = TEST_DATA_DIR / "images"
+
+    image_paths = list_images(images_dir) if images_dir.exists() else []
+    if not image_paths:
+        raise ValueError(f"No images found in {images_dir}")
+
+    if count >= len(image_paths):
+        return image_paths
+    picks = np.linspace(0, len(image_paths) - 1, count).round().astype(int)
+    return [image_paths[i] for i in picks]
+
+
+def predict_pool(
+    weights: Path,
+    images: list[np.ndarray],
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    confidence: float = DEFAULT_CONFIDENCE_THRESHOLD,
+    iou: float = DEFAULT_IOU_THRESHOLD,
+    workers: int = 4,
+) -> PredictionArrays:
+    """
+    Run a model over images with a pool of model instances on CPU.
+
+    Each worker thread loads its own instance (TFLite interpreters are not
+    thread safe) and predicts a contiguous share of the images one at a
+    time. The CPU threads of torch are split between the workers so
+    concurrent .pt instances do not oversubscribe the cores. The workers
+    compete for the CPU, so their timings are not a latency measurement;
+    use measure_latency for that.
+
+    Args:
+        weights: Model file (.pt, .tflite, .onnx)
+        images: Decoded BGR images; list position is the image id
+        imgsz: Inference image size
+        confidence: Minimum confidence kept
+        iou: NMS IoU threshold
+        workers: Number of model instances
+
+    Returns:
+        Predictions, with image ids indexing images
+    """
+    import torch
+    from ultralytics import YOLO
+
+    workers = max(1, min(workers, len(images)))
+    bounds = np.linspace(0, len(images), workers + 1).astype(int)
+
+    def run(start: int, stop: int) -> PredictionArrays:
+        model = YOLO(str(weights), task="detect")
+        predictions = predict_images(
+            model,
+            images[start:stop],
+            imgsz=imgsz,
+            batch=1,
+            confidence=confidence,
+            iou=iou,
+            device="cpu",
+        )
+        return predictions._replace(image_ids=predictions.image_ids + start)
+
+    # The thread count is per process, so this is each worker's share
+    num_threads = torch.get_num_threads()
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(run, bounds[:-1], bounds[1:]))
+    finally:
+        torch.set_num_threads(num_threads)
+
+    return PredictionArrays(
+        *(np.concatenate([out[i] for out in outputs]) for i in range(4))
+    )
+
+
+def measure_latency(
+    weights: Path, images: list[np.ndarray], imgsz: int = DEFAULT_IMAGE_SIZE
+) -> np.ndarray:
+    """
+    Time a model on CPU, one warmed-up batch-1 image after another.
+
+    Args:
+        weights: Model file (.pt, .tflite, .onnx)
+        images: Decoded BGR images
+        imgsz: Inference image size
+
+    Returns:
+        Per-image inference latency in ms
+    """
+    from ultralytics import YOLO
+
+    _, timings = predict_timed(YOLO(str(weights), task="detect"), images, imgsz)
+    return np.array([t["inference"] for t in timings])
+
+
+def match_detections(
+    reference: PredictionArrays,
+    candidate: PredictionArrays,
+    iou_threshold: float = VERIFY_MATCH_IOU,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Match candidate detections to reference detections one-to-one by IoU.
+
+    Classes are ignored so class disagreements can be measured; matching
+    is greedy by IoU within each image.
+
+    Args:
+        reference: Detections of the source model
+        candidate: Detections of the exported model
+        iou_threshold: Minimum IoU for a match
+
+    Returns:
+        Tuple of (reference indices, candidate indices, IoU), aligned
+    """
+    reference_boxes = LabelArrays(
+        image_ids=reference.image_ids,
+        boxes=reference.boxes,
+        classes=np.zeros_like(reference.classes),
+    )
+    cand_idx, ref_idx = candidate_pairs(
+        candidate._replace(classes=np.zeros_like(candidate.classes)), reference_boxes
+    )
+
+    iou = box_iou_pairs(candidate.boxes[cand_idx], reference.boxes[ref_idx])
+    keep = iou >= iou_threshold
+    order = np.argsort(-iou[keep], kind="stable")
+    cand_idx, ref_idx, iou = (
+        cand_idx[keep][order],
+        ref_idx[keep][order],
+        iou[keep][order],
+    )
+
+    # Greedy one-to-one: walk pairs by descending IoU, keep unused ones
+    used_ref, used_cand, pairs = set(), set(), []
+    for c, r, v in zip(cand_idx.tolist(), ref_idx.tolist(), iou.tolist()):
+        if c not in used_cand and r not in used_ref:
+            used_cand.add(c)
+            used_ref.add(r)
+            pairs.append((r, c, v))
+
+    if not pairs:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+
+    ref_idx, cand_idx, iou = (np.array(x) for x in zip(*pairs))
+    return ref_idx, cand_idx, iou
+
+
+def compare_detections(
+    reference: PredictionArrays, candidate: PredictionArrays
+) -> dict:
+    """
+    Summarize box-level agreement between two sets of detections.
+
+    Args:
+        reference: Detections of the source model
+        candidate: Detections of the exported model
+
+    Returns:
+        Dictionary with reference/candidate/matched counts, match_rate,
+        extra_rate, mean_iou, confidence_delta (mean absolute),
+        max_confidence_delta and class_agreement
+    """
+    ref_idx, cand_idx, iou = match_detections(reference, candidate)
+    num_reference = len(reference.scores)
+    num_candidate = len(candidate.scores)
+    matched = len(ref_idx)
+
+    delta = np.abs(reference.scores[ref_idx] - candidate.scores[cand_idx])
+    same_class = reference.classes[ref_idx] == candidate.classes[cand_idx]
+
+    return {
+        "reference": num_reference,
+        "candidate": num_candidate,
+        "matched": matched,
+        "match_rate": matched / num_reference if num_reference else 1.0,
+        "extra_rate": (num_candidate - matched) / max(num_candidate, 1),
+        "mean_iou": float(iou.mean()) if matched else 1.0,
+        "confidence_delta": float(delta.mean()) if matched else 0.0,
+        "max_confidence_delta": float(delta.max()) if matched else 0.0,
+        "class_agreement": float(same_class.mean()) if matched else 1.0,
+    }
+
+
+def check_verification(report: dict, thresholds: VerifyThresholds) -> list[str]:
+    """
+    Check a verification report against the gate.
+
+    Args:
+        report: Output of verify_export
+        thresholds: Limits to enforce
+
+    Returns:
+        List of failure messages (empty if the export passes)
+    """
+    failures = []
+    if report["match_rate"] < thresholds.min_match_rate:
+        failures.append(
+            f"match rate {report['match_rate']:.3f} < {thresholds.min_match_rate}"
+        )
+    if report["mean_iou"] < thresholds.min_mean_iou:
+        failures.append(
+            f"mean IoU {report['mean_iou']:.3f} < {thresholds.min_mean_iou}"
+        )
+    if report["confidence_delta"] > thresholds.max_confidence_delta:
+        failures.append(
+            f"confidence delta {report['confidence_delta']:.3f} > "
+            f"{thresholds.max_confidence_delta}"
+        )
+    if report["class_agreement"] < thresholds.min_class_agreement:
+        failures.append(
+            f"class agreement {report['class_agreement']:.3f} < "
+            f"{thresholds.min_class_agreement}"
+        )
+    if (
+        thresholds.max_latency_ratio is not None
+        and report["latency_ratio"] > thresholds.max_latency_ratio
+    ):
+        failures.append(
+            f"latency ratio {report['latency_ratio']:.2f} > {thresholds.max_latency_ratio}"
+        )
+    return failures
+
+
+def verify_export(
+    export_path: Path,
+    source_weights: Path,
+    images_dir: Path | None = None,
+    num_images: int = VERIFY_IMAGES,
+    imgsz: int = DEFAULT_IMAGE_SIZE,
+    workers: int = 4,
+    thresholds: VerifyThresholds | None = None,
+) -> dict:
+    """
+    Compare an exported model with its source weights on held-out images.
+
+    Args:
+        export_path: Exported model (.tflite or .onnx)
+        source_weights: The .pt weights it was exported from
+        images_dir: Held-out images. Defaults to TEST_DATA_DIR/images.
+        num_images: Number of images to check
+        imgsz: Inference image size (the export size)
+        workers: Model instances per model for the detections (latency
+            is always timed with a single instance)
+        thresholds: Limits to enforce. Defaults to VerifyThresholds().
+
+    Returns:
+        Dictionary with the compare_detections fields, source_ms and
+        export_ms (median per-image latency), latency_ratio, and
+        failures (list of messages; empty means the export passed)
+
+    Raises:
+        FileNotFoundError: If either model file is missing
+        ValueError: If there are no images to check
+    """
+    for path in (export_path, source_weights):
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Model file not found: {path}")
+
+    image_paths = select_verify_images(images_dir, num_images)
+    images = []
+    for path in image_paths:
+        with Image.open(path) as img:
+            # ultralytics expects BGR arrays, like cv2.imread
+            images.append(
+                np.ascontiguousarray(np.asarray(img.convert("RGB"))[..., ::-1])
+            )
+
+    print(f"Verifying {Path(export_path).name} on {len(images)} images...")
+    reference = predict_pool(source_weights, images, imgsz=imgsz, workers=workers)
+    candidate = predict_pool(export_path, images, imgsz=imgsz, workers=workers)
+    source_latency = measure_latency(source_weights, images, imgsz)
+    export_latency = measure_latency(export_path, images, imgsz)
+
+    report = compare_detections(reference, candidate)
+    report["export"] = str(export_path)
+    report["source_ms"] = float(np.median(source_latency))
+    report["export_ms"] = float(np.median(export_latency))
+    report["latency_ratio"] = report["export_ms"] / max(report["source_ms"], 1e-9)
+    report["failures"] = check_verification(report, thresholds or VerifyThresholds())
+
+    return report
+
+
+def print_verification_report(report: dict) -> None:
+    """Print a verification report and its pass/fail status."""
+    print("\n" + "=" * 60)
+    print(f"EXPORT VERIFICATION: {Path(report['export']).name}")
+    print("=" * 60)
+
+    print(f"\n{'Metric':<25} {'Value':>15}")
+    print("-" * 40)
+    print(f"{'Source detections':<25} {report['reference']:>15d}")
+    print(f"{'Export detections':<25} {report['candidate']:>15d}")
+    print(f"{'Match rate':<25} {report['match_rate']:>15.4f}")
+    print(f"{'Extra detections':<25} {report['extra_rate']:>15.4f}")
+    print(f"{'Mean matched IoU':<25} {report['mean_iou']:>15.4f}")
+    print(f"{'Mean confidence delta':<25} {report['confidence_delta']:>15.4f}")
+    print(f"{'Max confidence delta':<25} {report['max_confidence_delta']:>15.4f}")
+    print(f"{'Class agreement':<25} {report['class_agreement']:>15.4f}")
+    print(f"{'Source latency (ms)':<25} {report['source_ms']:>15.1f}")
+    print(f"{'Export latency (ms)':<25} {report['export_ms']:>15.1f}")
+
+    if report["failures"]:
+        print("\nFAILED:")
+        for failure in report["failures"]:
+            print(f"  - {failure}")
+    else:
+        print("\nPASSED")
+
+    print("=" * 60)
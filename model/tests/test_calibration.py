@@ -0,0 +1,103 @@
+"""
+Tests for int8 calibration subset selection.
+"""
+
+import numpy as np
+import pytest
+import yaml
+from PIL import Image
+
+from mina.calibration import build_calibration_yaml, select_calibration_images
+from mina.core.dataset import label_path_for, resolve_split_images
+
+
+def make_split(root, counts: dict[int, int], seed: int = 0):
+    """Create train images with one-class labels: {class_id: image count}."""
+    rng = np.random.default_rng(seed)
+    images_dir = root / "train" / "images"
+    labels_dir = root / "train" / "labels"
+    images_dir.mkdir(parents=True)
+    labels_dir.mkdir(parents=True)
+
+    paths = []
+    for cls, count in counts.items():
+        for i in range(count):
+            name = f"c{cls}_{i}"
+            Image.new("RGB", (16, 16)).save(images_dir / f"{name}.jpg")
+            boxes = rng.uniform(0.1, 0.5, (int(rng.integers(1, 4)), 4))
+            (labels_dir / f"{name}.txt").write_text(
+                "".join(f"{cls} {' '.join(map(str, b))}\n" for b in boxes)
+            )
+            paths.append(images_dir / f"{name}.jpg")
+
+    (root / "data.yaml").write_text("train: ../train/images\nval: ../train/images\n")
+    return root / "data.yaml", sorted(paths)
+
+
+class TestSelection:
+    """Stratified k-center selection tests."""
+
+    def test_label_path_for(self, tmp_path):
+        image = tmp_path / "images" / "train" / "images" / "a.jpg"
+        assert (
+            label_path_for(image) == tmp_path / "images" / "train" / "labels" / "a.txt"
+        )
+
+    def test_rare_classes_are_kept(self, tmp_path):
+        _, paths = make_split(tmp_path, {2: 60, 3: 4, 4: 3})
+
+        selected = select_calibration_images(paths, size=15, seed=0)
+
+        assert len(selected) == 15
+        assert sum(p.name.startswith("c3_") for p in selected) == 4
+        assert sum(p.name.startswith("c4_") for p in selected) == 3
+
+    def test_reproducible_and_seeded(self, tmp_path):
+        _, paths = make_split(tmp_path, {0: 30, 1: 30})
+
+        first = select_calibration_images(paths, size=10, seed=1)
+        assert first == select_calibration_images(paths, size=10, seed=1)
+        assert len(set(first)) == 10
+
+    def test_small_split_is_used_whole(self, tmp_path):
+        _, paths = make_split(tmp_path, {0: 5})
+        assert select_calibration_images(paths, size=10) == paths
+
+
+class TestCalibrationYaml:
+    """Cached calibration dataset config tests."""
+
+    def test_yaml_points_at_selection(self, tmp_path):
+        data_yaml, _ = make_split(tmp_path / "data", {0: 20, 4: 5})
+
+        yaml_path = build_calibration_yaml(data_yaml, size=8, cache_dir=tmp_path)
+        content = yaml.safe_load(yaml_path.read_text())
+        selected = resolve_split_images(yaml_path, "val")
+
+        assert content["train"] == content["val"] == "images.txt"
+        assert len(selected) == 8
+        assert all(p.exists() for p in selected)
+        assert sum(p.name.startswith("c4_") for p in selected) == 4
+
+    def test_selection_is_cached(self, tmp_path, capsys):
+        data_yaml, _ = make_split(tmp_path / "data", {0: 20})
+
+        first = build_calibration_yaml(data_yaml, size=8, cache_dir=tmp_path)
+        list_before = (first.parent / "images.txt").read_text()
+        second = build_calibration_yaml(data_yaml, size=8, cache_dir=tmp_path)
+
+        assert first == second
+        assert (second.parent / "images.txt").read_text() == list_before
+        assert "Using cached calibration set" in capsys.readouterr().out
+
+    def test_label_change_invalidates(self, tmp_path):
+        data_yaml, paths = make_split(tmp_path / "data", {0: 20})
+        first = build_calibration_yaml(data_yaml, size=8, cache_dir=tmp_path)
+
+        label_path_for(paths[0]).write_text("3 0.5 0.5 0.1 0.1\n")
+        assert build_calibration_yaml(data_yaml, size=8, cache_dir=tmp_path) != first
+
+    def test_empty_split_raises(self, tmp_path):
+        (tmp_path / "data.yaml").write_text("train: missing\n")
+        with pytest.raises(ValueError):
+            build_calibration_yaml(tmp_path / "data.yaml", cache_dir=tmp_path)
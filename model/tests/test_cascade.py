@@ -0,0 +1,152 @@
+"""
+Tests for confidence-gated cascade inference.
+"""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import torch
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.cascade import CascadeStats, run_cascade
+from mina.core.constants import DISEASE_CLASSES
+from mina.sinks import open_sink
+
+
+class FakeBoxes(SimpleNamespace):
+    def __len__(self) -> int:
+        return len(self.conf)
+
+
+def result(conf: float | None, cls: int) -> SimpleNamespace:
+    """A prediction with one box, or none if conf is None."""
+    confs = [] if conf is None else [conf]
+    return SimpleNamespace(
+        boxes=FakeBoxes(
+            conf=torch.tensor(confs),
+            cls=torch.tensor([float(cls)] * len(confs)),
+            xyxyn=torch.tensor([[0.1, 0.1, 0.5, 0.5]] * len(confs)).reshape(-1, 4),
+        ),
+        speed={"inference": 1.0},
+    )
+
+
+class ScreenModel:
+    """Returns a preset top confidence per image, as class 0."""
+
+    def __init__(self, confidences: dict[str, float | None]):
+        self.confidences = confidences
+
+    def __call__(self, source: str, **kwargs):
+        return [result(self.confidences[Path(source).name], cls=0)]
+
+
+class FullModel:
+    """Finds a confident class-1 box in every image, recording its batches."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, source: list[str], **kwargs):
+        self.batches.append([Path(s).name for s in source])
+        return [result(0.95, cls=1) for _ in source]
+
+
+class TestCascade:
+    """Only uncertain images reach the full model, in batches."""
+
+    @given(
+        confidences=st.lists(
+            st.one_of(st.none(), st.floats(0.0, 1.0)), min_size=1, max_size=40
+        ),
+        batch_size=st.integers(1, 8),
+    )
+    @settings(max_examples=30, deadline=None)
+    def test_escalation(
+        self,
+        tmp_path_factory,
+        confidences: list[float | None],
+        batch_size: int,
+    ):
+        """
+        **Feature: cascade, Property: Uncertain images are escalated**
+
+        Images with a top confidence in the band, and only those, are
+        re-run through the full model, in batches of at most batch_size;
+        every image gets exactly one record.
+        """
+        names = {f"img{i:02d}.jpg": conf for i, conf in enumerate(confidences)}
+        uncertain = {n for n, c in names.items() if c is not None and 0.2 <= c < 0.6}
+        full = FullModel()
+        output = tmp_path_factory.mktemp("cascade") / "out.jsonl"
+
+        with open_sink(output) as sink:
+            stats = run_cascade(
+                ScreenModel(names),
+                full,
+                [Path(name) for name in names],
+                min_confidence=0.3,
+                band=(0.2, 0.6),
+                batch_size=batch_size,
+                verbose=False,
+                sink=sink,
+            )
+
+        escalated = [name for batch in full.batches for name in batch]
+        assert set(escalated) == uncertain
+        assert len(escalated) == len(uncertain)
+        assert all(0 < len(batch) <= batch_size for batch in full.batches)
+        assert (stats.images, stats.escalated) == (len(names), len(uncertain))
+
+        records = {
+            Path(r["image"]).name: r["detections"]
+            for r in map(json.loads, output.read_text().splitlines())
+        }
+        assert set(records) == set(names)
+        for name, detections in records.items():
+            classes = [d["disease_class"] for d in detections]
+            if name in uncertain:
+                assert classes == [DISEASE_CLASSES[1]]
+            elif names[name] is not None and names[name] >= 0.3:
+                assert classes == [DISEASE_CLASSES[0]]
+            else:
+                assert classes == []
+
+    def test_invalid_band(self):
+        with pytest.raises(ValueError, match="Uncertainty band"):
+            run_cascade(ScreenModel({}), FullModel(), [], band=(0.6, 0.2))
+
+    def test_stats(self):
+        stats = CascadeStats(
+            images=100,
+            escalated=10,
+            screen_seconds=1.0,
+            full_seconds=0.5,
+            total_seconds=2.0,
+        )
+        assert stats.escalation_rate == 0.1
+        assert stats.throughput == 50.0
+        assert CascadeStats(0, 0, 0.0, 0.0, 0.0).escalation_rate == 0.0
+
+    def test_resume_with_limit(self, tmp_path: Path):
+        names = {f"img{i:02d}.jpg": 0.9 for i in range(12)}
+        output = tmp_path / "out.jsonl"
+
+        for run in range(2):
+            with open_sink(output, resume=run > 0) as sink:
+                stats = run_cascade(
+                    ScreenModel(names),
+                    FullModel(),
+                    [Path(name) for name in names],
+                    limit=5,
+                    verbose=False,
+                    sink=sink,
+                )
+            # Images done by the first run do not count towards the limit
+            assert stats.images == 5
+
+        lines = output.read_text().splitlines()
+        assert sorted(json.loads(line)["image"] for line in lines) == sorted(names)[:10]
@@ -0,0 +1,124 @@
+"""
+Tests for asynchronous, atomic training checkpoints.
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.checkpoint import (
+    AsyncCheckpointer,
+    QueuedPath,
+    rotate_checkpoints,
+    write_atomic,
+)
+from mina.core.model import find_last_checkpoint
+
+
+class TestWriteAtomic:
+    """Files are replaced in one step and no temporary files remain."""
+
+    def test_replaces_contents(self, tmp_path: Path):
+        path = tmp_path / "weights" / "last.pt"
+        write_atomic(path, b"old")
+        write_atomic(path, b"new")
+
+        assert path.read_bytes() == b"new"
+        assert [p.name for p in path.parent.iterdir()] == ["last.pt"]
+
+
+class TestRotation:
+    """Only the newest epoch checkpoints are kept."""
+
+    @given(
+        epochs=st.sets(st.integers(min_value=0, max_value=300), max_size=12),
+        keep=st.integers(min_value=0, max_value=5),
+    )
+    @settings(max_examples=30)
+    def test_keeps_newest(self, tmp_path_factory, epochs: set[int], keep: int):
+        weights_dir = tmp_path_factory.mktemp("weights")
+        for epoch in epochs:
+            (weights_dir / f"epoch{epoch}.pt").write_bytes(b"")
+        (weights_dir / "last.pt").write_bytes(b"")
+
+        rotate_checkpoints(weights_dir, keep)
+
+        remaining = {p.name for p in weights_dir.iterdir()}
+        newest = sorted(epochs)[len(epochs) - min(keep, len(epochs)) :]
+        assert remaining == {"last.pt"} | {f"epoch{e}.pt" for e in newest}
+
+
+class TestAsyncCheckpointer:
+    """Background writes, coalescing and derived paths."""
+
+    def test_flush_writes_latest(self, tmp_path: Path):
+        checkpointer = AsyncCheckpointer(keep=2)
+        path = tmp_path / "last.pt"
+        for i in range(20):
+            checkpointer.submit(path, str(i).encode())
+        checkpointer.flush()
+
+        assert path.read_bytes() == b"19"
+        checkpointer.close()
+
+    def test_epoch_files_rotated(self, tmp_path: Path):
+        checkpointer = AsyncCheckpointer(keep=2)
+        wdir = QueuedPath(tmp_path, checkpointer=checkpointer)
+        for epoch in range(5):
+            (wdir / f"epoch{epoch}.pt").write_bytes(b"x")
+        checkpointer.close()
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "epoch3.pt",
+            "epoch4.pt",
+        ]
+
+    def test_write_error_surfaces(self, tmp_path: Path):
+        blocker = tmp_path / "file"
+        blocker.write_bytes(b"")
+        checkpointer = AsyncCheckpointer()
+        checkpointer.submit(blocker / "last.pt", b"x")
+
+        with pytest.raises(RuntimeError, match="Checkpoint write failed"):
+            checkpointer.flush()
+
+    def test_any_error_surfaces_on_next_submit(self, tmp_path: Path, monkeypatch):
+        def fail(path, keep):
+            raise ValueError("bad epoch name")
+
+        monkeypatch.setattr("mina.checkpoint.rotate_checkpoints", fail)
+        checkpointer = AsyncCheckpointer()
+        checkpointer.submit(tmp_path / "epoch1.pt", b"x")
+        checkpointer._queue.join()
+
+        with pytest.raises(RuntimeError) as info:
+            checkpointer.submit(tmp_path / "last.pt", b"x")
+        assert isinstance(info.value.__cause__, ValueError)
+        # The writer thread survived the error and is stopped cleanly
+        with pytest.raises(RuntimeError):
+            checkpointer.close()
+        assert not checkpointer._thread.is_alive()
+
+
+class TestFindLastCheckpoint:
+    """The newest run with a last.pt is resumed."""
+
+    def test_newest_run(self, tmp_path: Path):
+        for i, name in enumerate(["old", "new", "empty"]):
+            run = tmp_path / name
+            (run / "weights").mkdir(parents=True)
+            if name != "empty":
+                (run / "weights" / "last.pt").write_bytes(b"")
+            mtime = time.time() + i
+            os.utime(run, (mtime, mtime))
+
+        assert (
+            find_last_checkpoint(tmp_path) == tmp_path / "new" / "weights" / "last.pt"
+        )
+
+    def test_missing_runs_dir(self, tmp_path: Path):
+        assert find_last_checkpoint(tmp_path / "missing") is None
@@ -0,0 +1,172 @@
+"""
+Tests for multi-model comparison on a shared decoded image buffer.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import ClassVar
+
+import cv2
+import numpy as np
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from PIL import Image
+
+from mina.compare import (
+    _evaluate_worker,
+    decode_images,
+    print_comparison_results,
+    summarize_models,
+)
+from mina.metrics import LabelArrays, PredictionArrays
+
+
+def read_layout(buffer_path: Path, layout: list[tuple]) -> list[np.ndarray]:
+    """Map the buffer the way the evaluation workers do."""
+    buffer = np.memmap(buffer_path, dtype=np.uint8, mode="r")
+    return [
+        np.asarray(buffer[offset : offset + int(np.prod(shape))]).reshape(shape)
+        for offset, shape in layout
+    ]
+
+
+def make_labels(num_images: int) -> LabelArrays:
+    """One box per image, cycling through the classes."""
+    return LabelArrays(
+        image_ids=np.arange(num_images),
+        boxes=np.tile([0.2, 0.2, 0.6, 0.6], (num_images, 1)).astype(np.float32),
+        classes=np.arange(num_images) % 5,
+    )
+
+
+def predictions_for(labels: LabelArrays, keep: np.ndarray) -> PredictionArrays:
+    """Exact predictions for the kept labels, wrong-class ones for the rest."""
+    return PredictionArrays(
+        image_ids=labels.image_ids,
+        boxes=labels.boxes,
+        scores=np.full(len(keep), 0.9, dtype=np.float32),
+        classes=np.where(keep, labels.classes, (labels.classes + 1) % 5),
+    )
+
+
+class TestDecodeImages:
+    """Images survive the trip through the flat buffer."""
+
+    @given(
+        sizes=st.lists(
+            st.tuples(st.integers(1, 40), st.integers(1, 40)), min_size=1, max_size=5
+        ),
+        mode=st.sampled_from(["RGB", "L", "RGBA"]),
+    )
+    @settings(max_examples=20, deadline=None)
+    def test_layout_round_trip(self, tmp_path_factory, sizes, mode: str):
+        """
+        **Feature: compare, Property: Decoded images match cv2.imread**
+
+        Every image read back from the buffer is what ultralytics would
+        load from its path.
+        """
+        root = tmp_path_factory.mktemp("decode")
+        rng = np.random.default_rng(0)
+        paths = []
+        for i, (width, height) in enumerate(sizes):
+            pixels = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            paths.append(root / f"{i}.png")
+            Image.fromarray(pixels).convert(mode).save(paths[-1])
+
+        layout = decode_images(paths, root / "images.bin")
+
+        assert [shape for _, shape in layout] == [(h, w, 3) for w, h in sizes]
+        for image, path in zip(read_layout(root / "images.bin", layout), paths):
+            assert np.array_equal(image, cv2.imread(str(path)))
+
+    def test_exif_orientation(self, tmp_path: Path):
+        pil = Image.fromarray(np.zeros((48, 64, 3), dtype=np.uint8))
+        exif = pil.getexif()
+        exif[0x0112] = 6  # displayed rotated 90 degrees
+        path = tmp_path / "rotated.jpg"
+        pil.save(path, exif=exif)
+
+        layout = decode_images([path], tmp_path / "images.bin")
+        assert layout == [(0, (64, 48, 3))]
+
+
+class RecordingModel:
+    """Finds nothing, recording the options of every predict call."""
+
+    calls: ClassVar[list[dict]] = []
+
+    def __init__(self, weights: str = "", **kwargs):
+        pass
+
+    def predict(self, source: list, **kwargs):
+        RecordingModel.calls.append(kwargs)
+        return [SimpleNamespace(boxes=None, speed={"inference": 1.0}) for _ in source]
+
+
+class TestEvaluateWorker:
+    """Models are timed on CPU, one image at a time."""
+
+    def test_cpu_batch_one(self, tmp_path: Path, monkeypatch):
+        monkeypatch.setattr("ultralytics.YOLO", RecordingModel)
+        RecordingModel.calls = []
+        paths = []
+        for i in range(3):
+            paths.append(tmp_path / f"{i}.png")
+            Image.new("RGB", (8, 6)).save(paths[-1])
+        layout = decode_images(paths, tmp_path / "images.bin")
+
+        _, timings = _evaluate_worker(
+            "best.pt",
+            str(tmp_path / "images.bin"),
+            layout,
+            64,
+            str(tmp_path / "cache.npz"),
+            [p.name for p in paths],
+            {},
+        )
+
+        assert len(timings) == 3
+        assert {call["device"] for call in RecordingModel.calls} == {"cpu"}
+        # One warm-up call, then one call per image
+        assert len(RecordingModel.calls) == 4
+
+
+class TestSummarizeModels:
+    """Metrics and mAP deltas against the first model."""
+
+    def test_deltas(self, capsys):
+        labels = make_labels(20)
+        worse = np.arange(20) % 2 == 0
+        timings = [{"preprocess": 1.0, "inference": 10.0, "postprocess": 1.0}] * 20
+        outputs = [
+            (predictions_for(labels, np.ones(20, dtype=bool)), timings),
+            (predictions_for(labels, worse), timings),
+        ]
+
+        baseline, model = summarize_models(outputs, labels, 20, bootstrap=50)
+
+        assert baseline["mAP50"] == pytest.approx(1.0)
+        assert model["mAP50"] < baseline["mAP50"]
+        assert baseline["delta_ci"]["mAP50"] == (0.0, 0.0)
+        low, high = model["delta_ci"]["mAP50-95"]
+        assert low <= high < 0
+        assert (model["latency_ms"], model["total_ms"]) == (10.0, 12.0)
+
+        for metrics, name in zip((baseline, model), ("best.pt", "best_int8.tflite")):
+            metrics["weights"] = name
+        print_comparison_results([baseline, model])
+        out = capsys.readouterr().out
+        delta = model["mAP50"] - baseline["mAP50"]
+        assert f"{delta:>+8.4f}" in out
+        assert "95% CI" in out
+
+    def test_without_bootstrap(self):
+        labels = make_labels(5)
+        timings = [{"inference": float(i)} for i in range(5)]
+        (metrics,) = summarize_models(
+            [(predictions_for(labels, np.ones(5, dtype=bool)), timings)], labels, 5
+        )
+        assert "delta_ci" not in metrics
+        assert metrics["latency_ms"] == 2.0
@@ -0,0 +1,284 @@
+"""
+Tests for teacher soft targets used in knowledge distillation.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from PIL import Image
+from ultralytics.utils.tal import TaskAlignedAssigner
+
+from mina.distill import (
+    DistillationTrainer,
+    SoftTargetAssigner,
+    add_soft_targets,
+    build_soft_targets,
+    decode_soft_classes,
+    encode_soft_classes,
+    load_distill_settings,
+    save_distill_settings,
+    teacher_soft_targets,
+)
+from mina.metrics import LabelArrays, PredictionArrays
+from mina.train import train
+
+
+class TestEncoding:
+    """Soft weights must survive the trip through the class value."""
+
+    @given(
+        classes=st.lists(st.integers(min_value=0, max_value=4), min_size=1),
+        data=st.data(),
+    )
+    @settings(max_examples=50)
+    def test_roundtrip(self, classes: list[int], data):
+        weights = np.array(
+            data.draw(
+                st.lists(
+                    st.floats(min_value=0.01, max_value=1.0),
+                    min_size=len(classes),
+                    max_size=len(classes),
+                )
+            )
+        )
+        encoded = encode_soft_classes(np.array(classes), weights)
+
+        decoded, decoded_weights = decode_soft_classes(torch.from_numpy(encoded))
+
+        assert decoded.long().tolist() == classes
+        assert np.allclose(decoded_weights.numpy(), weights, atol=1e-5)
+
+    def test_ground_truth_has_full_weight(self):
+        _, weights = decode_soft_classes(torch.tensor([0.0, 3.0]))
+        assert weights.tolist() == [1.0, 1.0]
+
+
+class TestSoftTargets:
+    """Selection of teacher detections as extra targets."""
+
+    def test_redundant_boxes_are_dropped(self):
+        box = [0.1, 0.1, 0.3, 0.3]
+        teacher = PredictionArrays(
+            image_ids=np.array([0, 0, 0, 1]),
+            boxes=np.array([box, box, [0.6, 0.6, 0.8, 0.9], box], dtype=np.float32),
+            scores=np.array([0.9, 0.8, 0.7, 0.6], dtype=np.float32),
+            classes=np.array([2, 1, 2, 0]),
+        )
+        labels = LabelArrays(
+            image_ids=np.array([0]),
+            boxes=np.array([box], dtype=np.float32),
+            classes=np.array([2]),
+        )
+        paths = [Path("a.jpg"), Path("b.jpg")]
+
+        targets = build_soft_targets(teacher, labels, paths)
+
+        # Same-class duplicate of the label is dropped; other class and box kept
+        first = targets[str(paths[0].resolve())]
+        classes, weights = decode_soft_classes(torch.from_numpy(first[:, 0]))
+        assert classes.tolist() == [1.0, 2.0]
+        assert np.allclose(weights.numpy(), [0.8, 0.7], atol=1e-5)
+        assert np.allclose(first[1, 1:], [0.7, 0.75, 0.2, 0.3])
+        assert len(targets[str(paths[1].resolve())]) == 1
+
+    def test_added_to_dataset_labels(self):
+        path = Path("a.jpg")
+        labels = [
+            {
+                "im_file": str(path),
+                "cls": np.array([[0.0]], dtype=np.float32),
+                "bboxes": np.array([[0.5, 0.5, 0.2, 0.2]], dtype=np.float32),
+                "segments": [],
+            },
+            {
+                "im_file": "other.jpg",
+                "cls": np.zeros((0, 1), dtype=np.float32),
+                "bboxes": np.zeros((0, 4), dtype=np.float32),
+                "segments": [],
+            },
+        ]
+        rows = np.array([[1.25, 0.1, 0.1, 0.05, 0.05]], dtype=np.float32)
+
+        added = add_soft_targets(labels, {str(path.resolve()): rows})
+
+        assert added == 1
+        assert labels[0]["cls"].ravel().tolist() == [0.0, 1.25]
+        assert labels[0]["bboxes"].shape == (2, 4)
+        assert len(labels[1]["cls"]) == 0
+
+    def test_labels_of_every_train_directory(self, tmp_path: Path, monkeypatch):
+        box = [0.1, 0.1, 0.3, 0.3]
+        paths = []
+        for source, name in (("farm_a", "a"), ("farm_b", "b")):
+            (tmp_path / source / "images").mkdir(parents=True)
+            (tmp_path / source / "labels").mkdir()
+            image = tmp_path / source / "images" / f"{name}.jpg"
+            Image.new("RGB", (32, 32)).save(image)
+            (tmp_path / source / "labels" / f"{name}.txt").write_text(
+                "2 0.2 0.2 0.2 0.2\n"
+            )
+            paths.append(image)
+        teacher = PredictionArrays(
+            image_ids=np.array([0, 1]),
+            boxes=np.array([box, box], dtype=np.float32),
+            scores=np.array([0.9, 0.9], dtype=np.float32),
+            classes=np.array([2, 2]),
+        )
+        monkeypatch.setattr(
+            "mina.core.dataset.resolve_split_images", lambda *args: paths
+        )
+        monkeypatch.setattr("mina.distill.get_predictions", lambda *args: teacher)
+
+        # Both teacher boxes duplicate their own image's label
+        assert teacher_soft_targets(Path("teacher.pt"), Path("data.yaml")) == {}
+
+    def test_nested_train_directories(self, tmp_path: Path, monkeypatch):
+        from ultralytics import YOLO
+
+        teacher = tmp_path / "teacher.pt"
+        YOLO("yolov8n.yaml").save(teacher)
+        paths = []
+        for images in ("farm_a/images", "farm_b/2024/images"):
+            (tmp_path / images).mkdir(parents=True)
+            Image.new("RGB", (64, 48), (90, 120, 60)).save(tmp_path / images / "x.jpg")
+            paths.append(tmp_path / images / "x.jpg")
+        monkeypatch.setattr(
+            "mina.core.dataset.resolve_split_images", lambda *args: paths
+        )
+        monkeypatch.setattr("mina.predictions.CACHE_DIR", tmp_path / "cache")
+
+        # Real teacher inference through the prediction store
+        targets = teacher_soft_targets(teacher, Path("data.yaml"), imgsz=64)
+        assert set(targets) <= {str(p.resolve()) for p in paths}
+        assert len(list((tmp_path / "cache" / "predictions").iterdir())) == 1
+
+
+class TestAssigner:
+    """Target scores must be scaled by the weight of the assigned target."""
+
+    def test_scores_scaled_per_target(self):
+        calls = {}
+
+        def assigner(pd_scores, pd_bboxes, anc_points, gt_labels, gt_bboxes, mask_gt):
+            calls["labels"] = gt_labels
+            scores = torch.ones(1, 3, 5)
+            gt_idx = torch.tensor([[0, 1, 1]])
+            return None, None, scores, None, gt_idx
+
+        gt_labels = torch.tensor([[[2.0], [1.25]]])  # ground truth, soft 0.5
+        wrapped = SoftTargetAssigner(assigner)
+        _, _, scores, _, _ = wrapped(None, None, None, gt_labels, None, None)
+
+        assert calls["labels"].ravel().tolist() == [2.0, 1.0]
+        assert scores[0, :, 0].tolist() == [1.0, 0.5, 0.5]
+
+    def test_real_task_aligned_assigner(self):
+        torch.manual_seed(0)
+        ys, xs = torch.meshgrid(torch.arange(16.0), torch.arange(16.0), indexing="ij")
+        anchors = torch.stack([xs.ravel(), ys.ravel()], 1) + 0.5
+        pd_bboxes = torch.cat([anchors - 2.5, anchors + 2.5], 1).unsqueeze(0)
+        pd_scores = torch.rand(1, len(anchors), 5)
+        gt_bboxes = torch.tensor([[[1.0, 1.0, 6.0, 6.0], [9.0, 9.0, 14.0, 14.0]]])
+        mask_gt = torch.ones(1, 2, 1)
+        assigner = TaskAlignedAssigner(topk=10, num_classes=5, alpha=0.5, beta=6.0)
+
+        hard = assigner(
+            pd_scores,
+            pd_bboxes,
+            anchors,
+            torch.tensor([[[2.0], [1.0]]]),
+            gt_bboxes,
+            mask_gt,
+        )
+        soft = SoftTargetAssigner(assigner)(
+            pd_scores,
+            pd_bboxes,
+            anchors,
+            torch.tensor([[[2.0], [1.25]]]),
+            gt_bboxes,
+            mask_gt,
+        )
+
+        # Same assignment; only the soft target's scores are halved
+        assert torch.equal(soft[0], hard[0])
+        assert torch.equal(soft[3], hard[3])
+        assert torch.equal(soft[4], hard[4])
+        fg, gt_idx = hard[3][0], hard[4][0]
+        assert fg.any() and set(gt_idx[fg].tolist()) == {0, 1}
+        ground_truth = fg & (gt_idx == 0)
+        teacher = fg & (gt_idx == 1)
+        assert torch.allclose(soft[2][0, ground_truth], hard[2][0, ground_truth])
+        assert torch.allclose(soft[2][0, teacher], hard[2][0, teacher] * 0.5)
+        assert hard[2][0, teacher].sum() > 0
+
+
+class TestResume:
+    """An interrupted distillation run resumes with its own teacher."""
+
+    @pytest.fixture
+    def run(self, tmp_path: Path, monkeypatch) -> dict:
+        """A resumable run whose training call is recorded instead of run."""
+        checkpoint = tmp_path / "runs" / "student" / "weights" / "last.pt"
+        checkpoint.parent.mkdir(parents=True)
+        checkpoint.write_bytes(b"")
+        calls = {}
+
+        class RecordingYOLO:
+            def __init__(self, weights: str):
+                calls["weights"] = weights
+
+            def train(self, **kwargs):
+                calls.update(kwargs)
+                raise KeyboardInterrupt
+
+        def soft_targets(teacher, data_yaml, imgsz, min_confidence):
+            calls["teacher"] = (teacher, imgsz, min_confidence)
+            return {}
+
+        monkeypatch.setattr("mina.train.get_data_yaml_path", lambda d: Path("d.yaml"))
+        monkeypatch.setattr("mina.train.find_last_checkpoint", lambda: checkpoint)
+        monkeypatch.setattr("mina.train.is_resumable", lambda path: True)
+        monkeypatch.setattr("mina.train.YOLO", RecordingYOLO)
+        monkeypatch.setattr("mina.distill.teacher_soft_targets", soft_targets)
+        return {"dir": checkpoint.parent.parent, "calls": calls}
+
+    def test_settings_round_trip(self, tmp_path: Path):
+        saved = {"teacher": "/w/teacher.pt", "min_confidence": 0.3, "imgsz": 320}
+        save_distill_settings(tmp_path, saved)
+        assert load_distill_settings(tmp_path) == saved
+        assert load_distill_settings(tmp_path / "other") is None
+
+    def test_rebuilds_distillation_trainer(self, tmp_path: Path, run: dict):
+        teacher = tmp_path / "teacher.pt"
+        teacher.write_bytes(b"")
+        saved = {"teacher": str(teacher), "min_confidence": 0.4, "imgsz": 320}
+        save_distill_settings(run["dir"], saved)
+
+        with pytest.raises(KeyboardInterrupt):
+            train(resume=True, device="cpu")
+
+        calls = run["calls"]
+        assert calls["resume"] is True
+        assert calls["teacher"] == (teacher, 320, 0.4)
+        assert issubclass(calls["trainer"], DistillationTrainer)
+        assert calls["trainer"].settings == saved
+
+    def test_refuses_a_changed_teacher(self, tmp_path: Path, run: dict):
+        teacher = tmp_path / "teacher.pt"
+        saved = {"teacher": str(teacher), "min_confidence": 0.4, "imgsz": 320}
+        save_distill_settings(run["dir"], saved)
+
+        # The saved teacher is gone
+        with pytest.raises(FileNotFoundError, match="teacher.pt"):
+            train(resume=True, device="cpu")
+        with pytest.raises(ValueError, match="distilled from"):
+            train(resume=True, device="cpu", teacher=tmp_path / "other.pt")
+
+    def test_refuses_adding_a_teacher(self, tmp_path: Path, run: dict):
+        with pytest.raises(ValueError, match="Cannot add a teacher"):
+            train(resume=True, device="cpu", teacher=tmp_path / "teacher.pt")
+        assert run["calls"] == {}
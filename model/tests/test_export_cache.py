@@ -0,0 +1,182 @@
+"""
+Tests for the content-addressed TFLite export cache.
+
+These tests never run the converter: cache hits must be served without
+loading the model, so a fake weights file is enough.
+"""
+
+import hashlib
+import json
+import shutil
+
+import numpy as np
+import pytest
+import yaml
+from PIL import Image
+
+from mina.core.cache import atomic_copy
+from mina.core.dataset import resolve_split_images
+from mina.export import (
+    calibration_set_hash,
+    export_cache_entry,
+    export_formats,
+    export_tflite,
+    parse_formats,
+    store_cached_export,
+)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """Create a tiny dataset with train and val images and a data.yaml."""
+    root = tmp_path / "dataset"
+    for split, count in (("train", 2), ("val", 3)):
+        images_dir = root / split / "images"
+        images_dir.mkdir(parents=True)
+        for i in range(count):
+            pixels = np.full((32, 32, 3), 40 * i, dtype=np.uint8)
+            Image.fromarray(pixels).save(images_dir / f"{split}_{i}.jpg")
+
+    (root / "data.yaml").write_text(
+        "train: ../train/images\nval: ../val/images\nnc: 5\n"
+        "names: [bacterial_infection, fungal_infection, healthy, parasite, white_tail]\n"
+    )
+    return root / "data.yaml"
+
+
+@pytest.fixture
+def weights(tmp_path):
+    """Create a fake weights file (its content only feeds the hash)."""
+    path = tmp_path / "weights" / "best.pt"
+    path.parent.mkdir()
+    path.write_bytes(b"not a real model")
+    return path
+
+
+class TestCalibrationHash:
+    """The calibration hash must track val images and nothing else."""
+
+    def test_resolves_roboflow_relative_paths(self, dataset):
+        images = resolve_split_images(dataset, "val")
+        assert [p.name for p in images] == ["val_0.jpg", "val_1.jpg", "val_2.jpg"]
+
+    def test_resolves_image_list_file(self, dataset):
+        (dataset.parent / "calib.txt").write_text("val/images/val_1.jpg\n")
+        dataset.write_text("val: calib.txt\n")
+
+        images = resolve_split_images(dataset, "val")
+        assert [p.name for p in images] == ["val_1.jpg"]
+
+    def test_changes_with_val_images_only(self, dataset):
+        before = calibration_set_hash(dataset)
+
+        Image.new("RGB", (8, 8)).save(dataset.parent / "train" / "images" / "x.jpg")
+        assert calibration_set_hash(dataset) == before
+
+        Image.new("RGB", (8, 8)).save(dataset.parent / "val" / "images" / "x.jpg")
+        assert calibration_set_hash(dataset) != before
+
+    def test_stable_when_dataset_moves(self, dataset, tmp_path):
+        before = calibration_set_hash(dataset)
+        moved = shutil.copytree(dataset.parent, tmp_path / "moved")
+
+        assert calibration_set_hash(moved / "data.yaml") == before
+
+
+class TestExportCache:
+    """Export cache key and hit behavior."""
+
+    def test_key_depends_on_options(self, weights, dataset, tmp_path):
+        entries = {
+            export_cache_entry(weights, int8, imgsz, False, dataset, tmp_path)[0]
+            for int8 in (True, False)
+            for imgsz in (320, 640)
+        }
+        assert len(entries) == 4
+
+    def test_hit_skips_conversion(self, weights, dataset, tmp_path):
+        cache_dir = tmp_path / "cache"
+        entry, metadata = export_cache_entry(
+            weights, True, 640, False, dataset, cache_dir
+        )
+        entry.mkdir(parents=True)
+        (entry / "best_int8.tflite").write_bytes(b"cached artifact")
+        (entry / "metadata.json").write_text(
+            json.dumps({**metadata, "artifact": "best_int8.tflite"})
+        )
+
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        (output_dir / "best_int8.tflite").write_bytes(b"stale artifact")
+
+        path = export_tflite(
+            weights,
+            int8=True,
+            imgsz=640,
+            output_dir=output_dir,
+            data_yaml=dataset,
+            calibration_size=None,
+            cache_dir=cache_dir,
+        )
+
+        assert path == output_dir / "best_int8.tflite"
+        assert path.read_bytes() == b"cached artifact"
+        assert [p.name for p in output_dir.iterdir()] == ["best_int8.tflite"]
+
+    def test_atomic_copy_replaces_destination(self, tmp_path):
+        src = tmp_path / "src.bin"
+        dst = tmp_path / "out" / "dst.bin"
+        src.write_bytes(b"new")
+        dst.parent.mkdir()
+        dst.write_bytes(b"old")
+
+        atomic_copy(src, dst)
+
+        assert dst.read_bytes() == b"new"
+        assert sorted(p.name for p in dst.parent.iterdir()) == ["dst.bin"]
+
+
+class TestMultiFormatExport:
+    """Multi-format export from cached artifacts and the manifest."""
+
+    def test_parse_formats(self):
+        assert parse_formats("onnx, tflite-int8,onnx") == ["onnx", "tflite-int8"]
+        with pytest.raises(ValueError):
+            parse_formats("onnx,tflite-int4")
+        with pytest.raises(ValueError):
+            parse_formats(",")
+
+    def test_cached_formats_get_manifest(self, weights, dataset, tmp_path):
+        cache_dir = tmp_path / "cache"
+        contents = {
+            "onnx": ("best.onnx", b"onnx bytes"),
+            "tflite-fp16": ("best_float16.tflite", b"fp16 bytes"),
+            "tflite-int8": ("best_full_integer_quant.tflite", b"int8 bytes"),
+        }
+        for fmt, (name, data) in contents.items():
+            entry, metadata = export_cache_entry(
+                weights, fmt == "tflite-int8", 640, False, dataset, cache_dir, fmt=fmt
+            )
+            source = tmp_path / name
+            source.write_bytes(data)
+            store_cached_export(entry, source, metadata)
+
+        output_dir = tmp_path / "release"
+        manifest_path = export_formats(
+            weights,
+            list(contents),
+            imgsz=640,
+            output_dir=output_dir,
+            data_yaml=dataset,
+            calibration_size=None,
+            cache_dir=cache_dir,
+        )
+
+        manifest = yaml.safe_load(manifest_path.read_text())
+        assert manifest["weights"] == "best.pt"
+        for fmt, (name, data) in contents.items():
+            artifact = manifest["artifacts"][fmt]
+            assert artifact["file"] == name
+            assert artifact["size"] == len(data)
+            assert artifact["sha256"] == hashlib.sha256(data).hexdigest()
+            assert (output_dir / name).read_bytes() == data
@@ -7,11 +7,18 @@ as specified in the design document.
 Feature: fish-disease-detection, Property 5: Detection result structure
 """
 
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import torch
 from hypothesis import given, settings
 from hypothesis import strategies as st
 
 from mina.core.constants import DISEASE_CLASSES
 from mina.core.types import BoundingBox, Detection
+from mina.inference import run_inference_on_directory, smoke_image, smoke_test
+from mina.sinks import open_sink
 
 
 # Strategies for generating test data
@@ -241,3 +248,125 @@ class TestDiseaseClasses:
     def test_no_duplicate_classes(self):
         """Verify no duplicate class names."""
         assert len(DISEASE_CLASSES) == len(set(DISEASE_CLASSES))
+
+
+class FakeBoxes(SimpleNamespace):
+    """One ultralytics-style box."""
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+
+class FakeModel:
+    """Stands in for a YOLO model, returning one box and counting calls."""
+
+    def __init__(self, xyxyn: list[float]):
+        self.calls = []
+        self.boxes = FakeBoxes(
+            conf=torch.tensor([0.9]),
+            cls=torch.tensor([2.0]),
+            xyxyn=torch.tensor([xyxyn]),
+        )
+
+    def __call__(self, source, **kwargs):
+        self.calls.append(source)
+        return [SimpleNamespace(boxes=self.boxes, speed={"inference": 1.0})]
+
+
+class TestSmokeTest:
+    """The synthetic pipeline check is deterministic and cached per weights."""
+
+    def test_image_is_deterministic(self):
+        assert np.array_equal(smoke_image(64), smoke_image(64))
+        assert smoke_image(64).shape == (64, 64, 3)
+
+    def test_pass_is_cached(self, tmp_path):
+        weights = tmp_path / "best.pt"
+        weights.write_bytes(b"weights")
+        model = FakeModel([0.1, 0.1, 0.5, 0.5])
+
+        assert smoke_test(model, weights, imgsz=64, cache_dir=tmp_path)
+        assert smoke_test(model, weights, imgsz=64, cache_dir=tmp_path)
+        assert len(model.calls) == 1
+        assert np.array_equal(model.calls[0], smoke_image(64))
+
+        assert smoke_test(model, weights, imgsz=64, use_cache=False, cache_dir=tmp_path)
+        weights.write_bytes(b"retrained")
+        assert smoke_test(model, weights, imgsz=64, cache_dir=tmp_path)
+        assert len(model.calls) == 3
+
+    def test_failure_is_not_cached(self, tmp_path):
+        weights = tmp_path / "best.pt"
+        weights.write_bytes(b"weights")
+        # x2 < x1 gives a negative width
+        model = FakeModel([0.5, 0.1, 0.2, 0.5])
+
+        assert not smoke_test(model, weights, imgsz=64, cache_dir=tmp_path)
+        assert not smoke_test(model, weights, imgsz=64, cache_dir=tmp_path)
+        assert len(model.calls) == 2
+
+
+class CrashingModel(FakeModel):
+    """FakeModel that dies after a number of images, like an OOM kill."""
+
+    def __init__(self, crash_after: int):
+        super().__init__([0.1, 0.1, 0.5, 0.5])
+        self.crash_after = crash_after
+
+    def __call__(self, source, **kwargs):
+        if len(self.calls) == self.crash_after:
+            raise MemoryError
+        return super().__call__(source, **kwargs)
+
+
+class TestResume:
+    """An interrupted directory run continues where its output left off."""
+
+    @given(crash_after=st.integers(0, 12), batch_size=st.integers(1, 5))
+    @settings(max_examples=20, deadline=None)
+    def test_each_image_once(self, tmp_path_factory, crash_after: int, batch_size: int):
+        images = tmp_path_factory.mktemp("images")
+        for i in range(12):
+            (images / f"img{i:02d}.jpg").write_bytes(b"")
+        output = images.parent / f"{images.name}.jsonl"
+
+        # The sink is not closed, so buffered records are lost with the process
+        sink = open_sink(output, batch_size=batch_size)
+        try:
+            run_inference_on_directory(
+                CrashingModel(crash_after), images, limit=None, verbose=False, sink=sink
+            )
+        except MemoryError:
+            pass
+        written = len(output.read_text().splitlines())
+
+        model = FakeModel([0.1, 0.1, 0.5, 0.5])
+        with open_sink(output, batch_size=batch_size, resume=True) as sink:
+            run_inference_on_directory(
+                model, images, limit=None, verbose=False, sink=sink
+            )
+
+        assert len(model.calls) == 12 - written
+        lines = output.read_text().splitlines()
+        assert sorted(json.loads(line)["image"] for line in lines) == [
+            str(images / f"img{i:02d}.jpg") for i in range(12)
+        ]
+
+    def test_limit_counts_new_images(self, tmp_path):
+        for i in range(12):
+            (tmp_path / f"img{i:02d}.jpg").write_bytes(b"")
+        output = tmp_path.parent / f"{tmp_path.name}.jsonl"
+
+        for run in range(2):
+            model = FakeModel([0.1, 0.1, 0.5, 0.5])
+            with open_sink(output, resume=run > 0) as sink:
+                run_inference_on_directory(
+                    model, tmp_path, limit=5, verbose=False, sink=sink
+                )
+            # The resumed run skips the first 5 images and takes the next 5
+            assert len(model.calls) == 5
+
+        lines = output.read_text().splitlines()
+        assert sorted(json.loads(line)["image"] for line in lines) == [
+            str(tmp_path / f"img{i:02d}.jpg") for i in range(10)
+        ]
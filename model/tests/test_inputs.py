@@ -0,0 +1,151 @@
+"""
+Tests for inference input enumeration.
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.inputs import (
+    Shard,
+    iter_images,
+    parse_shard,
+    read_image_list,
+    shard_of,
+)
+
+TREE = [
+    "a.jpg",
+    "b.PNG",
+    "notes.txt",
+    "tank1/c.jpg",
+    "tank1/thumbs/c.jpg",
+    "tank2/d.jpeg",
+    "tank2/deep/e.webp",
+]
+
+
+def make_tree(root: Path, files: list[str] = TREE) -> Path:
+    for name in files:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+    return root
+
+
+def relative(paths, root: Path) -> list[str]:
+    return [path.relative_to(root).as_posix() for path in paths]
+
+
+class TestIterImages:
+    """Directory walks with filters."""
+
+    def test_top_level(self, tmp_path: Path):
+        make_tree(tmp_path)
+        assert relative(iter_images(tmp_path), tmp_path) == ["a.jpg", "b.PNG"]
+
+    def test_recursive_order(self, tmp_path: Path):
+        make_tree(tmp_path)
+        assert relative(iter_images(tmp_path, recursive=True), tmp_path) == [
+            "a.jpg",
+            "b.PNG",
+            "tank1/c.jpg",
+            "tank1/thumbs/c.jpg",
+            "tank2/d.jpeg",
+            "tank2/deep/e.webp",
+        ]
+
+    def test_include_and_exclude(self, tmp_path: Path):
+        make_tree(tmp_path)
+
+        def walk(**kwargs) -> list[str]:
+            return relative(iter_images(tmp_path, recursive=True, **kwargs), tmp_path)
+
+        assert walk(include=["*.jpg"]) == ["a.jpg", "tank1/c.jpg", "tank1/thumbs/c.jpg"]
+        assert walk(include=["tank2/*"]) == ["tank2/d.jpeg"]
+        assert walk(exclude=["thumbs", "deep"]) == [
+            "a.jpg",
+            "b.PNG",
+            "tank1/c.jpg",
+            "tank2/d.jpeg",
+        ]
+        assert walk(include=["tank*/*", "*/*/*"], exclude=["*.webp"]) == [
+            "tank1/c.jpg",
+            "tank1/thumbs/c.jpg",
+            "tank2/d.jpeg",
+        ]
+
+
+class TestSharding:
+    """Independent workers split an archive without overlap."""
+
+    @given(
+        names=st.sets(
+            st.from_regex(r"[a-z]{1,3}(/[a-z]{1,3}){0,2}\.jpg", fullmatch=True)
+        ),
+        count=st.integers(1, 8),
+    )
+    @settings(max_examples=30)
+    def test_shards_partition(self, names: set[str], count: int):
+        """
+        **Feature: inference-input, Property: Shards partition the archive**
+
+        Every image falls into exactly one shard.
+        """
+        shards = [
+            {name for name in names if shard_of(name, count) == index}
+            for index in range(count)
+        ]
+        assert set().union(*shards) == names
+        assert sum(len(shard) for shard in shards) == len(names)
+
+    def test_independent_of_mount_point(self, tmp_path: Path):
+        make_tree(tmp_path / "x")
+        make_tree(tmp_path / "mnt" / "archive")
+        for index in range(3):
+            shard = Shard(index, 3)
+            assert relative(
+                iter_images(tmp_path / "x", True, shard=shard), tmp_path / "x"
+            ) == relative(
+                iter_images(tmp_path / "mnt" / "archive", True, shard=shard),
+                tmp_path / "mnt" / "archive",
+            )
+
+    def test_walk_shards_cover_tree(self, tmp_path: Path):
+        make_tree(tmp_path)
+        walked = [
+            path
+            for index in range(4)
+            for path in iter_images(tmp_path, recursive=True, shard=Shard(index, 4))
+        ]
+        assert sorted(walked) == sorted(iter_images(tmp_path, recursive=True))
+
+    def test_parse_shard(self):
+        assert parse_shard("2/4") == Shard(2, 4)
+        for value in ("4/4", "-1/4", "0/0", "1", "a/b", "1/2/3"):
+            with pytest.raises(ValueError):
+                parse_shard(value)
+
+
+class TestImageList:
+    """Paths read from a file or stdin."""
+
+    def test_file(self, tmp_path: Path):
+        listing = tmp_path / "list.txt"
+        listing.write_text("x/a.jpg\n\n  x/b.png  \nx/notes.txt\ny/c.jpg\n")
+        assert list(read_image_list(listing)) == [
+            Path("x/a.jpg"),
+            Path("x/b.png"),
+            Path("y/c.jpg"),
+        ]
+        assert list(read_image_list(listing, exclude=["y/*"])) == [
+            Path("x/a.jpg"),
+            Path("x/b.png"),
+        ]
+
+    def test_stdin(self, monkeypatch):
+        monkeypatch.setattr("sys.stdin", io.StringIO("a.jpg\nb.jpg\n"))
+        assert list(read_image_list("-", include=["b*"])) == [Path("b.jpg")]
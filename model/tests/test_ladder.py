@@ -0,0 +1,92 @@
+"""
+Tests for the resolution ladder (parsing, benchmarking and the Pareto front).
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.ladder import export_ladder, pareto_front, parse_resolutions
+
+
+class TestResolutions:
+    """Resolution list parsing."""
+
+    def test_sorted_and_unique(self):
+        assert parse_resolutions("640, 320,416,320") == [320, 416, 640]
+
+    @pytest.mark.parametrize("value", ["", "320,abc", "320,500", "0"])
+    def test_invalid_lists_raise(self, value: str):
+        with pytest.raises(ValueError):
+            parse_resolutions(value)
+
+
+class TestParetoFront:
+    """Latency vs. accuracy Pareto front."""
+
+    def test_dominated_rung_is_dropped(self):
+        latency = np.array([5.0, 8.0, 9.0, 12.0])
+        accuracy = np.array([0.40, 0.50, 0.45, 0.55])
+        assert pareto_front(latency, accuracy).tolist() == [True, True, False, True]
+
+    @given(
+        points=st.lists(
+            st.tuples(
+                st.integers(min_value=1, max_value=20),
+                st.integers(min_value=0, max_value=20),
+            ),
+            min_size=1,
+            max_size=12,
+        )
+    )
+    @settings(max_examples=100)
+    def test_front_matches_pairwise_definition(self, points: list[tuple[int, int]]):
+        latency = np.array([p[0] for p in points], dtype=float)
+        accuracy = np.array([p[1] for p in points], dtype=float)
+        front = pareto_front(latency, accuracy)
+
+        for j in range(len(points)):
+            dominated = any(
+                latency[i] <= latency[j]
+                and accuracy[i] >= accuracy[j]
+                and (latency[i] < latency[j] or accuracy[i] > accuracy[j])
+                for i in range(len(points))
+            )
+            assert front[j] == (not dominated)
+        assert front.any()
+
+
+class TestBenchmark:
+    """Rungs are timed without competing for the CPU."""
+
+    def test_rungs_benchmarked_one_at_a_time(self, tmp_path: Path, monkeypatch):
+        calls = []
+
+        def export(weights, imgsz, output_dir, **kwargs) -> Path:
+            output_dir.mkdir(parents=True)
+            (output_dir / "best_int8.tflite").write_bytes(b"")
+            return output_dir / "best_int8.tflite"
+
+        def evaluate(paths, test_dir, imgsz, workers):
+            calls.append(workers)
+            return [
+                {
+                    "weights": str(path),
+                    "imgsz": size,
+                    "mAP50": 0.5,
+                    "mAP50-95": size / 1000,
+                    "latency_ms": float(size),
+                    "latency_p95_ms": float(size),
+                }
+                for path, size in zip(paths, imgsz)
+            ]
+
+        monkeypatch.setattr("mina.ladder.export_tflite", export)
+        monkeypatch.setattr("mina.ladder.evaluate_models", evaluate)
+        ladder = export_ladder(tmp_path / "best.pt", [320, 640], output_dir=tmp_path)
+
+        assert calls == [1]
+        assert [r["pareto"] for r in ladder["results"]] == [True, True]
@@ -0,0 +1,339 @@
+"""
+Tests for the vectorized detection metrics engine.
+
+These tests check the NumPy matching and AP computation against simple
+per-image reference implementations and known edge cases.
+"""
+
+import numpy as np
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.metrics import (
+    IOU_THRESHOLDS,
+    RECALL_POINTS,
+    LabelArrays,
+    PredictionArrays,
+    bootstrap_ap,
+    bootstrap_metrics,
+    box_iou_pairs,
+    compute_metrics,
+    interpolated_ap,
+    load_labels,
+    match_predictions,
+    pr_at_confidences,
+)
+
+
+def random_boxes(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Create n random valid xyxy boxes in normalized coordinates."""
+    xy = rng.uniform(0.0, 0.7, (n, 2))
+    wh = rng.uniform(0.05, 0.3, (n, 2))
+    return np.concatenate([xy, xy + wh], axis=1).astype(np.float32)
+
+
+def random_dataset(seed: int, num_images: int = 6, num_classes: int = 3):
+    """Create random labels and jittered predictions for a few images."""
+    rng = np.random.default_rng(seed)
+
+    num_labels = int(rng.integers(1, 4 * num_images))
+    labels = LabelArrays(
+        image_ids=rng.integers(0, num_images, num_labels),
+        boxes=random_boxes(rng, num_labels),
+        classes=rng.integers(0, num_classes, num_labels),
+    )
+
+    # Half the predictions are jittered copies of labels, half are noise
+    jitter = labels.boxes + rng.normal(0, 0.03, labels.boxes.shape).astype(np.float32)
+    num_noise = int(rng.integers(0, 2 * num_images))
+    predictions = PredictionArrays(
+        image_ids=np.concatenate(
+            [labels.image_ids, rng.integers(0, num_images, num_noise)]
+        ),
+        boxes=np.concatenate([jitter, random_boxes(rng, num_noise)]),
+        scores=rng.uniform(0.01, 1.0, num_labels + num_noise),
+        classes=np.concatenate(
+            [labels.classes, rng.integers(0, num_classes, num_noise)]
+        ),
+    )
+    return predictions, labels
+
+
+def reference_match(predictions, labels, iou_thresholds):
+    """Per-image, per-threshold greedy IoU matching written as plain loops."""
+    tp = np.zeros((len(predictions.scores), len(iou_thresholds)), dtype=bool)
+
+    for t, threshold in enumerate(iou_thresholds):
+        pairs = []
+        for p in range(len(predictions.scores)):
+            for g in range(len(labels.classes)):
+                if (
+                    predictions.image_ids[p] == labels.image_ids[g]
+                    and predictions.classes[p] == labels.classes[g]
+                ):
+                    iou = box_iou_pairs(
+                        predictions.boxes[p : p + 1], labels.boxes[g : g + 1]
+                    )[0]
+                    if iou >= threshold:
+                        pairs.append((iou, p, g))
+
+        pairs.sort(key=lambda x: -x[0])
+        best_for_pred = {}
+        for iou, p, g in pairs:
+            best_for_pred.setdefault(p, (iou, g))
+
+        used_labels = set()
+        for p, (iou, g) in sorted(best_for_pred.items(), key=lambda x: -x[1][0]):
+            if g not in used_labels:
+                used_labels.add(g)
+                tp[p, t] = True
+
+    return tp
+
+
+def reference_ap(recall: np.ndarray, precision: np.ndarray) -> float:
+    """101-point interpolated AP written as a loop over recall points."""
+    total = 0.0
+    for r in RECALL_POINTS:
+        above = precision[recall >= r]
+        total += above.max() if len(above) else 0.0
+    return total / len(RECALL_POINTS)
+
+
+class TestBoxIoU:
+    """IoU must be symmetric, bounded and 1 for identical boxes."""
+
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=50)
+    def test_iou_properties(self, seed: int):
+        rng = np.random.default_rng(seed)
+        a = random_boxes(rng, 20)
+        b = random_boxes(rng, 20)
+
+        iou_ab = box_iou_pairs(a, b)
+        assert np.allclose(iou_ab, box_iou_pairs(b, a))
+        assert np.all((iou_ab >= 0.0) & (iou_ab <= 1.0))
+        assert np.allclose(box_iou_pairs(a, a), 1.0)
+
+    def test_disjoint_boxes(self):
+        a = np.array([[0.0, 0.0, 0.1, 0.1]])
+        b = np.array([[0.5, 0.5, 0.6, 0.6]])
+        assert box_iou_pairs(a, b)[0] == 0.0
+
+
+class TestMatching:
+    """Vectorized matching must agree with the per-image reference."""
+
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=50, deadline=None)
+    def test_matches_reference(self, seed: int):
+        predictions, labels = random_dataset(seed)
+
+        tp = match_predictions(predictions, labels, IOU_THRESHOLDS)
+        expected = reference_match(predictions, labels, IOU_THRESHOLDS)
+
+        assert np.array_equal(tp, expected)
+
+    def test_one_prediction_per_label(self):
+        labels = LabelArrays(
+            image_ids=np.array([0]),
+            boxes=np.array([[0.1, 0.1, 0.5, 0.5]]),
+            classes=np.array([1]),
+        )
+        predictions = PredictionArrays(
+            image_ids=np.array([0, 0]),
+            boxes=np.array([[0.1, 0.1, 0.5, 0.5], [0.1, 0.1, 0.5, 0.52]]),
+            scores=np.array([0.9, 0.8]),
+            classes=np.array([1, 1]),
+        )
+
+        tp = match_predictions(predictions, labels)
+        assert tp[:, 0].tolist() == [True, False]
+
+    def test_no_cross_image_matches(self):
+        labels = LabelArrays(
+            image_ids=np.array([0]),
+            boxes=np.array([[0.1, 0.1, 0.5, 0.5]]),
+            classes=np.array([0]),
+        )
+        predictions = PredictionArrays(
+            image_ids=np.array([1]),
+            boxes=np.array([[0.1, 0.1, 0.5, 0.5]]),
+            scores=np.array([0.9]),
+            classes=np.array([0]),
+        )
+
+        assert not match_predictions(predictions, labels).any()
+
+
+class TestAveragePrecision:
+    """AP computation tests."""
+
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=50)
+    def test_batched_ap_matches_reference(self, seed: int):
+        rng = np.random.default_rng(seed)
+        rows, n = 4, int(rng.integers(1, 30))
+
+        tp = rng.random((rows, n)) < 0.6
+        num_labels = np.maximum(tp.sum(axis=1), 1) + rng.integers(0, 3, rows)
+        tpc = np.cumsum(tp, axis=1)
+        recall = tpc / num_labels[:, None]
+        precision = tpc / np.arange(1, n + 1)
+
+        ap = interpolated_ap(recall, precision)
+        for i in range(rows):
+            assert np.isclose(ap[i], reference_ap(recall[i], precision[i]))
+
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=25, deadline=None)
+    def test_perfect_predictions(self, seed: int):
+        _, labels = random_dataset(seed)
+        predictions = PredictionArrays(
+            image_ids=labels.image_ids,
+            boxes=labels.boxes,
+            scores=np.linspace(1.0, 0.5, len(labels.classes)),
+            classes=labels.classes,
+        )
+
+        metrics = compute_metrics(predictions, labels)
+        assert np.isclose(metrics["mAP50"], 1.0)
+        assert np.isclose(metrics["mAP50-95"], 1.0)
+        assert np.isclose(metrics["precision"], 1.0)
+        assert np.isclose(metrics["recall"], 1.0)
+
+    def test_no_predictions(self):
+        _, labels = random_dataset(0)
+        metrics = compute_metrics(PredictionArrays.empty(), labels)
+
+        assert metrics["mAP50"] == 0.0
+        assert metrics["mAP50-95"] == 0.0
+        assert all(ap == 0.0 for ap in metrics["per_class_ap50"].values())
+
+    def test_metrics_bounded(self):
+        for seed in range(10):
+            predictions, labels = random_dataset(seed)
+            metrics = compute_metrics(predictions, labels)
+
+            for key in ("mAP50", "mAP50-95", "precision", "recall"):
+                assert 0.0 <= metrics[key] <= 1.0
+            assert metrics["mAP50-95"] <= metrics["mAP50"] + 1e-9
+
+
+class TestConfidenceSweep:
+    """Grid precision/recall must equal filtering at each threshold directly."""
+
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=25, deadline=None)
+    def test_pr_at_confidences_matches_filtering(self, seed: int):
+        predictions, labels = random_dataset(seed)
+        confidences = np.array([0.1, 0.3, 0.5, 0.9])
+
+        tp = match_predictions(predictions, labels, np.array([0.5]))[:, 0]
+        precision, recall = pr_at_confidences(
+            tp, predictions.scores, predictions.classes, labels.classes, confidences, 3
+        )
+
+        for c in range(3):
+            for g, conf in enumerate(confidences):
+                kept = (predictions.classes == c) & (predictions.scores >= conf)
+                num_labels = (labels.classes == c).sum()
+                expected_p = tp[kept].mean() if kept.any() else 1.0
+                expected_r = tp[kept].sum() / num_labels if num_labels else 0.0
+                assert np.isclose(precision[c, g], expected_p)
+                assert np.isclose(recall[c, g], expected_r)
+
+
+def resample_dataset(predictions, labels, counts):
+    """Build a resampled dataset by copying each image counts[i] times."""
+    pred_parts, label_parts = [], []
+    new_id = 0
+    for image, count in enumerate(counts):
+        for _ in range(count):
+            p = predictions.image_ids == image
+            g = labels.image_ids == image
+            pred_parts.append((np.full(p.sum(), new_id), p))
+            label_parts.append((np.full(g.sum(), new_id), g))
+            new_id += 1
+
+    resampled_predictions = PredictionArrays(
+        image_ids=np.concatenate([ids for ids, _ in pred_parts]),
+        boxes=np.concatenate([predictions.boxes[m] for _, m in pred_parts]),
+        scores=np.concatenate([predictions.scores[m] for _, m in pred_parts]),
+        classes=np.concatenate([predictions.classes[m] for _, m in pred_parts]),
+    )
+    resampled_labels = LabelArrays(
+        image_ids=np.concatenate([ids for ids, _ in label_parts]),
+        boxes=np.concatenate([labels.boxes[m] for _, m in label_parts]),
+        classes=np.concatenate([labels.classes[m] for _, m in label_parts]),
+    )
+    return resampled_predictions, resampled_labels
+
+
+class TestBootstrap:
+    """Bootstrap resampling must reweight the single-pass matching correctly."""
+
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=25, deadline=None)
+    def test_matches_explicit_resamples(self, seed: int):
+        num_images = 6
+        predictions, labels = random_dataset(seed, num_images=num_images)
+        ap = bootstrap_ap(predictions, labels, num_images, 3, seed=seed, num_classes=3)
+
+        # Same draws as bootstrap_ap makes internally
+        rng = np.random.default_rng(seed)
+        draws = rng.multinomial(num_images, np.full(num_images, 1 / num_images), 3)
+
+        for b, counts in enumerate(draws):
+            resampled = resample_dataset(predictions, labels, counts)
+            metrics = compute_metrics(*resampled, class_names=["a", "b", "c"])
+            expected = np.full(3, np.nan)
+            for c, name in enumerate(["a", "b", "c"]):
+                expected[c] = metrics["per_class_ap50-95"].get(name, np.nan)
+
+            assert np.allclose(ap[b].mean(axis=1), expected, equal_nan=True)
+
+    def test_single_image_collapses_to_point_estimate(self):
+        # With one image every resample is the original set
+        predictions, labels = random_dataset(0, num_images=1)
+        metrics = compute_metrics(predictions, labels)
+        ci = bootstrap_metrics(predictions, labels, num_images=1, num_resamples=5)
+
+        assert np.allclose(ci["mAP50"], metrics["mAP50"])
+        assert np.allclose(ci["mAP50-95"], metrics["mAP50-95"])
+        for cls, ap50 in metrics["per_class_ap50"].items():
+            assert np.allclose(ci["per_class_ap50"][cls], ap50)
+
+    def test_interval_contains_point_estimate(self):
+        predictions, labels = random_dataset(1, num_images=20)
+        metrics = compute_metrics(predictions, labels)
+        ci = bootstrap_metrics(predictions, labels, num_images=20, num_resamples=500)
+
+        for key in ("mAP50", "mAP50-95"):
+            low, high = ci[key]
+            assert 0.0 <= low <= metrics[key] <= high <= 1.0
+        assert set(ci["per_class_ap50"]) == set(metrics["per_class_ap50"])
+
+    def test_reproducible_with_seed(self):
+        predictions, labels = random_dataset(2, num_images=10)
+
+        first = bootstrap_metrics(predictions, labels, 10, num_resamples=50, seed=7)
+        second = bootstrap_metrics(predictions, labels, 10, num_resamples=50, seed=7)
+        assert first == second
+
+
+class TestLoadLabels:
+    """YOLO label file parsing tests."""
+
+    def test_load_box_and_polygon_labels(self, tmp_path):
+        (tmp_path / "a.txt").write_text("1 0.5 0.5 0.2 0.4\n")
+        (tmp_path / "b.txt").write_text("3 0.1 0.1 0.3 0.1 0.3 0.4 0.1 0.4\n")
+
+        labels = load_labels(
+            tmp_path, [tmp_path / "a.jpg", tmp_path / "c.jpg", tmp_path / "b.jpg"]
+        )
+
+        assert labels.image_ids.tolist() == [0, 2]
+        assert labels.classes.tolist() == [1, 3]
+        assert np.allclose(labels.boxes[0], [0.4, 0.3, 0.6, 0.7])
+        assert np.allclose(labels.boxes[1], [0.1, 0.1, 0.3, 0.4])
@@ -0,0 +1,191 @@
+"""
+Tests for the cached prediction store and NMS on cached predictions.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import ClassVar
+
+import numpy as np
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.metrics import PredictionArrays
+from mina.predictions import (
+    apply_nms,
+    get_predictions,
+    load_predictions,
+    predict_images,
+    prediction_cache_path,
+    save_predictions,
+)
+
+
+@st.composite
+def prediction_arrays(draw, num_images: int = 4) -> PredictionArrays:
+    n = draw(st.integers(0, 30))
+    rng = np.random.default_rng(draw(st.integers(0, 2**32 - 1)))
+    xy = rng.uniform(0.0, 0.7, (n, 2))
+    wh = rng.uniform(0.01, 0.3, (n, 2))
+    return PredictionArrays(
+        image_ids=rng.integers(0, num_images, n),
+        boxes=np.concatenate([xy, xy + wh], axis=1).astype(np.float32),
+        scores=rng.uniform(0.001, 1.0, n).astype(np.float32),
+        classes=rng.integers(0, 5, n),
+    )
+
+
+def predictions(
+    image_ids: list[int], boxes: list, scores: list[float], classes: list[int]
+) -> PredictionArrays:
+    return PredictionArrays(
+        image_ids=np.array(image_ids, dtype=np.int64),
+        boxes=np.array(boxes, dtype=np.float32).reshape(-1, 4),
+        scores=np.array(scores, dtype=np.float32),
+        classes=np.array(classes, dtype=np.int64),
+    )
+
+
+class EmptyModel:
+    """Finds nothing, recording every predict call."""
+
+    calls: ClassVar[list[dict]] = []
+
+    def __init__(self, weights: str = "", **kwargs):
+        pass
+
+    def predict(self, source: list, **kwargs):
+        EmptyModel.calls.append(kwargs)
+        return [SimpleNamespace(boxes=None, speed={"inference": 1.0}) for _ in source]
+
+
+def make_test_set(root: Path, count: int = 3) -> list[Path]:
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        paths.append(root / f"img{i}.jpg")
+        paths[-1].write_bytes(f"image {i}".encode())
+    return paths
+
+
+class TestStore:
+    """Predictions survive the compressed columnar store."""
+
+    @given(stored=prediction_arrays())
+    @settings(max_examples=30)
+    def test_round_trip(self, tmp_path_factory, stored: PredictionArrays):
+        """
+        **Feature: prediction-store, Property: Saved predictions load unchanged**
+        """
+        path = tmp_path_factory.mktemp("store") / "dump.npz"
+        names = [f"img{i}.jpg" for i in range(4)]
+        metadata = {"weights": "abc", "imgsz": 640}
+
+        save_predictions(path, stored, names, metadata)
+        loaded, loaded_names, loaded_metadata = load_predictions(path)
+
+        for column, expected in zip(loaded, stored):
+            assert np.array_equal(column, expected)
+        assert loaded.image_ids.dtype == loaded.classes.dtype == np.int64
+        assert (loaded_names, loaded_metadata) == (names, metadata)
+
+
+class TestCache:
+    """The cache key covers the weights, the test set and imgsz."""
+
+    def test_key_changes(self, tmp_path: Path):
+        weights = tmp_path / "best.pt"
+        weights.write_bytes(b"weights v1")
+        images = make_test_set(tmp_path / "test")
+        path, _ = prediction_cache_path(weights, images, 640, tmp_path)
+
+        assert prediction_cache_path(weights, images, 640, tmp_path)[0] == path
+        assert prediction_cache_path(weights, images, 320, tmp_path)[0] != path
+        assert prediction_cache_path(weights, images[:2], 640, tmp_path)[0] != path
+
+        images[0].write_bytes(b"relabelled")
+        assert prediction_cache_path(weights, images, 640, tmp_path)[0] != path
+        images[0].write_bytes(b"image 0")
+
+        weights.write_bytes(b"weights v2")
+        assert prediction_cache_path(weights, images, 640, tmp_path)[0] != path
+
+    def test_key_ignores_location(self, tmp_path: Path):
+        weights = tmp_path / "best.pt"
+        weights.write_bytes(b"weights")
+        first = prediction_cache_path(weights, make_test_set(tmp_path / "a"), 640)[1]
+        second = prediction_cache_path(weights, make_test_set(tmp_path / "b"), 640)[1]
+        assert first == second
+
+    def test_hit_and_miss(self, tmp_path: Path, monkeypatch):
+        monkeypatch.setattr("mina.predictions.YOLO", EmptyModel)
+        EmptyModel.calls = []
+        weights = tmp_path / "best.pt"
+        weights.write_bytes(b"weights v1")
+        images = make_test_set(tmp_path / "test")
+        cached = predictions([1], [[0.1, 0.1, 0.2, 0.2]], [0.9], [3])
+        path, metadata = prediction_cache_path(weights, images, 640, tmp_path)
+        save_predictions(path, cached, [p.name for p in images], metadata)
+
+        hit = get_predictions(weights, images, 640, cache_dir=tmp_path)
+        assert EmptyModel.calls == []
+        assert np.array_equal(hit.scores, cached.scores)
+
+        for imgsz, use_cache in ((320, True), (640, False)):
+            miss = get_predictions(
+                weights, images, imgsz, use_cache=use_cache, cache_dir=tmp_path
+            )
+            assert len(miss.scores) == 0
+        assert len(EmptyModel.calls) == 2
+
+        # The fresh dump replaced the stale entry for imgsz 640
+        assert len(load_predictions(path)[0].scores) == 0
+
+    def test_predict_images_passes_device(self):
+        EmptyModel.calls = []
+        predict_images(EmptyModel(), ["a.jpg", "b.jpg"], batch=1, device="cpu")
+        assert [call["device"] for call in EmptyModel.calls] == ["cpu", "cpu"]
+
+
+class TestApplyNMS:
+    """Confidence filtering, class-aware NMS and the per-image cap."""
+
+    def test_class_aware(self):
+        box = [0.1, 0.1, 0.5, 0.5]
+        raw = predictions(
+            image_ids=[0, 0, 0, 1],
+            boxes=[box, box, box, box],
+            scores=[0.9, 0.8, 0.7, 0.6],
+            classes=[2, 2, 3, 2],
+        )
+
+        kept = apply_nms(raw, confidence=0.1, iou=0.5)
+
+        # The same-class duplicate goes; other classes and images stay
+        assert kept.image_ids.tolist() == [0, 0, 1]
+        assert kept.classes.tolist() == [2, 3, 2]
+        assert np.allclose(kept.scores, [0.9, 0.7, 0.6])
+
+    def test_confidence_floor(self):
+        raw = predictions(
+            [0, 0], [[0, 0, 0.1, 0.1], [0.5, 0.5, 0.9, 0.9]], [0.2, 0.05], [0, 0]
+        )
+        assert apply_nms(raw, confidence=0.1).scores.tolist() == [np.float32(0.2)]
+        assert len(apply_nms(raw, confidence=0.5).scores) == 0
+
+    @given(raw=prediction_arrays(), max_det=st.integers(1, 5))
+    @settings(max_examples=50)
+    def test_per_image_cap(self, raw: PredictionArrays, max_det: int):
+        """
+        **Feature: prediction-store, Property: NMS keeps the top max_det per image**
+        """
+        uncapped = apply_nms(raw, confidence=0.0, iou=0.5, max_det=10_000)
+        kept = apply_nms(raw, confidence=0.0, iou=0.5, max_det=max_det)
+
+        for image_id in range(4):
+            all_scores = uncapped.scores[uncapped.image_ids == image_id]
+            scores = kept.scores[kept.image_ids == image_id]
+            assert len(scores) == min(len(all_scores), max_det)
+            assert np.array_equal(scores, all_scores[:max_det])
+            assert np.all(np.diff(scores) <= 0)
+        assert np.all(np.diff(kept.image_ids) >= 0)
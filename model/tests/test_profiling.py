@@ -0,0 +1,59 @@
+"""
+Tests for choosing data-loader workers and batch size from probe runs.
+"""
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.profiling import THROUGHPUT_TOLERANCE, ProbeResult, pick_setting
+
+
+def make_probe(workers: int, batch: int, images_per_sec: float) -> ProbeResult:
+    return ProbeResult(
+        workers=workers,
+        batch=batch,
+        steps=10,
+        data_wait_s=1.0,
+        compute_s=3.0,
+        images_per_sec=images_per_sec,
+        peak_memory_mb=100.0,
+    )
+
+
+class TestPickSetting:
+    """The smallest setting within tolerance of the fastest is chosen."""
+
+    @given(
+        throughputs=st.lists(
+            st.floats(min_value=1.0, max_value=1000.0), min_size=1, max_size=8
+        )
+    )
+    @settings(max_examples=100)
+    def test_close_to_best_and_smallest(self, throughputs: list[float]):
+        probes = [make_probe(i, 16, t) for i, t in enumerate(throughputs)]
+
+        chosen = pick_setting(probes, "workers")
+
+        best = max(throughputs)
+        assert chosen.images_per_sec >= (1 - THROUGHPUT_TOLERANCE) * best
+        assert all(
+            p.images_per_sec < (1 - THROUGHPUT_TOLERANCE) * best
+            for p in probes
+            if p.workers < chosen.workers
+        )
+
+    def test_prefers_smaller_batch_when_equal(self):
+        probes = [make_probe(4, 32, 100.0), make_probe(4, 16, 98.0)]
+        assert pick_setting(probes, "batch").batch == 16
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            pick_setting([], "batch")
+
+
+class TestProbeResult:
+    """Step time split."""
+
+    def test_data_wait_fraction(self):
+        assert make_probe(0, 8, 10.0).data_wait_fraction == pytest.approx(0.25)
@@ -0,0 +1,79 @@
+"""
+Tests for inference progress logs.
+"""
+
+from pathlib import Path
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.progress import ProgressLog, drop_partial_line, progress_path
+
+names = st.text(
+    st.characters(blacklist_categories=("Cs", "Cc", "Zl", "Zp")),
+    min_size=1,
+    max_size=20,
+)
+
+
+class TestProgressLog:
+    """Completed images survive reopening the log."""
+
+    @given(batches=st.lists(st.lists(names, max_size=10), max_size=10))
+    @settings(max_examples=30)
+    def test_round_trip(self, tmp_path_factory, batches: list[list[str]]):
+        """
+        **Feature: inference-output, Property: Progress is kept across runs**
+
+        Every image added in any batch is found after resuming, and
+        nothing else is.
+        """
+        path = tmp_path_factory.mktemp("progress") / "out.jsonl.progress"
+        log = ProgressLog(path)
+        for batch in batches:
+            log.add(batch)
+        log.sync()
+
+        resumed = ProgressLog(path, resume=True)
+        expected = {name for batch in batches for name in batch}
+        assert resumed.completed == expected
+        assert all(name in resumed for name in expected)
+        assert "not-an-image.jpg" not in resumed
+
+    def test_fresh_log_forgets_previous_run(self, tmp_path: Path):
+        path = tmp_path / "out.progress"
+        ProgressLog(path).add(["a.jpg"])
+        assert len(ProgressLog(path, resume=True)) == 1
+        assert len(ProgressLog(path)) == 0
+        assert path.read_text() == ""
+
+    def test_torn_line_is_dropped(self, tmp_path: Path):
+        path = tmp_path / "out.progress"
+        path.write_text("a.jpg\nb.jpg\nc.j")
+
+        log = ProgressLog(path, resume=True)
+        assert log.completed == {"a.jpg", "b.jpg"}
+        log.add([Path("c.jpg")])
+        assert path.read_text() == "a.jpg\nb.jpg\nc.jpg\n"
+
+    def test_progress_path(self):
+        assert progress_path(Path("out/results.db")) == Path("out/results.db.progress")
+
+
+class TestDropPartialLine:
+    """Repairing a line-oriented file after a torn write."""
+
+    @given(
+        lines=st.lists(st.binary(max_size=200).filter(lambda b: b"\n" not in b)),
+        tail=st.binary(max_size=100_000).filter(lambda b: b"\n" not in b),
+    )
+    @settings(max_examples=30)
+    def test_keeps_complete_lines(
+        self, tmp_path_factory, lines: list[bytes], tail: bytes
+    ):
+        path = tmp_path_factory.mktemp("lines") / "out.jsonl"
+        complete = b"".join(line + b"\n" for line in lines)
+        path.write_bytes(complete + tail)
+
+        assert drop_partial_line(path) == len(tail)
+        assert path.read_bytes() == complete
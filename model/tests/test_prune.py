@@ -0,0 +1,89 @@
+"""
+Tests for channel-level structured pruning.
+
+The model is built from the yolov8n YAML, so no weights are downloaded.
+"""
+
+import pytest
+import torch
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from ultralytics.nn.tasks import DetectionModel
+
+from mina.prune import (
+    CHANNEL_MULTIPLE,
+    count_parameters,
+    find_prune_groups,
+    keep_count,
+    prune_model,
+    prune_to_target,
+)
+
+
+@pytest.fixture(scope="module")
+def model():
+    """Create an untrained YOLOv8n detection model with 5 classes."""
+    torch.manual_seed(0)
+    return DetectionModel("yolov8n.yaml", nc=5, verbose=False).eval()
+
+
+class TestKeepCount:
+    """Channel counts after pruning."""
+
+    @given(
+        channels=st.integers(min_value=1, max_value=512),
+        fraction=st.floats(min_value=0.0, max_value=0.9),
+    )
+    @settings(max_examples=100)
+    def test_rounded_and_bounded(self, channels: int, fraction: float):
+        keep = keep_count(channels, fraction)
+
+        assert keep <= channels
+        assert keep >= min(channels, CHANNEL_MULTIPLE)
+        assert keep == channels or keep % CHANNEL_MULTIPLE == 0
+        assert keep >= channels * (1 - fraction) or keep == channels
+
+
+class TestPruning:
+    """Pruning must preserve the model's interface and function."""
+
+    def test_groups_found(self, model):
+        groups = find_prune_groups(model)
+        # 10 C2f bottlenecks, 1 SPPF and 2 pairs in each of the 6 head branches
+        assert len(groups) == 10 + 1 + 12
+
+    def test_removing_dead_channels_keeps_outputs(self, model):
+        dead = prune_model(model, 0.0)
+        generator = torch.Generator().manual_seed(1)
+        for group in find_prune_groups(dead):
+            bn = group.producer.bn
+            channels = bn.num_features
+            order = torch.randperm(channels, generator=generator)
+            removed = order[keep_count(channels, 0.5) :]
+            with torch.no_grad():
+                bn.weight.uniform_(0.5, 1.0, generator=generator)
+                bn.weight[removed] = 0.0
+                bn.bias[removed] = 0.0
+
+        pruned = prune_model(dead, 0.5)
+        image = torch.rand(1, 3, 64, 64, generator=generator)
+        with torch.no_grad():
+            expected, actual = dead(image)[0], pruned(image)[0]
+
+        assert count_parameters(pruned) < count_parameters(dead)
+        assert torch.allclose(expected, actual, atol=1e-4)
+
+    def test_target_ratio_is_met(self, model):
+        pruned, ratio = prune_to_target(model, 0.8, metric="params", imgsz=64)
+
+        assert ratio <= 0.8
+        assert count_parameters(pruned) <= 0.8 * count_parameters(model)
+        with torch.no_grad():
+            assert (
+                pruned(torch.rand(1, 3, 64, 64))[0].shape
+                == model(torch.rand(1, 3, 64, 64))[0].shape
+            )
+
+    def test_invalid_target_raises(self, model):
+        with pytest.raises(ValueError):
+            prune_to_target(model, 0.0, metric="params")
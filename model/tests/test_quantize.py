@@ -0,0 +1,205 @@
+"""
+Tests for the mixed-precision search logic (TensorFlow only for the export).
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from PIL import Image
+
+from mina.evaluate import evaluate
+from mina.predictions import apply_nms, get_predictions
+from mina.quantize import (
+    QuantCandidate,
+    calibration_image_paths,
+    export_saved_model,
+    iter_calibration_images,
+    letterbox,
+    rank_sensitive_layers,
+    saved_model_entry,
+    select_candidate,
+    write_tflite,
+)
+
+
+def candidate(k: int, latency_ms: float, map50_95: float) -> QuantCandidate:
+    """Create a candidate keeping k placeholder layers in float."""
+    return QuantCandidate(
+        float_layers=[f"layer{i}" for i in range(k)],
+        path=Path(f"float{k}.tflite"),
+        latency_ms=latency_ms,
+        map50=map50_95 + 0.2,
+        map50_95=map50_95,
+    )
+
+
+class TestSensitivity:
+    """Layer ranking by quantization error in units of the scale."""
+
+    def test_ranked_by_rmse_over_scale(self):
+        rows = [
+            {"tensor_name": "conv", "mean_squared_error": "0.04", "scale": "1.0"},
+            {"tensor_name": "head", "mean_squared_error": "0.04", "scale": "0.1"},
+            {"tensor_name": "neck", "mean_squared_error": "0.01", "scale": "0.1"},
+        ]
+        assert rank_sensitive_layers(rows) == ["head", "neck", "conv"]
+
+    def test_skips_unquantized_tensors(self):
+        rows = [
+            {"tensor_name": "float_op", "mean_squared_error": "1.0", "scale": "0"},
+            {"tensor_name": "conv", "mean_squared_error": "0.1", "scale": "0.5"},
+        ]
+        assert rank_sensitive_layers(rows) == ["conv"]
+
+
+class TestSelection:
+    """Candidate selection under the mAP and latency budget."""
+
+    def test_fastest_within_map_budget(self):
+        candidates = [
+            candidate(0, 10.0, 0.40),
+            candidate(2, 12.0, 0.495),
+            candidate(8, 20.0, 0.50),
+        ]
+        selected = select_candidate(candidates, reference_map=0.50, max_map_drop=0.01)
+        assert len(selected.float_layers) == 2
+
+    def test_latency_ceiling(self):
+        candidates = [candidate(0, 10.0, 0.40), candidate(8, 20.0, 0.50)]
+        selected = select_candidate(
+            candidates, reference_map=0.50, max_map_drop=0.01, max_latency_ms=15.0
+        )
+        # Nothing meets both budgets: most accurate model under the ceiling
+        assert len(selected.float_layers) == 0
+
+    @given(
+        maps=st.lists(st.floats(min_value=0.0, max_value=1.0), min_size=1, max_size=6),
+        max_map_drop=st.floats(min_value=0.0, max_value=0.5),
+    )
+    @settings(max_examples=50)
+    def test_selection_respects_budget(self, maps: list[float], max_map_drop: float):
+        candidates = [candidate(k, 10.0 + k, m) for k, m in enumerate(maps)]
+        selected = select_candidate(candidates, 1.0, max_map_drop)
+
+        fitting = [c for c in candidates if 1.0 - c.map50_95 <= max_map_drop]
+        if fitting:
+            assert selected == min(fitting, key=lambda c: c.latency_ms)
+        else:
+            assert selected.map50_95 == max(maps)
+
+
+class TestLetterbox:
+    """Calibration images must match the export's input layout."""
+
+    def test_shape_range_and_padding(self):
+        image = Image.new("RGB", (200, 100), (255, 255, 255))
+        array = letterbox(image, 64)
+
+        assert array.shape == (64, 64, 3)
+        assert array.dtype == np.float32
+        assert np.allclose(array[0, 0], 114 / 255)  # padded top
+        assert np.allclose(array[32, 32], 1.0)  # image content
+
+
+class TestCalibration:
+    """Calibration set selection."""
+
+    def test_size_zero_uses_val_split(self, tmp_path: Path):
+        for split, count in (("train", 2), ("val", 3)):
+            (tmp_path / "images" / split).mkdir(parents=True)
+            for i in range(count):
+                Image.new("RGB", (40, 20)).save(
+                    tmp_path / "images" / split / f"{i}.jpg"
+                )
+        data_yaml = tmp_path / "data.yaml"
+        data_yaml.write_text(
+            yaml.safe_dump(
+                {"path": str(tmp_path), "train": "images/train", "val": "images/val"}
+            )
+        )
+        paths = calibration_image_paths(data_yaml, size=0)
+        assert len(paths) == 3
+        images = iter_calibration_images(paths, 32)
+        assert [image.shape for image in images] == [(32, 32, 3)] * 3
+
+
+class TestSavedModelCache:
+    """The sensitivity analysis never reuses a SavedModel of other weights."""
+
+    def test_keyed_by_weights_and_imgsz(self, tmp_path: Path):
+        weights = tmp_path / "best.pt"
+        weights.write_bytes(b"weights v1")
+        entry = saved_model_entry(weights, 640, tmp_path)
+
+        assert entry.parent == tmp_path / "saved_models"
+        assert saved_model_entry(weights, 640, tmp_path) == entry
+        assert saved_model_entry(weights, 320, tmp_path) != entry
+        weights.write_bytes(b"weights v2")
+        assert saved_model_entry(weights, 640, tmp_path) != entry
+
+    def test_cached_entry_is_reused(self, tmp_path: Path):
+        weights = tmp_path / "best.pt"
+        weights.write_bytes(b"not a model")
+        entry = saved_model_entry(weights, 640, tmp_path)
+        entry.mkdir(parents=True)
+        (entry / "saved_model.pb").write_bytes(b"")
+
+        # Loading the bogus weights would fail, so nothing is exported
+        assert export_saved_model(weights, 640, tmp_path) == entry
+
+    def test_export(self, tmp_path: Path):
+        pytest.importorskip("tensorflow")
+        from ultralytics import YOLO
+
+        weights = tmp_path / "yolov8n.pt"
+        YOLO("yolov8n.yaml").save(weights)
+
+        entry = export_saved_model(weights, 64, tmp_path / "cache")
+        assert (entry / "saved_model.pb").exists()
+        assert export_saved_model(weights, 64, tmp_path / "cache") == entry
+        assert export_saved_model(weights, 96, tmp_path / "cache") != entry
+
+    def test_float_candidate_matches_pt(self, tmp_path: Path):
+        """A float conversion of the SavedModel scores like the .pt."""
+        tf = pytest.importorskip("tensorflow")
+        pytest.importorskip("ai_edge_litert")
+        from ultralytics import YOLO
+
+        weights = tmp_path / "yolov8n.pt"
+        YOLO("yolov8n.yaml").save(weights)
+        cache = tmp_path / "cache"
+        rng = np.random.default_rng(0)
+        test_dir = tmp_path / "test"
+        (test_dir / "images").mkdir(parents=True)
+        (test_dir / "labels").mkdir()
+        images = []
+        for i in range(4):
+            images.append(test_dir / "images" / f"{i}.jpg")
+            pixels = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+            Image.fromarray(pixels).save(images[-1])
+
+        # Label each image with the .pt's top box, so its mAP is high and a
+        # candidate with mis-scaled boxes cannot match it
+        top = apply_nms(get_predictions(weights, images, 64, cache_dir=cache), 0.0)
+        for image_id, path in enumerate(images):
+            kept = top.image_ids == image_id
+            rows = [
+                f"{cls} {(x1 + x2) / 2} {(y1 + y2) / 2} {x2 - x1} {y2 - y1}\n"
+                for (x1, y1, x2, y2), cls in zip(
+                    top.boxes[kept][:1], top.classes[kept][:1]
+                )
+            ]
+            (test_dir / "labels" / f"{path.stem}.txt").write_text("".join(rows))
+        reference = evaluate(weights, test_dir, imgsz=64, cache_dir=cache)
+
+        entry = export_saved_model(weights, 64, cache)
+        converter = tf.lite.TFLiteConverter.from_saved_model(str(entry))
+        candidate = write_tflite(converter.convert(), entry, tmp_path / "float.tflite")
+        metrics = evaluate(candidate, test_dir, imgsz=64, cache_dir=cache)
+
+        assert reference["mAP50-95"] > 0.5
+        assert metrics["mAP50-95"] == pytest.approx(reference["mAP50-95"], abs=0.05)
@@ -0,0 +1,201 @@
+"""
+Tests for the training run registry.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.core.cache import hash_file
+from mina.core.model import (
+    INT8_TFLITE_ARTIFACTS,
+    find_best_weights,
+    find_last_checkpoint,
+    find_run_weights,
+    find_tflite_weights,
+)
+from mina.core.registry import (
+    REGISTRY_PATH,
+    RunRegistry,
+    read_best_metrics,
+    register_run,
+)
+
+HEADER = "epoch,metrics/mAP50(B),metrics/mAP50-95(B)\n"
+
+
+def make_run(runs_dir: Path, name: str, maps: list[float] = (), age: int = 0) -> Path:
+    """Create a run with best.pt/last.pt and a results.csv with these mAP50-95s."""
+    run = runs_dir / name
+    (run / "weights").mkdir(parents=True)
+    (run / "weights" / "best.pt").write_bytes(name.encode())
+    (run / "weights" / "last.pt").write_bytes(name.encode() * 2)
+    (run / "results.csv").write_text(
+        HEADER + "".join(f"{i + 1},{m + 0.1},{m}\n" for i, m in enumerate(maps))
+    )
+    mtime = time.time() - 1000 + age
+    os.utime(run, (mtime, mtime))
+    return run
+
+
+def touch(path: Path) -> None:
+    """Bump a directory's mtime, like adding or removing an entry does."""
+    mtime = path.stat().st_mtime + 10
+    os.utime(path, (mtime, mtime))
+
+
+class TestRegistry:
+    """Lookup by name, latest and best."""
+
+    def test_rebuilds_from_disk(self, tmp_path: Path):
+        make_run(tmp_path, "old", [0.2, 0.6], age=0)
+        make_run(tmp_path, "new", [0.3, 0.4], age=1)
+        (tmp_path / "tune").mkdir()
+
+        with RunRegistry(tmp_path) as registry:
+            assert [run["name"] for run in registry.runs()] == ["new", "old"]
+            assert registry.latest()["name"] == "new"
+            assert registry.best()["name"] == "old"
+            assert registry.get("old")["fitness"] == 0.6
+            assert registry.get("tune") is None
+
+            entry = registry.get("new")
+        assert entry["weights"]["best.pt"]["sha256"] == hash_file(
+            tmp_path / "new" / "weights" / "best.pt"
+        )
+        assert entry["metrics"]["metrics/mAP50(B)"] == 0.5
+        assert (tmp_path / REGISTRY_PATH).exists()
+
+    def test_find_run_weights(self, tmp_path: Path):
+        make_run(tmp_path, "a", [0.9], age=0)
+        make_run(tmp_path, "b", [0.1], age=1)
+
+        assert find_run_weights("latest", runs_dir=tmp_path).parent.parent.name == "b"
+        assert find_run_weights("best", runs_dir=tmp_path).parent.parent.name == "a"
+        assert find_run_weights("a", "last.pt", tmp_path).name == "last.pt"
+        assert find_run_weights("missing", runs_dir=tmp_path) is None
+        assert find_run_weights(runs_dir=tmp_path / "missing") is None
+
+    def test_tflite_preference(self, tmp_path: Path):
+        run = make_run(tmp_path, "a")
+        saved_model = run / "weights" / "best_saved_model"
+        saved_model.mkdir()
+        (saved_model / "best_int8.tflite").write_bytes(b"")
+        assert find_tflite_weights(tmp_path)[1] == saved_model / "best_int8.tflite"
+
+        (saved_model / "best_float32.tflite").write_bytes(b"")
+        assert find_tflite_weights(tmp_path)[1] == saved_model / "best_float32.tflite"
+
+    def test_int8_tflite_of_run(self, tmp_path: Path):
+        make_run(tmp_path, "a", [0.9], age=0)
+        run = make_run(tmp_path, "b", [0.1], age=1)
+        (run / "weights" / "best.tflite").write_bytes(b"")
+        assert find_tflite_weights(tmp_path, artifacts=INT8_TFLITE_ARTIFACTS)[1] is None
+
+        int8 = run / "weights" / "best_full_integer_quant.tflite"
+        int8.write_bytes(b"")
+        assert find_tflite_weights(tmp_path, artifacts=INT8_TFLITE_ARTIFACTS)[1] == int8
+        assert find_tflite_weights(tmp_path, "best", INT8_TFLITE_ARTIFACTS) == (
+            tmp_path / "a" / "weights" / "best.pt",
+            None,
+        )
+
+
+class TestSync:
+    """The registry follows runs created or deleted by other processes."""
+
+    def test_new_and_deleted_runs(self, tmp_path: Path):
+        make_run(tmp_path, "a", age=0)
+        with RunRegistry(tmp_path) as registry:
+            assert registry.latest()["name"] == "a"
+
+            make_run(tmp_path, "b", age=1)
+            touch(tmp_path)
+            assert registry.latest()["name"] == "b"
+
+            for path in sorted((tmp_path / "b").rglob("*"), reverse=True):
+                path.unlink() if path.is_file() else path.rmdir()
+            (tmp_path / "b").rmdir()
+            touch(tmp_path)
+            assert [run["name"] for run in registry.runs()] == ["a"]
+
+    def test_deleted_weights_are_skipped(self, tmp_path: Path):
+        make_run(tmp_path, "a", age=0)
+        make_run(tmp_path, "b", age=1)
+        with RunRegistry(tmp_path) as registry:
+            registry.sync()
+            (tmp_path / "b" / "weights" / "best.pt").unlink()
+
+            assert registry.latest()["name"] == "a"
+            assert "best.pt" not in registry.get("b")["weights"]
+            assert registry.latest("last.pt")["name"] == "b"
+
+    def test_weights_written_after_sync(self, tmp_path: Path):
+        make_run(tmp_path, "old", [0.5], age=0)
+        new = tmp_path / "new"
+        new.mkdir()
+        touch(tmp_path)
+        # A lookup while "new" is still training, before its first checkpoint
+        assert find_last_checkpoint(tmp_path).parent.parent.name == "old"
+
+        mtime = tmp_path.stat().st_mtime_ns
+        (new / "weights").mkdir()
+        (new / "weights" / "last.pt").write_bytes(b"last")
+        (new / "weights" / "best.pt").write_bytes(b"best")
+        # Files inside a run leave the runs directory's mtime alone
+        os.utime(tmp_path, ns=(mtime, mtime))
+
+        assert find_last_checkpoint(tmp_path) == new / "weights" / "last.pt"
+        assert find_best_weights(tmp_path) == new / "weights" / "best.pt"
+        assert find_run_weights("new", runs_dir=tmp_path) == new / "weights" / "best.pt"
+        with RunRegistry(tmp_path) as registry:
+            assert [run["name"] for run in registry.runs()] == ["new", "old"]
+
+    def test_persisted_across_connections(self, tmp_path: Path):
+        make_run(tmp_path, "a", [0.5])
+        with RunRegistry(tmp_path) as registry:
+            registry.sync()
+
+        # A registered run is found without listing the runs directory again
+        with RunRegistry(tmp_path) as registry:
+            row = registry.connection.execute("SELECT value FROM meta").fetchone()
+            assert row["value"] == str(tmp_path.stat().st_mtime_ns)
+            assert registry.get("a")["fitness"] == 0.5
+
+    def test_rehashes_changed_weights(self, tmp_path: Path):
+        run = make_run(tmp_path, "a")
+        with RunRegistry(tmp_path) as registry:
+            before = registry.get("a")["weights"]["best.pt"]["sha256"]
+            (run / "weights" / "best.pt").write_bytes(b"retrained")
+            after = registry.register(run)["weights"]["best.pt"]["sha256"]
+
+        assert before != after
+        assert after == hash_file(run / "weights" / "best.pt")
+
+    def test_register_run_outside_runs_dir(self, tmp_path: Path):
+        run = make_run(tmp_path / "elsewhere", "a")
+        assert register_run(run, runs_dir=tmp_path / "runs") is None
+        assert register_run(run, runs_dir=tmp_path / "elsewhere")["name"] == "a"
+
+
+class TestMetrics:
+    """Best-epoch metrics from results.csv."""
+
+    @given(maps=st.lists(st.floats(0.0, 1.0), min_size=1, max_size=30))
+    @settings(max_examples=30)
+    def test_best_epoch(self, tmp_path_factory, maps: list[float]):
+        path = tmp_path_factory.mktemp("run") / "results.csv"
+        # Older ultralytics versions pad the column names with spaces
+        path.write_text(
+            "  epoch,  metrics/mAP50-95(B)\n"
+            + "".join(f"{i},{m}\n" for i, m in enumerate(maps))
+        )
+        best = read_best_metrics(path)
+        assert best["metrics/mAP50-95(B)"] == max(maps)
+        assert maps[int(best["epoch"])] == max(maps)
+
+    def test_missing_results(self, tmp_path: Path):
+        assert read_best_metrics(tmp_path / "results.csv") == {}
@@ -0,0 +1,189 @@
+"""
+Tests for streaming inference result sinks.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.core.constants import DISEASE_CLASSES
+from mina.core.types import BoundingBox, Detection
+from mina.sinks import JSONLSink, ResultSink, SQLiteSink, open_sink
+
+TIMINGS = {"preprocess": 1.0, "inference": 20.0, "postprocess": 2.0}
+
+
+def detections(count: int) -> list[Detection]:
+    return [
+        Detection(
+            id=f"det_{i:03d}",
+            disease_class=DISEASE_CLASSES[i % len(DISEASE_CLASSES)],
+            confidence=0.5,
+            bounding_box=BoundingBox(x=0.1, y=0.2, width=0.3, height=0.4),
+        )
+        for i in range(count)
+    ]
+
+
+def read_jsonl(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestJSONLSink:
+    """Buffered JSONL output."""
+
+    @given(
+        counts=st.lists(st.integers(0, 3), max_size=40),
+        batch_size=st.integers(1, 16),
+    )
+    @settings(max_examples=30)
+    def test_all_records_in_order(
+        self, tmp_path_factory, counts: list[int], batch_size: int
+    ):
+        """
+        **Feature: inference-output, Property: Sinks keep every record**
+
+        Whatever the batch size, every image is written once, in order,
+        with its own detections.
+        """
+        path = tmp_path_factory.mktemp("sink") / "out.jsonl"
+        with JSONLSink(path, batch_size=batch_size) as sink:
+            for i, count in enumerate(counts):
+                sink.write(Path(f"img{i}.jpg"), detections(count), TIMINGS)
+
+        records = read_jsonl(path)
+        assert [r["image"] for r in records] == [
+            f"img{i}.jpg" for i in range(len(counts))
+        ]
+        assert [len(r["detections"]) for r in records] == counts
+        assert all(r["inference_ms"] == 20.0 for r in records)
+
+    def test_batches_written_before_close(self, tmp_path: Path):
+        path = tmp_path / "out.jsonl"
+        sink = JSONLSink(path, batch_size=2)
+        sink.write(Path("a.jpg"), detections(1))
+        assert path.read_text() == ""
+
+        sink.write(Path("b.jpg"), detections(1))
+        assert len(read_jsonl(path)) == 2
+        sink.close()
+
+    def test_detection_fields(self, tmp_path: Path):
+        path = tmp_path / "out.jsonl"
+        with open_sink(path) as sink:
+            sink.write(Path("a.jpg"), detections(1))
+
+        (record,) = read_jsonl(path)
+        assert record["detections"][0] == {
+            "id": "det_000",
+            "disease_class": DISEASE_CLASSES[0],
+            "confidence": 0.5,
+            "x": 0.1,
+            "y": 0.2,
+            "width": 0.3,
+            "height": 0.4,
+        }
+        assert record["preprocess_ms"] is None
+
+
+class TestSQLiteSink:
+    """Queryable SQLite output."""
+
+    def test_tables(self, tmp_path: Path):
+        path = tmp_path / "out.db"
+        with open_sink(path, batch_size=3) as sink:
+            assert isinstance(sink, SQLiteSink)
+            for i in range(10):
+                sink.write(Path(f"img{i}.jpg"), detections(i % 3), TIMINGS)
+
+        connection = sqlite3.connect(path)
+        assert connection.execute("SELECT COUNT(*) FROM images").fetchone() == (10,)
+        rows = connection.execute(
+            "SELECT i.path, COUNT(d.id) FROM images i "
+            "LEFT JOIN detections d ON d.image_id = i.id GROUP BY i.id ORDER BY i.id"
+        ).fetchall()
+        assert rows == [(f"img{i}.jpg", i % 3) for i in range(10)]
+        connection.close()
+
+    def test_replaces_existing_output(self, tmp_path: Path):
+        path = tmp_path / "out.db"
+        for _ in range(2):
+            with open_sink(path) as sink:
+                sink.write(Path("a.jpg"), detections(1))
+
+        connection = sqlite3.connect(path)
+        assert connection.execute("SELECT COUNT(*) FROM images").fetchone() == (1,)
+        connection.close()
+
+
+class TestParquetSink:
+    """Parquet output (needs pyarrow)."""
+
+    def test_row_groups(self, tmp_path: Path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "out.parquet"
+        with open_sink(path, batch_size=4) as sink:
+            for i in range(10):
+                sink.write(Path(f"img{i}.jpg"), detections(i % 2), TIMINGS)
+
+        parquet = pq.ParquetFile(path)
+        assert parquet.metadata.num_row_groups == 3
+        table = parquet.read()
+        assert table.column("image").to_pylist() == [f"img{i}.jpg" for i in range(10)]
+
+
+def test_unknown_format(tmp_path: Path):
+    with pytest.raises(ValueError, match="Unknown output format"):
+        open_sink(tmp_path / "out.csv")
+
+
+def test_base_sink_is_abstract(tmp_path: Path):
+    with pytest.raises(TypeError, match="_write_batch"):
+        ResultSink(tmp_path / "out.txt")
+
+
+class TestResume:
+    """Resumed sinks append to the output of an interrupted run."""
+
+    def interrupted(self, path: Path, images: int, batch_size: int) -> None:
+        """Write images without closing the sink, as if the process died."""
+        sink = open_sink(path, batch_size=batch_size)
+        for i in range(images):
+            sink.write(Path(f"img{i}.jpg"), detections(1))
+
+    def test_jsonl(self, tmp_path: Path):
+        path = tmp_path / "out.jsonl"
+        self.interrupted(path, images=7, batch_size=3)
+        # A record cut short by the crash
+        with open(path, "a") as f:
+            f.write('{"image": "img6.jp')
+
+        with open_sink(path, resume=True) as sink:
+            assert sink.progress.completed == {f"img{i}.jpg" for i in range(6)}
+            sink.write(Path("img6.jpg"), detections(1))
+
+        assert [r["image"] for r in read_jsonl(path)] == [
+            f"img{i}.jpg" for i in range(7)
+        ]
+        assert len(open_sink(path, resume=True).progress) == 7
+
+    def test_sqlite(self, tmp_path: Path):
+        path = tmp_path / "out.db"
+        self.interrupted(path, images=5, batch_size=2)
+
+        with open_sink(path, resume=True) as sink:
+            assert len(sink.progress) == 4
+            sink.write(Path("img4.jpg"), detections(1))
+
+        connection = sqlite3.connect(path)
+        rows = connection.execute("SELECT path FROM images ORDER BY id").fetchall()
+        assert rows == [(f"img{i}.jpg",) for i in range(5)]
+        connection.close()
+
+    def test_parquet_cannot_resume(self, tmp_path: Path):
+        with pytest.raises(ValueError, match="cannot be resumed"):
+            open_sink(tmp_path / "out.parquet", resume=True)
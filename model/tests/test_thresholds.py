@@ -0,0 +1,179 @@
+"""
+Tests for per-class thresholds and the threshold sweep that produces them.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+import yaml
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.core.constants import (
+    DEFAULT_CONFIDENCE_THRESHOLD,
+    DEFAULT_IOU_THRESHOLD,
+    DISEASE_CLASSES,
+)
+from mina.core.thresholds import ClassThresholds, load_thresholds, save_thresholds
+from mina.inference import convert_to_detections
+from mina.metrics import LabelArrays, PredictionArrays
+from mina.sweep import save_sweep_results, sweep_thresholds
+
+thresholds_strategy = st.builds(
+    ClassThresholds,
+    nms_iou=st.floats(0.1, 0.95),
+    confidence=st.dictionaries(
+        st.sampled_from(DISEASE_CLASSES), st.floats(0.0, 1.0), max_size=5
+    ),
+)
+
+
+class FakeBoxes(SimpleNamespace):
+    def __len__(self) -> int:
+        return len(self.conf)
+
+
+def fake_results(confidences: list[float], classes: list[int]) -> list:
+    """One ultralytics-style result with a box per confidence."""
+    n = len(confidences)
+    boxes = FakeBoxes(
+        conf=torch.tensor(confidences, dtype=torch.float32),
+        cls=torch.tensor(classes, dtype=torch.float32),
+        xyxyn=torch.tensor([[0.1, 0.1, 0.5, 0.5]] * n).reshape(-1, 4),
+    )
+    return [SimpleNamespace(boxes=boxes)]
+
+
+class TestClassThresholds:
+    """Lookup of per-class confidences."""
+
+    def test_untuned_classes_use_default(self):
+        thresholds = ClassThresholds(0.5, {"healthy": 0.6, "parasite": 0.2})
+        assert thresholds.for_class("healthy") == 0.6
+        assert thresholds.for_class("white_tail") == DEFAULT_CONFIDENCE_THRESHOLD
+        assert thresholds.min_confidence() == 0.2
+        assert ClassThresholds(0.5, {}).min_confidence() == DEFAULT_CONFIDENCE_THRESHOLD
+
+    @given(
+        thresholds=thresholds_strategy,
+        boxes=st.lists(
+            st.tuples(st.floats(0.0, 1.0), st.integers(0, len(DISEASE_CLASSES) - 1)),
+            max_size=20,
+        ),
+    )
+    @settings(max_examples=50)
+    def test_convert_to_detections(self, thresholds: ClassThresholds, boxes):
+        """
+        **Feature: thresholds, Property: Each class is cut at its own threshold**
+
+        A box is kept exactly when its confidence reaches its class's
+        threshold; min_confidence is ignored.
+        """
+        confidences = [float(np.float32(conf)) for conf, _ in boxes]
+        classes = [cls for _, cls in boxes]
+        detections = convert_to_detections(
+            fake_results(confidences, classes),
+            min_confidence=1.0,
+            thresholds=thresholds,
+        )
+
+        expected = sorted(
+            (conf, DISEASE_CLASSES[cls])
+            for conf, cls in zip(confidences, classes)
+            if conf >= thresholds.for_class(DISEASE_CLASSES[cls])
+        )
+        assert sorted((d.confidence, d.disease_class) for d in detections) == expected
+
+
+class TestThresholdFiles:
+    """Threshold tables written by the sweep and read by inference."""
+
+    @given(thresholds=thresholds_strategy)
+    @settings(max_examples=50)
+    def test_round_trip(self, tmp_path_factory, thresholds: ClassThresholds):
+        """
+        **Feature: thresholds, Property: Saved thresholds load unchanged**
+        """
+        path = tmp_path_factory.mktemp("thresholds") / "thresholds.yaml"
+        assert load_thresholds(save_thresholds(thresholds, path)) == thresholds
+
+    def test_unknown_class(self, tmp_path: Path):
+        path = tmp_path / "thresholds.yaml"
+        path.write_text(yaml.safe_dump({"confidence": {"healthy": 0.5, "ich": 0.3}}))
+        with pytest.raises(ValueError, match="ich"):
+            load_thresholds(path)
+
+    def test_missing_and_empty(self, tmp_path: Path):
+        with pytest.raises(FileNotFoundError):
+            load_thresholds(tmp_path / "missing.yaml")
+        (tmp_path / "empty.yaml").write_text("")
+        assert load_thresholds(tmp_path / "empty.yaml") == ClassThresholds(
+            DEFAULT_IOU_THRESHOLD, {}
+        )
+
+
+class TestSweep:
+    """Operating points chosen from synthetic predictions."""
+
+    def test_per_class_operating_point(self, tmp_path: Path, monkeypatch):
+        box = [0.1, 0.1, 0.4, 0.4]
+        # An equally confident same-class duplicate overlapping it with IoU 0.6
+        duplicate = [0.1, 0.1, 0.4, 0.28]
+        num_images = 10
+        labels = LabelArrays(
+            image_ids=np.repeat(np.arange(num_images), 2),
+            boxes=np.tile([box, [0.6, 0.6, 0.9, 0.9]], (num_images, 1)).astype(
+                np.float32
+            ),
+            classes=np.tile([0, 2], num_images),
+        )
+        ids = np.arange(num_images)
+        raw = PredictionArrays(
+            image_ids=np.concatenate([ids, ids, ids, ids]),
+            boxes=np.concatenate(
+                [
+                    np.tile(box, (num_images, 1)),
+                    np.tile(duplicate, (num_images, 1)),
+                    np.tile([0.6, 0.6, 0.9, 0.9], (num_images, 1)),
+                    # Class 0 false positives away from every label
+                    np.tile([0.5, 0.0, 0.6, 0.1], (num_images, 1)),
+                ]
+            ).astype(np.float32),
+            scores=np.concatenate(
+                [
+                    np.full(num_images, 0.9),
+                    np.full(num_images, 0.9),
+                    np.full(num_images, 0.3),
+                    np.full(num_images, 0.4),
+                ]
+            ).astype(np.float32),
+            classes=np.concatenate(
+                [np.zeros(num_images), np.zeros(num_images), np.full(num_images, 2)]
+                + [np.zeros(num_images)]
+            ).astype(np.int64),
+        )
+        images = [Path(f"img{i}.jpg") for i in range(num_images)]
+        monkeypatch.setattr(
+            "mina.sweep.load_test_set", lambda test_dir: (images, labels)
+        )
+        monkeypatch.setattr("mina.sweep.get_predictions", lambda *args, **kwargs: raw)
+
+        results = sweep_thresholds(Path("best.pt"), nms_ious=(0.5, 0.7))
+
+        # NMS at 0.5 removes the duplicate; at 0.7 no threshold can drop it
+        assert results["per_iou"][0.5] == pytest.approx(1.0)
+        assert results["per_iou"][0.7] < 1.0
+        thresholds = results["thresholds"]
+        assert thresholds.nms_iou == 0.5
+        assert set(thresholds.confidence) == {DISEASE_CLASSES[0], DISEASE_CLASSES[2]}
+        assert 0.4 < thresholds.confidence[DISEASE_CLASSES[0]] <= 0.9
+        assert thresholds.confidence[DISEASE_CLASSES[2]] <= 0.3
+        assert results["per_class"][DISEASE_CLASSES[0]]["f1"] == pytest.approx(1.0)
+
+        curves_path, thresholds_path = save_sweep_results(results, tmp_path)
+        assert load_thresholds(thresholds_path) == thresholds
+        rows = curves_path.read_text().splitlines()
+        assert len(rows) == 1 + 2 * len(DISEASE_CLASSES) * 91
@@ -0,0 +1,126 @@
+"""
+Tests for the persistent tuning trial store.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from mina.trials import TrialStore
+from mina.tune import record_ultralytics_results
+
+
+@pytest.fixture
+def store(tmp_path: Path):
+    with TrialStore(tmp_path / "trials.db") as store:
+        yield store
+
+
+class TestStudies:
+    """Creating and resuming studies."""
+
+    def test_create_and_resume(self, store: TrialStore):
+        assert not store.has_study("a")
+        store.create_study("a", {"epochs": 30})
+        assert store.has_study("a")
+
+        with pytest.raises(ValueError, match="already exists"):
+            store.create_study("a", {"epochs": 30})
+        store.create_study("a", {"epochs": 30}, resume=True)
+
+    def test_resume_with_different_config(self, store: TrialStore):
+        store.create_study("a", {"epochs": 30, "imgsz": 640})
+
+        with pytest.raises(ValueError, match="imgsz"):
+            store.create_study("a", {"epochs": 30, "imgsz": 320}, resume=True)
+
+    def test_resume_missing(self, store: TrialStore):
+        with pytest.raises(ValueError, match="No study"):
+            store.create_study("missing", {}, resume=True)
+
+
+class TestTrials:
+    """Recording, querying and resetting trials."""
+
+    def test_persisted_across_connections(self, tmp_path: Path):
+        path = tmp_path / "trials.db"
+        with TrialStore(path) as store:
+            store.create_study("a", {})
+            trial_id = store.start_trial("a", 0, {"lr0": 0.01})
+            store.report(trial_id, 1, 0.2)
+            store.report(trial_id, 2, 0.3)
+            store.finish_trial(trial_id, "completed", 0.3)
+
+        with TrialStore(path) as store:
+            (trial,) = store.trials("a")
+
+        assert trial["hyperparameters"] == {"lr0": 0.01}
+        assert trial["history"] == [[1, 0.2], [2, 0.3]]
+        assert trial["status"] == "completed"
+
+    @given(
+        fitness=st.lists(
+            st.floats(min_value=0.0, max_value=1.0), min_size=1, max_size=20
+        )
+    )
+    @settings(max_examples=30)
+    def test_best_trials_sorted(self, tmp_path_factory, fitness: list[float]):
+        with TrialStore(tmp_path_factory.mktemp("db") / "trials.db") as store:
+            store.create_study("a", {})
+            store.create_study("b", {})
+            for i, value in enumerate(fitness):
+                store.add_trial("ab"[i % 2], i, {"i": i}, "stopped", value)
+
+            best = store.best_trials(n=3)
+            best_a = store.best_trial("a")
+
+        assert [t["fitness"] for t in best] == sorted(fitness, reverse=True)[:3]
+        assert best_a["fitness"] == max(fitness[::2])
+
+    def test_unfinished_trials_reset(self, store: TrialStore):
+        store.create_study("a", {})
+        store.add_trial("a", 0, {"i": 0}, "completed", 0.5, [(3, 0.4)])
+        running = store.start_trial("a", 1, {"i": 1})
+        store.report(running, 3, 0.9)
+
+        reset = store.reset_unfinished("a")
+
+        assert [t["number"] for t in reset] == [1]
+        assert [t["number"] for t in store.trials("a")] == [0]
+        assert store.rung_scores("a", [3, 9]) == {3: [0.4]}
+        assert store.best_trial("a")["number"] == 0
+
+    def test_failed_trial_has_no_fitness(self, store: TrialStore):
+        store.create_study("a", {})
+        store.add_trial("a", 0, {}, "failed", None)
+
+        assert store.best_trial() is None
+        with pytest.raises(ValueError):
+            store.finish_trial(1, "running", None)
+
+
+class TestUltralyticsImport:
+    """The ultralytics tuner's results are copied without duplicates."""
+
+    def test_import_idempotent(self, tmp_path: Path):
+        tune_dir = tmp_path / "tune"
+        tune_dir.mkdir()
+        records = [
+            {"iteration": i, "fitness": f, "hyperparameters": {"lr0": f}}
+            for i, f in [(1, 0.1), (2, 0.4)]
+        ]
+        results = tune_dir / "tune_results.ndjson"
+        results.write_text("".join(json.dumps(r) + "\n" for r in records))
+        db = tmp_path / "trials.db"
+
+        study = record_ultralytics_results(tune_dir, db)
+        with open(results, "a") as f:
+            f.write(json.dumps({"iteration": 3, "fitness": 0.2, "hyperparameters": {}}))
+        record_ultralytics_results(tune_dir, db)
+
+        with TrialStore(db) as store:
+            assert [t["number"] for t in store.trials(study)] == [1, 2, 3]
+            assert store.best_trial(study)["hyperparameters"] == {"lr0": 0.4}
@@ -0,0 +1,212 @@
+"""
+Tests for test-time augmentation and weighted box fusion.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+import torch
+from hypothesis import assume, given, settings
+from hypothesis import strategies as st
+from PIL import Image
+
+from mina.inference import run_inference
+from mina.tta import (
+    TTA,
+    TTA_VIEWS,
+    View,
+    load_bgr,
+    make_view,
+    unmap_boxes,
+    weighted_box_fusion,
+)
+
+views = st.builds(View, st.sampled_from([1.0, 0.83, 0.67, 0.5]), st.booleans())
+
+
+@st.composite
+def normalized_boxes(draw) -> list[float]:
+    x1, x2 = sorted(draw(st.lists(st.floats(0.0, 1.0), min_size=2, max_size=2)))
+    y1, y2 = sorted(draw(st.lists(st.floats(0.0, 1.0), min_size=2, max_size=2)))
+    return [x1, y1, x2, y2]
+
+
+def map_box(box: list[float], view: View) -> list[float]:
+    """Where a box of the original image lands in a view."""
+    x1, y1, x2, y2 = (v * view.scale for v in box)
+    return [1.0 - x2, y1, 1.0 - x1, y2] if view.flip else [x1, y1, x2, y2]
+
+
+class FakeResult(SimpleNamespace):
+    def __len__(self) -> int:
+        return len(self.conf)
+
+
+class ViewModel:
+    """Sees one lesion at a known box in every view it is given."""
+
+    def __init__(self, box: list[float], conf: float, cls: int = 1):
+        self.box, self.conf, self.cls = box, conf, cls
+        self.calls = []
+
+    def result(self, box: list[float]) -> SimpleNamespace:
+        boxes = FakeResult(
+            conf=torch.tensor([self.conf]),
+            cls=torch.tensor([float(self.cls)]),
+            xyxyn=torch.tensor([box]),
+        )
+        return SimpleNamespace(boxes=boxes, speed={"inference": 10.0})
+
+    def __call__(self, source, **kwargs):
+        self.calls.append(source)
+        if isinstance(source, list):
+            return [self.result(map_box(self.box, view)) for view in TTA_VIEWS]
+        return [self.result(self.box)]
+
+
+class TestViews:
+    """Augmented views and the mapping of their boxes back."""
+
+    @given(box=normalized_boxes(), view=views)
+    @settings(max_examples=50)
+    def test_unmap_inverts_view(self, box: list[float], view: View):
+        """
+        **Feature: tta, Property: View boxes map back to the original**
+        """
+        restored = unmap_boxes(np.array([map_box(box, view)]), view)[0]
+        assert np.allclose(restored, box, atol=1e-9)
+
+    @given(view=views)
+    @settings(max_examples=20)
+    def test_content_moves_with_view(self, view: View):
+        image = np.zeros((100, 200, 3), dtype=np.uint8)
+        image[20:40, 30:70] = 255
+        box = [30 / 200, 20 / 100, 70 / 200, 40 / 100]
+
+        augmented = make_view(image, view)
+        assert augmented.shape == image.shape
+        ys, xs = np.nonzero(augmented[..., 0] > 127)
+        found = [
+            xs.min() / 200,
+            ys.min() / 100,
+            (xs.max() + 1) / 200,
+            (ys.max() + 1) / 100,
+        ]
+        assert np.allclose(found, map_box(box, view), atol=0.02)
+
+    def test_load_applies_exif_orientation(self, tmp_path: Path):
+        image = np.zeros((48, 64, 3), dtype=np.uint8)
+        image[:10, :20] = 255
+        pil = Image.fromarray(image)
+        exif = pil.getexif()
+        exif[0x0112] = 6  # stored sideways, displayed rotated 90 degrees
+        path = tmp_path / "rotated.jpg"
+        pil.save(path, exif=exif)
+
+        # Same pixels ultralytics sees when it reads the path with cv2
+        loaded = load_bgr(path)
+        assert loaded.shape == (64, 48, 3)
+        assert np.array_equal(loaded, cv2.imread(str(path)))
+
+
+class TestWeightedBoxFusion:
+    """Vectorized WBF."""
+
+    @given(
+        box=normalized_boxes(),
+        scores=st.lists(st.floats(0.05, 1.0), min_size=1, max_size=6),
+    )
+    @settings(max_examples=50)
+    def test_agreeing_views_fuse(self, box: list[float], scores: list[float]):
+        """
+        **Feature: tta, Property: Boxes found in every view fuse into one**
+
+        The fused box is the shared box and its score the mean confidence.
+        """
+        # A box without area overlaps nothing, not even itself
+        assume(box[2] > box[0] and box[3] > box[1])
+        n = len(scores)
+        boxes, fused_scores, labels = weighted_box_fusion(
+            np.tile(box, (n, 1)), scores, np.full(n, 2), num_views=n, iou_threshold=0.0
+        )
+        assert len(boxes) == 1
+        assert np.allclose(boxes[0], box)
+        assert fused_scores[0] == pytest.approx(np.mean(scores))
+        assert labels[0] == 2
+
+    @given(
+        boxes=st.lists(normalized_boxes(), min_size=1, max_size=30),
+        data=st.data(),
+    )
+    @settings(max_examples=50)
+    def test_invariants(self, boxes: list[list[float]], data):
+        n = len(boxes)
+        scores = np.array(
+            data.draw(st.lists(st.floats(0.01, 1.0), min_size=n, max_size=n))
+        )
+        labels = np.array(
+            data.draw(st.lists(st.integers(0, 4), min_size=n, max_size=n))
+        )
+        fused, fused_scores, fused_labels = weighted_box_fusion(
+            boxes, scores, labels, num_views=4
+        )
+
+        assert len(fused) <= n
+        assert np.all(np.diff(fused_scores) <= 0)
+        assert fused_scores.max() <= scores.max() + 1e-9
+        # Every class present keeps at least one box, and none appear
+        assert set(fused_labels) == set(labels)
+        hull = np.array(boxes)
+        assert np.all(fused[:, :2] >= hull[:, :2].min(axis=0) - 1e-9)
+        assert np.all(fused[:, 2:] <= hull[:, 2:].max(axis=0) + 1e-9)
+
+    def test_classes_and_distant_boxes_stay_apart(self):
+        boxes = [[0.1, 0.1, 0.3, 0.3], [0.1, 0.1, 0.3, 0.3], [0.6, 0.6, 0.9, 0.9]]
+        fused, _, labels = weighted_box_fusion(boxes, [0.9, 0.8, 0.7], [0, 1, 0])
+        assert len(fused) == 3
+        assert list(labels) == [0, 1, 0]
+
+    def test_empty(self):
+        boxes, scores, labels = weighted_box_fusion(np.zeros((0, 4)), [], [])
+        assert len(boxes) == len(scores) == len(labels) == 0
+
+
+class TestRunInference:
+    """TTA inside run_inference, always or only for borderline images."""
+
+    @pytest.fixture
+    def image(self, tmp_path: Path) -> Path:
+        path = tmp_path / "fish.jpg"
+        Image.new("RGB", (64, 48)).save(path)
+        return path
+
+    def test_always(self, image: Path):
+        box = [0.2, 0.3, 0.6, 0.7]
+        model = ViewModel(box, conf=0.8)
+        tta = TTA("on")
+
+        (detection,) = run_inference(model, image, 0.3, verbose=False, tta=tta)
+        # One batched call with every view, and no plain pass
+        assert len(model.calls) == 1
+        assert len(model.calls[0]) == len(TTA_VIEWS)
+        assert detection.confidence == pytest.approx(0.8)
+        assert np.allclose(detection.bounding_box, [0.2, 0.3, 0.4, 0.4])
+        assert (tta.images, tta.plain, tta.augmented) == (1, 0, 1)
+
+    @pytest.mark.parametrize(("conf", "augmented"), [(0.9, False), (0.35, True)])
+    def test_auto(self, image: Path, conf: float, augmented: bool):
+        model = ViewModel([0.2, 0.3, 0.6, 0.7], conf=conf)
+        tta = TTA("auto", margin=0.1)
+
+        run_inference(model, image, 0.3, verbose=False, tta=tta)
+        assert len(model.calls) == 1 + augmented
+        assert (tta.images, tta.plain, tta.augmented) == (1, 1, int(augmented))
+        assert tta.plain_ms == 10.0
+        assert "1 images" in tta.summary()
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError, match="Unknown TTA mode"):
+            TTA("sometimes")
@@ -6,12 +6,28 @@ and matches the design document specifications.
 """
 
 import inspect
+import math
 
+import numpy as np
+import pytest
+import yaml
 from hypothesis import given, settings
 from hypothesis import strategies as st
+from PIL import Image
 
 from mina.core.constants import DEFAULT_TUNE_EPOCHS, DEFAULT_TUNE_ITERATIONS
-from mina.tune import tune_hyperparameters
+from mina.core.dataset import resolve_split_images
+from mina.tune import (
+    SEARCH_SPACE,
+    ASHAScheduler,
+    asha_milestones,
+    build_proxy_yaml,
+    rank_correlation,
+    sample_hyperparameters,
+    tune_asha,
+    tune_hyperparameters,
+    tune_multifidelity,
+)
 
 
 class TestTuningConfiguration:
@@ -114,3 +130,143 @@ class TestTuningConstants:
         """
         assert DEFAULT_TUNE_ITERATIONS >= 100
         assert DEFAULT_TUNE_ITERATIONS <= 1000
+
+
+class TestASHA:
+    """Tests for early stopping of tuning trials."""
+
+    def test_milestones(self):
+        assert asha_milestones(30, 3, 3) == [3, 9, 27]
+        assert asha_milestones(9, 1, 3) == [1, 3]
+        assert asha_milestones(3, 3, 3) == []
+
+    def test_first_trial_continues(self):
+        scheduler = ASHAScheduler(30)
+        assert scheduler.report(3, 0.0)
+
+    def test_only_milestones_decide(self):
+        scheduler = ASHAScheduler(30)
+        scheduler.report(3, 0.9)
+        assert scheduler.report(4, 0.0)
+
+    @given(
+        scores=st.lists(
+            st.floats(min_value=0.0, max_value=1.0), min_size=10, max_size=60
+        )
+    )
+    @settings(max_examples=50)
+    def test_keeps_top_fraction(self, scores: list[float]):
+        """
+        **Feature: hyperparameter-tuning, Property: ASHA promotion rate**
+
+        A trial that beats everything before it always continues, one that
+        is worse than everything before it always stops, and roughly 1/eta
+        of the trials continue past a rung.
+        """
+        scheduler = ASHAScheduler(30, grace_epochs=3, reduction_factor=3)
+        continued = [scheduler.report(3, score) for score in scores]
+
+        for i in range(1, len(scores)):
+            if scores[i] > max(scores[:i]):
+                assert continued[i]
+            if scores[i] < min(scores[:i]):
+                assert not continued[i]
+
+    def test_promotion_rate_random_order(self):
+        rng = np.random.default_rng(0)
+        scheduler = ASHAScheduler(30, grace_epochs=3, reduction_factor=3)
+        continued = [scheduler.report(3, s) for s in rng.uniform(size=3000)]
+        assert abs(np.mean(continued) - 1 / 3) < 0.05
+
+    def test_tune_asha_rejects_bounds(self):
+        for kwargs in ({"epochs": 4}, {"iterations": 1001}):
+            try:
+                tune_asha(**kwargs)
+                assert False, f"Should reject {kwargs}"
+            except ValueError:
+                pass
+
+
+class TestSearchSpace:
+    """Tests for random sampling of trial configurations."""
+
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=50)
+    def test_samples_within_bounds(self, seed: int):
+        values = sample_hyperparameters(np.random.default_rng(seed))
+
+        assert set(values) == set(SEARCH_SPACE)
+        for name, (low, high, _) in SEARCH_SPACE.items():
+            assert low - 1e-6 <= values[name] <= high + 1e-6
+
+
+def make_dataset(root, counts: dict[int, int]):
+    """Create train/val splits with one-class labels: {class_id: train images}."""
+    for split, scale in (("train", 1), ("val", 0.5)):
+        images_dir = root / split / "images"
+        labels_dir = root / split / "labels"
+        images_dir.mkdir(parents=True)
+        labels_dir.mkdir(parents=True)
+        for cls, count in counts.items():
+            for i in range(max(int(count * scale), 1)):
+                Image.new("RGB", (16, 16)).save(images_dir / f"c{cls}_{i}.jpg")
+                (labels_dir / f"c{cls}_{i}.txt").write_text(f"{cls} 0.5 0.5 0.2 0.3\n")
+
+    (root / "data.yaml").write_text(
+        "train: train/images\nval: val/images\nnc: 5\nnames: [a, b, c, d, e]\n"
+    )
+    return root / "data.yaml"
+
+
+class TestMultiFidelity:
+    """Tests for proxy datasets and proxy/full-fidelity agreement."""
+
+    def test_proxy_subset_is_stratified(self, tmp_path):
+        data_yaml = make_dataset(tmp_path / "data", {0: 60, 1: 30, 2: 6})
+        proxy_yaml = build_proxy_yaml(data_yaml, tmp_path / "proxy", fraction=0.25)
+
+        train = resolve_split_images(proxy_yaml, "train")
+        assert len(train) == 24
+        # The rare class keeps its images although a random quarter would not
+        assert sum(p.name.startswith("c2_") for p in train) >= 3
+        # Validation is never subsampled
+        assert resolve_split_images(proxy_yaml, "val") == resolve_split_images(
+            data_yaml, "val"
+        )
+        assert yaml.safe_load(proxy_yaml.read_text())["nc"] == 5
+
+    def test_proxy_fraction_bounds(self, tmp_path):
+        data_yaml = make_dataset(tmp_path / "data", {0: 4})
+        for fraction in (0.0, 1.5):
+            with pytest.raises(ValueError, match="fraction"):
+                build_proxy_yaml(data_yaml, tmp_path / "proxy", fraction=fraction)
+
+    @given(
+        scores=st.lists(
+            st.floats(min_value=0.0, max_value=1.0),
+            min_size=2,
+            max_size=20,
+            unique=True,
+        )
+    )
+    @settings(max_examples=50)
+    def test_rank_correlation_bounds(self, scores: list[float]):
+        """
+        **Feature: hyperparameter-tuning, Property: Proxy rank correlation**
+
+        Any order-preserving proxy correlates perfectly with the full
+        scores, a reversed one anti-correlates perfectly.
+        """
+        proxy = [math.sqrt(s) for s in scores]
+        assert rank_correlation(proxy, scores) == pytest.approx(1.0)
+        assert rank_correlation([-p for p in proxy], scores) == pytest.approx(-1.0)
+
+    def test_rank_correlation_undefined(self):
+        assert math.isnan(rank_correlation([0.5], [0.5]))
+        assert math.isnan(rank_correlation([0.5, 0.5], [0.1, 0.2]))
+
+    def test_tune_multifidelity_rejects_bounds(self):
+        with pytest.raises(ValueError, match="promote"):
+            tune_multifidelity(promote=0)
+        with pytest.raises(ValueError):
+            tune_multifidelity(epochs=4)
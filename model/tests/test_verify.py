@@ -0,0 +1,154 @@
+"""
+Tests for post-export verification (detection agreement and the gate).
+"""
+
+import numpy as np
+import pytest
+import torch
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from PIL import Image
+
+from mina.metrics import PredictionArrays
+from mina.verify import (
+    VerifyThresholds,
+    check_verification,
+    compare_detections,
+    match_detections,
+    measure_latency,
+    predict_pool,
+    select_verify_images,
+)
+
+
+def random_detections(seed: int, num_images: int = 5) -> PredictionArrays:
+    """Create random detections spread over a few images."""
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 20))
+    xy = rng.uniform(0.0, 0.7, (n, 2))
+    wh = rng.uniform(0.05, 0.3, (n, 2))
+    return PredictionArrays(
+        image_ids=rng.integers(0, num_images, n),
+        boxes=np.concatenate([xy, xy + wh], axis=1).astype(np.float32),
+        scores=rng.uniform(0.3, 1.0, n).astype(np.float32),
+        classes=rng.integers(0, 5, n),
+    )
+
+
+class TestAgreement:
+    """Box-level agreement between source and export detections."""
+
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=25)
+    def test_identical_detections_agree(self, seed: int):
+        detections = random_detections(seed)
+        report = compare_detections(detections, detections)
+
+        assert report["match_rate"] == 1.0
+        assert report["extra_rate"] == 0.0
+        assert np.isclose(report["mean_iou"], 1.0)
+        assert report["confidence_delta"] == 0.0
+        assert report["class_agreement"] == 1.0
+
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=25)
+    def test_matching_is_one_to_one(self, seed: int):
+        reference = random_detections(seed)
+        candidate = random_detections(seed + 1)
+
+        ref_idx, cand_idx, iou = match_detections(reference, candidate)
+
+        assert len(set(ref_idx.tolist())) == len(ref_idx)
+        assert len(set(cand_idx.tolist())) == len(cand_idx)
+        assert np.all(reference.image_ids[ref_idx] == candidate.image_ids[cand_idx])
+        assert np.all(iou >= 0.5)
+
+    def test_class_flip_and_confidence_drift(self):
+        reference = random_detections(0)
+        candidate = reference._replace(
+            scores=reference.scores - 0.1,
+            classes=(reference.classes + 1) % 5,
+        )
+
+        report = compare_detections(reference, candidate)
+
+        assert report["match_rate"] == 1.0
+        assert np.isclose(report["confidence_delta"], 0.1, atol=1e-6)
+        assert report["class_agreement"] == 0.0
+
+    def test_missing_detections(self):
+        reference = random_detections(0)
+        report = compare_detections(reference, PredictionArrays.empty())
+
+        assert report["match_rate"] == 0.0
+        assert report["candidate"] == 0
+
+
+class TestGate:
+    """The verification gate must flag each exceeded threshold."""
+
+    def test_passing_report(self):
+        report = compare_detections(random_detections(0), random_detections(0))
+        report["latency_ratio"] = 0.5
+        assert check_verification(report, VerifyThresholds()) == []
+
+    def test_failures_are_reported(self):
+        report = {
+            "match_rate": 0.5,
+            "mean_iou": 0.6,
+            "confidence_delta": 0.2,
+            "class_agreement": 0.5,
+            "latency_ratio": 3.0,
+        }
+        failures = check_verification(report, VerifyThresholds(max_latency_ratio=2.0))
+        assert len(failures) == 5
+
+
+class TestImageSubset:
+    """The verification subset must be fixed for a directory."""
+
+    def test_evenly_spaced_and_stable(self, tmp_path):
+        for i in range(10):
+            Image.new("RGB", (8, 8)).save(tmp_path / f"{i:02d}.jpg")
+
+        first = select_verify_images(tmp_path, count=4)
+        assert first == select_verify_images(tmp_path, count=4)
+        assert [p.name for p in first] == ["00.jpg", "03.jpg", "06.jpg", "09.jpg"]
+
+    def test_empty_directory_raises(self, tmp_path):
+        with pytest.raises(ValueError):
+            select_verify_images(tmp_path)
+
+
+class TestPredictPool:
+    """Model instances share the CPU without changing the results."""
+
+    def test_workers_cover_images(self, tmp_path):
+        from ultralytics import YOLO
+
+        weights = tmp_path / "yolov8n.pt"
+        YOLO("yolov8n.yaml").save(weights)
+        rng = np.random.default_rng(0)
+        images = [rng.integers(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(5)]
+        threads = torch.get_num_threads()
+
+        predictions = predict_pool(weights, images, imgsz=64, confidence=0.0, workers=2)
+        single = predict_pool(weights, images, imgsz=64, confidence=0.0, workers=1)
+
+        assert torch.get_num_threads() == threads
+        assert np.array_equal(predictions.image_ids, single.image_ids)
+        assert np.allclose(predictions.scores, single.scores, atol=1e-5)
+
+    def test_latency_pass(self, tmp_path):
+        from ultralytics import YOLO
+
+        weights = tmp_path / "yolov8n.pt"
+        YOLO("yolov8n.yaml").save(weights)
+        images = [np.zeros((48, 64, 3), dtype=np.uint8)] * 3
+        threads = torch.get_num_threads()
+
+        latency = measure_latency(weights, images, imgsz=64)
+
+        assert latency.shape == (3,)
+        assert np.all(latency > 0)
+        assert torch.get_num_threads() == threads